@@ -0,0 +1,1216 @@
+"""
+Main FastAPI application for AI Climate Resilience System
+Provides endpoints for disaster prediction, alerts, and data management
+"""
+
+import time
+_IMPORT_STARTED = time.perf_counter()  # Start of the module import phase
+
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.security import HTTPBearer
+from pydantic import BaseModel
+from typing import List, Dict, Optional, Tuple
+import logging
+import asyncio
+import os
+from datetime import datetime, timedelta
+import json
+import pandas as pd
+
+# Import our models and services
+# from ..models.flood_model import FloodPredictionModel
+# from ..models.drought_model import DroughtPredictionModel
+# from ..models.cyclone_model import CyclonePredictionModel
+from ..models.simple_models import SimpleModelFactory
+from ..models.registry import model_registry
+from ..models.lazy_imports import preload
+from ..services.data_collector import DataCollector, LocationData, LOCATION_SOURCES
+from ..services.alert_system import AlertSystem
+from ..services.weather_api import WeatherAPIService
+from ..services.satellite_api import SatelliteAPIService
+from ..services.geocoding_api import geocoding_service
+from ..services.http_client import http_client
+from ..services.compute_executor import compute_executor
+from ..services.inference_scheduler import inference_scheduler
+from ..services.tile_cache import tile_cache
+from ..services.prediction_index import prediction_index
+from ..services.risk_grid_service import MAX_ZOOM, TILE_FORMATS, risk_grid_service
+from ..services.update_stream import update_stream
+from ..services.metrics import (CONTENT_TYPE_LATEST, RequestMetricsMiddleware, TaskTimer, monitor_loop_lag,
+                                observe_stage, render as render_metrics, runtime_collector)
+from ..database.models import DatabaseManager
+from .routes.weather import router as weather_router, stream_layers, weather_snapshots
+from .snapshots import etag_matches
+from .startup import StartupTracker
+
+startup_tracker = StartupTracker(started_at=_IMPORT_STARTED)
+startup_tracker.record("imports", time.perf_counter() - _IMPORT_STARTED)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="AI Climate Resilience & Disaster Preparedness System",
+    description="Advanced AI-powered system for predicting natural disasters and providing early warnings",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc"
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Configure appropriately for production
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(RequestMetricsMiddleware)
+
+# Include routers
+app.include_router(weather_router, prefix="/api/v1")
+
+# Security
+security = HTTPBearer()
+
+# Initialize services
+data_collector = DataCollector()
+weather_service = WeatherAPIService()
+satellite_service = SatelliteAPIService()
+alert_system = AlertSystem()
+db_manager = DatabaseManager()
+
+# Component statistics read on each /metrics scrape
+runtime_collector.bind(
+    http_client=http_client,
+    location_cache=data_collector.cache,
+    alert_delivery=alert_system.delivery,
+    inference_scheduler=inference_scheduler,
+    update_stream=update_stream,
+    db_manager=db_manager
+)
+
+# New area alerts are pushed to the update stream subscribers
+alert_system.alert_listeners.append(update_stream.publish_alert)
+
+# Initialize models
+# flood_model = FloodPredictionModel(forward=inference_scheduler.predict)
+# drought_model = DroughtPredictionModel(forward=inference_scheduler.predict)
+# cyclone_model = CyclonePredictionModel(forward=inference_scheduler.predict)
+model_factory = SimpleModelFactory()
+models = model_factory.get_all_models()
+
+# Used when weather data could not be collected for a location
+FALLBACK_WEATHER_ROW = {
+    "temperature": 25,
+    "precipitation": 10,
+    "humidity": 60,
+    "pressure": 1013,
+    "wind_speed": 5,
+    "water_level": 1.5,
+    "soil_moisture": 0.4,
+    "ndvi": 0.3,
+    "evi": 0.2,
+    "lst": 25,
+    "sst": 26,
+    "wind_shear": 2,
+    "relative_humidity": 65
+}
+
+DISASTER_TYPES = ["flood", "drought", "cyclone"]
+
+# Returned when a model fails to score a location
+FALLBACK_PREDICTIONS = {
+    "flood": {
+        "probability": 0.75,
+        "risk_level": "HIGH",
+        "confidence": 0.85,
+        "water_level": 2.5,
+        "rainfall_24h": 45.2
+    },
+    "drought": {
+        "probability": 0.45,
+        "risk_level": "MEDIUM",
+        "confidence": 0.78,
+        "vegetation_health": 0.6,
+        "soil_moisture": 0.3
+    },
+    "cyclone": {
+        "probability": 0.65,
+        "risk_level": "HIGH",
+        "confidence": 0.82,
+        "intensity": "CATEGORY_2",
+        "wind_speed": 85.0
+    }
+}
+
+# Batch prediction limits
+BATCH_MAX_ENTRIES = int(os.getenv("PREDICT_BATCH_MAX_ENTRIES", "10000"))
+BATCH_CHUNK_SIZE = int(os.getenv("PREDICT_BATCH_CHUNK_SIZE", "1000"))
+BATCH_COLLECTION_CONCURRENCY = int(os.getenv("PREDICT_BATCH_CONCURRENCY", "32"))
+
+# How often each worker checks the registry for a newly activated model version
+MODEL_RELOAD_INTERVAL_S = int(os.getenv("MODEL_RELOAD_INTERVAL_S", "60"))
+# How often the event loop lag is sampled
+LOOP_LAG_INTERVAL_S = float(os.getenv("LOOP_LAG_INTERVAL_S", "0.5"))
+
+# Pydantic models for API requests/responses
+class LocationRequest(BaseModel):
+    latitude: float
+    longitude: float
+    radius_km: float = 50.0
+
+class PredictionRequest(BaseModel):
+    location: LocationRequest
+    disaster_type: str  # "flood", "drought", "cyclone"
+    prediction_horizon_hours: int = 24
+
+class CityPredictionRequest(BaseModel):
+    city_name: str
+    disaster_type: str  # "flood", "drought", "cyclone"
+    prediction_horizon_hours: int = 24
+    country_code: Optional[str] = None
+
+class BatchLocationRequest(LocationRequest):
+    disaster_types: List[str]  # ["flood", "drought", "cyclone"]
+
+class BatchPredictionRequest(BaseModel):
+    locations: List[BatchLocationRequest]
+    prediction_horizon_hours: int = 24
+
+class AlertRequest(BaseModel):
+    user_id: str
+    location: LocationRequest
+    alert_types: List[str]  # ["sms", "email", "push"]
+    disaster_types: List[str]  # ["flood", "drought", "cyclone"]
+
+class PredictionResponse(BaseModel):
+    disaster_type: str
+    probability: float
+    risk_level: str
+    confidence: float
+    timestamp: str
+    location: LocationRequest
+    details: Dict
+    recommendations: List[str]
+
+class AlertResponse(BaseModel):
+    alert_id: str
+    status: str
+    message: str
+    timestamp: str
+
+class SystemStatusResponse(BaseModel):
+    status: str
+    models_loaded: bool
+    data_sources_connected: bool
+    last_update: str
+    active_alerts: int
+
+@app.on_event("startup")
+async def startup_event():
+    """Initialize the system on startup"""
+    logger.info("Starting AI Climate Resilience System...")
+    
+    try:
+        # Start the shared upstream HTTP pool
+        with startup_tracker.phase("http_pool"):
+            await http_client.start()
+        
+        # Start the alert delivery workers
+        await alert_system.delivery.start()
+        
+        # Initialize database (optional). In fast mode predictions are
+        # served while the pool connects in the background.
+        if startup_tracker.config.is_fast:
+            asyncio.create_task(initialize_database())
+        else:
+            await initialize_database()
+        
+        # Load pre-trained models
+        with startup_tracker.phase("model_load"):
+            await load_models()
+        
+        # Start the compute pools (process mode loads the models in every worker)
+        with startup_tracker.phase("compute_pool"):
+            await compute_executor.start(DISASTER_TYPES)
+        
+        # Start background tasks
+        asyncio.create_task(data_collection_task())
+        asyncio.create_task(alert_monitoring_task())
+        asyncio.create_task(model_reload_task())
+        asyncio.create_task(monitor_loop_lag(LOOP_LAG_INTERVAL_S))
+        asyncio.create_task(update_stream.run(stream_layers))
+        asyncio.create_task(risk_grid_task())
+        
+        # Import the deep-model dependencies ahead of first use
+        if startup_tracker.config.warmup_enabled:
+            if startup_tracker.config.is_fast:
+                asyncio.create_task(warm_up())
+            else:
+                await warm_up()
+        
+        startup_tracker.mark_ready()
+        logger.info("System startup completed successfully")
+    except Exception as e:
+        logger.error(f"Startup failed: {e}")
+        # Don't raise the error, just log it
+        logger.info("Continuing with limited functionality...")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on shutdown"""
+    logger.info("Shutting down AI Climate Resilience System...")
+    
+    await alert_system.delivery.stop()
+    inference_scheduler.close()
+    await compute_executor.close()
+    await http_client.close()
+    await db_manager.close()
+
+async def initialize_database():
+    """Initialize the database pool, timing it for the startup report"""
+    try:
+        with startup_tracker.phase("db_pool"):
+            await db_manager.initialize()
+        logger.info("Database initialized successfully")
+    except Exception as e:
+        logger.warning(f"Database initialization failed: {e}")
+        logger.info("Continuing with simulated data...")
+
+async def warm_up():
+    """Import heavy model dependencies (TensorFlow, geo stack) in a worker thread"""
+    startup_tracker.warmup_started()
+    try:
+        with startup_tracker.phase("warmup"):
+            results = await asyncio.to_thread(preload)
+        startup_tracker.warmup_finished(results)
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        startup_tracker.warmup_failed(e)
+
+async def load_models():
+    """Load pre-trained models"""
+    try:
+        # Active versions come from the model registry; models without a
+        # published version keep serving simulated predictions
+        swapped = await asyncio.to_thread(reload_registry_models)
+        logger.info(f"Models loaded successfully: {swapped or 'no published versions'}")
+    except Exception as e:
+        logger.warning(f"Could not load pre-trained models: {e}")
+
+def reload_registry_models() -> Dict[str, str]:
+    """
+    Swap in any model whose active registry version changed
+
+    Each model is replaced with a single dict assignment, so requests
+    already holding the previous model finish on it.
+    """
+    swapped = {}
+    for disaster_type in DISASTER_TYPES:
+        version = model_registry.current_version(disaster_type)
+        if version is None or version == models[disaster_type].version:
+            continue
+        try:
+            models[disaster_type] = SimpleModelFactory.load_model(disaster_type, model_registry, version)
+            swapped[disaster_type] = version
+        except Exception as e:
+            logger.error(f"Failed to load {disaster_type} model version {version}: {e}")
+    return swapped
+
+async def model_reload_task():
+    """Background task that hot-swaps newly activated model versions"""
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL_S)
+        try:
+            swapped = await asyncio.to_thread(reload_registry_models)
+            if swapped:
+                logger.info(f"Hot-swapped models: {swapped}")
+        except Exception as e:
+            logger.error(f"Model reload error: {e}")
+
+async def data_collection_task():
+    """Background task for continuous data collection"""
+    timer = TaskTimer("data_collection")
+    while True:
+        try:
+            with timer.run():
+                await data_collector.collect_all_data()
+            delay_s = 3600  # Collect data every hour
+        except Exception as e:
+            logger.error(f"Data collection error: {e}")
+            delay_s = 300  # Wait 5 minutes before retrying
+        timer.schedule(delay_s)
+        await asyncio.sleep(delay_s)
+
+async def risk_grid_task():
+    """Background task that rescores the risk tile grids"""
+    timer = TaskTimer("risk_grid")
+    delay_s = risk_grid_service.config.interval_s
+    while True:
+        try:
+            with timer.run():
+                await risk_grid_service.refresh(models)
+        except Exception as e:
+            logger.error(f"Risk grid computation error: {e}")
+        timer.schedule(delay_s)
+        await asyncio.sleep(delay_s)
+
+async def alert_monitoring_task():
+    """Background task for monitoring and sending alerts"""
+    timer = TaskTimer("alert_monitoring")
+    while True:
+        try:
+            with timer.run():
+                await alert_system.process_alerts()
+            delay_s = 300  # Check alerts every 5 minutes
+        except Exception as e:
+            logger.error(f"Alert monitoring error: {e}")
+            delay_s = 60  # Wait 1 minute before retrying
+        timer.schedule(delay_s)
+        await asyncio.sleep(delay_s)
+
+@app.get("/", response_model=Dict)
+async def root():
+    """Root endpoint with system information"""
+    return {
+        "message": "AI Climate Resilience & Disaster Preparedness System",
+        "version": "1.0.0",
+        "status": "operational",
+        "endpoints": {
+            "predictions": "/api/v1/predict",
+            "batch_predictions": "/api/v1/predict/batch",
+            "alerts": "/api/v1/alerts",
+            "status": "/api/v1/status",
+            "docs": "/docs"
+        }
+    }
+
+@app.get("/api/v1/status", response_model=SystemStatusResponse)
+async def get_system_status():
+    """Get system status and health"""
+    try:
+        # Check data sources
+        weather_connected = await weather_service.check_connection()
+        satellite_connected = await satellite_service.check_connection()
+        
+        # Get active alerts count
+        active_alerts = await alert_system.get_active_alerts_count()
+        
+        return SystemStatusResponse(
+            status="operational",
+            models_loaded=True,  # Simple models are always available
+            data_sources_connected=weather_connected and satellite_connected,
+            last_update=datetime.now().isoformat(),
+            active_alerts=active_alerts
+        )
+    except Exception as e:
+        logger.error(f"Status check failed: {e}")
+        raise HTTPException(status_code=500, detail="Status check failed")
+
+@app.get("/api/v1/ready")
+async def get_readiness():
+    """
+    Readiness probe: 200 once the simple models can serve predictions,
+    with the background warm-up state alongside
+    """
+    unavailable = [
+        module for module, result in startup_tracker.warmup_results.items() if not result.get("loaded")
+    ]
+    body = {
+        "ready": startup_tracker.ready,
+        "mode": startup_tracker.config.mode,
+        # Warm once every heavy dependency is imported; replicas without
+        # the deep-model stack serve the simple models only
+        "warm": startup_tracker.warmup_state == "done" and not unavailable,
+        "warmup_state": startup_tracker.warmup_state,
+        "unavailable_modules": unavailable
+    }
+    return JSONResponse(status_code=200 if startup_tracker.ready else 503, content=body)
+
+@app.get("/api/v1/system/startup")
+async def get_startup_report():
+    """Get the startup timing report for this worker"""
+    return startup_tracker.report()
+
+@app.get("/api/v1/system/http-pools")
+async def get_http_pool_stats():
+    """Get upstream HTTP connection pool statistics per host"""
+    return http_client.get_pool_stats()
+
+@app.get("/api/v1/system/location-cache")
+async def get_location_cache_stats():
+    """Get location data cache statistics"""
+    if data_collector.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **data_collector.cache.get_stats()}
+
+@app.get("/api/v1/system/write-behind")
+async def get_write_behind_stats():
+    """Get database write-behind buffer statistics"""
+    return db_manager.get_write_behind_stats()
+
+@app.get("/api/v1/system/inference")
+async def get_inference_stats():
+    """Get deep-model micro-batching statistics"""
+    return inference_scheduler.get_stats()
+
+@app.get("/api/v1/system/tile-cache")
+async def get_tile_cache_stats():
+    """Get satellite tile cache statistics"""
+    return tile_cache.get_stats()
+
+@app.get("/api/v1/system/prediction-index")
+async def get_prediction_index_stats():
+    """Get prediction index statistics"""
+    return prediction_index.get_stats()
+
+@app.get("/api/v1/system/risk-grid")
+async def get_risk_grid_stats():
+    """Get risk grid statistics"""
+    return risk_grid_service.get_stats()
+
+@app.get("/api/v1/system/snapshots")
+async def get_snapshot_stats():
+    """Get weather snapshot statistics"""
+    return weather_snapshots.get_stats()
+
+@app.get("/api/v1/system/stream")
+async def get_stream_stats():
+    """Get update stream statistics"""
+    return update_stream.get_stats()
+
+@app.get("/api/v1/system/compute")
+async def get_compute_stats():
+    """Get compute executor statistics"""
+    return compute_executor.get_stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    # Set as a header: media_type would append a second charset
+    return Response(content=render_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+@app.get("/api/v1/models")
+async def get_model_versions():
+    """Get the loaded and published versions of each model"""
+    registry_status = model_registry.get_status(DISASTER_TYPES)
+    return {
+        disaster_type: {
+            "loaded_version": models[disaster_type].version,
+            "trained": models[disaster_type].is_trained,
+            **registry_status[disaster_type]
+        }
+        for disaster_type in DISASTER_TYPES
+    }
+
+@app.post("/api/v1/models/reload")
+async def reload_models():
+    """Load newly activated model versions without a restart"""
+    try:
+        swapped = await asyncio.to_thread(reload_registry_models)
+        return {"reloaded": swapped}
+    except Exception as e:
+        logger.error(f"Model reload failed: {e}")
+        raise HTTPException(status_code=500, detail="Model reload failed")
+
+@app.get("/api/v1/risk/nearby")
+async def get_nearby_risk(latitude: float, longitude: float, radius_km: float = 50.0, k: int = 10,
+                          disaster_type: Optional[str] = None, min_probability: float = 0.0):
+    """
+    Get the highest-risk recent predictions within a radius
+    
+    Served from the in-memory prediction index; predictions drop out once
+    their horizon has passed.
+    """
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    if not 0 < radius_km <= prediction_index.config.max_radius_km:
+        raise HTTPException(
+            status_code=400,
+            detail=f"radius_km must be in (0, {prediction_index.config.max_radius_km}]"
+        )
+    if not 1 <= k <= 1000:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 1000")
+    if disaster_type is not None and disaster_type not in DISASTER_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid disaster type")
+    
+    start_time = time.perf_counter()
+    matches = prediction_index.nearby(
+        latitude, longitude, radius_km, k,
+        disaster_types=[disaster_type] if disaster_type else None,
+        min_probability=min_probability
+    )
+    return {
+        "location": {"latitude": latitude, "longitude": longitude, "radius_km": radius_km},
+        "count": len(matches),
+        "predictions": [entry.to_dict(distance_km) for entry, distance_km in matches],
+        "query_ms": round((time.perf_counter() - start_time) * 1000, 3)
+    }
+
+@app.get("/api/v1/risk/grid")
+async def get_risk_grid():
+    """Get the risk grid layout and the available (disaster type, time step) layers"""
+    return risk_grid_service.describe()
+
+@app.get("/api/v1/risk/tiles/{disaster_type}/{z}/{x}/{y}.{fmt}")
+async def get_risk_tile(request: Request, disaster_type: str, z: int, x: int, y: int, fmt: str,
+                        step: Optional[str] = None):
+    """
+    Get an XYZ (Web Mercator) risk tile as a palette PNG or raw uint8 array
+    
+    Raw tiles are 256x256 bytes, rows north to south: value / 254 is the
+    probability and 255 means no data. ``step`` selects a time step from
+    /api/v1/risk/grid; the latest by default.
+    """
+    if disaster_type not in DISASTER_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid disaster type")
+    if fmt not in TILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown tile format {fmt!r}, expected one of {list(TILE_FORMATS)}")
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Invalid tile coordinates")
+    
+    layer = risk_grid_service.layer(disaster_type, step)
+    if layer is None:
+        raise HTTPException(status_code=404, detail="No risk grid computed for this disaster type and step yet")
+    
+    headers = {"ETag": f'"{layer.step}-{layer.version}"', "Cache-Control": "public, max-age=300"}
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    try:
+        body = risk_grid_service.tile(layer, z, x, y, fmt)
+    except Exception as e:
+        logger.error(f"Risk tile {disaster_type}/{z}/{x}/{y} failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to render risk tile")
+    return Response(content=body, media_type=TILE_FORMATS[fmt], headers=headers)
+
+@app.post("/api/v1/predict", response_model=PredictionResponse)
+async def predict_disaster(request: PredictionRequest):
+    """Predict natural disasters for a given location using coordinates"""
+    try:
+        # Validate disaster type
+        if request.disaster_type not in ["flood", "drought", "cyclone"]:
+            raise HTTPException(status_code=400, detail="Invalid disaster type")
+        
+        # Collect current data for the location (degrades per source)
+        location_data = await collect_prediction_data(request.location)
+        
+        # Make prediction based on disaster type
+        if request.disaster_type == "flood":
+            prediction = await predict_flood(location_data)
+        elif request.disaster_type == "drought":
+            prediction = await predict_drought(location_data)
+        else:  # cyclone
+            prediction = await predict_cyclone(location_data)
+        
+        # Record which sources the prediction was made without
+        prediction["missing_sources"] = location_data["missing_sources"]
+        prediction["stale_sources"] = location_data["stale_sources"]
+        
+        # Generate recommendations
+        with observe_stage("recommendations", request.disaster_type):
+            recommendations = generate_recommendations(
+                request.disaster_type,
+                prediction["risk_level"],
+                prediction["probability"]
+            )
+        
+        # Index the prediction for nearby-risk queries and alert cycles
+        prediction_index.add(
+            request.disaster_type, request.location.latitude, request.location.longitude,
+            prediction, request.prediction_horizon_hours
+        )
+        
+        # Store prediction in database (optional)
+        try:
+            with observe_stage("db_write", request.disaster_type):
+                await db_manager.store_prediction(
+                    request.disaster_type,
+                    request.location.model_dump(),
+                    prediction,
+                    request.prediction_horizon_hours
+                )
+        except Exception as e:
+            logger.warning(f"Failed to store prediction in database: {e}")
+        
+        return PredictionResponse(
+            disaster_type=request.disaster_type,
+            probability=prediction["probability"],
+            risk_level=prediction["risk_level"],
+            confidence=prediction["confidence"],
+            timestamp=prediction["timestamp"],
+            location=request.location,
+            details=prediction,
+            recommendations=recommendations
+        )
+        
+    except Exception as e:
+        logger.error(f"Prediction failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@app.post("/api/v1/predict/city", response_model=PredictionResponse)
+async def predict_disaster_by_city(request: CityPredictionRequest):
+    """Predict natural disasters for a given city name"""
+    try:
+        # Validate disaster type
+        if request.disaster_type not in ["flood", "drought", "cyclone"]:
+            raise HTTPException(status_code=400, detail="Invalid disaster type")
+        
+        # Geocode the city name to get coordinates
+        logger.info(f"Geocoding city: {request.city_name}")
+        location_info = await geocoding_service.geocode_city(
+            request.city_name, 
+            request.country_code
+        )
+        
+        if not location_info:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"City '{request.city_name}' not found. Please check the spelling or try a different city name."
+            )
+        
+        # Create location request with geocoded coordinates
+        location_request = LocationRequest(
+            latitude=location_info['latitude'],
+            longitude=location_info['longitude'],
+            radius_km=50.0
+        )
+        
+        # Collect current data for the location (degrades per source)
+        location_data = await collect_prediction_data(location_request)
+        
+        # Make prediction based on disaster type
+        if request.disaster_type == "flood":
+            prediction = await predict_flood(location_data)
+        elif request.disaster_type == "drought":
+            prediction = await predict_drought(location_data)
+        else:  # cyclone
+            prediction = await predict_cyclone(location_data)
+        
+        # Record which sources the prediction was made without
+        prediction["missing_sources"] = location_data["missing_sources"]
+        prediction["stale_sources"] = location_data["stale_sources"]
+        
+        # Generate recommendations
+        with observe_stage("recommendations", request.disaster_type):
+            recommendations = generate_recommendations(
+                request.disaster_type,
+                prediction["risk_level"],
+                prediction["probability"]
+            )
+        
+        # Index the prediction for nearby-risk queries and alert cycles
+        prediction_index.add(
+            request.disaster_type, location_request.latitude, location_request.longitude,
+            prediction, request.prediction_horizon_hours
+        )
+        
+        # Store prediction in database (optional)
+        try:
+            with observe_stage("db_write", request.disaster_type):
+                await db_manager.store_prediction(
+                    request.disaster_type,
+                    location_request.model_dump(),
+                    prediction,
+                    request.prediction_horizon_hours
+                )
+        except Exception as e:
+            logger.warning(f"Failed to store prediction in database: {e}")
+        
+        # Add location info to details
+        prediction_details = prediction.copy()
+        prediction_details.update({
+            "city_name": location_info['city'],
+            "display_name": location_info['display_name'],
+            "country": location_info['country'],
+            "state": location_info['state'],
+            "geocoding_confidence": location_info['confidence']
+        })
+        
+        return PredictionResponse(
+            disaster_type=request.disaster_type,
+            probability=prediction["probability"],
+            risk_level=prediction["risk_level"],
+            confidence=prediction["confidence"],
+            timestamp=prediction["timestamp"],
+            location=location_request,
+            details=prediction_details,
+            recommendations=recommendations
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"City prediction failed: {e}")
+        raise HTTPException(status_code=500, detail=f"City prediction failed: {str(e)}")
+
+@app.post("/api/v1/predict/batch")
+async def predict_disaster_batch(request: BatchPredictionRequest):
+    """
+    Predict natural disasters for many locations and disaster types at once
+
+    Data is collected once per distinct location and each model scores all
+    of its locations in one vectorized call. Results stream back as
+    newline-delimited JSON, one line per entry in input order.
+    """
+    if len(request.locations) > BATCH_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.locations)} entries (max {BATCH_MAX_ENTRIES})"
+        )
+    
+    for index, entry in enumerate(request.locations):
+        if not entry.disaster_types or any(t not in DISASTER_TYPES for t in entry.disaster_types):
+            raise HTTPException(status_code=400, detail=f"Invalid disaster type in entry {index}")
+    
+    return StreamingResponse(
+        stream_batch_predictions(request.locations, request.prediction_horizon_hours),
+        media_type="application/x-ndjson"
+    )
+
+async def collect_prediction_data(location: LocationRequest) -> Dict:
+    """Collect location data for a prediction, degrading per source"""
+    try:
+        with observe_stage("collect"):
+            location_data_obj = await data_collector.collect_location_data(
+                location.latitude,
+                location.longitude,
+                location.radius_km
+            )
+    except Exception as e:
+        logger.warning(f"Data collection failed: {e}")
+        location_data_obj = None
+
+    if location_data_obj is None:
+        # Use simulated data
+        return {
+            "weather_data": pd.DataFrame([FALLBACK_WEATHER_ROW]),
+            "satellite_data": pd.DataFrame(),
+            "soil_data": pd.DataFrame(),
+            "atmospheric_data": pd.DataFrame(),
+            "ocean_data": pd.DataFrame(),
+            "spatial_data": [],
+            "missing_sources": list(LOCATION_SOURCES),
+            "stale_sources": []
+        }
+
+    # Convert LocationData object to dictionary format
+    location_data = location_data_to_dict(location_data_obj)
+
+    # Observed weather replaces the climatology inputs of its risk grid cell
+    if not location_data["weather_data"].empty:
+        risk_grid_service.observe(
+            location.latitude, location.longitude, location_data["weather_data"].iloc[0].to_dict()
+        )
+
+    # Only the missing weather source falls back to simulated values
+    if location_data["weather_data"].empty:
+        location_data["weather_data"] = pd.DataFrame([FALLBACK_WEATHER_ROW])
+
+    return location_data
+
+def batch_location_key(location: LocationRequest) -> Tuple[float, float, float]:
+    """Key identifying a distinct location within a batch"""
+    return (location.latitude, location.longitude, location.radius_km)
+
+async def collect_batch_location(location: LocationRequest, semaphore: asyncio.Semaphore) -> Dict:
+    """Collect a batch location and keep only what the simple models read"""
+    async with semaphore:
+        location_data = await collect_prediction_data(location)
+    
+    return {
+        "weather_row": location_data["weather_data"].iloc[0].to_dict(),
+        "missing_sources": location_data["missing_sources"],
+        "stale_sources": location_data["stale_sources"]
+    }
+
+async def stream_batch_predictions(entries: List[BatchLocationRequest], horizon_hours: int = 24):
+    """
+    Yield batch prediction results as NDJSON lines in input order
+
+    Entries are processed in chunks of BATCH_CHUNK_SIZE so results start
+    streaming before the whole batch is collected; the next chunk's data
+    collection runs while the current chunk is scored and written.
+    """
+    semaphore = asyncio.Semaphore(BATCH_COLLECTION_CONCURRENCY)
+    chunks = [entries[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(entries), BATCH_CHUNK_SIZE)]
+    # One collection per distinct location across the whole batch
+    tasks: Dict[Tuple, asyncio.Task] = {}
+    
+    def schedule(chunk: List[BatchLocationRequest]):
+        for entry in chunk:
+            key = batch_location_key(entry)
+            if key not in tasks:
+                tasks[key] = asyncio.create_task(collect_batch_location(entry, semaphore))
+    
+    if chunks:
+        schedule(chunks[0])
+    offset = 0
+    try:
+        for chunk_index, chunk in enumerate(chunks):
+            if chunk_index + 1 < len(chunks):
+                schedule(chunks[chunk_index + 1])
+            
+            keys = list(dict.fromkeys(batch_location_key(entry) for entry in chunk))
+            collected = dict(zip(keys, await asyncio.gather(*(tasks[key] for key in keys))))
+            
+            # One feature matrix per model over the chunk's distinct locations
+            scored: Dict[str, Dict[Tuple, Dict]] = {}
+            for disaster_type in DISASTER_TYPES:
+                keys = list(dict.fromkeys(
+                    batch_location_key(entry) for entry in chunk if disaster_type in entry.disaster_types
+                ))
+                if keys:
+                    rows = pd.DataFrame([collected[key]["weather_row"] for key in keys])
+                    scored[disaster_type] = dict(zip(keys, await predict_batch_rows(disaster_type, rows)))
+            
+            stored = []
+            lines = []
+            for position, entry in enumerate(chunk):
+                key = batch_location_key(entry)
+                predictions = {}
+                for disaster_type in dict.fromkeys(entry.disaster_types):
+                    prediction = scored[disaster_type][key]
+                    stored.append((disaster_type, {"latitude": entry.latitude, "longitude": entry.longitude}, prediction))
+                    with observe_stage("recommendations", disaster_type):
+                        recommendations = generate_recommendations(
+                            disaster_type,
+                            prediction["risk_level"],
+                            prediction["probability"]
+                        )
+                    predictions[disaster_type] = {**prediction, "recommendations": recommendations}
+                
+                result = {
+                    "index": offset + position,
+                    "location": {
+                        "latitude": entry.latitude,
+                        "longitude": entry.longitude,
+                        "radius_km": entry.radius_km
+                    },
+                    "missing_sources": collected[key]["missing_sources"],
+                    "stale_sources": collected[key]["stale_sources"],
+                    "predictions": predictions
+                }
+                lines.append(json.dumps(result, default=to_json_value) + "\n")
+            
+            # Index the chunk's predictions and store them (buffered, written in
+            # bulk) before sending, so a client leaving mid-chunk loses nothing
+            prediction_index.add_many(stored, horizon_hours)
+            with observe_stage("db_write", "batch"):
+                await db_manager.store_predictions(stored, horizon_hours)
+            yield "".join(lines)
+            offset += len(chunk)
+    finally:
+        # Client went away mid-stream: stop collecting for unsent chunks
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+
+async def predict_batch_rows(disaster_type: str, rows: pd.DataFrame) -> List[Dict]:
+    """Score every row with a single model call off the event loop, falling back on failure"""
+    try:
+        return await compute_executor.predict_batch(disaster_type, models[disaster_type], rows)
+    except Exception as e:
+        logger.error(f"Batch {disaster_type} prediction error: {e}")
+        return [fallback_prediction(disaster_type) for _ in range(len(rows))]
+
+def fallback_prediction(disaster_type: str) -> Dict:
+    """Get the fallback prediction for a disaster type"""
+    return {**FALLBACK_PREDICTIONS[disaster_type], "timestamp": datetime.now().isoformat()}
+
+def to_json_value(value):
+    """Convert NumPy scalars and timestamps for json.dumps"""
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def location_data_to_dict(location_data_obj: LocationData) -> Dict:
+    """Convert a LocationData object to the dictionary format used by the predictors"""
+    return {
+        "weather_data": location_data_obj.weather_data,
+        "satellite_data": location_data_obj.satellite_data,
+        "soil_data": location_data_obj.soil_data,
+        "water_data": location_data_obj.water_data,
+        "atmospheric_data": location_data_obj.atmospheric_data,
+        "ocean_data": location_data_obj.ocean_data,
+        "spatial_data": location_data_obj.spatial_data,
+        "missing_sources": list(location_data_obj.missing_sources),
+        "stale_sources": list(location_data_obj.stale_sources)
+    }
+
+async def predict_flood(location_data: Dict) -> Dict:
+    """Predict flood risk"""
+    try:
+        # Prepare data for flood model
+        weather_data = location_data.get("weather_data", pd.DataFrame())
+        
+        # Make prediction using simple model, off the event loop
+        prediction = await compute_executor.predict("flood", models["flood"], weather_data)
+        
+        return prediction
+    except Exception as e:
+        logger.error(f"Flood prediction error: {e}")
+        # Return fallback prediction
+        return fallback_prediction("flood")
+
+async def predict_drought(location_data: Dict) -> Dict:
+    """Predict drought risk"""
+    try:
+        # Prepare data for drought model
+        weather_data = location_data.get("weather_data", pd.DataFrame())
+        
+        # Make prediction using simple model, off the event loop
+        prediction = await compute_executor.predict("drought", models["drought"], weather_data)
+        
+        return prediction
+    except Exception as e:
+        logger.error(f"Drought prediction error: {e}")
+        # Return fallback prediction
+        return fallback_prediction("drought")
+
+async def predict_cyclone(location_data: Dict) -> Dict:
+    """Predict cyclone risk"""
+    try:
+        # Prepare data for cyclone model
+        weather_data = location_data.get("weather_data", pd.DataFrame())
+        
+        # Make prediction using simple model, off the event loop
+        prediction = await compute_executor.predict("cyclone", models["cyclone"], weather_data)
+        
+        return prediction
+    except Exception as e:
+        logger.error(f"Cyclone prediction error: {e}")
+        # Return fallback prediction
+        return fallback_prediction("cyclone")
+
+def generate_recommendations(disaster_type: str, risk_level: str, probability: float) -> List[str]:
+    """Generate recommendations based on prediction"""
+    recommendations = []
+    
+    # Check if risk is very low or safe
+    low_risk_levels = ["LOW", "SAFE", "MINIMAL"]
+    if risk_level in low_risk_levels or probability < 0.2:
+        recommendations.append("✅ You are safe! No immediate action required.")
+        recommendations.append("🌤️ Continue monitoring weather conditions")
+        recommendations.append("📱 Stay informed through local weather updates")
+        recommendations.append("🏠 Maintain normal daily activities")
+        return recommendations
+    
+    if disaster_type == "flood":
+        if risk_level in ["HIGH", "CRITICAL", "VERY_HIGH"]:
+            recommendations.extend([
+                "🚨 Evacuate to higher ground immediately",
+                "📦 Move valuable items to upper floors",
+                "🚗 Avoid driving through flooded areas",
+                "📻 Stay tuned to emergency broadcasts",
+                "📞 Keep emergency contacts handy"
+            ])
+        elif risk_level == "MEDIUM":
+            recommendations.extend([
+                "📋 Prepare emergency kit with essentials",
+                "🌊 Monitor water levels in nearby rivers",
+                "🗺️ Have evacuation plan ready",
+                "🔒 Secure outdoor items and furniture",
+                "📱 Sign up for flood alerts"
+            ])
+        else:  # LOW risk
+            recommendations.extend([
+                "✅ You are safe from flooding",
+                "🌤️ Continue monitoring weather conditions",
+                "📱 Stay informed through local weather updates",
+                "🏠 Maintain normal daily activities"
+            ])
+    
+    elif disaster_type == "drought":
+        if risk_level in ["SEVERE_DROUGHT", "EXTREME_DROUGHT"]:
+            recommendations.extend([
+                "💧 Implement strict water conservation measures",
+                "🚰 Prepare for water restrictions",
+                "🌱 Monitor crop health closely",
+                "🌾 Consider drought-resistant crops",
+                "📊 Track water usage patterns"
+            ])
+        elif risk_level == "MODERATE_DROUGHT":
+            recommendations.extend([
+                "💧 Reduce water usage by 20-30%",
+                "🌱 Monitor soil moisture levels",
+                "🚿 Prepare irrigation systems",
+                "💧 Store water supplies",
+                "🌿 Use drought-resistant landscaping"
+            ])
+        else:  # LOW risk
+            recommendations.extend([
+                "✅ You are safe from drought conditions",
+                "🌧️ Normal rainfall patterns expected",
+                "🌱 Continue regular agricultural activities",
+                "💧 Maintain normal water usage"
+            ])
+    
+    elif disaster_type == "cyclone":
+        if risk_level in ["VERY_HIGH", "EXTREME", "CRITICAL"]:
+            recommendations.extend([
+                "🚨 Evacuate immediately if ordered by authorities",
+                "🔒 Secure all outdoor objects and furniture",
+                "🪟 Board up windows and doors",
+                "📦 Prepare emergency supplies kit",
+                "📱 Charge all electronic devices"
+            ])
+        elif risk_level == "HIGH":
+            recommendations.extend([
+                "🗺️ Prepare evacuation plan",
+                "🔒 Secure loose objects outdoors",
+                "📻 Monitor weather updates regularly",
+                "📦 Prepare emergency kit",
+                "🏠 Identify safe shelter locations"
+            ])
+        else:  # LOW risk
+            recommendations.extend([
+                "✅ You are safe from cyclone activity",
+                "🌤️ Normal weather conditions expected",
+                "📱 Continue monitoring weather updates",
+                "🏠 Maintain normal daily activities"
+            ])
+    
+    # If no specific recommendations were added, provide general safety message
+    if not recommendations:
+        recommendations.extend([
+            "✅ You are safe! No immediate action required.",
+            "🌤️ Continue monitoring weather conditions",
+            "📱 Stay informed through local weather updates",
+            "🏠 Maintain normal daily activities"
+        ])
+    
+    return recommendations
+
+@app.post("/api/v1/alerts/subscribe", response_model=AlertResponse)
+async def subscribe_to_alerts(request: AlertRequest):
+    """Subscribe to disaster alerts for a location"""
+    try:
+        alert_id = await alert_system.subscribe_user(
+            request.user_id,
+            request.location.model_dump(),
+            request.alert_types,
+            request.disaster_types
+        )
+        
+        return AlertResponse(
+            alert_id=alert_id,
+            status="subscribed",
+            message="Successfully subscribed to alerts",
+            timestamp=datetime.now().isoformat()
+        )
+    except Exception as e:
+        logger.error(f"Alert subscription failed: {e}")
+        raise HTTPException(status_code=500, detail="Alert subscription failed")
+
+@app.delete("/api/v1/alerts/{alert_id}")
+async def unsubscribe_from_alerts(alert_id: str):
+    """Unsubscribe from alerts"""
+    try:
+        await alert_system.unsubscribe_user(alert_id)
+        return {"message": "Successfully unsubscribed from alerts"}
+    except Exception as e:
+        logger.error(f"Alert unsubscription failed: {e}")
+        raise HTTPException(status_code=500, detail="Alert unsubscription failed")
+
+@app.get("/api/v1/alerts/history/{user_id}")
+async def get_alert_history(user_id: str, limit: int = 50):
+    """Get alert history for a user"""
+    try:
+        alerts = await alert_system.get_user_alerts(user_id, limit)
+        return {"alerts": alerts}
+    except Exception as e:
+        logger.error(f"Failed to get alert history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get alert history")
+
+@app.get("/api/v1/alerts/delivery")
+async def get_alert_delivery_stats():
+    """Get alert delivery queue depth and latency per channel"""
+    return alert_system.delivery.get_stats()
+
+@app.get("/api/v1/alerts/dead-letters")
+async def get_alert_dead_letters(limit: int = 100):
+    """Get alerts that could not be delivered"""
+    return {"dead_letters": alert_system.delivery.get_dead_letters(limit)}
+
+@app.get("/api/v1/data/weather/{latitude}/{longitude}")
+async def get_weather_data(latitude: float, longitude: float):
+    """Get current weather data for a location"""
+    try:
+        weather_data = await weather_service.get_current_weather(latitude, longitude)
+        return weather_data
+    except Exception as e:
+        logger.error(f"Failed to get weather data: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get weather data")
+
+@app.get("/api/v1/data/satellite/{latitude}/{longitude}")
+async def get_satellite_data(latitude: float, longitude: float):
+    """Get satellite imagery data for a location"""
+    try:
+        satellite_data = await satellite_service.get_satellite_data(latitude, longitude)
+        return satellite_data
+    except Exception as e:
+        logger.error(f"Failed to get satellite data: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get satellite data")
+
+@app.get("/api/v1/geocode/search")
+async def search_cities(query: str, limit: int = 5):
+    """Search for cities by name"""
+    try:
+        cities = await geocoding_service.search_cities(query, limit)
+        return {"cities": cities}
+    except Exception as e:
+        logger.error(f"City search failed: {e}")
+        raise HTTPException(status_code=500, detail="City search failed")
+
+@app.get("/api/v1/geocode/city/{city_name}")
+async def geocode_city(city_name: str, country_code: Optional[str] = None):
+    """Get coordinates for a city name"""
+    try:
+        location_info = await geocoding_service.geocode_city(city_name, country_code)
+        if not location_info:
+            raise HTTPException(status_code=404, detail=f"City '{city_name}' not found")
+        return location_info
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Geocoding failed: {e}")
+        raise HTTPException(status_code=500, detail="Geocoding failed")
+
+@app.get("/api/v1/analytics/trends/{disaster_type}")
+async def get_disaster_trends(disaster_type: str, days: int = 30, city: str = None):
+    """Get disaster prediction trends over time for a city (mock data)"""
+    try:
+        # For demo, generate mock trend data
+        from datetime import datetime, timedelta
+        import random
+        now = datetime.now()
+        trends = []
+        for i in range(days):
+            dt = now - timedelta(days=days - i)
+            probability = max(0, min(1, random.gauss(0.3 + 0.2 * (disaster_type == 'flood'), 0.15)))
+            if probability > 0.7:
+                risk_level = 'HIGH'
+            elif probability > 0.4:
+                risk_level = 'MEDIUM'
+            else:
+                risk_level = 'LOW'
+            trends.append({
+                'timestamp': dt.isoformat(),
+                'probability': probability,
+                'risk_level': risk_level
+            })
+        return {"trends": trends}
+    except Exception as e:
+        logger.error(f"Failed to get trends: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get trends")
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,400 @@
+"""
+Weather API Routes for Globe Visualization
+Provides live weather data including cyclones, drought areas, and rainfall,
+plus a gridded cyclone genesis-risk field. The polled routes serve
+versioned snapshots with ETags and compact encodings.
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any
+import asyncio
+from datetime import datetime, timedelta
+import random
+import math
+
+import numpy as np
+
+from ...services.genesis_service import genesis_service
+from ...services.update_stream import LAYERS, BoundingBox, StreamFull, update_stream
+from ..snapshots import SnapshotStore
+
+router = APIRouter(prefix="/weather", tags=["weather"])
+
+# Largest genesis grid returned in one response; use stride or a bbox beyond this
+GENESIS_GRID_MAX_CELLS = 300_000
+
+# Simulated weather data for demo
+SIMULATED_CYCLONES = [
+    {
+        "id": "AL012023",
+        "name": "Hurricane Ian",
+        "lat": 25.0,
+        "lon": -80.0,
+        "intensity": 4,
+        "category": "Category 4",
+        "wind_speed": 130,
+        "pressure": 950,
+        "movement": "NW",
+        "speed": 12,
+        "timestamp": datetime.now().isoformat()
+    },
+    {
+        "id": "WP012023",
+        "name": "Typhoon Noru",
+        "lat": 15.0,
+        "lon": 120.0,
+        "intensity": 3,
+        "category": "Category 3",
+        "wind_speed": 115,
+        "pressure": 965,
+        "movement": "W",
+        "speed": 15,
+        "timestamp": datetime.now().isoformat()
+    },
+    {
+        "id": "SH012023",
+        "name": "Cyclone Yasi",
+        "lat": -20.0,
+        "lon": 150.0,
+        "intensity": 2,
+        "category": "Category 2",
+        "wind_speed": 95,
+        "pressure": 980,
+        "movement": "SE",
+        "speed": 8,
+        "timestamp": datetime.now().isoformat()
+    }
+]
+
+SIMULATED_DROUGHT_AREAS = [
+    {
+        "id": "drought_001",
+        "region": "Texas, USA",
+        "lat": 35.0,
+        "lon": -100.0,
+        "severity": 0.8,
+        "level": "Extreme",
+        "affected_area_km2": 250000,
+        "population_affected": 15000000,
+        "duration_days": 180,
+        "timestamp": datetime.now().isoformat()
+    },
+    {
+        "id": "drought_002",
+        "region": "North Africa",
+        "lat": 30.0,
+        "lon": 20.0,
+        "severity": 0.7,
+        "level": "Severe",
+        "affected_area_km2": 500000,
+        "population_affected": 25000000,
+        "duration_days": 365,
+        "timestamp": datetime.now().isoformat()
+    },
+    {
+        "id": "drought_003",
+        "region": "South Africa",
+        "lat": -30.0,
+        "lon": 25.0,
+        "severity": 0.6,
+        "level": "Moderate",
+        "affected_area_km2": 300000,
+        "population_affected": 12000000,
+        "duration_days": 120,
+        "timestamp": datetime.now().isoformat()
+    },
+    {
+        "id": "drought_004",
+        "region": "Central Asia",
+        "lat": 40.0,
+        "lon": 100.0,
+        "severity": 0.5,
+        "level": "Mild",
+        "affected_area_km2": 150000,
+        "population_affected": 8000000,
+        "duration_days": 90,
+        "timestamp": datetime.now().isoformat()
+    }
+]
+
+SIMULATED_RAINFALL_DATA = [
+    {
+        "region": "Southeast Asia",
+        "lat_range": (5, 25),
+        "lon_range": (90, 130),
+        "intensity": "Heavy",
+        "amount_mm": 150,
+        "duration_hours": 24,
+        "flood_risk": "High"
+    },
+    {
+        "region": "Eastern USA",
+        "lat_range": (25, 45),
+        "lon_range": (-85, -65),
+        "intensity": "Medium",
+        "amount_mm": 75,
+        "duration_hours": 12,
+        "flood_risk": "Medium"
+    },
+    {
+        "region": "Western Europe",
+        "lat_range": (40, 60),
+        "lon_range": (-10, 20),
+        "intensity": "Light",
+        "amount_mm": 25,
+        "duration_hours": 6,
+        "flood_risk": "Low"
+    }
+]
+
+def simulate_weather() -> Dict[str, Any]:
+    """
+    One refresh of the simulated feed: cyclone positions and drought
+    severities drift slightly from their base values
+    """
+    current_time = datetime.now()
+    
+    # Update cyclone positions slightly
+    updated_cyclones = []
+    for cyclone in SIMULATED_CYCLONES:
+        # Add small random movement
+        lat_offset = random.uniform(-0.5, 0.5)
+        lon_offset = random.uniform(-0.5, 0.5)
+        
+        updated_cyclone = cyclone.copy()
+        updated_cyclone["lat"] += lat_offset
+        updated_cyclone["lon"] += lon_offset
+        updated_cyclone["timestamp"] = current_time.isoformat()
+        updated_cyclones.append(updated_cyclone)
+    
+    # Update drought severity slightly
+    updated_droughts = []
+    for drought in SIMULATED_DROUGHT_AREAS:
+        severity_change = random.uniform(-0.05, 0.05)
+        updated_drought = drought.copy()
+        updated_drought["severity"] = max(0.1, min(1.0, drought["severity"] + severity_change))
+        updated_drought["timestamp"] = current_time.isoformat()
+        updated_droughts.append(updated_drought)
+    
+    return {"time": current_time, "cyclones": updated_cyclones, "drought_areas": updated_droughts}
+
+def current_weather_view(feed: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "timestamp": feed["time"].isoformat(),
+        "cyclones": feed["cyclones"],
+        "drought_areas": feed["drought_areas"],
+        "rainfall": SIMULATED_RAINFALL_DATA,
+        "summary": {
+            "total_cyclones": len(feed["cyclones"]),
+            "total_drought_areas": len(feed["drought_areas"]),
+            "active_rainfall_regions": len(SIMULATED_RAINFALL_DATA),
+            "data_source": "simulated"
+        }
+    }
+
+def cyclones_view(feed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return feed["cyclones"]
+
+def drought_view(feed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return feed["drought_areas"]
+
+def rainfall_view(feed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return SIMULATED_RAINFALL_DATA
+
+def forecast_view(feed: Dict[str, Any], hours: int) -> Dict[str, Any]:
+    current_time = feed["time"]
+    forecast_data = []
+    
+    for hour in range(0, hours + 1, 6):  # Every 6 hours
+        forecast_time = current_time + timedelta(hours=hour)
+        
+        # Simulate forecast data
+        forecast_entry = {
+            "timestamp": forecast_time.isoformat(),
+            "cyclones": len(SIMULATED_CYCLONES),
+            "drought_areas": len(SIMULATED_DROUGHT_AREAS),
+            "rainfall_intensity": random.choice(["Light", "Medium", "Heavy"]),
+            "global_risk_level": random.choice(["Low", "Medium", "High"])
+        }
+        forecast_data.append(forecast_entry)
+    
+    return {
+        "forecast_hours": hours,
+        "data": forecast_data,
+        "generated_at": current_time.isoformat()
+    }
+
+def stats_view(feed: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "total_cyclones": len(SIMULATED_CYCLONES),
+        "total_drought_areas": len(SIMULATED_DROUGHT_AREAS),
+        "active_rainfall_regions": len(SIMULATED_RAINFALL_DATA),
+        "highest_cyclone_intensity": max(cyclone["intensity"] for cyclone in SIMULATED_CYCLONES),
+        "most_severe_drought": max(drought["severity"] for drought in SIMULATED_DROUGHT_AREAS),
+        "data_last_updated": feed["time"].isoformat(),
+        "data_source": "simulated"
+    }
+
+# Every globe client polls the same data: one refresh per SNAPSHOT_TTL_S,
+# served pre-encoded with ETags (see ..snapshots)
+weather_snapshots = SnapshotStore("weather", simulate_weather)
+
+async def stream_layers() -> Dict[str, List[Dict[str, Any]]]:
+    """Layer source of the update stream: the current snapshot refresh"""
+    feed = await weather_snapshots.data()
+    return {
+        "cyclones": feed["cyclones"],
+        "drought": feed["drought_areas"],
+        "rainfall": SIMULATED_RAINFALL_DATA
+    }
+
+@router.get("/current")
+async def get_current_weather(request: Request) -> Response:
+    """
+    Get current weather data for globe visualization
+    Returns cyclones, drought areas, and rainfall data
+    """
+    try:
+        return await weather_snapshots.respond(request, current_weather_view)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get weather data: {str(e)}")
+
+@router.get("/cyclones")
+async def get_cyclones(request: Request) -> Response:
+    """
+    Get current cyclone data
+    """
+    try:
+        return await weather_snapshots.respond(request, cyclones_view)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get cyclone data: {str(e)}")
+
+@router.get("/cyclones/genesis")
+async def get_cyclone_genesis(min_risk: float = 0.5, limit: int = 50) -> Dict[str, Any]:
+    """
+    Get the cyclone genesis-risk summary and hotspot cells
+    """
+    try:
+        grid = await genesis_service.get_grid()
+        return {
+            "summary": grid.summary(),
+            "hotspots": grid.hotspots(min_risk=min_risk, limit=min(max(limit, 1), 1000))
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get cyclone genesis data: {str(e)}")
+
+@router.get("/cyclones/genesis/grid")
+async def get_cyclone_genesis_grid(lat_min: float = -90, lat_max: float = 90,
+                                   lon_min: float = -180, lon_max: float = 180,
+                                   stride: int = 1) -> Dict[str, Any]:
+    """
+    Get the genesis-risk grid for a bounding box
+
+    Risk values are row-major (south to north, west to east), rounded to
+    three decimals, with null over land and missing data.
+    """
+    if stride < 1:
+        raise HTTPException(status_code=400, detail="stride must be at least 1")
+    try:
+        grid = (await genesis_service.get_grid()).subset(lat_min, lat_max, lon_min, lon_max, stride)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get cyclone genesis grid: {str(e)}")
+
+    if grid.risk.size > GENESIS_GRID_MAX_CELLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Grid of {grid.risk.size} cells is too large (max {GENESIS_GRID_MAX_CELLS}); "
+                   f"increase stride or narrow the bounding box"
+        )
+    risk = np.round(grid.risk.astype(np.float64), 3)
+    return {
+        "generated_at": grid.generated_at,
+        "source": grid.source,
+        "shape": list(grid.shape),
+        "latitudes": grid.latitudes.tolist(),
+        "longitudes": grid.longitudes.tolist(),
+        "risk": np.where(np.isnan(risk), None, risk).tolist()
+    }
+
+@router.get("/drought")
+async def get_drought_areas(request: Request) -> Response:
+    """
+    Get current drought area data
+    """
+    try:
+        return await weather_snapshots.respond(request, drought_view)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get drought data: {str(e)}")
+
+@router.get("/rainfall")
+async def get_rainfall_data(request: Request) -> Response:
+    """
+    Get current rainfall data
+    """
+    try:
+        return await weather_snapshots.respond(request, rainfall_view)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get rainfall data: {str(e)}")
+
+@router.get("/forecast/{hours}")
+async def get_weather_forecast(request: Request, hours: int = 24) -> Response:
+    """
+    Get weather forecast for specified hours
+    """
+    try:
+        # Max 7 days; the clamp also bounds the number of forecast snapshots
+        hours = min(max(hours, 0), 168)
+        return await weather_snapshots.respond(request, forecast_view, hours)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get forecast: {str(e)}")
+
+@router.get("/stats")
+async def get_weather_stats(request: Request) -> Response:
+    """
+    Get weather statistics
+    """
+    try:
+        return await weather_snapshots.respond(request, stats_view)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get weather stats: {str(e)}")
+
+@router.get("/stream")
+async def stream_updates(layers: str = ",".join(LAYERS),
+                         lat_min: float = -90, lat_max: float = 90,
+                         lon_min: float = -180, lon_max: float = 180) -> StreamingResponse:
+    """
+    Stream globe updates as Server-Sent Events
+
+    Sends a ``snapshot`` event of the requested layers within the bounding
+    box, then ``delta`` events (per layer ``upsert`` features and
+    ``remove`` ids) and ``alert`` events. ``lon_min`` greater than
+    ``lon_max`` crosses the antimeridian.
+    """
+    requested = frozenset(layer.strip() for layer in layers.split(",") if layer.strip())
+    unknown = requested - set(LAYERS)
+    if not requested or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown layers {sorted(unknown)}, expected some of {list(LAYERS)}")
+    if lat_min > lat_max:
+        raise HTTPException(status_code=400, detail="lat_min must not exceed lat_max")
+    try:
+        subscription = update_stream.subscribe(requested, BoundingBox(lat_min, lat_max, lon_min, lon_max))
+    except StreamFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        update_stream.events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,343 @@
+"""
+Response Snapshots
+Versioned, pre-encoded payloads for routes whose data is the same for every client:
+- Each payload built once per data refresh and tagged with a version and ETag
+- Conditional GETs (If-None-Match) answered with 304 Not Modified
+- Every representation encoded and compressed (gzip, and brotli when
+  installed) in the build thread, so requests only look bodies up
+- Optional compact encodings: MessagePack (when installed) and a packed
+  format with coordinates as float32 arrays
+- Format chosen with ?format= or the Accept header, compression with Accept-Encoding
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+PACKED_MAGIC = b"CLXP"
+PACKED_FORMAT_VERSION = 1
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "packed": "application/vnd.climatrix.packed",
+}
+ACCEPT_ALIASES = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.climatrix.packed": "packed",
+}
+
+@dataclass
+class SnapshotConfig:
+    """Snapshot configuration"""
+    # Seconds between data refreshes; every snapshot is rebuilt after a refresh
+    ttl_s: float = float(os.getenv("SNAPSHOT_TTL_S", "30"))
+    gzip_level: int = 9
+    brotli_quality: int = 11
+    # Bodies smaller than this are not worth a Content-Encoding
+    min_compress_bytes: int = int(os.getenv("SNAPSHOT_MIN_COMPRESS_BYTES", "256"))
+
+def pack_coordinates(payload: Any) -> bytes:
+    """
+    Encode a payload with the coordinates of its records as one float32 array
+
+    Every list of records that all carry numeric ``lat`` and ``lon`` is
+    replaced in the JSON header by
+    ``{"$coords": start, "count": n, "records": [...]}``, where the records
+    no longer have lat/lon and record i's coordinates are the float32 pair
+    at ``coords[2 * (start + i)]``. Layout, little-endian::
+
+        b"CLXP" | u8 format version | 3 zero bytes | u32 header length
+        | header JSON (space-padded to a multiple of 4 bytes) | float32 coords
+
+    so a browser reads the coordinates with
+    ``new Float32Array(buffer, 12 + headerLength)`` and no copy.
+    """
+    pairs: List[Tuple[float, float]] = []
+
+    def is_point(item) -> bool:
+        return (isinstance(item, dict)
+                and isinstance(item.get("lat"), (int, float))
+                and isinstance(item.get("lon"), (int, float)))
+
+    def strip(value):
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            if value and all(is_point(item) for item in value):
+                start = len(pairs)
+                pairs.extend((item["lat"], item["lon"]) for item in value)
+                records = [strip({k: v for k, v in item.items() if k not in ("lat", "lon")}) for item in value]
+                return {"$coords": start, "count": len(value), "records": records}
+            return [strip(item) for item in value]
+        return value
+
+    header = json.dumps(strip(payload), separators=(",", ":")).encode()
+    header += b" " * (-len(header) % 4)
+    coords = np.asarray(pairs, dtype="<f4").reshape(-1)
+    prefix = PACKED_MAGIC + struct.pack("<B3xI", PACKED_FORMAT_VERSION, len(header))
+    return prefix + header + coords.tobytes()
+
+def encode_payload(payload: Any, fmt: str) -> bytes:
+    if fmt == "json":
+        return json.dumps(payload, separators=(",", ":")).encode()
+    if fmt == "msgpack":
+        return msgpack.packb(payload, use_bin_type=True)
+    if fmt == "packed":
+        return pack_coordinates(payload)
+    raise ValueError(f"Unknown snapshot format {fmt!r}")
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in MEDIA_TYPES if fmt != "msgpack" or msgpack is not None]
+
+def available_encodings() -> List[str]:
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+def _parse_quality(header: str) -> Dict[str, float]:
+    """Tokens of an Accept or Accept-Encoding header with their q values"""
+    accepted = {}
+    for part in header.split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[token.lower()] = q
+    return accepted
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 specifies for If-None-Match"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+@dataclass
+class Snapshot:
+    """One built payload and its encoded bodies"""
+    name: str
+    payload: Any
+    version: int
+    digest: str
+    generation: int
+    built_at: float
+    config: SnapshotConfig
+    # (format, content encoding) -> body
+    bodies: Dict[Tuple[str, str], bytes] = field(default_factory=dict)
+
+    def etag(self, fmt: str, encoding: str) -> str:
+        """Strong ETag of one representation"""
+        return f'"{self.digest}-{fmt}-{encoding}"'
+
+    def body(self, fmt: str, encoding: str) -> Optional[bytes]:
+        """
+        A precomputed representation's body
+
+        None when the encoding would not make the body smaller.
+        """
+        return self.bodies.get((fmt, encoding))
+
+    def encode(self, fmt: str, encoding: str) -> Optional[bytes]:
+        """Encode one representation; runs in the build thread, before the snapshot is shared"""
+        key = (fmt, encoding)
+        if key not in self.bodies:
+            identity = self.bodies.get((fmt, "identity"))
+            if identity is None:
+                identity = self.bodies[(fmt, "identity")] = encode_payload(self.payload, fmt)
+            if encoding == "identity":
+                return identity
+            compressed = None
+            if len(identity) >= self.config.min_compress_bytes:
+                if encoding == "gzip":
+                    compressed = gzip.compress(identity, self.config.gzip_level, mtime=0)
+                elif encoding == "br":
+                    compressed = brotli.compress(identity, quality=self.config.brotli_quality)
+            self.bodies[key] = compressed if compressed is not None and len(compressed) < len(identity) else None
+        return self.bodies[key]
+
+    def precompute(self):
+        """Encode every format and content encoding the server offers"""
+        for fmt in available_formats():
+            for encoding in ["identity", *available_encodings()]:
+                self.encode(fmt, encoding)
+
+class SnapshotStore:
+    """
+    Versioned snapshots of views over one data source
+
+    ``source`` produces the data for one refresh; each view is a function
+    of that data (plus route parameters) returning a JSON-compatible
+    payload. The source and every requested view are built once per
+    refresh, in a worker thread, together with every representation of
+    the payload, and concurrent requests share the build; responding never
+    encodes or compresses on the event loop.
+    A snapshot whose content did not change across a refresh keeps its
+    version and ETag, so clients keep getting 304s.
+    """
+
+    def __init__(self, name: str, source: Callable[[], Any], config: SnapshotConfig = None):
+        self.name = name
+        self.source = source
+        self.config = config or SnapshotConfig()
+        self.generation = 0
+        self._data: Any = None
+        self._refreshed_at = float("-inf")
+        self._refresh: Optional[asyncio.Task] = None
+        self._snapshots: Dict[Tuple, Snapshot] = {}
+        self._builds: Dict[Tuple, asyncio.Task] = {}
+        self.stats = {"refreshes": 0, "builds": 0, "responses": 0, "not_modified": 0, "bytes_sent": 0}
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() - self._refreshed_at < self.config.ttl_s
+
+    def invalidate(self):
+        """Rebuild everything on the next request, e.g. after new data was collected"""
+        self._refreshed_at = float("-inf")
+
+    async def data(self):
+        """The source data of the current refresh, reloading it once stale"""
+        if self.fresh:
+            return self._data
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._reload())
+        return await asyncio.shield(self._refresh)
+
+    async def _reload(self):
+        data = await asyncio.to_thread(self.source)
+        self._data = data
+        self.generation += 1
+        self._refreshed_at = time.monotonic()
+        self.stats["refreshes"] += 1
+        return data
+
+    async def get(self, view: Callable[..., Any], *args) -> Snapshot:
+        """The current snapshot of a view, rebuilt after each refresh"""
+        data = await self.data()
+        key = (view.__name__, *args)
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.generation == self.generation:
+            return snapshot
+        build = self._builds.get(key)
+        if build is None or build.done():
+            build = self._builds[key] = asyncio.create_task(self._build(key, view, data, args))
+        return await asyncio.shield(build)
+
+    async def _build(self, key: Tuple, view: Callable[..., Any], data: Any, args: Tuple) -> Snapshot:
+        generation = self.generation
+        previous = self._snapshots.get(key)
+
+        def build() -> Snapshot:
+            payload = view(data, *args)
+            snapshot = Snapshot(key[0], payload, 0, "", generation, time.time(), self.config)
+            identity = snapshot.encode("json", "identity")
+            snapshot.digest = hashlib.blake2b(identity, digest_size=10).hexdigest()
+            if previous is not None and previous.digest == snapshot.digest:
+                # Same content: keep the encoded bodies, the version and the ETag
+                previous.generation = generation
+                return previous
+            snapshot.version = previous.version + 1 if previous is not None else 1
+            snapshot.precompute()
+            return snapshot
+
+        snapshot = await asyncio.to_thread(build)
+        self._snapshots[key] = snapshot
+        self.stats["builds"] += 1
+        return snapshot
+
+    def negotiate(self, request: Request) -> Tuple[str, str]:
+        """Pick the format and content encoding of a response"""
+        fmt = request.query_params.get("format")
+        if fmt is not None:
+            if fmt not in MEDIA_TYPES:
+                raise HTTPException(status_code=400, detail=f"Unknown format {fmt!r}, expected one of {list(MEDIA_TYPES)}")
+            if fmt not in available_formats():
+                raise HTTPException(status_code=406, detail=f"Format {fmt!r} is not available on this server")
+        else:
+            fmt = "json"
+            accepted = _parse_quality(request.headers.get("accept", ""))
+            best = 0.0
+            for media_type, q in accepted.items():
+                candidate = ACCEPT_ALIASES.get(media_type)
+                if candidate in available_formats() and q > best:
+                    fmt, best = candidate, q
+
+        accepted_encodings = _parse_quality(request.headers.get("accept-encoding", ""))
+        encoding = "identity"
+        for candidate in available_encodings():
+            if accepted_encodings.get(candidate, accepted_encodings.get("*", 0.0)) > 0:
+                encoding = candidate
+                break
+        return fmt, encoding
+
+    async def respond(self, request: Request, view: Callable[..., Any], *args) -> Response:
+        """Serve a view's current snapshot in the representation the client asked for"""
+        snapshot = await self.get(view, *args)
+        fmt, encoding = self.negotiate(request)
+        body = snapshot.body(fmt, encoding)
+        if body is None:
+            encoding = "identity"
+            body = snapshot.body(fmt, encoding)
+
+        etag = snapshot.etag(fmt, encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept, Accept-Encoding",
+            "X-Snapshot-Version": str(snapshot.version),
+        }
+        self.stats["responses"] += 1
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        self.stats["bytes_sent"] += len(body)
+        return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+    def get_stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "ttl_s": self.config.ttl_s,
+            "generation": self.generation,
+            "fresh": self.fresh,
+            "formats": available_formats(),
+            "encodings": available_encodings(),
+            "snapshots": {
+                "/".join(str(part) for part in key): {
+                    "version": snapshot.version,
+                    "json_bytes": len(snapshot.bodies.get(("json", "identity"), b"")),
+                    "encoded": sorted(f"{fmt}/{enc}" for (fmt, enc), body in snapshot.bodies.items() if body is not None)
+                }
+                for key, snapshot in list(self._snapshots.items())
+            },
+            **self.stats
+        }
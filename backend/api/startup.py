@@ -0,0 +1,96 @@
+"""
+Startup Tracking
+Measures and reports API cold start:
+- Startup mode (fast: ready before DB and warm-up, full: everything first)
+- Per-phase timings (imports, HTTP pool, DB pool, model load, warm-up)
+- Readiness and background warm-up state
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StartupConfig:
+    """Startup configuration"""
+    # "fast": serve the simple models as soon as they are loaded and do the
+    # database connection and heavy imports in the background.
+    # "full": finish everything before reporting ready.
+    mode: str = os.getenv("STARTUP_MODE", "fast")
+    warmup_enabled: bool = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
+    @property
+    def is_fast(self) -> bool:
+        return self.mode != "full"
+
+class StartupTracker:
+    """
+    Collects startup phase timings and readiness for one worker process
+    """
+
+    def __init__(self, started_at: float = None, config: StartupConfig = None):
+        self.config = config or StartupConfig()
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.ready_at: Optional[str] = None
+        self.ready_after_s: Optional[float] = None
+        self.warmup_state = "pending" if self.config.warmup_enabled else "disabled"
+        self.warmup_results: Dict[str, Dict] = {}
+
+    def record(self, phase: str, seconds: float):
+        """Record the duration of a startup phase"""
+        self.phases[phase] = round(seconds, 3)
+
+    @contextmanager
+    def phase(self, phase: str):
+        """Time a startup phase"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start_time)
+
+    def mark_ready(self):
+        """Mark the worker as ready to serve and log the timing report"""
+        self.ready = True
+        self.ready_at = datetime.now().isoformat()
+        self.ready_after_s = round(time.perf_counter() - self.started_at, 3)
+        logger.info(f"Ready after {self.ready_after_s}s ({self.config.mode} mode): {self.phases}")
+
+    def warmup_started(self):
+        """Mark the background warm-up as running"""
+        self.warmup_state = "running"
+
+    def warmup_finished(self, results: Dict[str, Dict]):
+        """Record the outcome of the background warm-up"""
+        self.warmup_results = results
+        self.warmup_state = "done"
+        logger.info(f"Warm-up finished: {results}")
+
+    def warmup_failed(self, error: Exception):
+        """Record a failed background warm-up"""
+        self.warmup_state = "failed"
+        self.warmup_results = {"error": {"loaded": False, "error": str(error)}}
+
+    def report(self) -> Dict:
+        """
+        Get the startup timing and warm-up report
+        """
+        return {
+            "mode": self.config.mode,
+            "ready": self.ready,
+            "ready_at": self.ready_at,
+            "ready_after_s": self.ready_after_s,
+            "phases": dict(self.phases),
+            "warmup": {
+                "state": self.warmup_state,
+                "modules": self.warmup_results
+            }
+        }
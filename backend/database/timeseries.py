@@ -0,0 +1,480 @@
+"""
+Time-Series Store
+Append-only columnar storage for collected environmental observations:
+- One partition per source and day (<root>/<source>/<YYYY-MM-DD>/)
+- One raw NumPy column file per field, only ever appended to
+- A small JSON index per partition (committed rows, dtypes, time range, series ids)
+- Memory-mapped reads for time-range, location-cell and series queries
+- Contiguous rolling-history arrays for the models
+- One-time importer for the legacy data_collection_*.json dumps
+"""
+
+import glob
+import json
+import logging
+import math
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+IMPORT_LOG_FILE = "imported.json"
+
+# Key columns present in every partition; everything else is a float32 value column
+TIMESTAMP_COLUMN = "timestamp"
+KEY_COLUMNS = {
+    TIMESTAMP_COLUMN: "<i8",  # epoch microseconds
+    "latitude": "<f8",
+    "longitude": "<f8",
+    "series": "<i4"  # position in the partition's series id list
+}
+VALUE_DTYPE = "<f4"
+
+# Coordinates of observations collected without a location: they match no cell
+UNLOCATED = (math.nan, math.nan)
+
+@dataclass
+class TimeSeriesConfig:
+    """Time-series store configuration"""
+    root_dir: str = os.getenv("TIMESERIES_DIR", "timeseries_store")
+    cell_size_deg: float = float(os.getenv("TIMESERIES_CELL_DEG", "0.05"))
+
+def to_epoch_us(value) -> int:
+    """Convert a datetime, ISO string or epoch microseconds to epoch microseconds"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        value = value.replace(tzinfo=None).isoformat()
+    return int(np.datetime64(str(value).replace(" ", "T"), "us").astype(np.int64))
+
+def _day_of(epoch_us: int) -> str:
+    return str(np.datetime64(epoch_us, "us").astype("datetime64[D]"))
+
+def _numeric_fields(record: Dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten the numeric fields of a (nested) record into column values"""
+    fields = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            fields.update(_numeric_fields(value, f"{prefix}{key}_"))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            fields[f"{prefix}{key}"] = float(value)
+    return fields
+
+def _coordinates(*payloads: Dict) -> Tuple[float, float]:
+    """The first latitude/longitude found in the payloads, or UNLOCATED"""
+    for payload in payloads:
+        location = payload.get("location") if isinstance(payload.get("location"), dict) else payload
+        for lat_key, lon_key in (("lat", "lon"), ("latitude", "longitude")):
+            if isinstance(location.get(lat_key), (int, float)) and isinstance(location.get(lon_key), (int, float)):
+                return float(location[lat_key]), float(location[lon_key])
+    return UNLOCATED
+
+def flatten_collection(data: Dict) -> Dict[str, List[Dict]]:
+    """
+    Turn one collect_all_data() result into observations per source
+
+    Each observation has timestamp, latitude, longitude, series (provider,
+    collection or sensor id) and its numeric fields. Forecasts and text
+    fields are not observations and are skipped. The monitoring cycle's
+    weather and satellite summaries usually carry no coordinates; those
+    rows are stored with NaN latitude/longitude, which no location query
+    matches, rather than with a made-up point.
+    """
+    collected_at = data.get("timestamp") or datetime.now()
+    observations: Dict[str, List[Dict]] = defaultdict(list)
+
+    for provider, payload in (data.get("weather") or {}).items():
+        current = payload.get("current") if isinstance(payload, dict) else None
+        if isinstance(current, dict):
+            latitude, longitude = _coordinates(current, payload)
+            observations[f"weather_{provider}"].append({
+                "timestamp": collected_at, "latitude": latitude, "longitude": longitude,
+                "series": provider, **_numeric_fields(current)
+            })
+
+    for name, payload in (data.get("satellite") or {}).items():
+        if isinstance(payload, dict):
+            latitude, longitude = _coordinates(payload)
+            observations[f"satellite_{name}"].append({
+                "timestamp": payload.get("timestamp") or collected_at,
+                "latitude": latitude, "longitude": longitude,
+                "series": payload.get("collection") or name,
+                **_numeric_fields(payload)
+            })
+
+    for kind, payload in (data.get("sensors") or {}).items():
+        if not isinstance(payload, dict):
+            continue
+        for record in payload.get("sensors") or payload.get("stations") or []:
+            location = record.get("location") or {}
+            if "lat" not in location or "lon" not in location:
+                continue
+            fields = _numeric_fields({k: v for k, v in record.items() if k != "location"})
+            observations[f"sensor_{kind}"].append({
+                "timestamp": record.get("timestamp") or collected_at,
+                "latitude": location["lat"], "longitude": location["lon"],
+                "series": record.get("sensor_id") or record.get("station_id") or kind,
+                **fields
+            })
+
+    return dict(observations)
+
+class TimeSeriesStore:
+    """
+    Append-only columnar store partitioned by source and day
+
+    Layout::
+
+        <root>/<source>/<YYYY-MM-DD>/index.json
+        <root>/<source>/<YYYY-MM-DD>/<column>.bin
+
+    Column files hold raw little-endian values and are only appended to.
+    The index records how many rows are committed and is replaced
+    atomically after the column files are written, so readers never see
+    a partial append; bytes past the committed length are truncated on
+    the next append. One process should write to a store at a time.
+    """
+
+    def __init__(self, config: TimeSeriesConfig = None):
+        self.config = config or TimeSeriesConfig()
+        self._lock = threading.Lock()
+
+    def partition_dir(self, source: str, day: str) -> str:
+        """Directory of one source/day partition"""
+        return os.path.join(self.config.root_dir, source, day)
+
+    @staticmethod
+    def _column_path(path: str, column: str) -> str:
+        return os.path.join(path, f"{column}.bin")
+
+    @staticmethod
+    def _read_index(path: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(path, INDEX_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_index(path: str, index: Dict):
+        index_path = os.path.join(path, INDEX_FILE)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+    def append(self, source: str, observations: List[Dict]) -> int:
+        """Append observations of one source, returning how many were written"""
+        by_day: Dict[str, List[Tuple[int, Dict]]] = defaultdict(list)
+        for observation in observations:
+            epoch_us = to_epoch_us(observation["timestamp"])
+            by_day[_day_of(epoch_us)].append((epoch_us, observation))
+
+        with self._lock:
+            for day, rows in by_day.items():
+                self._append_partition(source, day, rows)
+        return sum(len(rows) for rows in by_day.values())
+
+    def _append_partition(self, source: str, day: str, rows: List[Tuple[int, Dict]]):
+        path = self.partition_dir(source, day)
+        os.makedirs(path, exist_ok=True)
+        index = self._read_index(path) or {
+            "source": source, "day": day, "rows": 0, "columns": dict(KEY_COLUMNS),
+            "series": [], "min_timestamp": None, "max_timestamp": None, "sorted": True
+        }
+        committed = index["rows"]
+        columns = index["columns"]
+
+        # Drop anything written after the last committed index update
+        for column, dtype in columns.items():
+            column_path = self._column_path(path, column)
+            committed_bytes = committed * np.dtype(dtype).itemsize
+            if os.path.exists(column_path) and os.path.getsize(column_path) > committed_bytes:
+                os.truncate(column_path, committed_bytes)
+
+        # New value columns are back-filled with NaN for earlier rows
+        for _, observation in rows:
+            for column in observation:
+                if column not in columns:
+                    columns[column] = VALUE_DTYPE
+                    np.full(committed, np.nan, dtype=VALUE_DTYPE).tofile(self._column_path(path, column))
+
+        series_ids = {series: i for i, series in enumerate(index["series"])}
+        for _, observation in rows:
+            series = str(observation.get("series", ""))
+            if series not in series_ids:
+                series_ids[series] = len(index["series"])
+                index["series"].append(series)
+
+        timestamps = np.array([epoch_us for epoch_us, _ in rows], dtype=KEY_COLUMNS[TIMESTAMP_COLUMN])
+        arrays = {
+            TIMESTAMP_COLUMN: timestamps,
+            "series": np.array([series_ids[str(o.get("series", ""))] for _, o in rows], dtype=KEY_COLUMNS["series"])
+        }
+        for column, dtype in columns.items():
+            if column not in arrays:
+                arrays[column] = np.array([o.get(column, np.nan) for _, o in rows], dtype=dtype)
+
+        for column, values in arrays.items():
+            with open(self._column_path(path, column), "ab") as f:
+                f.write(values.tobytes())
+
+        first, last = int(timestamps.min()), int(timestamps.max())
+        index["sorted"] = bool(
+            index["sorted"]
+            and np.all(timestamps[1:] >= timestamps[:-1])
+            and (index["max_timestamp"] is None or timestamps[0] >= index["max_timestamp"])
+        )
+        index["min_timestamp"] = first if index["min_timestamp"] is None else min(first, index["min_timestamp"])
+        index["max_timestamp"] = last if index["max_timestamp"] is None else max(last, index["max_timestamp"])
+        index["rows"] = committed + len(rows)
+        self._write_index(path, index)
+
+    def append_collection(self, data: Dict) -> Dict[str, int]:
+        """Append one collect_all_data() result, returning rows per source"""
+        return {
+            source: self.append(source, observations)
+            for source, observations in flatten_collection(data).items()
+        }
+
+    def sources(self) -> List[str]:
+        """List sources with at least one partition"""
+        if not os.path.isdir(self.config.root_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.config.root_dir)
+            if os.path.isdir(os.path.join(self.config.root_dir, entry))
+        )
+
+    def partitions(self, source: str, start=None, end=None) -> List[str]:
+        """List the days of a source overlapping [start, end], oldest first"""
+        source_dir = os.path.join(self.config.root_dir, source)
+        if not os.path.isdir(source_dir):
+            return []
+        first_day = _day_of(to_epoch_us(start)) if start is not None else None
+        last_day = _day_of(to_epoch_us(end)) if end is not None else None
+        return sorted(
+            day for day in os.listdir(source_dir)
+            if os.path.isfile(os.path.join(source_dir, day, INDEX_FILE))
+            and (first_day is None or day >= first_day)
+            and (last_day is None or day <= last_day)
+        )
+
+    def _read_partition(self, source: str, day: str, columns: Optional[List[str]],
+                        start_us: Optional[int], end_us: Optional[int],
+                        cell: Optional[Tuple[int, int]], series: Optional[str]) -> Optional[Dict[str, np.ndarray]]:
+        path = self.partition_dir(source, day)
+        index = self._read_index(path)
+        if not index or index["rows"] == 0:
+            return None
+        rows = index["rows"]
+
+        def column(name: str) -> np.ndarray:
+            dtype = index["columns"].get(name)
+            if dtype is None:
+                return np.full(rows, np.nan, dtype=VALUE_DTYPE)
+            return np.memmap(self._column_path(path, name), dtype=dtype, mode="r", shape=(rows,))
+
+        timestamps = column(TIMESTAMP_COLUMN)
+        lo, hi = 0, rows
+        mask = None
+        if index["sorted"]:
+            # Time range as a slice, so only the rows in range are paged in
+            if start_us is not None:
+                lo = int(np.searchsorted(timestamps, start_us, side="left"))
+            if end_us is not None:
+                hi = int(np.searchsorted(timestamps, end_us, side="right"))
+        else:
+            mask = np.ones(rows, dtype=bool)
+            if start_us is not None:
+                mask &= timestamps >= start_us
+            if end_us is not None:
+                mask &= timestamps <= end_us
+            mask = mask[lo:hi]
+        if hi <= lo:
+            return None
+
+        def restrict(selected: np.ndarray):
+            nonlocal mask
+            mask = selected if mask is None else mask & selected
+
+        if cell is not None:
+            size = self.config.cell_size_deg
+            restrict(
+                (np.floor(column("latitude")[lo:hi] / size) == cell[0])
+                & (np.floor(column("longitude")[lo:hi] / size) == cell[1])
+            )
+        if series is not None:
+            if series not in index["series"]:
+                return None
+            restrict(column("series")[lo:hi] == index["series"].index(series))
+
+        names = list(KEY_COLUMNS) + [c for c in (columns or index["columns"]) if c not in KEY_COLUMNS]
+        result = {}
+        for name in names:
+            values = column(name)[lo:hi]
+            # Boolean indexing and np.array both copy out of the memory map
+            result[name] = values[mask] if mask is not None else np.array(values)
+        result["series"] = np.asarray(index["series"], dtype=object)[result["series"]]
+        return result
+
+    def _cell(self, latitude: Optional[float], longitude: Optional[float]) -> Optional[Tuple[int, int]]:
+        if latitude is None or longitude is None:
+            return None
+        size = self.config.cell_size_deg
+        return (int(math.floor(latitude / size)), int(math.floor(longitude / size)))
+
+    def query(self, source: str, start=None, end=None, latitude: float = None, longitude: float = None,
+              series: str = None, columns: List[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Read observations of a source as contiguous column arrays
+
+        Filters are optional: a time range, the grid cell containing
+        (latitude, longitude), and a series id. Timestamps come back as
+        datetime64[us]; value columns missing from a partition are NaN.
+        """
+        start_us = to_epoch_us(start) if start is not None else None
+        end_us = to_epoch_us(end) if end is not None else None
+        cell = self._cell(latitude, longitude)
+
+        parts = [
+            part for part in (
+                self._read_partition(source, day, columns, start_us, end_us, cell, series)
+                for day in self.partitions(source, start, end)
+            )
+            if part is not None and len(part[TIMESTAMP_COLUMN])
+        ]
+
+        names = list(KEY_COLUMNS) + [c for c in (columns or self._value_columns(parts)) if c not in KEY_COLUMNS]
+        result = {}
+        for name in names:
+            arrays = [part[name] if name in part else np.full(len(part[TIMESTAMP_COLUMN]), np.nan, dtype=VALUE_DTYPE)
+                      for part in parts]
+            if arrays:
+                result[name] = np.concatenate(arrays)
+            else:
+                result[name] = np.empty(0, dtype=object if name == "series" else KEY_COLUMNS.get(name, VALUE_DTYPE))
+        result[TIMESTAMP_COLUMN] = result[TIMESTAMP_COLUMN].astype("datetime64[us]")
+        return result
+
+    @staticmethod
+    def _value_columns(parts: List[Dict]) -> List[str]:
+        names = {}
+        for part in parts:
+            names.update(dict.fromkeys(name for name in part if name not in KEY_COLUMNS))
+        return list(names)
+
+    def history(self, source: str, column: str, latitude: float, longitude: float,
+                steps: int, end=None, series: str = None) -> np.ndarray:
+        """
+        Get the last ``steps`` values of a column for a location cell
+
+        Returns a contiguous float32 array, oldest first, possibly shorter
+        than ``steps`` when the store holds less history. Partitions are
+        read newest first and only until enough rows are found.
+
+        ``series`` may only be omitted when the cell holds a single series
+        (e.g. one weather provider); with co-located sensors or stations
+        the readings would interleave, so a ValueError names the series
+        to choose from.
+        """
+        end_us = to_epoch_us(end) if end is not None else None
+        cell = self._cell(latitude, longitude)
+        chunks = []
+        found = 0
+        seen_series = set()
+        for day in reversed(self.partitions(source, end=end)):
+            part = self._read_partition(source, day, [column], None, end_us, cell, series)
+            if part is None or not len(part[TIMESTAMP_COLUMN]):
+                continue
+            if series is None:
+                seen_series.update(part["series"])
+                if len(seen_series) > 1:
+                    raise ValueError(
+                        f"{source} cell at ({latitude}, {longitude}) holds several series "
+                        f"{sorted(seen_series)}; pass series= to pick one"
+                    )
+            order = np.argsort(part[TIMESTAMP_COLUMN], kind="stable")
+            chunks.append(part[column][order])
+            found += len(order)
+            if found >= steps:
+                break
+
+        if not chunks:
+            return np.empty(0, dtype=VALUE_DTYPE)
+        return np.ascontiguousarray(np.concatenate(chunks[::-1])[-steps:], dtype=VALUE_DTYPE)
+
+    def import_json_dumps(self, paths: Iterable[str] = None) -> Dict:
+        """
+        Import legacy data_collection_*.json dumps
+
+        Imported file names are recorded in the store, so running the
+        import again skips them.
+        """
+        paths = sorted(paths if paths is not None else glob.glob("data_collection_*.json"))
+        os.makedirs(self.config.root_dir, exist_ok=True)
+        log_path = os.path.join(self.config.root_dir, IMPORT_LOG_FILE)
+        try:
+            with open(log_path) as f:
+                imported = set(json.load(f))
+        except FileNotFoundError:
+            imported = set()
+
+        summary = {"files": 0, "skipped": 0, "failed": 0, "rows": defaultdict(int)}
+        for path in paths:
+            name = os.path.basename(path)
+            if name in imported:
+                summary["skipped"] += 1
+                continue
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                for source, rows in self.append_collection(data).items():
+                    summary["rows"][source] += rows
+            except Exception as e:
+                logger.error(f"Failed to import {path}: {e}")
+                summary["failed"] += 1
+                continue
+            imported.add(name)
+            summary["files"] += 1
+
+        with open(log_path, "w") as f:
+            json.dump(sorted(imported), f)
+
+        summary["rows"] = dict(summary["rows"])
+        logger.info(f"Imported {summary['files']} JSON dumps: {summary['rows']}")
+        return summary
+
+    def get_stats(self) -> Dict:
+        """
+        Get partition and row counts per source
+        """
+        stats = {}
+        for source in self.sources():
+            days = self.partitions(source)
+            rows = 0
+            for day in days:
+                index = self._read_index(self.partition_dir(source, day))
+                rows += index["rows"] if index else 0
+            stats[source] = {
+                "partitions": len(days),
+                "rows": rows,
+                "first_day": days[0] if days else None,
+                "last_day": days[-1] if days else None
+            }
+        return stats
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    # python -m backend.database.timeseries [data_collection_*.json ...]
+    result = TimeSeriesStore().import_json_dumps(sys.argv[1:] or None)
+    print(json.dumps(result, indent=2))
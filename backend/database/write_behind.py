@@ -0,0 +1,228 @@
+"""
+Write-Behind Buffer
+Batched, asynchronous persistence for high-volume inserts:
+- Rows are accepted without waiting for the database
+- Bulk flushes on a size or time trigger
+- Bounded memory with backpressure on producers
+- Retry with backoff, then counted drops
+- Final flush on shutdown
+- Flush latency and throughput metrics
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ..services.metrics import DB_FLUSH_ROWS, DB_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WriteBehindConfig:
+    """Write-behind buffer configuration"""
+    enabled: bool = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+    batch_size: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+    flush_interval_s: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_S", "1.0"))
+    # Rows held in memory before producers have to wait
+    max_pending: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "50000"))
+    # How long a producer waits for space before its row is dropped
+    put_timeout_s: float = float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT_S", "2.0"))
+    max_attempts: int = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "3"))
+    backoff_base_s: float = float(os.getenv("WRITE_BEHIND_BACKOFF_BASE_S", "0.2"))
+
+class WriteBehindBuffer:
+    """
+    Buffers rows for one table and writes them in bulk
+
+    ``write_rows`` receives a list of rows (e.g. parameter tuples for
+    ``executemany``) and must write all of them or raise. Any coroutine
+    function works, so a local Postgres pool or an in-process stand-in
+    can sit behind the buffer.
+    """
+
+    def __init__(self, name: str, write_rows: Callable[[List[Tuple]], Awaitable[None]],
+                 config: WriteBehindConfig = None, sample_size: int = 1000):
+        self.name = name
+        self.write_rows = write_rows
+        self.config = config or WriteBehindConfig()
+        self._pending: Deque[Tuple] = deque()
+        self._flush_requested = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flush_latencies: Deque[float] = deque(maxlen=sample_size)
+        self.last_flush_at: Optional[str] = None
+        self.counters = {
+            "accepted": 0,
+            "written": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "failed_rows": 0,
+            "dropped_backpressure": 0,
+            "backpressure_waits": 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def start(self):
+        """Start the background flush loop"""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Write-behind buffer {self.name} started "
+            f"(batch {self.config.batch_size}, every {self.config.flush_interval_s}s)"
+        )
+
+    async def stop(self):
+        """Stop the flush loop and write everything still pending"""
+        if self._task is not None:
+            # Let a flush in progress finish instead of cancelling it, which
+            # would lose the batch it took off the buffer
+            self._stopping = True
+            self._flush_requested.set()
+            try:
+                await self._task
+            finally:
+                self._task = None
+                self._stopping = False
+
+        await self.flush()
+        if self._pending:
+            logger.warning(f"Write-behind buffer {self.name} stopped with {len(self._pending)} unwritten rows")
+        else:
+            logger.info(f"Write-behind buffer {self.name} stopped")
+
+    async def put(self, row: Tuple) -> bool:
+        """
+        Accept a row for writing
+
+        Returns as soon as the row is buffered. When the buffer is full the
+        caller waits up to put_timeout_s for a flush to make room, then the
+        row is dropped and counted.
+        """
+        if len(self._pending) >= self.config.max_pending:
+            self.counters["backpressure_waits"] += 1
+            deadline = time.monotonic() + self.config.put_timeout_s
+            while len(self._pending) >= self.config.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["dropped_backpressure"] += 1
+                    return False
+                self._space_available.clear()
+                self._flush_requested.set()
+                try:
+                    await asyncio.wait_for(self._space_available.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+        self._pending.append(row)
+        self.counters["accepted"] += 1
+        if len(self._pending) >= self.config.batch_size:
+            self._flush_requested.set()
+        return True
+
+    async def put_many(self, rows: Iterable[Tuple]) -> int:
+        """Accept several rows, returning how many were buffered"""
+        accepted = 0
+        for row in rows:
+            if await self.put(row):
+                accepted += 1
+        return accepted
+
+    async def _run(self):
+        """Flush when a batch fills up or the flush interval passes"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.config.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            if self._stopping:
+                break  # stop() writes what is left
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Write-behind flush loop error for {self.name}: {e}")
+
+    async def flush(self) -> int:
+        """Write all pending rows in batches, returning how many were written"""
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch_size = min(self.config.batch_size, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(batch_size)]
+                self._space_available.set()
+                if await self._write_batch(batch):
+                    written += len(batch)
+        return written
+
+    async def _write_batch(self, batch: List[Tuple]) -> bool:
+        """Write one batch, retrying with backoff before giving up on it"""
+        for attempt in range(1, self.config.max_attempts + 1):
+            start_time = time.perf_counter()
+            try:
+                await self.write_rows(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["failed_flushes"] += 1
+                if attempt >= self.config.max_attempts:
+                    self.counters["failed_rows"] += len(batch)
+                    logger.error(f"Write-behind flush of {len(batch)} {self.name} rows failed, dropping them: {e}")
+                    return False
+                logger.warning(f"Write-behind flush of {len(batch)} {self.name} rows failed (attempt {attempt}): {e}")
+                await asyncio.sleep(self.config.backoff_base_s * (2 ** (attempt - 1)))
+                continue
+
+            elapsed_s = time.perf_counter() - start_time
+            self.flush_latencies.append(elapsed_s)
+            DB_FLUSH_SECONDS.labels(self.name).observe(elapsed_s)
+            DB_FLUSH_ROWS.labels(self.name).inc(len(batch))
+            self.last_flush_at = datetime.now().isoformat()
+            self.counters["flushes"] += 1
+            self.counters["written"] += len(batch)
+            logger.debug(f"Flushed {len(batch)} {self.name} rows")
+            return True
+        return False
+
+    def get_stats(self) -> Dict:
+        """
+        Get buffer depth, counters and flush latency
+        """
+        latencies = sorted(self.flush_latencies)
+        if latencies:
+            flush_latency = {
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+                "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2)
+            }
+        else:
+            flush_latency = {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "max_pending": self.config.max_pending,
+            "batch_size": self.config.batch_size,
+            "flush_interval_s": self.config.flush_interval_s,
+            "last_flush_at": self.last_flush_at,
+            "flush_latency": flush_latency,
+            **self.counters
+        }
@@ -0,0 +1 @@
+# AI Models Package 
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Feature Schemas for the Simple Models
+Declarative description of each model's input features:
+- Ordered feature columns with their dtypes and defaults
+- Column-wise extraction into one preallocated contiguous matrix
+- Accepts DataFrames, dicts of arrays or raw ndarrays
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Tuple, Union
+
+FeatureInput = Union[pd.DataFrame, Mapping[str, Any], np.ndarray]
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """A single model input feature"""
+    name: str
+    default: float
+    dtype: Any = np.float64  # dtype the raw column is read as
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    """
+    Ordered set of features a model is trained and scored on
+
+    Missing columns and missing values (NaN/None) are filled with the
+    feature default, so partial weather rows still produce a full matrix.
+    """
+    name: str
+    features: Tuple[FeatureSpec, ...]
+    dtype: Any = np.float64  # dtype of the extracted matrix
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Feature column names in matrix order"""
+        return tuple(spec.name for spec in self.features)
+
+    @property
+    def defaults(self) -> Dict[str, float]:
+        """Default value per feature column"""
+        return {spec.name: spec.default for spec in self.features}
+
+    def index(self, name: str) -> int:
+        """Get the matrix column index of a feature"""
+        return self.columns.index(name)
+
+    def n_rows(self, data: FeatureInput) -> int:
+        """Count the rows in a feature input"""
+        if isinstance(data, pd.DataFrame):
+            return len(data)
+        if isinstance(data, np.ndarray):
+            return 1 if data.ndim == 1 else data.shape[0]
+        lengths = [len(value) for value in data.values() if np.ndim(value) > 0]
+        return max(lengths) if lengths else 1
+
+    def head(self, data: FeatureInput, n: int = 1) -> FeatureInput:
+        """Get the first n rows of a feature input, without extracting the rest"""
+        if isinstance(data, pd.DataFrame):
+            return data.iloc[:n]
+        if isinstance(data, np.ndarray):
+            return data if data.ndim == 1 else data[:n]
+        return {name: value[:n] if np.ndim(value) > 0 else value for name, value in data.items()}
+
+    def extract(self, data: FeatureInput) -> np.ndarray:
+        """
+        Build the C-contiguous (rows, features) matrix for a feature input
+
+        DataFrames and dicts are read column by column; raw ndarrays must
+        already be in schema column order.
+        """
+        if isinstance(data, np.ndarray):
+            return self._from_array(data)
+
+        n_rows = self.n_rows(data)
+        matrix = np.empty((n_rows, len(self.features)), dtype=self.dtype)
+        for j, spec in enumerate(self.features):
+            if spec.name not in data:
+                matrix[:, j] = spec.default
+                continue
+
+            column = data[spec.name]
+            if isinstance(column, pd.Series):
+                values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=spec.dtype, na_value=np.nan)
+            else:
+                values = np.asarray(column, dtype=spec.dtype)
+            matrix[:, j] = values
+            self._fill_missing(matrix[:, j], spec.default)
+
+        return matrix
+
+    def _from_array(self, data: np.ndarray) -> np.ndarray:
+        """Validate and convert a raw feature array"""
+        matrix = data.reshape(1, -1) if data.ndim == 1 else data
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.features):
+            raise ValueError(
+                f"{self.name} expects {len(self.features)} features {self.columns}, "
+                f"got array of shape {data.shape}"
+            )
+        matrix = np.array(matrix, dtype=self.dtype, order="C")
+        for j, spec in enumerate(self.features):
+            self._fill_missing(matrix[:, j], spec.default)
+        return matrix
+
+    @staticmethod
+    def _fill_missing(column: np.ndarray, default: float):
+        """Replace NaN values in a matrix column view in place"""
+        missing = np.isnan(column)
+        if missing.any():
+            column[missing] = default
+
+FLOOD_FEATURES = FeatureSchema(
+    name="flood",
+    features=(
+        FeatureSpec("precipitation", 0),
+        FeatureSpec("temperature", 20),
+        FeatureSpec("humidity", 50),
+        FeatureSpec("pressure", 1013),
+        FeatureSpec("wind_speed", 0),
+        FeatureSpec("water_level", 0),
+        FeatureSpec("soil_moisture", 0.5)
+    )
+)
+
+DROUGHT_FEATURES = FeatureSchema(
+    name="drought",
+    features=(
+        FeatureSpec("temperature", 20),
+        FeatureSpec("precipitation", 0),
+        FeatureSpec("humidity", 50),
+        FeatureSpec("soil_moisture", 0.5),
+        FeatureSpec("ndvi", 0.3),
+        FeatureSpec("evi", 0.2),
+        FeatureSpec("lst", 25)
+    )
+)
+
+CYCLONE_FEATURES = FeatureSchema(
+    name="cyclone",
+    features=(
+        FeatureSpec("pressure", 1013),
+        FeatureSpec("temperature", 20),
+        FeatureSpec("wind_speed", 0),
+        FeatureSpec("humidity", 50),
+        FeatureSpec("sst", 25),  # Sea surface temperature
+        FeatureSpec("wind_shear", 0),
+        FeatureSpec("relative_humidity", 50)
+    )
+)
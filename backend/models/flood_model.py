@@ -0,0 +1,477 @@
+"""
+Flood Prediction Model
+Uses LSTM networks and ensemble methods to predict floods based on:
+- River water levels
+- Rainfall data
+- Satellite imagery (water body detection)
+- Soil moisture
+- Historical flood patterns
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+import joblib
+import logging
+from typing import Tuple, List, Dict, Optional
+from datetime import datetime, timedelta
+
+from .lazy_imports import lazy_import, lazy_from
+from .network_forward import NetworkForward, direct_forward
+from .registry import RegisteredModel
+from .sequence_pipeline import (collect_ensemble_sample, fit_keras_streaming, sample_sequences,
+                                sequence_windows, streaming_splits)
+
+# TensorFlow and OpenCV are imported on first use
+tf = lazy_import("tensorflow")
+Sequential = lazy_from("tensorflow", "keras.models.Sequential")
+load_model = lazy_from("tensorflow", "keras.models.load_model")
+LSTM = lazy_from("tensorflow", "keras.layers.LSTM")
+Dense = lazy_from("tensorflow", "keras.layers.Dense")
+Dropout = lazy_from("tensorflow", "keras.layers.Dropout")
+Conv2D = lazy_from("tensorflow", "keras.layers.Conv2D")
+MaxPooling2D = lazy_from("tensorflow", "keras.layers.MaxPooling2D")
+Flatten = lazy_from("tensorflow", "keras.layers.Flatten")
+Adam = lazy_from("tensorflow", "keras.optimizers.Adam")
+cv2 = lazy_import("cv2")
+
+logger = logging.getLogger(__name__)
+
+def water_hue_mask(rgb: np.ndarray, low_deg: float = 100.0, high_deg: float = 130.0) -> np.ndarray:
+    """
+    Pixels whose HSV hue is within [low_deg, high_deg], for (..., 3) RGB arrays
+    
+    Same hue as cv2.cvtColor(..., COLOR_RGB2HSV) on float images, computed
+    for a whole image stack at once.
+    """
+    r, g, b = (rgb[..., i].astype(np.float32) for i in range(3))
+    value = np.maximum(np.maximum(r, g), b)
+    delta = value - np.minimum(np.minimum(r, g), b)
+    safe_delta = np.where(delta > 0, delta, 1.0)
+    hue = np.select(
+        [value == r, value == g],
+        [60.0 * (g - b) / safe_delta, 120.0 + 60.0 * (b - r) / safe_delta],
+        240.0 + 60.0 * (r - g) / safe_delta
+    )
+    hue = np.where(delta > 0, hue % 360.0, 0.0)
+    return (hue >= low_deg) & (hue <= high_deg)
+
+class FloodPredictionModel(RegisteredModel):
+    """
+    Advanced flood prediction model combining LSTM, CNN, and ensemble methods
+    
+    Publish with publish_to_registry(model_registry) and load the active
+    version with load_from_registry(model_registry).
+    """
+    
+    registry_name = "flood_deep"
+    
+    def __init__(self, model_path: str = None, forward: NetworkForward = direct_forward):
+        # Runs the networks; pass inference_scheduler.predict to batch concurrent requests
+        self.forward = forward
+        self.lstm_model = None
+        self.cnn_model = None
+        self.ensemble_model = None
+        self.scaler = StandardScaler()
+        self.image_scaler = MinMaxScaler()
+        self.is_trained = False
+        
+        if model_path:
+            self.load_models(model_path)
+    
+    def build_lstm_model(self, input_shape: Tuple[int, int]) -> Sequential:
+        """
+        Build LSTM model for time series prediction
+        """
+        model = Sequential([
+            LSTM(128, return_sequences=True, input_shape=input_shape),
+            Dropout(0.2),
+            LSTM(64, return_sequences=False),
+            Dropout(0.2),
+            Dense(32, activation='relu'),
+            Dense(16, activation='relu'),
+            Dense(1, activation='sigmoid')
+        ])
+        
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='binary_crossentropy',
+            metrics=['accuracy', 'precision', 'recall']
+        )
+        
+        return model
+    
+    def build_cnn_model(self, input_shape: Tuple[int, int, int]) -> Sequential:
+        """
+        Build CNN model for satellite image processing
+        """
+        model = Sequential([
+            Conv2D(32, (3, 3), activation='relu', input_shape=input_shape),
+            MaxPooling2D((2, 2)),
+            Conv2D(64, (3, 3), activation='relu'),
+            MaxPooling2D((2, 2)),
+            Conv2D(64, (3, 3), activation='relu'),
+            Flatten(),
+            Dense(64, activation='relu'),
+            Dropout(0.5),
+            Dense(32, activation='relu'),
+            Dense(1, activation='sigmoid')
+        ])
+        
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='binary_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        return model
+    
+    def preprocess_temporal_data(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Preprocess temporal data (river levels, rainfall, etc.)
+        """
+        # Feature engineering
+        data['rainfall_3h_avg'] = data['rainfall'].rolling(window=3).mean()
+        data['rainfall_24h_avg'] = data['rainfall'].rolling(window=24).mean()
+        data['water_level_change'] = data['water_level'].diff()
+        data['water_level_velocity'] = data['water_level_change'].diff()
+        
+        # Create lag features
+        for lag in [1, 3, 6, 12, 24]:
+            data[f'water_level_lag_{lag}'] = data['water_level'].shift(lag)
+            data[f'rainfall_lag_{lag}'] = data['rainfall'].shift(lag)
+        
+        # Fill NaN values
+        data = data.bfill().fillna(0)
+        
+        # Select features
+        feature_columns = [
+            'water_level', 'rainfall', 'temperature', 'humidity',
+            'rainfall_3h_avg', 'rainfall_24h_avg', 'water_level_change',
+            'water_level_velocity'
+        ] + [col for col in data.columns if 'lag_' in col]
+        
+        return data[feature_columns].values
+    
+    def preprocess_satellite_images(self, images) -> np.ndarray:
+        """
+        Preprocess satellite images for water body detection
+        
+        Takes a list of images or a (time, y, x, band) stack, e.g. the
+        memory-mapped stacks from the tile cache, and processes the whole
+        stack at once.
+        """
+        if len(images) == 0:
+            # Same width as a non-empty result: an empty stack carries its
+            # band count, an empty list is taken as RGB (the CNN's input)
+            ndim = np.ndim(images) if isinstance(images, np.ndarray) else 4
+            if ndim != 4:
+                return np.empty((0, 64 * 64), dtype=np.float32)
+            bands = images.shape[-1] if isinstance(images, np.ndarray) else 3
+            return np.empty((0, 64 * 64 * bands + 1), dtype=np.float32)
+        
+        # Resize to standard size (tile cache stacks already are 64x64)
+        if all(np.shape(img)[:2] == (64, 64) for img in images):
+            stack = np.asarray(images)
+        else:
+            stack = np.stack([cv2.resize(np.asarray(img, dtype=np.float32), (64, 64)) for img in images])
+        
+        # Normalize pixel values, one pass over the stack
+        normalized = np.divide(stack, 255.0, dtype=np.float32)
+        flattened = normalized.reshape(len(normalized), -1)
+        if normalized.ndim != 4:
+            return flattened
+        
+        # Apply water body detection filters: water has a hue between
+        # 100 and 130 degrees (first three bands read as RGB)
+        water_ratio = (water_hue_mask(normalized[..., :3]).sum(axis=(1, 2)) / (64 * 64)).astype(np.float32)
+        
+        # Add water ratio as additional feature
+        return np.column_stack([flattened, water_ratio])
+    
+    def create_sequences(self, data: np.ndarray, target: np.ndarray, 
+                        sequence_length: int = 24) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Create sequences for LSTM training
+
+        Returns a read-only strided view of ``data`` (no copy); see sequence_windows.
+        """
+        return sequence_windows(data, target, sequence_length)
+    
+    def train(self, temporal_data: pd.DataFrame, satellite_data: List[np.ndarray],
+              labels: np.ndarray, validation_split: float = 0.2) -> Dict:
+        """
+        Train the flood prediction model
+        """
+        logger.info("Starting flood model training...")
+        
+        # Preprocess temporal data
+        temporal_features = self.preprocess_temporal_data(temporal_data)
+        temporal_features_scaled = self.scaler.fit_transform(temporal_features)
+        
+        # Create sequences
+        X_temporal, y = self.create_sequences(temporal_features_scaled, labels)
+        
+        # Preprocess satellite data
+        if satellite_data:
+            X_satellite = self.preprocess_satellite_images(satellite_data)
+            X_satellite = X_satellite[:len(y)]  # Align with temporal data
+        
+        # Split data
+        split_idx = int(len(X_temporal) * (1 - validation_split))
+        X_train_temp, X_val_temp = X_temporal[:split_idx], X_temporal[split_idx:]
+        y_train, y_val = y[:split_idx], y[split_idx:]
+        
+        # Train LSTM model
+        self.lstm_model = self.build_lstm_model((X_temporal.shape[1], X_temporal.shape[2]))
+        
+        lstm_history = self.lstm_model.fit(
+            X_train_temp, y_train,
+            validation_data=(X_val_temp, y_val),
+            epochs=50,
+            batch_size=32,
+            verbose=1
+        )
+        
+        # Train CNN model if satellite data available
+        if satellite_data:
+            X_train_sat, X_val_sat = X_satellite[:split_idx], X_satellite[split_idx:]
+            
+            # Reshape for CNN (assuming 64x64 images)
+            X_train_sat_reshaped = X_train_sat.reshape(-1, 64, 64, 3)
+            X_val_sat_reshaped = X_val_sat.reshape(-1, 64, 64, 3)
+            
+            self.cnn_model = self.build_cnn_model((64, 64, 3))
+            
+            cnn_history = self.cnn_model.fit(
+                X_train_sat_reshaped, y_train,
+                validation_data=(X_val_sat_reshaped, y_val),
+                epochs=30,
+                batch_size=32,
+                verbose=1
+            )
+        
+        # Train ensemble model
+        self.ensemble_model = GradientBoostingClassifier(
+            n_estimators=100,
+            learning_rate=0.1,
+            max_depth=5,
+            random_state=42
+        )
+        
+        # Prepare ensemble features
+        lstm_pred_train = self.lstm_model.predict(X_train_temp).flatten()
+        ensemble_features_train = np.column_stack([
+            lstm_pred_train,
+            temporal_features_scaled[24:split_idx+24]  # Align with predictions
+        ])
+        
+        self.ensemble_model.fit(ensemble_features_train, y_train)
+        
+        # Evaluate models
+        metrics = self.evaluate(X_val_temp, y_val, satellite_data[split_idx:] if satellite_data else None)
+        
+        self.is_trained = True
+        logger.info("Flood model training completed successfully")
+        
+        return {
+            'lstm_history': lstm_history.history,
+            'cnn_history': cnn_history.history if satellite_data else None,
+            'metrics': metrics
+        }
+    
+    def train_streaming(self, history_dir: str, validation_split: float = 0.2, epochs: int = 50,
+                        batch_size: int = 32, ensemble_rows: int = 200_000) -> Dict:
+        """
+        Train the temporal models from featurized history on disk
+        
+        For station histories too large to hold as sequences in memory: the
+        history (written with sequence_pipeline.save_history, one file pair
+        per station) is memory-mapped and streamed to the LSTM in batches.
+        The ensemble is fitted on a bounded uniform sample of the same
+        stream. The satellite CNN still trains in memory through train().
+        """
+        logger.info(f"Starting streaming flood model training from {history_dir}...")
+        
+        train_batches, val_batches = streaming_splits(
+            history_dir, 24, self.scaler, batch_size=batch_size, validation_split=validation_split
+        )
+        
+        # Train LSTM model
+        self.lstm_model = self.build_lstm_model((24, train_batches.n_features))
+        lstm_history = fit_keras_streaming(self.lstm_model, train_batches, val_batches, epochs)
+        
+        # Train ensemble model
+        self.ensemble_model = GradientBoostingClassifier(
+            n_estimators=100,
+            learning_rate=0.1,
+            max_depth=5,
+            random_state=42
+        )
+        ensemble_features, ensemble_labels = collect_ensemble_sample(
+            train_batches, [lambda X: self.lstm_model.predict(X, verbose=0)], max_rows=ensemble_rows
+        )
+        self.ensemble_model.fit(ensemble_features, ensemble_labels)
+        
+        # Evaluate models on a sample of the validation sequences
+        metrics = self.evaluate(*sample_sequences(val_batches))
+        
+        self.is_trained = True
+        logger.info("Streaming flood model training completed successfully")
+        
+        return {
+            'lstm_history': lstm_history.history,
+            'cnn_history': None,
+            'metrics': metrics
+        }
+    
+    def predict(self, temporal_data: pd.DataFrame, 
+                satellite_data: Optional[List[np.ndarray]] = None) -> Dict:
+        """
+        Make flood predictions
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        # Preprocess temporal data
+        temporal_features = self.preprocess_temporal_data(temporal_data)
+        temporal_features_scaled = self.scaler.transform(temporal_features)
+        
+        # Create sequence for prediction
+        X_temporal = temporal_features_scaled[-24:].reshape(1, 24, -1)
+        
+        # Get LSTM prediction
+        lstm_pred = self.forward("flood.lstm", self.lstm_model, X_temporal)[0][0]
+        
+        # Get CNN prediction if satellite data available
+        cnn_pred = None
+        if satellite_data and self.cnn_model:
+            X_satellite = self.preprocess_satellite_images(satellite_data[-1:])
+            X_satellite_reshaped = X_satellite.reshape(-1, 64, 64, 3)
+            cnn_pred = self.forward("flood.cnn", self.cnn_model, X_satellite_reshaped)[0][0]
+        
+        # Get ensemble prediction
+        ensemble_features = np.column_stack([
+            [lstm_pred],
+            temporal_features_scaled[-1:]
+        ])
+        ensemble_pred = self.ensemble_model.predict_proba(ensemble_features)[0][1]
+        
+        # Calculate confidence and risk level
+        confidence = ensemble_pred
+        risk_level = self._calculate_risk_level(confidence)
+        
+        return {
+            'flood_probability': float(confidence),
+            'risk_level': risk_level,
+            'lstm_prediction': float(lstm_pred),
+            'cnn_prediction': float(cnn_pred) if cnn_pred else None,
+            'ensemble_prediction': float(ensemble_pred),
+            'timestamp': datetime.now().isoformat(),
+            'confidence': float(confidence)
+        }
+    
+    def _calculate_risk_level(self, probability: float) -> str:
+        """
+        Calculate risk level based on flood probability
+        """
+        if probability < 0.3:
+            return "LOW"
+        elif probability < 0.6:
+            return "MEDIUM"
+        elif probability < 0.8:
+            return "HIGH"
+        else:
+            return "CRITICAL"
+    
+    def evaluate(self, X_test: np.ndarray, y_test: np.ndarray,
+                satellite_test: Optional[List[np.ndarray]] = None) -> Dict:
+        """
+        Evaluate model performance
+        """
+        # LSTM predictions
+        lstm_pred = self.lstm_model.predict(X_test).flatten()
+        lstm_pred_binary = (lstm_pred > 0.5).astype(int)
+        
+        # CNN predictions
+        cnn_pred = None
+        cnn_pred_binary = None
+        if satellite_test and self.cnn_model:
+            X_sat_test = self.preprocess_satellite_images(satellite_test)
+            X_sat_test_reshaped = X_sat_test.reshape(-1, 64, 64, 3)
+            cnn_pred = self.cnn_model.predict(X_sat_test_reshaped).flatten()
+            cnn_pred_binary = (cnn_pred > 0.5).astype(int)
+        
+        # Ensemble predictions
+        ensemble_features = np.column_stack([
+            lstm_pred,
+            X_test[:, -1, :]  # Last timestep features
+        ])
+        ensemble_pred = self.ensemble_model.predict_proba(ensemble_features)[:, 1]
+        ensemble_pred_binary = (ensemble_pred > 0.5).astype(int)
+        
+        # Calculate metrics
+        metrics = {
+            'lstm': {
+                'accuracy': accuracy_score(y_test, lstm_pred_binary),
+                'precision': precision_score(y_test, lstm_pred_binary, zero_division=0),
+                'recall': recall_score(y_test, lstm_pred_binary, zero_division=0),
+                'f1_score': f1_score(y_test, lstm_pred_binary, zero_division=0),
+                'roc_auc': roc_auc_score(y_test, lstm_pred)
+            },
+            'ensemble': {
+                'accuracy': accuracy_score(y_test, ensemble_pred_binary),
+                'precision': precision_score(y_test, ensemble_pred_binary, zero_division=0),
+                'recall': recall_score(y_test, ensemble_pred_binary, zero_division=0),
+                'f1_score': f1_score(y_test, ensemble_pred_binary, zero_division=0),
+                'roc_auc': roc_auc_score(y_test, ensemble_pred)
+            }
+        }
+        
+        if cnn_pred is not None:
+            metrics['cnn'] = {
+                'accuracy': accuracy_score(y_test, cnn_pred_binary),
+                'precision': precision_score(y_test, cnn_pred_binary, zero_division=0),
+                'recall': recall_score(y_test, cnn_pred_binary, zero_division=0),
+                'f1_score': f1_score(y_test, cnn_pred_binary, zero_division=0),
+                'roc_auc': roc_auc_score(y_test, cnn_pred)
+            }
+        
+        return metrics
+    
+    def save_models(self, path: str):
+        """
+        Save trained models
+        """
+        if self.lstm_model:
+            self.lstm_model.save(f"{path}/lstm_model.h5")
+        
+        if self.cnn_model:
+            self.cnn_model.save(f"{path}/cnn_model.h5")
+        
+        if self.ensemble_model:
+            joblib.dump(self.ensemble_model, f"{path}/ensemble_model.pkl")
+        
+        joblib.dump(self.scaler, f"{path}/scaler.pkl")
+        joblib.dump(self.image_scaler, f"{path}/image_scaler.pkl")
+        
+        logger.info(f"Models saved to {path}")
+    
+    def load_models(self, path: str):
+        """
+        Load trained models
+        """
+        try:
+            self.lstm_model = load_model(f"{path}/lstm_model.h5")
+            self.cnn_model = load_model(f"{path}/cnn_model.h5")
+            self.ensemble_model = joblib.load(f"{path}/ensemble_model.pkl")
+            self.scaler = joblib.load(f"{path}/scaler.pkl")
+            self.image_scaler = joblib.load(f"{path}/image_scaler.pkl")
+            self.is_trained = True
+            
+            logger.info(f"Models loaded from {path}")
+        except Exception as e:
+            logger.error(f"Error loading models: {e}")
+            raise 
\ No newline at end of file
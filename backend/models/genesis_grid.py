@@ -0,0 +1,267 @@
+"""
+Gridded Cyclone Genesis Potential
+Potential intensity and Genesis Potential Index over a whole lat/lon field:
+- Same formulas as CyclonePredictionModel, on 2-D arrays instead of one
+  location's time series
+- Processed in bands of latitude rows into preallocated float32 outputs,
+  so temporaries stay bounded by the band size
+- Fields may be NumPy arrays, memmaps, xarray DataArrays or netCDF
+  variables; each band is read with a positional slice, so file-backed
+  fields are only loaded a band at a time
+- Genesis-risk grid in [0, 1] plus a hotspot summary for the cyclone routes
+- Seasonal climatology fields for running without gridded reanalysis data
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Inputs of the gridded computation, each shaped (lat, lon)
+GRID_FIELDS = ("sst", "humidity", "pressure", "vorticity", "wind_shear")
+
+# Below this SST (26.5 °C) tropical cyclones practically never form
+GENESIS_MIN_SST_K = 299.65
+
+# Conditions that count as fully favourable for genesis (risk 1.0)
+REFERENCE_CONDITIONS = {
+    "sst": 302.15,        # 29 °C
+    "humidity": 80.0,     # %
+    "pressure": 1008.0,   # hPa
+    "vorticity": 2e-5,    # s^-1
+    "wind_shear": 5.0     # m/s
+}
+
+FieldSource = Union[Mapping[str, object], Callable[[np.ndarray, np.ndarray], Mapping[str, np.ndarray]]]
+
+def potential_intensity(sst_k, humidity, pressure):
+    """
+    Simplified potential intensity from SST (K), relative humidity (%) and pressure (hPa)
+
+    Works element-wise on scalars, Series and arrays.
+    """
+    return 0.5 * (sst_k - 273.15) + 0.3 * humidity + 0.2 * pressure
+
+def genesis_potential_index(vorticity, humidity, potential_intensity_values, wind_shear):
+    """
+    Simplified GPI = |η|^(3/2) * (H/100)^3 * Vpot^3 * (1 + 0.1 |Vshear|)^(-2)
+
+    Works element-wise on scalars, Series and arrays.
+    """
+    rel_humidity = humidity / 100.0
+    return (abs(vorticity) ** 1.5) * (rel_humidity ** 3) * (potential_intensity_values ** 3) \
+        * ((1 + 0.1 * abs(wind_shear)) ** (-2))
+
+def reference_gpi() -> float:
+    """GPI under REFERENCE_CONDITIONS, the value mapped to a genesis risk of 1"""
+    conditions = REFERENCE_CONDITIONS
+    vpot = potential_intensity(conditions["sst"], conditions["humidity"], conditions["pressure"])
+    return float(genesis_potential_index(conditions["vorticity"], conditions["humidity"], vpot,
+                                         conditions["wind_shear"]))
+
+@dataclass
+class GenesisGrid:
+    """Genesis potential over a regular lat/lon grid"""
+    latitudes: np.ndarray            # (lat,)
+    longitudes: np.ndarray           # (lon,)
+    potential_intensity: np.ndarray  # (lat, lon) float32, NaN over land/missing
+    gpi: np.ndarray                  # (lat, lon) float32
+    risk: np.ndarray                 # (lat, lon) float32 in [0, 1]
+    generated_at: str
+    source: str
+
+    @property
+    def shape(self):
+        return self.risk.shape
+
+    def subset(self, lat_min: float = -90, lat_max: float = 90,
+               lon_min: float = -180, lon_max: float = 180, stride: int = 1) -> "GenesisGrid":
+        """Get a bounding-box view of the grid, optionally thinned by stride"""
+        rows = np.flatnonzero((self.latitudes >= lat_min) & (self.latitudes <= lat_max))[::stride]
+        cols = np.flatnonzero((self.longitudes >= lon_min) & (self.longitudes <= lon_max))[::stride]
+        index = np.ix_(rows, cols)
+        return GenesisGrid(
+            latitudes=self.latitudes[rows],
+            longitudes=self.longitudes[cols],
+            potential_intensity=self.potential_intensity[index],
+            gpi=self.gpi[index],
+            risk=self.risk[index],
+            generated_at=self.generated_at,
+            source=self.source
+        )
+
+    def hotspots(self, min_risk: float = 0.5, limit: int = 50) -> List[Dict]:
+        """Highest-risk cells at or above min_risk, most at risk first"""
+        risk = np.nan_to_num(self.risk, nan=-1.0)
+        candidates = np.flatnonzero(risk >= min_risk)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(risk.ravel()[candidates], -limit)[-limit:]]
+        candidates = candidates[np.argsort(risk.ravel()[candidates])[::-1]]
+        rows, cols = np.unravel_index(candidates, risk.shape)
+        return [
+            {
+                "lat": float(self.latitudes[row]),
+                "lon": float(self.longitudes[col]),
+                "genesis_risk": round(float(self.risk[row, col]), 4),
+                "gpi": float(self.gpi[row, col]),
+                "potential_intensity": round(float(self.potential_intensity[row, col]), 2),
+                "risk_level": genesis_risk_level(float(self.risk[row, col]))
+            }
+            for row, col in zip(rows, cols)
+        ]
+
+    def summary(self) -> Dict:
+        ocean = ~np.isnan(self.risk)
+        return {
+            "shape": list(self.shape),
+            "ocean_cells": int(ocean.sum()),
+            "cells_high_risk": int((self.risk >= 0.7).sum()),
+            "cells_medium_risk": int(((self.risk >= 0.4) & (self.risk < 0.7)).sum()),
+            "max_risk": float(np.nanmax(self.risk)) if ocean.any() else 0.0,
+            "generated_at": self.generated_at,
+            "source": self.source
+        }
+
+def genesis_risk_level(risk: float) -> str:
+    if risk >= 0.7:
+        return "HIGH"
+    if risk >= 0.4:
+        return "MEDIUM"
+    return "LOW"
+
+def grid_axes(resolution_deg: float):
+    """Cell-center latitudes (south to north) and longitudes (west to east) of a global grid"""
+    latitudes = np.arange(-90 + resolution_deg / 2, 90, resolution_deg)
+    longitudes = np.arange(-180 + resolution_deg / 2, 180, resolution_deg)
+    return latitudes, longitudes
+
+def _band(fields: FieldSource, start: int, stop: int, latitudes: np.ndarray,
+          longitudes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Read rows [start, stop) of every input field as float32"""
+    if callable(fields):
+        band = fields(latitudes[start:stop], longitudes)
+    else:
+        band = {name: fields[name][start:stop] for name in GRID_FIELDS if name in fields}
+        if "wind_shear" not in band and "wind_200hpa" in fields:
+            band["wind_shear"] = (np.asarray(fields["wind_200hpa"][start:stop], dtype=np.float32)
+                                  - np.asarray(fields["wind_850hpa"][start:stop], dtype=np.float32))
+    missing = [name for name in GRID_FIELDS if name not in band]
+    if missing:
+        raise KeyError(f"Gridded genesis fields missing: {missing}")
+    return {name: np.asarray(band[name], dtype=np.float32) for name in GRID_FIELDS}
+
+def compute_genesis_grid(fields: FieldSource, latitudes: np.ndarray, longitudes: np.ndarray,
+                         chunk_rows: int = 32, source: str = "fields") -> GenesisGrid:
+    """
+    Compute potential intensity, GPI and genesis risk over a lat/lon grid
+
+    ``fields`` maps each name in GRID_FIELDS (or wind_200hpa/wind_850hpa in
+    place of wind_shear) to a (lat, lon) array-like, or is a callable
+    ``(band_latitudes, longitudes) -> fields`` that produces one band at a
+    time. Cells with a NaN SST (land, missing data) are NaN in every output.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    shape = (len(latitudes), len(longitudes))
+    out_pi = np.empty(shape, dtype=np.float32)
+    out_gpi = np.empty(shape, dtype=np.float32)
+    out_risk = np.empty(shape, dtype=np.float32)
+    scale = np.float32(1.0 / reference_gpi())
+
+    for start in range(0, shape[0], chunk_rows):
+        stop = min(start + chunk_rows, shape[0])
+        band = _band(fields, start, stop, latitudes, longitudes)
+        if band["sst"].shape != (stop - start, shape[1]):
+            raise ValueError(f"Field band shape {band['sst'].shape} does not match grid rows {start}:{stop}")
+
+        vpot = potential_intensity(band["sst"], band["humidity"], band["pressure"])
+        # Negative potential intensity means no support for a cyclone at all
+        np.maximum(vpot, 0, out=vpot)
+        gpi = genesis_potential_index(band["vorticity"], band["humidity"], vpot, band["wind_shear"])
+
+        risk = gpi * scale
+        np.clip(risk, 0, 1, out=risk)
+        risk[band["sst"] < GENESIS_MIN_SST_K] = 0
+
+        out_pi[start:stop] = vpot
+        out_gpi[start:stop] = gpi
+        out_risk[start:stop] = risk
+
+    return GenesisGrid(
+        latitudes=latitudes,
+        longitudes=longitudes,
+        potential_intensity=out_pi,
+        gpi=out_gpi,
+        risk=out_risk,
+        generated_at=datetime.now().isoformat(),
+        source=source
+    )
+
+def climatology_fields(when: Optional[datetime] = None) -> Callable:
+    """
+    Field source with a smooth seasonal climatology for every grid band
+
+    Stands in for gridded reanalysis (e.g. ERA5 SST, humidity and winds)
+    until such a feed is configured: SST peaks in the summer-hemisphere
+    tropics, shear rises toward the mid-latitudes, vorticity follows the
+    Coriolis parameter, and land (a coarse mask) is NaN. Day-to-day
+    variation comes from smooth drifting wave patterns, so every cell's
+    value depends only on its coordinates and the date, not on banding.
+    """
+    when = when or datetime.now()
+    day = when.timetuple().tm_yday
+    # +1 at the northern summer peak (mid-August), -1 at the southern one
+    season = math.cos(2 * math.pi * (day - 228) / 365.25)
+    phase = 0.4 * day
+
+    def band(latitudes: np.ndarray, longitudes: np.ndarray) -> Dict[str, np.ndarray]:
+        lat = np.asarray(latitudes, dtype=np.float32)[:, None]
+        lon = np.asarray(longitudes, dtype=np.float32)[None, :]
+        lat_rad, lon_rad = np.radians(lat), np.radians(lon)
+        noise = (np.sin(7 * lon_rad + 5 * lat_rad + phase) * np.cos(4 * lon_rad - 9 * lat_rad - 0.7 * phase)
+                 + 0.5 * np.sin(13 * lon_rad - 11 * lat_rad + 1.3 * phase)).astype(np.float32)
+
+        # Thermal equator shifts about 8° toward the summer hemisphere
+        equator = 8.0 * season
+        sst = 273.15 + 29.5 - 0.0085 * (lat - equator) ** 2 + 0.4 * noise
+        sst = np.maximum(sst, np.float32(271.35))  # sea water freezes around -1.8 °C
+        sst[_land_mask(lat, lon)] = np.nan
+
+        humidity = np.clip(82 - 0.25 * np.abs(lat - equator) + 3 * noise, 20, 100)
+        pressure = 1010 + 0.05 * np.abs(lat) + 1.5 * noise
+        coriolis = 2 * 7.2921e-5 * np.sin(np.radians(lat))
+        # Low-level vorticity grows with |f| but saturates outside the deep tropics
+        vorticity = np.minimum(np.abs(coriolis) * 0.5, 2.2e-5) * (1 + 0.3 * noise)
+        wind_shear = 4 + 0.35 * np.abs(lat - equator) + 2 * np.abs(noise)
+        return {
+            "sst": sst,
+            "humidity": humidity,
+            "pressure": pressure,
+            "vorticity": vorticity,
+            "wind_shear": wind_shear
+        }
+
+    return band
+
+# Rough continental boxes (lat_min, lat_max, lon_min, lon_max) for the climatology land mask
+_LAND_BOXES = (
+    (15, 70, -130, -60),    # North America
+    (-55, 12, -80, -35),    # South America
+    (36, 70, -10, 60),      # Europe
+    (-35, 35, -17, 51),     # Africa
+    (10, 75, 60, 140),      # Asia
+    (-38, -12, 114, 153),   # Australia
+    (60, 83, -73, -12),     # Greenland
+    (-90, -62, -180, 180)   # Antarctica
+)
+
+def _land_mask(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    mask = np.zeros(np.broadcast_shapes(lat.shape, lon.shape), dtype=bool)
+    for lat_min, lat_max, lon_min, lon_max in _LAND_BOXES:
+        mask |= (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+    return mask
@@ -0,0 +1,117 @@
+"""
+Lazy Imports
+Deferred loading of heavy model dependencies (TensorFlow, OpenCV, geo stack):
+- Module proxies that import on first attribute access
+- Name proxies for what used to be ``from module import name``
+- Per-module import timings
+- Background preloading for warm-up after the API is ready
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from functools import reduce
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Imported only when a deep model first needs them, or by the warm-up task
+HEAVY_MODULES = ["tensorflow", "cv2", "xarray", "netCDF4", "rasterio", "geopandas"]
+
+_import_lock = threading.RLock()
+import_timings: Dict[str, float] = {}
+
+def _import(module_name: str):
+    """Import a module once, recording how long the first import took"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+
+        start_time = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_timings[module_name] = time.perf_counter() - start_time
+        logger.info(f"Imported {module_name} in {import_timings[module_name]:.2f}s")
+        return module
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = _import(self._module_name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._module_name} ({state})>"
+
+class LazyName:
+    """
+    Stand-in for a class or function inside a lazily imported module
+
+    ``path`` is resolved attribute by attribute from the module, so names
+    behind virtual packages such as ``tensorflow.keras`` work too.
+    """
+
+    def __init__(self, module_name: str, path: str):
+        self._module_name = module_name
+        self._path = path
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            module = _import(self._module_name)
+            self._target = reduce(getattr, self._path.split("."), module)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str):
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy name {self._module_name}.{self._path}>"
+
+def lazy_import(module_name: str) -> LazyModule:
+    """Get a proxy for ``import module_name``"""
+    return LazyModule(module_name)
+
+def lazy_from(module_name: str, path: str) -> LazyName:
+    """Get a proxy for ``from module_name import path``"""
+    return LazyName(module_name, path)
+
+def is_loaded(module_name: str) -> bool:
+    """Check if a module has been imported in this process"""
+    return module_name in sys.modules
+
+def preload(module_names: List[str] = None) -> Dict[str, Dict]:
+    """
+    Import heavy modules ahead of first use
+
+    Missing optional dependencies are reported, not raised, so a replica
+    without TensorFlow still serves the simple models.
+    """
+    results = {}
+    for module_name in module_names or HEAVY_MODULES:
+        try:
+            _import(module_name)
+            results[module_name] = {"loaded": True, "seconds": round(import_timings.get(module_name, 0.0), 3)}
+        except Exception as e:
+            logger.warning(f"Preloading {module_name} failed: {e}")
+            results[module_name] = {"loaded": False, "error": str(e)}
+    return results
@@ -0,0 +1,19 @@
+"""
+Network Forward Passes
+How the deep models run their Keras networks:
+- Models take a forward callable ``(name, network, inputs) -> outputs``
+  instead of importing a scheduler, so models do not depend on services
+- Plain ``network.predict`` by default; the API passes the inference
+  scheduler's ``predict`` so concurrent requests share batched passes
+"""
+
+from typing import Any, Callable
+
+import numpy as np
+
+# (network name, e.g. "flood.lstm", Keras network, inputs) -> outputs
+NetworkForward = Callable[[str, Any, np.ndarray], np.ndarray]
+
+def direct_forward(name: str, network, inputs: np.ndarray) -> np.ndarray:
+    """Run inputs straight through the network, without batching"""
+    return network.predict(inputs)
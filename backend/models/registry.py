@@ -0,0 +1,238 @@
+"""
+Model Registry
+Versioned on-disk store for trained model artifacts:
+- One immutable directory per model version with a JSON manifest
+- Atomic publish (staging directory + rename) and CURRENT pointer swap
+- Memory-mapped loading so worker processes share array pages
+- Version pruning that never touches the active version, run on every publish
+- Publish/load lifecycle for models saved as files (the Keras deep models)
+"""
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+CURRENT_POINTER = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+ARTIFACT_SUFFIX = ".joblib"
+
+@dataclass
+class RegistryConfig:
+    """Model registry configuration"""
+    root_dir: str = os.getenv("MODEL_REGISTRY_DIR", "model_registry")
+    # Memory-map NumPy arrays on load instead of reading them into each process
+    mmap: bool = os.getenv("MODEL_REGISTRY_MMAP", "true").lower() == "true"
+    keep_versions: int = int(os.getenv("MODEL_REGISTRY_KEEP_VERSIONS", "5"))
+
+@dataclass
+class LoadedModel:
+    """Artifacts of one model version as loaded from disk"""
+    name: str
+    version: str
+    path: str
+    manifest: Dict
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+
+class ModelRegistry:
+    """
+    Versioned artifact store shared by all API workers
+
+    Layout::
+
+        <root>/<name>/CURRENT            active version id
+        <root>/<name>/<version>/         immutable version directory
+            manifest.json
+            <artifact>.joblib
+
+    Artifacts are written uncompressed so joblib can memory-map their
+    arrays; every worker that loads the same version maps the same files
+    and the OS shares the pages between them.
+    """
+
+    def __init__(self, config: RegistryConfig = None):
+        self.config = config or RegistryConfig()
+
+    def model_dir(self, name: str) -> str:
+        """Directory holding all versions of a model"""
+        return os.path.join(self.config.root_dir, name)
+
+    def version_path(self, name: str, version: str) -> str:
+        """Directory of a single model version"""
+        return os.path.join(self.model_dir(name), version)
+
+    def publish(self, name: str, artifacts: Dict[str, Any], metadata: Dict = None,
+                writer: Callable[[str], None] = None, activate: bool = True) -> str:
+        """
+        Write a new model version and optionally make it the active one
+
+        ``artifacts`` are joblib-dumped one file each (models, scalers,
+        ensemble weights). ``writer`` may write extra files, e.g. Keras
+        models via an existing ``save_models(path)``, into the version
+        directory before it becomes visible. Versions beyond
+        ``keep_versions`` are pruned afterwards.
+        """
+        # Microseconds keep versions published within one second in order
+        version = datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S%f") + f"-{uuid.uuid4().hex[:6]}"
+        model_dir = self.model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        # Build the version in a hidden staging directory, then rename it
+        # into place so readers never see a partially written version
+        staging_dir = os.path.join(model_dir, f".staging-{version}")
+        os.makedirs(staging_dir)
+        try:
+            for artifact_name, artifact in artifacts.items():
+                joblib.dump(artifact, os.path.join(staging_dir, artifact_name + ARTIFACT_SUFFIX))
+
+            if writer is not None:
+                writer(staging_dir)
+
+            manifest = {
+                "name": name,
+                "version": version,
+                "created_at": datetime.now().isoformat(),
+                "artifacts": sorted(artifacts.keys()),
+                "files": sorted(os.listdir(staging_dir)),
+                "metadata": metadata or {}
+            }
+            with open(os.path.join(staging_dir, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            os.rename(staging_dir, self.version_path(name, version))
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Published {name} model version {version}")
+
+        if activate:
+            self.activate(name, version)
+        self.prune(name)
+        return version
+
+    def activate(self, name: str, version: str):
+        """Atomically point a model at an existing version"""
+        if not os.path.isfile(os.path.join(self.version_path(name, version), MANIFEST_FILE)):
+            raise ValueError(f"Unknown {name} model version: {version}")
+
+        pointer = os.path.join(self.model_dir(name), CURRENT_POINTER)
+        tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_pointer, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, pointer)
+
+        logger.info(f"Activated {name} model version {version}")
+
+    def current_version(self, name: str) -> Optional[str]:
+        """Get the active version of a model, if any"""
+        try:
+            with open(os.path.join(self.model_dir(name), CURRENT_POINTER)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self, name: str) -> List[str]:
+        """List published versions of a model, oldest first"""
+        model_dir = self.model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(model_dir)
+            if os.path.isfile(os.path.join(model_dir, entry, MANIFEST_FILE))
+        )
+
+    def load(self, name: str, version: str = None) -> LoadedModel:
+        """
+        Load the artifacts of a model version (the active one by default)
+
+        With mmap enabled, NumPy arrays inside the artifacts are read-only
+        memory maps of the version files.
+        """
+        version = version or self.current_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No active version for model {name}")
+
+        path = self.version_path(name, version)
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        mmap_mode = "r" if self.config.mmap else None
+        artifacts = {
+            artifact_name: joblib.load(os.path.join(path, artifact_name + ARTIFACT_SUFFIX), mmap_mode=mmap_mode)
+            for artifact_name in manifest["artifacts"]
+        }
+
+        logger.info(f"Loaded {name} model version {version}")
+        return LoadedModel(name=name, version=version, path=path, manifest=manifest, artifacts=artifacts)
+
+    def prune(self, name: str, keep: int = None) -> List[str]:
+        """
+        Delete old versions of a model, keeping the newest ones and the active one
+        """
+        keep = self.config.keep_versions if keep is None else keep
+        current = self.current_version(name)
+        versions = self.list_versions(name)
+        removable = [v for v in versions[:max(len(versions) - keep, 0)] if v != current]
+
+        for version in removable:
+            shutil.rmtree(self.version_path(name, version), ignore_errors=True)
+            logger.info(f"Pruned {name} model version {version}")
+        return removable
+
+    def get_status(self, names: List[str]) -> Dict:
+        """
+        Get the active and available versions of several models
+        """
+        return {
+            name: {
+                "current_version": self.current_version(name),
+                "versions": self.list_versions(name)
+            }
+            for name in names
+        }
+
+class RegisteredModel:
+    """
+    Registry lifecycle for models persisted with ``save_models(path)`` and
+    ``load_models(path)``
+
+    The model's files are written into the version directory through the
+    registry's writer hook, and loading resolves the active version.
+    """
+
+    registry_name: str
+    version: Optional[str] = None  # Registry version the model was loaded from
+
+    def publish_to_registry(self, registry: "ModelRegistry", metadata: Dict = None, activate: bool = True) -> str:
+        """Publish the trained model as a new registry version"""
+        if not self.is_trained:
+            raise ValueError(f"Cannot publish untrained {self.registry_name} model")
+        version = registry.publish(
+            self.registry_name, {},
+            metadata={"model_class": type(self).__name__, **(metadata or {})},
+            writer=self.save_models,
+            activate=activate
+        )
+        self.version = version
+        return version
+
+    def load_from_registry(self, registry: "ModelRegistry", version: str = None) -> str:
+        """Load a registry version of the model (the active one by default)"""
+        loaded = registry.load(self.registry_name, version)
+        self.load_models(loaded.path)
+        self.version = loaded.version
+        return loaded.version
+
+# Global instance
+model_registry = ModelRegistry()
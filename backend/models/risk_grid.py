@@ -0,0 +1,164 @@
+"""
+Regional Risk Grid
+Gridded disaster risk for map tiles:
+- Model inputs for every cell of a lat/lon grid (seasonal climatology
+  until gridded observations are configured)
+- Risk stored compactly: float16 probabilities, uint8 tile values
+- Max-pooled overview pyramid, so zoomed-out tiles read a small level
+- Web Mercator XYZ tile sampling and palette PNG encoding
+"""
+
+import math
+import struct
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .genesis_grid import climatology_fields
+
+TILE_SIZE = 256
+# uint8 tile values: 0-254 is probability * 254, 255 is no data
+RISK_SCALE = 254
+NO_DATA = 255
+MAX_MERCATOR_LAT = 85.0511287798
+
+InputSource = Callable[[np.ndarray, np.ndarray], Dict[str, np.ndarray]]
+
+def grid_axes(bounds: Tuple[float, float, float, float], resolution_deg: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Cell-center latitudes (south to north) and longitudes (west to east) within (lat_min, lat_max, lon_min, lon_max)"""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    latitudes = np.arange(lat_min + resolution_deg / 2, lat_max, resolution_deg)
+    longitudes = np.arange(lon_min + resolution_deg / 2, lon_max, resolution_deg)
+    return latitudes, longitudes
+
+def climatology_inputs(when: Optional[datetime] = None) -> InputSource:
+    """
+    Input source with every simple-model feature from a seasonal climatology
+
+    Built on the genesis climatology (SST, humidity, pressure, shear);
+    the land-surface features are smooth functions of those. Returns
+    (rows, cols) arrays per feature; NaN falls back to the feature default.
+    """
+    fields = climatology_fields(when)
+
+    def inputs(latitudes: np.ndarray, longitudes: np.ndarray) -> Dict[str, np.ndarray]:
+        band = fields(latitudes, longitudes)
+        lat = np.abs(np.asarray(latitudes, dtype=np.float32))[:, None]
+        land = np.isnan(band["sst"])
+        humidity = band["humidity"]
+        sst_c = band["sst"] - np.float32(273.15)
+        temperature = np.where(land, 31 - 0.5 * lat, sst_c)
+        precipitation = np.clip(0.12 * (humidity - 50), 0, None)
+        ndvi = np.where(land, np.clip(0.1 + 0.6 * (humidity - 40) / 60, 0.05, 0.85), np.nan)
+        return {
+            "temperature": temperature,
+            "precipitation": precipitation,
+            "humidity": humidity,
+            "relative_humidity": humidity,
+            "pressure": band["pressure"],
+            "wind_speed": 3 + 0.8 * band["wind_shear"],
+            "wind_shear": band["wind_shear"],
+            "sst": sst_c,
+            "soil_moisture": np.where(land, np.clip(humidity / 125, 0.05, 0.9), np.nan),
+            "ndvi": ndvi,
+            "evi": 0.6 * ndvi,
+            "lst": np.where(land, temperature + 3, np.nan),
+            "water_level": np.where(land, 0.02 * precipitation, np.nan)
+        }
+
+    return inputs
+
+def to_tile_values(probabilities: np.ndarray) -> np.ndarray:
+    """float probabilities to uint8 tile values (NaN becomes NO_DATA)"""
+    values = np.rint(np.clip(np.nan_to_num(probabilities, nan=0.0), 0, 1) * RISK_SCALE).astype(np.uint8)
+    values[np.isnan(probabilities)] = NO_DATA
+    return values
+
+def build_pyramid(values: np.ndarray, min_size: int = 1) -> List[np.ndarray]:
+    """
+    Overview levels of a uint8 risk grid, each half the size of the last
+
+    Levels are max-pooled over 2x2 blocks (ignoring NO_DATA) so hotspots
+    stay visible when zoomed out. Level 0 is the grid itself.
+    """
+    levels = [values]
+    current = values
+    while min(current.shape) > min_size:
+        rows, cols = current.shape
+        # Pad to even with NO_DATA, held as -1 so it never wins the max
+        padded = np.full((rows + rows % 2, cols + cols % 2), -1, dtype=np.int16)
+        padded[:rows, :cols] = np.where(current == NO_DATA, -1, current)
+        pooled = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).max(axis=(1, 3))
+        current = np.where(pooled < 0, NO_DATA, pooled).astype(np.uint8)
+        levels.append(current)
+    return levels
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) of a Web Mercator XYZ tile"""
+    n = 2 ** z
+    lon_min, lon_max = x / n * 360 - 180, (x + 1) / n * 360 - 180
+    lat_max = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    lat_min = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return lat_min, lat_max, lon_min, lon_max
+
+def render_tile(pyramid: List[np.ndarray], bounds: Tuple[float, float, float, float],
+                resolution_deg: float, z: int, x: int, y: int) -> np.ndarray:
+    """
+    Sample a (TILE_SIZE, TILE_SIZE) uint8 tile from the pyramid
+
+    Uses the coarsest level whose cells are no larger than a tile pixel,
+    with nearest-cell sampling; pixels outside the grid are NO_DATA.
+    """
+    n = 2 ** z
+    pixel = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    longitudes = (x + pixel) / n * 360 - 180
+    latitudes = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + pixel) / n))))
+
+    degrees_per_pixel = 360 / (TILE_SIZE * n)
+    level = int(np.clip(math.floor(math.log2(max(degrees_per_pixel / resolution_deg, 1))), 0, len(pyramid) - 1))
+    values = pyramid[level]
+    cell = resolution_deg * 2 ** level
+    lat_min, _, lon_min, _ = bounds
+    rows = np.floor((latitudes - lat_min) / cell).astype(np.int64)
+    cols = np.floor((longitudes - lon_min) / cell).astype(np.int64)
+    row_ok = (rows >= 0) & (rows < values.shape[0])
+    col_ok = (cols >= 0) & (cols < values.shape[1])
+
+    tile = np.full((TILE_SIZE, TILE_SIZE), NO_DATA, dtype=np.uint8)
+    if row_ok.any() and col_ok.any():
+        # Image rows run north to south, as the latitudes above do
+        tile[np.ix_(row_ok, col_ok)] = values[np.ix_(rows[row_ok], cols[col_ok])]
+    return tile
+
+def _risk_palette() -> Tuple[bytes, bytes]:
+    """PNG PLTE and tRNS chunks: green through yellow to red, NO_DATA transparent"""
+    p = np.linspace(0, 1, RISK_SCALE + 1)
+    red = np.clip(2 * p, 0, 1) * 255
+    green = np.clip(2 * (1 - p), 0, 1) * 200
+    blue = np.full_like(p, 40)
+    alpha = 60 + 170 * p
+    rgb = np.stack([red, green, blue], axis=1)
+    rgb = np.vstack([rgb, np.zeros((256 - len(p), 3))]).astype(np.uint8)
+    alpha = np.concatenate([alpha, np.zeros(256 - len(p))]).astype(np.uint8)
+    return rgb.tobytes(), alpha.tobytes()
+
+_PLTE, _TRNS = _risk_palette()
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def encode_png(tile: np.ndarray, compression: int = 6) -> bytes:
+    """Encode uint8 tile values as an 8-bit palette PNG"""
+    height, width = tile.shape
+    # Filter type 0 (none) before every scanline
+    scanlines = np.zeros((height, width + 1), dtype=np.uint8)
+    scanlines[:, 1:] = tile
+    header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", header)
+            + _png_chunk(b"PLTE", _PLTE)
+            + _png_chunk(b"tRNS", _TRNS)
+            + _png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compression))
+            + _png_chunk(b"IEND", b""))
@@ -0,0 +1,332 @@
+"""
+Rolling Feature Engine
+Trailing-window statistics for the drought and cyclone feature engineering:
+- Rolling sum, mean, standard deviation and least-squares trend slope in
+  closed form from cumulative sums (O(n) for any window length)
+- Rolling min/max over strided sliding-window views
+- pandas-compatible output: NaN until the window is full or while it holds a NaN/inf
+- Incremental per-location windows updated in O(1) per new observation
+"""
+
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+ROLLING_STATS = ("mean", "std", "min", "max", "trend")
+
+def _prepare(values, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Validate the input and get it as float64 along with its mask of missing values"""
+    if window < 1:
+        raise ValueError(f"window must be at least 1, got {window}")
+    x = np.asarray(values, dtype=np.float64)
+    if x.ndim != 1:
+        raise ValueError(f"expected a 1-D series, got shape {x.shape}")
+    # Infinities (e.g. an index over a zero denominator) would poison the
+    # cumulative sums for the rest of the series, so they count as missing
+    return x, ~np.isfinite(x)
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every full trailing window, one per window end (len(x) - window + 1)"""
+    cumulative = np.concatenate(([0.0], np.cumsum(x)))
+    return cumulative[window:] - cumulative[:-window]
+
+def _finish(result: np.ndarray, missing: np.ndarray, n: int, window: int) -> np.ndarray:
+    """Place per-window results at their window ends, NaN where undefined"""
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    if missing.any():
+        # A window with a NaN in it has no value, as in pandas rolling
+        result = np.where(_window_sums(missing.astype(np.float64), window) > 0, np.nan, result)
+    out[window - 1:] = result
+    return out
+
+def _offset(x: np.ndarray, missing: np.ndarray) -> float:
+    """Mean of the finite values (nanmean would be poisoned by an infinity)"""
+    return float(x[~missing].mean()) if not missing.all() else 0.0
+
+def _centered(x: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    """
+    Shift the series to a zero mean with NaNs as zeros
+
+    Centering keeps the cumulative sums small, so differences of them do
+    not lose precision on series with a large offset (e.g. SST in Kelvin).
+    Windows holding a NaN are masked afterwards.
+    """
+    return np.where(missing, 0.0, x - _offset(x, missing))
+
+def rolling_sum(values, window: int) -> np.ndarray:
+    """Trailing-window sum"""
+    x, missing = _prepare(values, window)
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    return _finish(_window_sums(np.where(missing, 0.0, x), window), missing, len(x), window)
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """Trailing-window mean"""
+    x, missing = _prepare(values, window)
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    means = _window_sums(_centered(x, missing), window) / window + _offset(x, missing)
+    return _finish(means, missing, len(x), window)
+
+def rolling_std(values, window: int, ddof: int = 1) -> np.ndarray:
+    """Trailing-window standard deviation (sample std by default, like pandas)"""
+    x, missing = _prepare(values, window)
+    if len(x) < window or window <= ddof:
+        return np.full(len(x), np.nan)
+    centered = _centered(x, missing)
+    sums = _window_sums(centered, window)
+    squares = _window_sums(centered * centered, window)
+    variance = np.maximum(squares - sums * sums / window, 0.0) / (window - ddof)
+    return _finish(np.sqrt(variance), missing, len(x), window)
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """Trailing-window minimum"""
+    x, missing = _prepare(values, window)
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    return _finish(sliding_window_view(x, window).min(axis=1), missing, len(x), window)
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """Trailing-window maximum"""
+    x, missing = _prepare(values, window)
+    if len(x) < window:
+        return np.full(len(x), np.nan)
+    return _finish(sliding_window_view(x, window).max(axis=1), missing, len(x), window)
+
+def rolling_slope(values, window: int) -> np.ndarray:
+    """
+    Trailing-window least-squares slope per step
+
+    Same value as ``np.polyfit(range(window), x, 1)[0]`` over each window,
+    from the closed form sum((t - t_mean) * x) / sum((t - t_mean)^2) with
+    t the position inside the window:
+
+        sum(t * x) over the window ending at i = S1(i) - (i - window + 1) * S0(i)
+
+    where S0 and S1 are window sums of x_j and j * x_j.
+    """
+    x, missing = _prepare(values, window)
+    n = len(x)
+    if n < window or window < 2:
+        return np.full(n, np.nan)
+    centered = _centered(x, missing)
+    positions = np.arange(n, dtype=np.float64)
+    s0 = _window_sums(centered, window)
+    s1 = _window_sums(positions * centered, window)
+    starts = positions[:n - window + 1]
+    t_mean = (window - 1) / 2.0
+    t_var = window * (window * window - 1) / 12.0
+    slopes = (s1 - starts * s0 - t_mean * s0) / t_var
+    return _finish(slopes, missing, n, window)
+
+ROLLING_FUNCTIONS = {
+    "sum": rolling_sum,
+    "mean": rolling_mean,
+    "std": rolling_std,
+    "min": rolling_min,
+    "max": rolling_max,
+    "trend": rolling_slope
+}
+
+def rolling_features(values, window: int, stats: Iterable[str] = ROLLING_STATS) -> Dict[str, np.ndarray]:
+    """Compute several rolling statistics of one series"""
+    x = np.asarray(values, dtype=np.float64)
+    return {stat: ROLLING_FUNCTIONS[stat](x, window) for stat in stats}
+
+class RollingWindow:
+    """
+    Trailing window over a single series, updated one observation at a time
+
+    Every statistic is kept up to date in O(1) per update: running sums for
+    the mean, std and slope, and monotonic deques for min/max. Statistics
+    are NaN until the window is full, matching the batch functions. A NaN or
+    infinite observation resets the window, just as it blanks the batch
+    result for every window that contains it.
+    """
+
+    # Recompute the running sums from the buffer this often to cancel drift
+    RESYNC_EVERY = 4096
+
+    def __init__(self, window: int):
+        if window < 2:
+            raise ValueError(f"window must be at least 2, got {window}")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._values: Deque[float] = deque(maxlen=self.window)
+        self._offset: Optional[float] = None  # first value, subtracted for precision
+        self._sum = 0.0      # sum(x - offset)
+        self._sum_sq = 0.0   # sum((x - offset)^2)
+        self._sum_tx = 0.0   # sum(t * (x - offset)), t = position in the window
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._count = 0      # observations since the last reset
+        self._since_resync = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) == self.window
+
+    def update(self, value: float):
+        """Add the newest observation, dropping the oldest when the window is full"""
+        value = float(value)
+        if not math.isfinite(value):
+            self.reset()
+            return
+        if self._offset is None:
+            self._offset = value
+        shifted = value - self._offset
+
+        if self.full:
+            oldest = self._values[0] - self._offset
+            # Every remaining value moves one position toward the start
+            self._sum_tx -= self._sum - oldest
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+            self._sum_tx += (self.window - 1) * shifted
+        else:
+            self._sum_tx += len(self._values) * shifted
+        self._sum += shifted
+        self._sum_sq += shifted * shifted
+        self._values.append(value)
+
+        index = self._count
+        self._count += 1
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        first_index = index - self.window + 1
+        if self._min[0][0] < first_index:
+            self._min.popleft()
+        if self._max[0][0] < first_index:
+            self._max.popleft()
+
+        self._since_resync += 1
+        if self._since_resync >= self.RESYNC_EVERY:
+            self._resync()
+
+    def _resync(self):
+        """Recompute the running sums exactly from the buffered values"""
+        shifted = np.asarray(self._values, dtype=np.float64) - self._offset
+        self._sum = float(shifted.sum())
+        self._sum_sq = float((shifted * shifted).sum())
+        self._sum_tx = float(np.arange(len(shifted)) @ shifted)
+        self._since_resync = 0
+
+    @property
+    def mean(self) -> float:
+        if not self.full:
+            return math.nan
+        return self._offset + self._sum / self.window
+
+    @property
+    def std(self) -> float:
+        if not self.full:
+            return math.nan
+        variance = (self._sum_sq - self._sum * self._sum / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self.full else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self.full else math.nan
+
+    @property
+    def trend(self) -> float:
+        if not self.full:
+            return math.nan
+        t_mean = (self.window - 1) / 2.0
+        t_var = self.window * (self.window * self.window - 1) / 12.0
+        return (self._sum_tx - t_mean * self._sum) / t_var
+
+    def stats(self, names: Iterable[str] = ROLLING_STATS) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in names}
+
+@dataclass(frozen=True)
+class RollingSpec:
+    """A rolling window over one input column and the statistics taken from it"""
+    column: str
+    window: int
+    stats: Tuple[str, ...] = ROLLING_STATS
+
+    def feature_name(self, stat: str) -> str:
+        return f"{self.column}_{stat}_{self.window}"
+
+class IncrementalRollingFeatures:
+    """
+    Rolling features kept per location and updated as observations arrive
+
+    Instead of recomputing windows over a location's full history on every
+    request, ``update`` folds the newest observation into that location's
+    windows and returns the current features. Locations are evicted least
+    recently updated first once ``max_locations`` is reached.
+    """
+
+    def __init__(self, specs: Iterable[RollingSpec], max_locations: int = 100_000):
+        self.specs = tuple(specs)
+        self.max_locations = max_locations
+        self._windows: "OrderedDict[Hashable, Tuple[RollingWindow, ...]]" = OrderedDict()
+
+    def _windows_for(self, key: Hashable) -> Tuple[RollingWindow, ...]:
+        windows = self._windows.get(key)
+        if windows is None:
+            windows = tuple(RollingWindow(spec.window) for spec in self.specs)
+            self._windows[key] = windows
+            if len(self._windows) > self.max_locations:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+        return windows
+
+    def update(self, key: Hashable, observation: Mapping[str, float]) -> Dict[str, float]:
+        """
+        Add one observation (column -> value) for a location and get its features
+
+        Columns missing from the observation count as NaN.
+        """
+        windows = self._windows_for(key)
+        features = {}
+        for spec, window in zip(self.specs, windows):
+            window.update(observation.get(spec.column, math.nan))
+            for stat in spec.stats:
+                features[spec.feature_name(stat)] = getattr(window, stat)
+        return features
+
+    def features(self, key: Hashable) -> Optional[Dict[str, float]]:
+        """Get the current features of a location without updating it"""
+        windows = self._windows.get(key)
+        if windows is None:
+            return None
+        return {
+            spec.feature_name(stat): getattr(window, stat)
+            for spec, window in zip(self.specs, windows)
+            for stat in spec.stats
+        }
+
+    def warm(self, key: Hashable, history: Mapping[str, Iterable[float]]):
+        """Seed a location's windows from its recent history (column -> values, oldest first)"""
+        windows = self._windows_for(key)
+        for spec, window in zip(self.specs, windows):
+            window.reset()
+            values = list(history.get(spec.column, ()))
+            for value in values[-spec.window:]:
+                window.update(value)
+
+    def forget(self, key: Hashable):
+        self._windows.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._windows)
@@ -0,0 +1,363 @@
+"""
+Sequence Training Pipeline
+Out-of-core training data for the deep (LSTM/CNN) models:
+- Zero-copy sequence windows over a feature matrix via strided views
+- Featurized per-station history on disk (.npy), memory-mapped for reading
+- Batches streamed in contiguous blocks through a bounded shuffle buffer,
+  so peak memory follows the batch and buffer sizes, not the history length
+- Out-of-core scaler fitting with partial_fit
+- tf.data wrapper for Keras and a bounded reservoir sample for the sklearn
+  ensemble stage, fed from the same batches
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .lazy_imports import lazy_import
+
+tf = lazy_import("tensorflow")
+
+logger = logging.getLogger(__name__)
+
+def sequence_windows(data: np.ndarray, target: np.ndarray,
+                     sequence_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Windows of ``sequence_length`` rows, each labelled with the target of the row after it
+
+    Sample k is ``data[k:k + sequence_length]`` with target
+    ``target[k + sequence_length]``, as the list-building create_sequences
+    produced. X is a read-only strided view of ``data`` shaped
+    (samples, sequence_length, features): nothing is copied.
+    """
+    data = np.asarray(data)
+    target = np.asarray(target)
+    samples = min(len(data), len(target)) - sequence_length
+    if samples <= 0:
+        return (np.empty((0, sequence_length) + data.shape[1:], dtype=data.dtype),
+                np.empty((0,), dtype=target.dtype))
+    windows = sliding_window_view(data[:samples + sequence_length - 1], sequence_length, axis=0)
+    # sliding_window_view puts the window axis last; move it next to the sample axis
+    return np.moveaxis(windows, -1, 1), target[sequence_length:sequence_length + samples]
+
+@dataclass
+class HistorySource:
+    """One station's featurized history: features (rows, features) and a target per row"""
+    name: str
+    features: np.ndarray
+    target: np.ndarray
+
+    @property
+    def rows(self) -> int:
+        return min(len(self.features), len(self.target))
+
+def save_history(directory: str, name: str, features: np.ndarray, target: np.ndarray):
+    """Write a station's featurized history as .npy files that open_history memory-maps"""
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, f"{name}.features.npy"), np.ascontiguousarray(features, dtype=np.float32))
+    np.save(os.path.join(directory, f"{name}.target.npy"), np.ascontiguousarray(target, dtype=np.float32))
+    index_path = os.path.join(directory, "index.json")
+    names = []
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            names = json.load(f)["sources"]
+    if name not in names:
+        names.append(name)
+    with open(index_path, "w") as f:
+        json.dump({"sources": names}, f)
+
+def open_history(directory: str) -> List[HistorySource]:
+    """Memory-map every station history saved in a directory"""
+    with open(os.path.join(directory, "index.json")) as f:
+        names = json.load(f)["sources"]
+    return [
+        HistorySource(
+            name=name,
+            features=np.load(os.path.join(directory, f"{name}.features.npy"), mmap_mode="r"),
+            target=np.load(os.path.join(directory, f"{name}.target.npy"), mmap_mode="r")
+        )
+        for name in names
+    ]
+
+class SequenceBatches:
+    """
+    Re-iterable stream of (X, y, current) training batches over history sources
+
+    X is (batch, sequence_length, features) float32, y the targets and
+    ``current`` the feature row at each target's timestep (what the
+    ensemble stage stacks next to the network outputs).
+
+    Each source's samples are split in time order: the first
+    ``1 - validation_split`` go to the "train" subset, the rest to "val".
+    Samples are read ``block_size`` at a time as one contiguous slice of
+    rows (sequential reads of a memory-mapped file); up to
+    ``shuffle_blocks`` blocks are held and their samples shuffled together.
+    Peak memory is about (shuffle_blocks * block_size + batch_size *
+    sequence_length) rows, whatever the history length.
+    """
+
+    def __init__(self, sources: Sequence[HistorySource], sequence_length: int, batch_size: int = 32,
+                 subset: str = "train", validation_split: float = 0.2, block_size: int = 4096,
+                 shuffle_blocks: int = 8, shuffle: Optional[bool] = None, seed: int = 0,
+                 transform: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        if subset not in ("train", "val", "all"):
+            raise ValueError(f"Unknown subset {subset!r}")
+        self.sources = list(sources)
+        self.sequence_length = sequence_length
+        self.batch_size = batch_size
+        self.subset = subset
+        self.validation_split = validation_split
+        self.block_size = block_size
+        self.shuffle_blocks = max(shuffle_blocks, 1)
+        # Validation batches keep time order unless asked otherwise
+        self.shuffle = (subset == "train") if shuffle is None else shuffle
+        self.seed = seed
+        self.transform = transform
+        self._epoch = 0
+
+    def sample_range(self, source: HistorySource) -> Tuple[int, int]:
+        """Sample indices [start, stop) of a source in this subset"""
+        samples = max(source.rows - self.sequence_length, 0)
+        split = int(samples * (1 - self.validation_split))
+        if self.subset == "train":
+            return 0, split
+        if self.subset == "val":
+            return split, samples
+        return 0, samples
+
+    @property
+    def n_features(self) -> int:
+        return self.sources[0].features.shape[1]
+
+    def __len__(self) -> int:
+        """Number of samples in the subset"""
+        return sum(stop - start for start, stop in map(self.sample_range, self.sources))
+
+    def steps(self) -> int:
+        """Batches per pass"""
+        return -(-len(self) // self.batch_size)
+
+    def blocks(self) -> List[Tuple[int, int, int]]:
+        """(source index, first sample, last sample + 1) of every block in the subset"""
+        blocks = []
+        for source_index, source in enumerate(self.sources):
+            start, stop = self.sample_range(source)
+            for block_start in range(start, stop, self.block_size):
+                blocks.append((source_index, block_start, min(block_start + self.block_size, stop)))
+        return blocks
+
+    def read_block(self, block: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read one block as (rows, targets) with one contiguous slice per array
+
+        The rows cover every window of the block's samples plus the row at
+        each target; windows are cut from them when a batch is gathered.
+        """
+        source_index, first, last = block
+        source = self.sources[source_index]
+        rows = np.asarray(source.features[first:last + self.sequence_length], dtype=np.float32)
+        if self.transform is not None:
+            rows = np.asarray(self.transform(rows), dtype=np.float32)
+        targets = np.asarray(source.target[first + self.sequence_length:last + self.sequence_length],
+                             dtype=np.float32)
+        return rows, targets
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        rng = np.random.default_rng(self.seed + self._epoch)
+        self._epoch += 1
+        blocks = self.blocks()
+        if self.shuffle:
+            blocks = [blocks[i] for i in rng.permutation(len(blocks))]
+
+        # A partial batch left at the end of one buffer is completed from the next
+        tail: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        tail_size = 0
+        for group_start in range(0, len(blocks), self.shuffle_blocks):
+            buffer = [self.read_block(block) for block in blocks[group_start:group_start + self.shuffle_blocks]]
+            # (buffer entry, sample within the entry) for every sample held
+            picks = np.concatenate([
+                np.stack([np.full(len(targets), entry), np.arange(len(targets))], axis=1)
+                for entry, (_, targets) in enumerate(buffer)
+            ])
+            if self.shuffle:
+                picks = picks[rng.permutation(len(picks))]
+
+            position = 0
+            while position < len(picks):
+                take = min(self.batch_size - tail_size, len(picks) - position)
+                tail.append(self._gather(buffer, picks[position:position + take]))
+                tail_size += take
+                position += take
+                if tail_size == self.batch_size:
+                    yield self._concat(tail)
+                    tail, tail_size = [], 0
+
+        if tail:
+            yield self._concat(tail)
+
+    def _gather(self, buffer: List[Tuple[np.ndarray, np.ndarray]],
+                picks: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Copy the picked samples' windows, targets and current rows out of the buffer"""
+        length = self.sequence_length
+        X = np.empty((len(picks), length, self.n_features), dtype=np.float32)
+        y = np.empty(len(picks), dtype=np.float32)
+        current = np.empty((len(picks), self.n_features), dtype=np.float32)
+        for entry in np.unique(picks[:, 0]):
+            mask = picks[:, 0] == entry
+            rows, targets = buffer[entry]
+            samples = picks[mask, 1]
+            windows, _ = sequence_windows(rows, rows[:, 0], length)
+            X[mask] = windows[samples]
+            y[mask] = targets[samples]
+            current[mask] = rows[samples + length]
+        return X, y, current
+
+    @staticmethod
+    def _concat(parts) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if len(parts) == 1:
+            return parts[0]
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def fit_scaler(self, scaler, chunk_rows: int = 65536):
+        """
+        Fit a scaler with partial_fit over the subset's rows, one chunk at a time
+
+        Only rows that feed this subset's samples are used, so a train
+        stream never sees validation rows.
+        """
+        for source in self.sources:
+            start, stop = self.sample_range(source)
+            last_row = stop + self.sequence_length if stop > start else start
+            for chunk_start in range(start, last_row, chunk_rows):
+                chunk = np.asarray(source.features[chunk_start:min(chunk_start + chunk_rows, last_row)],
+                                   dtype=np.float64)
+                if len(chunk):
+                    scaler.partial_fit(chunk)
+        return scaler
+
+    def to_tf_dataset(self, with_current: bool = False):
+        """
+        Wrap the stream as a repeatable tf.data pipeline of (X, y) batches
+
+        Batches are already shuffled and assembled here, so the dataset
+        only prefetches the next batch while the current one trains.
+        """
+        length, features = self.sequence_length, self.n_features
+        signature = [
+            tf.TensorSpec(shape=(None, length, features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32)
+        ]
+        if with_current:
+            signature.append(tf.TensorSpec(shape=(None, features), dtype=tf.float32))
+
+        def generate():
+            for X, y, current in self:
+                yield (X, y, current) if with_current else (X, y)
+
+        dataset = tf.data.Dataset.from_generator(generate, output_signature=tuple(signature))
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+class ReservoirSample:
+    """
+    Uniform sample of at most ``max_rows`` rows from a stream of batches
+
+    Lets a batch-only estimator (the gradient-boosting ensemble) train on a
+    bounded, unbiased sample of everything the stream produced.
+    """
+
+    def __init__(self, max_rows: int, seed: int = 0):
+        self.max_rows = max_rows
+        self.rng = np.random.default_rng(seed)
+        self.X: Optional[np.ndarray] = None
+        self.y: Optional[np.ndarray] = None
+        self.seen = 0
+        self.filled = 0
+
+    def add(self, X: np.ndarray, y: np.ndarray):
+        if self.X is None:
+            self.X = np.empty((self.max_rows, X.shape[1]), dtype=X.dtype)
+            self.y = np.empty(self.max_rows, dtype=y.dtype)
+
+        # Fill the reservoir first
+        fill = min(self.max_rows - self.filled, len(X))
+        if fill:
+            self.X[self.filled:self.filled + fill] = X[:fill]
+            self.y[self.filled:self.filled + fill] = y[:fill]
+            self.filled += fill
+        # Then the i-th row seen replaces a random slot with probability max_rows / i
+        rest = np.arange(fill, len(X))
+        if len(rest):
+            slots = self.rng.integers(0, self.seen + rest + 1)
+            keep = slots < self.max_rows
+            self.X[slots[keep]] = X[rest[keep]]
+            self.y[slots[keep]] = y[rest[keep]]
+        self.seen += len(X)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.X is None:
+            raise ValueError("No rows were streamed into the sample")
+        return self.X[:self.filled], self.y[:self.filled]
+
+def streaming_splits(history_dir: str, sequence_length: int, scaler, batch_size: int = 32,
+                     validation_split: float = 0.2, seed: int = 0) -> Tuple[SequenceBatches, SequenceBatches]:
+    """
+    Open a history directory as train and validation streams
+
+    The scaler is fitted on the training rows with partial_fit and applied
+    to every block both streams read.
+    """
+    sources = open_history(history_dir)
+    train = SequenceBatches(sources, sequence_length, batch_size, subset="train",
+                            validation_split=validation_split, seed=seed)
+    val = SequenceBatches(sources, sequence_length, batch_size, subset="val",
+                          validation_split=validation_split, seed=seed)
+    train.fit_scaler(scaler)
+    train.transform = val.transform = scaler.transform
+    logger.info(f"Streaming {len(train)} training and {len(val)} validation sequences "
+                f"from {len(sources)} sources in {history_dir}")
+    return train, val
+
+def sample_sequences(batches: SequenceBatches, max_rows: int = 20_000,
+                     seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Bounded uniform sample of whole sequences from a stream, e.g. for evaluate()"""
+    reservoir = ReservoirSample(max_rows, seed=seed)
+    for X, y, _ in batches:
+        reservoir.add(X.reshape(len(X), -1), y)
+    X, y = reservoir.arrays()
+    return X.reshape(len(X), batches.sequence_length, batches.n_features), y
+
+def collect_ensemble_sample(batches: SequenceBatches,
+                            predictors: Sequence[Callable[[np.ndarray], np.ndarray]],
+                            max_rows: int = 200_000, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build ensemble training rows from the stream: each predictor's output
+    on the batch's windows followed by the current feature row
+
+    Same layout as the in-memory train(): [network outputs..., current row].
+    """
+    reservoir = ReservoirSample(max_rows, seed=seed)
+    for X, y, current in batches:
+        outputs = [np.asarray(predict(X)).reshape(len(X), -1) for predict in predictors]
+        reservoir.add(np.column_stack(outputs + [current]), y)
+    logger.info(f"Ensemble sample: {reservoir.filled} of {reservoir.seen} streamed rows")
+    return reservoir.arrays()
+
+def fit_keras_streaming(model, train: SequenceBatches, val: Optional[SequenceBatches],
+                        epochs: int, callbacks: Optional[List] = None):
+    """Fit a Keras model on streamed batches, re-reading the history every epoch"""
+    train_data = train.to_tf_dataset().repeat()
+    validation_data = val.to_tf_dataset() if val is not None and len(val) else None
+    return model.fit(
+        train_data,
+        steps_per_epoch=train.steps(),
+        validation_data=validation_data,
+        validation_steps=val.steps() if validation_data is not None else None,
+        epochs=epochs,
+        verbose=1,
+        callbacks=callbacks or []
+    )
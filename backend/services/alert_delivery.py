@@ -0,0 +1,562 @@
+"""
+Alert Delivery Service
+Queued delivery of alert notifications off the evaluation path:
+- Bounded queue and async worker pool per channel (SMS, email, push)
+- Token-bucket rate limiting per provider
+- Batching for providers with batch endpoints
+- Retry with exponential backoff and jitter, then dead-lettering
+- Jobs for channels without a configured provider recorded as skipped
+- Deduplication by (subscription, disaster type, risk level, time window)
+- Queue depth and send latency metrics
+"""
+
+import asyncio
+import aiohttp
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ["sms", "email", "push"]
+
+# Provider responses worth retrying; other errors go straight to dead-letter
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+@dataclass
+class ChannelConfig:
+    """Delivery settings for one channel"""
+    workers: int
+    rate_per_s: float
+    burst: int
+    batch_size: int
+
+def _channel_config(channel: str, workers: int, rate_per_s: float, burst: int, batch_size: int) -> ChannelConfig:
+    """Read a channel's settings from ALERT_<CHANNEL>_* environment variables"""
+    prefix = f"ALERT_{channel.upper()}"
+    return ChannelConfig(
+        workers=int(os.getenv(f"{prefix}_WORKERS", str(workers))),
+        rate_per_s=float(os.getenv(f"{prefix}_RATE_PER_S", str(rate_per_s))),
+        burst=int(os.getenv(f"{prefix}_BURST", str(burst))),
+        batch_size=int(os.getenv(f"{prefix}_BATCH_SIZE", str(batch_size)))
+    )
+
+@dataclass
+class DeliveryConfig:
+    """Alert delivery configuration"""
+    queue_size: int = int(os.getenv("ALERT_QUEUE_SIZE", "100000"))
+    max_attempts: int = int(os.getenv("ALERT_MAX_ATTEMPTS", "5"))
+    backoff_base_s: float = float(os.getenv("ALERT_BACKOFF_BASE_S", "0.5"))
+    backoff_max_s: float = float(os.getenv("ALERT_BACKOFF_MAX_S", "60"))
+    dedup_window_s: float = float(os.getenv("ALERT_DEDUP_WINDOW_S", "3600"))
+    dead_letter_size: int = int(os.getenv("ALERT_DEAD_LETTER_SIZE", "10000"))
+    # Provider endpoints; point these at a local mock server for testing
+    twilio_api_url: str = os.getenv("TWILIO_API_URL", "https://api.twilio.com")
+    email_api_url: str = os.getenv("EMAIL_API_URL", "")
+    push_api_url: str = os.getenv("PUSH_API_URL", "")
+    twilio_account_sid: str = os.getenv("TWILIO_ACCOUNT_SID", "")
+    twilio_auth_token: str = os.getenv("TWILIO_AUTH_TOKEN", "")
+    twilio_phone_number: str = os.getenv("TWILIO_PHONE_NUMBER", "")
+    email_api_key: str = os.getenv("EMAIL_API_KEY", "")
+    push_api_key: str = os.getenv("PUSH_API_KEY", "")
+    channels: Dict[str, ChannelConfig] = field(default_factory=lambda: {
+        # Twilio has no batch send; push and email APIs take batches
+        "sms": _channel_config("sms", workers=8, rate_per_s=100, burst=100, batch_size=1),
+        "email": _channel_config("email", workers=4, rate_per_s=500, burst=500, batch_size=100),
+        "push": _channel_config("push", workers=4, rate_per_s=2000, burst=2000, batch_size=500)
+    })
+
+@dataclass
+class DeliveryJob:
+    """A single notification to deliver on one channel"""
+    channel: str
+    alert_id: str
+    subscription_id: str
+    user_id: str
+    disaster_type: str
+    risk_level: str
+    message: str
+    recipient: str
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    last_error: Optional[str] = None
+    dedup_key: Optional[Tuple] = None
+
+    def to_dict(self) -> Dict:
+        """Convert the job to a JSON-friendly dictionary"""
+        return {
+            "channel": self.channel,
+            "alert_id": self.alert_id,
+            "subscription_id": self.subscription_id,
+            "user_id": self.user_id,
+            "disaster_type": self.disaster_type,
+            "risk_level": self.risk_level,
+            "recipient": self.recipient,
+            "attempts": self.attempts,
+            "last_error": self.last_error
+        }
+
+@dataclass
+class SendFailure:
+    """A job that a provider did not accept"""
+    job: DeliveryJob
+    error: str
+    retryable: bool
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by a channel's workers
+    """
+
+    def __init__(self, rate_per_s: float, capacity: int):
+        self.rate_per_s = rate_per_s
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_s)
+        self.updated_at = now
+
+    async def acquire(self, tokens: int = 1):
+        """
+        Wait until the requested number of tokens is available
+
+        Requests larger than the bucket take its capacity at a time, so a
+        big batch still pays for every message.
+        """
+        # One waiter at a time keeps the bucket fair between workers
+        async with self._lock:
+            remaining = tokens
+            while remaining > 0:
+                chunk = min(remaining, self.capacity)
+                self._refill()
+                while self.tokens < chunk:
+                    await asyncio.sleep((chunk - self.tokens) / self.rate_per_s)
+                    self._refill()
+                self.tokens -= chunk
+                remaining -= chunk
+
+class ChannelMetrics:
+    """Counters and latency samples for one channel"""
+
+    def __init__(self, sample_size: int = 1000):
+        self.counters = {
+            "enqueued": 0,
+            "sent": 0,
+            "skipped": 0,
+            "failed_attempts": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+            "deduplicated": 0,
+            "dropped_queue_full": 0,
+            "batches": 0
+        }
+        self.send_latencies: Deque[float] = deque(maxlen=sample_size)
+        self.delivery_latencies: Deque[float] = deque(maxlen=sample_size)
+
+    @staticmethod
+    def _percentiles(samples: Deque[float]) -> Dict:
+        if not samples:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2)
+        }
+
+    def to_dict(self) -> Dict:
+        """Convert the metrics to a JSON-friendly dictionary"""
+        return {
+            **self.counters,
+            "send_latency": self._percentiles(self.send_latencies),
+            # Enqueue to provider acceptance, including queueing and retries
+            "delivery_latency": self._percentiles(self.delivery_latencies)
+        }
+
+class AlertDeliveryService:
+    """
+    Per-channel queues and workers that deliver alerts to providers
+
+    enqueue() never blocks the caller: a full queue drops the job to the
+    dead-letter queue and counts it instead of stalling evaluation.
+    """
+
+    def __init__(self, config: DeliveryConfig = None):
+        self.config = config or DeliveryConfig()
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.metrics: Dict[str, ChannelMetrics] = {channel: ChannelMetrics() for channel in CHANNELS}
+        self.dead_letters: Deque[Dict] = deque(maxlen=self.config.dead_letter_size)
+        self._workers: List[asyncio.Task] = []
+        # id(job) -> (timer, job) for jobs waiting out their backoff
+        self._retry_handles: Dict[int, Tuple[asyncio.TimerHandle, DeliveryJob]] = {}
+        self._recent: Dict[Tuple, float] = {}
+        self._in_flight = {channel: 0 for channel in CHANNELS}
+        self._loop = None
+        # Called with (job, status) as a delivery progresses: "sent",
+        # "skipped" (no provider configured), "retrying" or "dead_lettered"
+        self.outcome_listeners: List[Callable[[DeliveryJob, str], None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Create the channel queues and start the workers"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        """Start workers on the running event loop if they are not running yet"""
+        loop = asyncio.get_running_loop()
+        if self._workers and self._loop is loop:
+            return
+
+        self._loop = loop
+        self._workers = []
+        for channel in CHANNELS:
+            channel_config = self.config.channels[channel]
+            self.queues[channel] = asyncio.Queue(maxsize=self.config.queue_size)
+            self.buckets[channel] = TokenBucket(channel_config.rate_per_s, channel_config.burst)
+            for _ in range(channel_config.workers):
+                self._workers.append(asyncio.create_task(self._worker(channel)))
+
+        logger.info(f"Alert delivery started with {len(self._workers)} workers")
+
+    async def stop(self, drain_timeout_s: float = 10.0):
+        """
+        Wait for queued jobs to drain (up to a timeout), then stop the workers
+
+        Jobs still queued or waiting for a retry at that point are
+        dead-lettered, so no alert disappears silently on shutdown.
+        """
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self.queues.values())),
+                timeout=drain_timeout_s
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        undelivered = []
+        for handle, job in self._retry_handles.values():
+            handle.cancel()
+            undelivered.append(job)
+        self._retry_handles.clear()
+        for queue in self.queues.values():
+            while not queue.empty():
+                undelivered.append(queue.get_nowait())
+                queue.task_done()
+        for job in undelivered:
+            job.last_error = f"undelivered at shutdown (last error: {job.last_error})" if job.last_error else "undelivered at shutdown"
+            self._dead_letter(job, log=False)
+        if undelivered:
+            logger.warning(f"Alert delivery stopped with {len(undelivered)} undelivered jobs, dead-lettered")
+        logger.info("Alert delivery stopped")
+
+    def dedup_key(self, job: DeliveryJob) -> Tuple:
+        """Key identifying repeats of the same alert within one dedup window"""
+        window = int(time.time() // self.config.dedup_window_s)
+        return (job.subscription_id, job.disaster_type, job.risk_level, job.channel, window)
+
+    def enqueue(self, job: DeliveryJob) -> str:
+        """
+        Queue a job for delivery without waiting
+
+        Returns "queued", "deduplicated" or "dropped".
+        """
+        self._ensure_started()
+        metrics = self.metrics[job.channel]
+
+        key = job.dedup_key = self.dedup_key(job)
+        now = time.monotonic()
+        if self._recent.get(key, 0) > now:
+            metrics.counters["deduplicated"] += 1
+            return "deduplicated"
+
+        try:
+            self.queues[job.channel].put_nowait(job)
+        except asyncio.QueueFull:
+            metrics.counters["dropped_queue_full"] += 1
+            job.last_error = "queue full"
+            # Counted, not logged: a saturated queue would flood the log
+            self._dead_letter(job, log=False)
+            return "dropped"
+
+        self._recent[key] = now + self.config.dedup_window_s
+        if len(self._recent) > 4 * self.config.queue_size:
+            self._prune_recent(now)
+
+        metrics.counters["enqueued"] += 1
+        return "queued"
+
+    def _prune_recent(self, now: float):
+        """Forget dedup keys whose window has passed"""
+        self._recent = {key: expires for key, expires in self._recent.items() if expires > now}
+
+    async def _worker(self, channel: str):
+        """Take batches off a channel queue and send them"""
+        queue = self.queues[channel]
+        batch_size = self.config.channels[channel].batch_size
+
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self.buckets[channel].acquire(len(batch))
+                await self._deliver(channel, batch)
+            except asyncio.CancelledError:
+                # Stopped mid-send: the provider may or may not have the batch
+                for job in batch:
+                    job.last_error = "delivery interrupted at shutdown"
+                    self._dead_letter(job, log=False)
+                raise
+            except Exception as e:
+                logger.error(f"{channel} delivery worker error: {e}")
+                for job in batch:
+                    self._handle_failure(SendFailure(job, str(e), retryable=True))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _deliver(self, channel: str, batch: List[DeliveryJob]):
+        """Send one batch to its provider and record the outcome"""
+        metrics = self.metrics[channel]
+        for job in batch:
+            job.attempts += 1
+
+        self._in_flight[channel] += len(batch)
+        start_time = time.perf_counter()
+        try:
+            if channel == "sms":
+                failures = await self.send_sms_batch(batch)
+            elif channel == "email":
+                failures = await self.send_email_batch(batch)
+            else:
+                failures = await self.send_push_batch(batch)
+        finally:
+            self._in_flight[channel] -= len(batch)
+            metrics.send_latencies.append(time.perf_counter() - start_time)
+            metrics.counters["batches"] += 1
+
+        if failures is None:
+            # No provider for this channel: nothing was sent, and nothing to retry
+            metrics.counters["skipped"] += len(batch)
+            for job in batch:
+                self._notify(job, "skipped")
+            return
+
+        failed_jobs = {id(failure.job) for failure in failures}
+        now = time.monotonic()
+        for job in batch:
+            if id(job) not in failed_jobs:
+                metrics.counters["sent"] += 1
+                metrics.delivery_latencies.append(now - job.enqueued_at)
+                self._notify(job, "sent")
+        for failure in failures:
+            self._handle_failure(failure)
+
+    def _handle_failure(self, failure: SendFailure):
+        """Schedule a retry with backoff, or dead-letter the job"""
+        job = failure.job
+        job.last_error = failure.error
+        metrics = self.metrics[job.channel]
+        metrics.counters["failed_attempts"] += 1
+
+        if not failure.retryable or job.attempts >= self.config.max_attempts:
+            self._dead_letter(job)
+            return
+
+        # Full jitter: uniform over [0, min(max, base * 2^attempt)]
+        delay = random.uniform(0, min(self.config.backoff_max_s, self.config.backoff_base_s * 2 ** job.attempts))
+        metrics.counters["retried"] += 1
+        self._retry_handles[id(job)] = (self._loop.call_later(delay, self._requeue, job), job)
+        self._notify(job, "retrying")
+
+    def _requeue(self, job: DeliveryJob):
+        """Put a job back on its queue after its backoff delay"""
+        self._retry_handles.pop(id(job), None)
+        try:
+            self.queues[job.channel].put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics[job.channel].counters["dropped_queue_full"] += 1
+            job.last_error = "queue full on retry"
+            self._dead_letter(job, log=False)
+
+    def _dead_letter(self, job: DeliveryJob, log: bool = True):
+        """Keep a failed job for inspection"""
+        # Let the next evaluation cycle try this alert again
+        if job.dedup_key is not None:
+            self._recent.pop(job.dedup_key, None)
+        self.metrics[job.channel].counters["dead_lettered"] += 1
+        self.dead_letters.append({**job.to_dict(), "dead_lettered_at": datetime.now().isoformat()})
+        if log:
+            logger.warning(f"Alert {job.alert_id} dead-lettered on {job.channel}: {job.last_error}")
+        self._notify(job, "dead_lettered")
+
+    def _notify(self, job: DeliveryJob, status: str):
+        """Report a job's delivery status to the outcome listeners"""
+        for listener in self.outcome_listeners:
+            try:
+                listener(job, status)
+            except Exception as e:
+                logger.error(f"Delivery outcome listener failed: {e}")
+
+    async def send_sms_batch(self, batch: List[DeliveryJob]) -> Optional[List[SendFailure]]:
+        """
+        Send SMS alerts using Twilio (one request per message)
+
+        Returns the failures, or None when Twilio is not configured.
+        """
+        if not all([self.config.twilio_account_sid, self.config.twilio_auth_token, self.config.twilio_phone_number]):
+            logger.warning("Twilio credentials not configured, skipping SMS")
+            return None
+
+        url = f"{self.config.twilio_api_url}/2010-04-01/Accounts/{self.config.twilio_account_sid}/Messages.json"
+        auth = aiohttp.BasicAuth(self.config.twilio_account_sid, self.config.twilio_auth_token)
+
+        async def send_one(job: DeliveryJob) -> Optional[SendFailure]:
+            data = {
+                "From": self.config.twilio_phone_number,
+                "To": job.recipient,
+                "Body": job.message
+            }
+            try:
+                async with http_client.post(url, data=data, auth=auth) as response:
+                    if response.status == 201:
+                        return None
+                    return SendFailure(job, f"HTTP {response.status}", response.status in RETRYABLE_STATUSES)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return SendFailure(job, str(e) or type(e).__name__, retryable=True)
+
+        results = await asyncio.gather(*(send_one(job) for job in batch))
+        return [failure for failure in results if failure is not None]
+
+    async def send_email_batch(self, batch: List[DeliveryJob]) -> Optional[List[SendFailure]]:
+        """
+        Send email alerts through an HTTP email API in one request
+
+        Returns the failures, or None when no email provider is configured.
+        """
+        if not self.config.email_api_url:
+            # No email provider configured: log like the demo did
+            for job in batch:
+                logger.info(f"Email alert would be sent to {job.recipient}: {job.message[:100]}...")
+            return None
+
+        payload = {
+            "messages": [
+                {"to": job.recipient, "subject": f"{job.disaster_type.upper()} ALERT", "body": job.message}
+                for job in batch
+            ]
+        }
+        return await self._post_batch(f"{self.config.email_api_url}/send", payload, batch, self.config.email_api_key)
+
+    async def send_push_batch(self, batch: List[DeliveryJob]) -> Optional[List[SendFailure]]:
+        """
+        Send push notifications through a multicast push API in one request
+
+        Returns the failures, or None when no push provider is configured.
+        """
+        if not self.config.push_api_url:
+            # No push provider configured: log like the demo did
+            for job in batch:
+                logger.info(f"Push notification would be sent to user {job.user_id}: {job.message[:100]}...")
+            return None
+
+        payload = {
+            "messages": [
+                {"token": job.recipient, "title": f"{job.disaster_type.upper()} ALERT", "body": job.message}
+                for job in batch
+            ]
+        }
+        return await self._post_batch(f"{self.config.push_api_url}/send", payload, batch, self.config.push_api_key)
+
+    async def _post_batch(self, url: str, payload: Dict, batch: List[DeliveryJob],
+                          api_key: str) -> List[SendFailure]:
+        """
+        POST a batch and map per-message results back to jobs
+
+        Providers answer with {"results": [{"ok": bool, "error": str}, ...]}
+        in request order; a non-2xx response fails the whole batch. Jobs
+        without a result (a short results list) are retried, as the
+        provider did not confirm them.
+        """
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        try:
+            async with http_client.post(url, json=payload, headers=headers) as response:
+                if response.status >= 300:
+                    retryable = response.status in RETRYABLE_STATUSES
+                    return [SendFailure(job, f"HTTP {response.status}", retryable) for job in batch]
+                body = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return [SendFailure(job, str(e) or type(e).__name__, retryable=True) for job in batch]
+
+        results = (body or {}).get("results") or []
+        failures = []
+        for job, result in zip(batch, results):
+            if not result.get("ok", True):
+                failures.append(SendFailure(job, result.get("error", "rejected"), bool(result.get("retryable", False))))
+        for job in batch[len(results):]:
+            failures.append(SendFailure(job, "no result from provider", retryable=True))
+        return failures
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue depth and delivery metrics per channel
+        """
+        return {
+            "running": self.running,
+            "channels": {
+                channel: {
+                    "queue_depth": self.queues[channel].qsize() if channel in self.queues else 0,
+                    "queue_capacity": self.config.queue_size,
+                    "in_flight": self._in_flight[channel],
+                    "workers": self.config.channels[channel].workers,
+                    "rate_per_s": self.config.channels[channel].rate_per_s,
+                    **self.metrics[channel].to_dict()
+                }
+                for channel in CHANNELS
+            },
+            "pending_retries": len(self._retry_handles),
+            "dead_letter_size": len(self.dead_letters)
+        }
+
+    def get_dead_letters(self, limit: int = 100) -> List[Dict]:
+        """Get the most recent dead-lettered jobs"""
+        return list(self.dead_letters)[-limit:]
+
+def new_job(channel: str, subscription: Dict, disaster_type: str, risk_level: str,
+            message: str, recipient: str, alert_id: str = None) -> DeliveryJob:
+    """Build a delivery job for a subscription"""
+    return DeliveryJob(
+        channel=channel,
+        alert_id=alert_id or str(uuid.uuid4()),
+        subscription_id=subscription["subscription_id"],
+        user_id=subscription["user_id"],
+        disaster_type=disaster_type,
+        risk_level=risk_level,
+        message=message,
+        recipient=recipient
+    )
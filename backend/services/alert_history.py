@@ -0,0 +1,148 @@
+"""
+Alert History Store
+Bounded, indexed in-memory history of sent alerts:
+- Global time-ordered ring buffer with a retention window
+- Bounded per-user deques for O(limit) history queries
+- Alert ID index for direct lookups
+- Running counters by disaster type, risk level, channel and delivery status,
+  kept current as deliveries are sent, retried or dead-lettered
+"""
+
+import logging
+import os
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AlertHistoryConfig:
+    """Alert history configuration"""
+    retention_hours: float = float(os.getenv("ALERT_HISTORY_RETENTION_HOURS", "168"))
+    max_records: int = int(os.getenv("ALERT_HISTORY_MAX_RECORDS", "500000"))
+    max_per_user: int = int(os.getenv("ALERT_HISTORY_MAX_PER_USER", "200"))
+    # Window used for the "active alerts" count
+    active_window_hours: float = 24
+
+class AlertHistoryStore:
+    """
+    Alert records indexed by time, user and alert ID
+
+    Records must be added in sent_at order. Counters always describe the
+    records currently retained, so they move as old records expire.
+    """
+
+    def __init__(self, config: AlertHistoryConfig = None):
+        self.config = config or AlertHistoryConfig()
+        self._records: Deque[Dict] = deque()
+        self._by_user: Dict[str, Deque[Dict]] = {}
+        self._by_id: Dict[str, Dict] = {}
+        # Timestamps inside the active window, oldest first
+        self._active_window: Deque[datetime] = deque(maxlen=self.config.max_records)
+        self.total_recorded = 0
+        self.disaster_type_counts: Counter = Counter()
+        self.risk_level_counts: Counter = Counter()
+        self.channel_counts: Counter = Counter()
+        self.status_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: Dict):
+        """Add an alert record and expire what falls out of retention"""
+        self._records.append(record)
+        self._by_id[record["alert_id"]] = record
+        self._active_window.append(record["sent_at"])
+
+        user_alerts = self._by_user.get(record["user_id"])
+        if user_alerts is None:
+            user_alerts = self._by_user[record["user_id"]] = deque(maxlen=self.config.max_per_user)
+        user_alerts.append(record)
+
+        self.total_recorded += 1
+        self._count(record, 1)
+        self._expire(record["sent_at"])
+
+    def _count(self, record: Dict, delta: int):
+        """Apply a record to the running counters"""
+        self.disaster_type_counts[record["disaster_type"]] += delta
+        self.risk_level_counts[record["prediction"].get("risk_level", "UNKNOWN")] += delta
+        for channel in record.get("alert_types", []):
+            self.channel_counts[channel] += delta
+        for status in record.get("delivery", {}).values():
+            self.status_counts[status] += delta
+
+    def update_delivery(self, alert_id: str, channel: str, status: str) -> bool:
+        """
+        Record a channel's latest delivery status on a retained alert
+
+        Returns False when the alert is no longer retained (or never
+        recorded, e.g. a deduplicated send).
+        """
+        record = self._by_id.get(alert_id)
+        if record is None or channel not in record.get("delivery", {}):
+            return False
+        delivery = record["delivery"]
+        self.status_counts[delivery[channel]] -= 1
+        self.status_counts[status] += 1
+        delivery[channel] = status
+        return True
+
+    def _expire(self, now: datetime):
+        """Drop records past the retention window or over capacity"""
+        cutoff = now - timedelta(hours=self.config.retention_hours)
+        while self._records and (
+            len(self._records) > self.config.max_records or self._records[0]["sent_at"] < cutoff
+        ):
+            record = self._records.popleft()
+            self._by_id.pop(record["alert_id"], None)
+            self._count(record, -1)
+
+            # The user's oldest record is this one unless the per-user cap
+            # already pushed it out
+            user_alerts = self._by_user.get(record["user_id"])
+            if user_alerts and user_alerts[0] is record:
+                user_alerts.popleft()
+            if user_alerts is not None and not user_alerts:
+                del self._by_user[record["user_id"]]
+
+    def get(self, alert_id: str) -> Optional[Dict]:
+        """Get a retained alert by ID"""
+        return self._by_id.get(alert_id)
+
+    def get_user_alerts(self, user_id: str, limit: int = 50) -> List[Dict]:
+        """Get a user's most recent alerts, newest first"""
+        user_alerts = self._by_user.get(user_id)
+        if not user_alerts:
+            return []
+
+        alerts = []
+        for record in reversed(user_alerts):
+            if len(alerts) >= limit:
+                break
+            alerts.append(record)
+        return alerts
+
+    def active_count(self, now: datetime = None) -> int:
+        """Count alerts sent within the active window"""
+        cutoff = (now or datetime.now()) - timedelta(hours=self.config.active_window_hours)
+        while self._active_window and self._active_window[0] <= cutoff:
+            self._active_window.popleft()
+        return len(self._active_window)
+
+    def get_stats(self) -> Dict:
+        """
+        Get counters over the retained history
+        """
+        return {
+            "total_alerts": len(self._records),
+            "total_recorded": self.total_recorded,
+            "users": len(self._by_user),
+            "disaster_type_counts": {k: v for k, v in self.disaster_type_counts.items() if v},
+            "risk_level_counts": {k: v for k, v in self.risk_level_counts.items() if v},
+            "channel_counts": {k: v for k, v in self.channel_counts.items() if v},
+            "delivery_status_counts": {k: v for k, v in self.status_counts.items() if v},
+            "retention_hours": self.config.retention_hours
+        }
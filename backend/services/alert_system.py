@@ -0,0 +1,426 @@
+"""
+Alert System Service
+Manages disaster alerts and notifications:
+- SMS alerts
+- Email notifications
+- Push notifications
+- Alert prioritization
+- User preferences
+- Spatially grouped evaluation of subscriptions
+- Indexed, bounded alert history
+- Area alerts published to listeners (the update stream) as risk levels rise
+- Predictions read from the in-memory prediction index
+"""
+
+import asyncio
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import logging
+import os
+import json
+import time
+import uuid
+from dataclasses import dataclass
+
+from .http_client import http_client
+from .location_cache import quantize_location, cell_center
+from .alert_delivery import AlertDeliveryService, CHANNELS, new_job
+from .alert_history import AlertHistoryStore
+from .geo import haversine_km
+from .prediction_index import PredictionIndex, prediction_index
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AlertEvaluationConfig:
+    """Alert evaluation configuration"""
+    # Subscriptions in the same cell share one prediction lookup
+    cell_size_deg: float = float(os.getenv("ALERT_CELL_DEG", "0.05"))
+    # Predictions within this distance of a cell center apply to its subscribers
+    prediction_radius_km: float = float(os.getenv("ALERT_PREDICTION_RADIUS_KM", "25"))
+
+class AlertSystem:
+    """
+    Disaster alert and notification system
+    """
+    
+    def __init__(self, config: AlertEvaluationConfig = None, index: PredictionIndex = None):
+        self.config = config or AlertEvaluationConfig()
+        self.index = index or prediction_index
+        
+        # Notifications are queued here and sent by per-channel workers
+        self.delivery = AlertDeliveryService()
+        
+        # In-memory storage for demo (use database in production)
+        self.user_subscriptions = {}
+        self.alert_history = AlertHistoryStore()
+        self.active_subscription_count = 0
+        self.delivery.outcome_listeners.append(self._record_delivery_outcome)
+        
+        # Active subscriptions indexed by grid cell, then subscription ID
+        self.cell_subscriptions: Dict[Tuple[int, int], Dict[str, Dict]] = {}
+        self.last_cycle_stats: Dict = {}
+        
+        # Called with each new area alert; the risk level last published per
+        # (cell, disaster type) keeps repeated cycles from re-announcing it
+        self.alert_listeners: List[Callable[[Dict], None]] = []
+        self.area_alert_levels: Dict[Tuple[Tuple[int, int], str], str] = {}
+    
+    async def __aenter__(self):
+        # Requests go through the shared pool, which the application owns
+        await http_client.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    async def subscribe_user(self, user_id: str, location: Dict, alert_types: List[str], 
+                           disaster_types: List[str]) -> str:
+        """
+        Subscribe a user to disaster alerts
+        """
+        try:
+            subscription_id = str(uuid.uuid4())
+            
+            subscription = {
+                "subscription_id": subscription_id,
+                "user_id": user_id,
+                "location": location,
+                "alert_types": alert_types,
+                "disaster_types": disaster_types,
+                "created_at": datetime.now(),
+                "active": True
+            }
+            
+            self.user_subscriptions[subscription_id] = subscription
+            self.active_subscription_count += 1
+            self.cell_subscriptions.setdefault(
+                self.cell_for(location), {}
+            )[subscription_id] = subscription
+            
+            logger.info(f"User {user_id} subscribed to alerts with ID {subscription_id}")
+            return subscription_id
+            
+        except Exception as e:
+            logger.error(f"User subscription failed: {e}")
+            raise
+    
+    async def unsubscribe_user(self, subscription_id: str):
+        """
+        Unsubscribe a user from alerts
+        """
+        try:
+            if subscription_id in self.user_subscriptions:
+                subscription = self.user_subscriptions[subscription_id]
+                if subscription["active"]:
+                    self.active_subscription_count -= 1
+                subscription["active"] = False
+                
+                cell = self.cell_for(subscription["location"])
+                cell_members = self.cell_subscriptions.get(cell, {})
+                cell_members.pop(subscription_id, None)
+                if not cell_members:
+                    self.cell_subscriptions.pop(cell, None)
+                
+                logger.info(f"User unsubscribed from alerts: {subscription_id}")
+            else:
+                logger.warning(f"Subscription not found: {subscription_id}")
+                
+        except Exception as e:
+            logger.error(f"User unsubscription failed: {e}")
+            raise
+    
+    def cell_for(self, location: Dict) -> Tuple[int, int]:
+        """
+        Get the evaluation grid cell of a subscription location
+        """
+        return quantize_location(location["latitude"], location["longitude"], self.config.cell_size_deg)
+    
+    async def process_alerts(self):
+        """
+        Process and send alerts based on predictions
+        
+        Predictions are looked up once per grid cell and the result fans out
+        to every subscription in the cell. The lookups read the in-memory
+        index and sending only queues jobs, so the cells are evaluated in one
+        loop that yields to the event loop now and then.
+        """
+        try:
+            start_time = time.perf_counter()
+            cycle_stats = {"cells": 0, "subscriptions": 0, "alerts_sent": 0, "failed_cells": 0}
+            
+            for cell, members in list(self.cell_subscriptions.items()):
+                subscriptions = [sub for sub in members.values() if sub["active"]]
+                if not subscriptions:
+                    continue
+                try:
+                    cycle_stats["alerts_sent"] += await self.evaluate_cell(cell, subscriptions)
+                except Exception as e:
+                    cycle_stats["failed_cells"] += 1
+                    logger.error(f"Alert evaluation failed for cell {cell}: {e}")
+                cycle_stats["cells"] += 1
+                cycle_stats["subscriptions"] += len(subscriptions)
+                if cycle_stats["cells"] % 100 == 0:
+                    await asyncio.sleep(0)
+            
+            cycle_stats["duration_s"] = round(time.perf_counter() - start_time, 3)
+            cycle_stats["finished_at"] = datetime.now().isoformat()
+            self.last_cycle_stats = cycle_stats
+            logger.info(f"Alert cycle completed: {cycle_stats}")
+                
+        except Exception as e:
+            logger.error(f"Alert processing failed: {e}")
+    
+    async def evaluate_cell(self, cell: Tuple[int, int], subscriptions: List[Dict]) -> int:
+        """
+        Evaluate one grid cell and alert its subscribers
+        
+        Returns the number of alerts sent.
+        """
+        latitude, longitude = cell_center(cell, self.config.cell_size_deg)
+        predictions = self.get_location_predictions(latitude, longitude)
+        
+        # Group the cell's subscribers by disaster type
+        subscribers_by_type: Dict[str, List[Dict]] = {}
+        for subscription in subscriptions:
+            for disaster_type in subscription["disaster_types"]:
+                subscribers_by_type.setdefault(disaster_type, []).append(subscription)
+        
+        alerts_sent = 0
+        for disaster_type, subscribers in subscribers_by_type.items():
+            prediction = predictions.get(disaster_type)
+            if prediction is None or not self.should_send_alert(prediction):
+                self.area_alert_levels.pop((cell, disaster_type), None)
+                continue
+            
+            message = self.create_alert_message(disaster_type, prediction)
+            self.publish_area_alert(cell, disaster_type, prediction, message)
+            for subscription in subscribers:
+                await self.send_alert(subscription, disaster_type, prediction, message)
+                alerts_sent += 1
+                if alerts_sent % 1000 == 0:
+                    # Let delivery workers drain the queues during large fan-outs
+                    await asyncio.sleep(0)
+        
+        return alerts_sent
+    
+    def publish_area_alert(self, cell: Tuple[int, int], disaster_type: str, prediction: Dict, message: str):
+        """
+        Announce a cell's alert to the listeners when its risk level changed
+        
+        Area alerts carry no subscriber details; they are public.
+        """
+        risk_level = prediction.get("risk_level", "LOW")
+        key = (cell, disaster_type)
+        if not self.alert_listeners or self.area_alert_levels.get(key) == risk_level:
+            return
+        self.area_alert_levels[key] = risk_level
+        
+        latitude, longitude = cell_center(cell, self.config.cell_size_deg)
+        alert = {
+            "alert_id": str(uuid.uuid4()),
+            "disaster_type": disaster_type,
+            "risk_level": risk_level,
+            "probability": prediction.get("probability"),
+            "lat": latitude,
+            "lon": longitude,
+            "message": message,
+            "issued_at": datetime.now().isoformat()
+        }
+        for listener in self.alert_listeners:
+            try:
+                listener(alert)
+            except Exception as e:
+                logger.error(f"Alert listener failed: {e}")
+    
+    def get_location_predictions(self, latitude: float, longitude: float) -> Dict:
+        """
+        Get latest predictions for a location
+        
+        The highest-risk unexpired prediction of each disaster type within
+        the alert radius, from the in-memory index; disaster types without
+        one are left out.
+        """
+        try:
+            nearby = self.index.highest_by_type(latitude, longitude, self.config.prediction_radius_km)
+            return {
+                disaster_type: entry.to_dict(
+                    haversine_km(latitude, longitude, entry.latitude, entry.longitude)
+                )
+                for disaster_type, entry in nearby.items()
+            }
+        except Exception as e:
+            logger.error(f"Failed to get location predictions: {e}")
+            return {}
+    
+    def should_send_alert(self, prediction: Dict) -> bool:
+        """
+        Determine if an alert should be sent based on prediction
+        """
+        try:
+            probability = prediction.get("probability", 0)
+            risk_level = prediction.get("risk_level", "LOW")
+            
+            # Alert thresholds
+            if risk_level in ["HIGH", "CRITICAL"] and probability > 0.6:
+                return True
+            elif risk_level == "MEDIUM" and probability > 0.8:
+                return True
+            
+            return False
+            
+        except Exception as e:
+            logger.error(f"Alert threshold check failed: {e}")
+            return False
+    
+    async def send_alert(self, subscription: Dict, disaster_type: str, prediction: Dict,
+                         message: Optional[str] = None):
+        """
+        Send alert to user
+        """
+        try:
+            alert_id = str(uuid.uuid4())
+            
+            # Create alert message (shared across a cell when precomputed)
+            if message is None:
+                message = self.create_alert_message(disaster_type, prediction)
+            
+            # Queue delivery on each channel; this never waits on a provider
+            alert_types = subscription["alert_types"]
+            risk_level = prediction.get("risk_level", "LOW")
+            
+            delivery = {}
+            for channel in alert_types:
+                if channel not in CHANNELS:
+                    continue
+                job = new_job(
+                    channel, subscription, disaster_type, risk_level, message,
+                    self.recipient_for(subscription, channel), alert_id
+                )
+                delivery[channel] = self.delivery.enqueue(job)
+            
+            if delivery and all(status == "deduplicated" for status in delivery.values()):
+                # Already alerted for this risk level within the dedup window
+                return
+            
+            # Store alert
+            alert_record = {
+                "alert_id": alert_id,
+                "user_id": subscription["user_id"],
+                "disaster_type": disaster_type,
+                "message": message,
+                "prediction": prediction,
+                "sent_at": datetime.now(),
+                "alert_types": alert_types,
+                "delivery": delivery
+            }
+            
+            self.alert_history.add(alert_record)
+            
+            logger.info(f"Alert queued: {alert_id} for user {subscription['user_id']}")
+            
+        except Exception as e:
+            logger.error(f"Alert sending failed: {e}")
+    
+    def _record_delivery_outcome(self, job, status: str):
+        """Keep an alert's history record in step with its deliveries"""
+        self.alert_history.update_delivery(job.alert_id, job.channel, status)
+    
+    def recipient_for(self, subscription: Dict, channel: str) -> str:
+        """
+        Get the address a subscription receives a channel's alerts at
+        """
+        # In production, get user's contact details from database
+        if channel == "sms":
+            return subscription.get("phone", "+1234567890")  # Demo phone number
+        if channel == "email":
+            return subscription.get("email", "user@example.com")  # Demo email
+        return subscription.get("push_token", subscription["user_id"])
+    
+    def create_alert_message(self, disaster_type: str, prediction: Dict) -> str:
+        """
+        Create alert message based on disaster type and prediction
+        """
+        try:
+            probability = prediction.get("probability", 0)
+            risk_level = prediction.get("risk_level", "LOW")
+            confidence = prediction.get("confidence", 0)
+            
+            if disaster_type == "flood":
+                return f"🚨 FLOOD ALERT 🚨\nRisk Level: {risk_level}\nProbability: {probability:.1%}\nConfidence: {confidence:.1%}\nTake immediate action to protect yourself and property."
+            
+            elif disaster_type == "drought":
+                return f"🌵 DROUGHT ALERT 🌵\nRisk Level: {risk_level}\nProbability: {probability:.1%}\nConfidence: {confidence:.1%}\nImplement water conservation measures."
+            
+            elif disaster_type == "cyclone":
+                return f"🌀 CYCLONE ALERT 🌀\nRisk Level: {risk_level}\nProbability: {probability:.1%}\nConfidence: {confidence:.1%}\nPrepare for evacuation if necessary."
+            
+            else:
+                return f"⚠️ DISASTER ALERT ⚠️\nType: {disaster_type}\nRisk Level: {risk_level}\nProbability: {probability:.1%}\nConfidence: {confidence:.1%}"
+                
+        except Exception as e:
+            logger.error(f"Alert message creation failed: {e}")
+            return "Disaster alert - please check local authorities for details."
+    
+    async def get_active_alerts_count(self) -> int:
+        """
+        Get count of active alerts
+        """
+        try:
+            # Count alerts from last 24 hours
+            return self.alert_history.active_count()
+            
+        except Exception as e:
+            logger.error(f"Failed to get active alerts count: {e}")
+            return 0
+    
+    async def get_user_alerts(self, user_id: str, limit: int = 50) -> List[Dict]:
+        """
+        Get alert history for a user
+        """
+        try:
+            # Newest first, read from the user's own index
+            return self.alert_history.get_user_alerts(user_id, limit)
+            
+        except Exception as e:
+            logger.error(f"Failed to get user alerts: {e}")
+            return []
+    
+    async def get_alert_statistics(self) -> Dict:
+        """
+        Get alert system statistics
+        """
+        try:
+            # Counters are maintained as alerts are recorded and expire
+            return {
+                **self.alert_history.get_stats(),
+                "active_subscriptions": self.active_subscription_count,
+                "last_24h_alerts": await self.get_active_alerts_count(),
+                "subscription_cells": len(self.cell_subscriptions),
+                "last_cycle": self.last_cycle_stats
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get alert statistics: {e}")
+            return {}
+    
+    async def update_alert_preferences(self, subscription_id: str, 
+                                     alert_types: List[str], disaster_types: List[str]):
+        """
+        Update user's alert preferences
+        """
+        try:
+            if subscription_id in self.user_subscriptions:
+                subscription = self.user_subscriptions[subscription_id]
+                subscription["alert_types"] = alert_types
+                subscription["disaster_types"] = disaster_types
+                subscription["updated_at"] = datetime.now()
+                
+                logger.info(f"Updated alert preferences for subscription {subscription_id}")
+            else:
+                logger.warning(f"Subscription not found: {subscription_id}")
+                
+        except Exception as e:
+            logger.error(f"Failed to update alert preferences: {e}")
+            raise 
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Compute Executor
+Runs CPU-bound work off the event loop:
+- Model inference and feature pipelines dispatched to a worker pool, so a
+  slow prediction does not stall other requests or the background tasks
+- Thread mode (default): workers share the process and its loaded models;
+  NumPy, scikit-learn and TensorFlow release the GIL in their kernels
+- Process mode: simple-model inference in worker processes that load the
+  active registry versions at start and reload on version changes; inputs
+  are sent as feature matrices (NumPy buffers), not DataFrames
+- Pools sized to the available cores
+- Feature extraction and inference timed into the stage histograms here,
+  so the models stay free of metrics
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..models.registry import model_registry
+from ..models.simple_models import SimpleModelFactory
+from .metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_MODES = ("thread", "process", "inline")
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity, unlike os.cpu_count)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+@dataclass
+class ComputeConfig:
+    """Compute executor configuration"""
+    # thread: worker threads; process: inference in worker processes;
+    # inline: run on the event loop (debugging only)
+    mode: str = os.getenv("COMPUTE_MODE", "thread")
+    # 0 sizes the pools to the available cores
+    workers: int = int(os.getenv("COMPUTE_WORKERS", "0"))
+    # spawn avoids forking a process that already runs threads
+    start_method: str = os.getenv("COMPUTE_START_METHOD", "spawn")
+
+    @property
+    def pool_size(self) -> int:
+        return self.workers if self.workers > 0 else available_cores()
+
+# Models held by each worker process, by disaster type
+_worker_models: Dict[str, object] = {}
+
+def _worker_model(disaster_type: str, version: Optional[str]):
+    """Get a worker's model, loading the requested registry version when it changed"""
+    model = _worker_models.get(disaster_type)
+    if model is None or model.version != version:
+        if version is None:
+            model = SimpleModelFactory.create_model(disaster_type)
+        else:
+            model = SimpleModelFactory.load_model(disaster_type, model_registry, version)
+        _worker_models[disaster_type] = model
+    return model
+
+def _init_worker(disaster_types: List[str]):
+    """Process pool initializer: load the active model versions before the first request"""
+    for disaster_type in disaster_types:
+        try:
+            _worker_model(disaster_type, model_registry.current_version(disaster_type))
+        except Exception as e:
+            logger.warning(f"Worker {os.getpid()} could not preload the {disaster_type} model: {e}")
+
+def _infer(disaster_type: str, model, features, batch: bool):
+    with observe_stage("inference", disaster_type):
+        return model.predict_batch(features) if batch else model.predict(features)
+
+def _extract_and_infer(disaster_type: str, model, data, batch: bool):
+    """Score a model input in a worker thread, timing each stage"""
+    schema = getattr(model, "schema", None)
+    if schema is not None:
+        with observe_stage("feature_extraction", disaster_type):
+            data = schema.extract(data if batch else schema.head(data, 1))
+    return _infer(disaster_type, model, data, batch)
+
+def _predict_in_worker(disaster_type: str, version: Optional[str], features: np.ndarray, batch: bool):
+    return _infer(disaster_type, _worker_model(disaster_type, version), features, batch)
+
+def _ping() -> int:
+    return os.getpid()
+
+class ComputeExecutor:
+    """
+    Worker pools for CPU-bound work
+
+    ``run`` executes any callable on the thread pool. ``predict`` and
+    ``predict_batch`` score a model's input on the thread pool, or in a
+    worker process in process mode. Worker processes only receive the
+    disaster type, the model version and the feature matrix; they keep
+    their own copy of each model. Stage histograms recorded in worker
+    processes need PROMETHEUS_MULTIPROC_DIR to reach /metrics.
+    """
+
+    def __init__(self, config: ComputeConfig = None):
+        self.config = config or ComputeConfig()
+        if self.config.mode not in COMPUTE_MODES:
+            raise ValueError(f"Unknown compute mode {self.config.mode!r}, expected one of {COMPUTE_MODES}")
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self.stats = {"tasks": 0, "process_tasks": 0, "errors": 0}
+
+    @property
+    def threads(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.config.pool_size, thread_name_prefix="compute")
+        return self._threads
+
+    async def start(self, disaster_types: List[str]):
+        """Create the pools; in process mode start every worker and let it load its models"""
+        self.threads
+        if self.config.mode != "process" or self._processes is not None:
+            return
+        self._processes = ProcessPoolExecutor(
+            max_workers=self.config.pool_size,
+            mp_context=multiprocessing.get_context(self.config.start_method),
+            initializer=_init_worker,
+            initargs=(list(disaster_types),)
+        )
+        # Workers start on demand; submitting one task per worker starts them all now
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(self._processes, _ping) for _ in range(self.config.pool_size)
+        ))
+        logger.info(f"Started {len(set(pids))} compute worker processes")
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a callable on the thread pool"""
+        self.stats["tasks"] += 1
+        if self.config.mode == "inline":
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.threads, partial(fn, *args, **kwargs))
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    async def predict(self, disaster_type: str, model, data) -> Dict:
+        """Score the first row of a model input off the event loop"""
+        return await self._score(disaster_type, model, data, batch=False)
+
+    async def predict_batch(self, disaster_type: str, model, data) -> List[Dict]:
+        """Score every row of a model input off the event loop"""
+        return await self._score(disaster_type, model, data, batch=True)
+
+    async def _score(self, disaster_type: str, model, data, batch: bool):
+        schema = getattr(model, "schema", None)
+        if self._processes is None or schema is None:
+            return await self.run(_extract_and_infer, disaster_type, model, data, batch)
+
+        # Column-wise extraction is cheap; the worker gets a contiguous
+        # matrix, which pickles as one buffer instead of a DataFrame
+        with observe_stage("feature_extraction", disaster_type):
+            features = schema.extract(data if batch else schema.head(data, 1))
+        self.stats["process_tasks"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._processes, _predict_in_worker, disaster_type, model.version, features, batch
+            )
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    async def close(self):
+        for pool in (self._processes, self._threads):
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        self._processes = None
+        self._threads = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "mode": self.config.mode,
+            "pool_size": self.config.pool_size,
+            "processes_started": self._processes is not None,
+            **self.stats
+        }
+
+# Global instance
+compute_executor = ComputeExecutor()
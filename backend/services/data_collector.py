@@ -0,0 +1,844 @@
+"""
+Data Collector Service
+Integrates multiple data sources for comprehensive environmental monitoring:
+- Weather APIs (OpenWeatherMap, NOAA)
+- Satellite imagery (Landsat, Sentinel-2)
+- Environmental sensors (IoT devices)
+- Historical climate data
+"""
+
+import asyncio
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+from .weather_api import WeatherAPIService
+from .satellite_api import SatelliteAPIService
+from .sensor_api import SensorAPIService
+from .compute_executor import compute_executor
+from .http_client import http_client
+from .location_cache import LocationDataCache
+from .metrics import DATA_SOURCE_SECONDS
+from ..database.timeseries import TimeSeriesStore
+
+logger = logging.getLogger(__name__)
+
+# Sources gathered by collect_location_data, in LocationData field order
+LOCATION_SOURCES = ["weather", "satellite", "soil", "water", "atmospheric", "ocean", "spatial"]
+
+@dataclass
+class LocationData:
+    """Data structure for location-specific environmental data"""
+    latitude: float
+    longitude: float
+    timestamp: datetime
+    weather_data: pd.DataFrame
+    satellite_data: pd.DataFrame
+    soil_data: pd.DataFrame
+    water_data: pd.DataFrame
+    atmospheric_data: pd.DataFrame
+    ocean_data: pd.DataFrame
+    spatial_data: List[np.ndarray]
+    missing_sources: List[str] = field(default_factory=list)  # failed, timed out or empty
+    stale_sources: List[str] = field(default_factory=list)  # newest observation older than allowed
+
+    @property
+    def is_partial(self) -> bool:
+        """True if any source is missing or stale"""
+        return bool(self.missing_sources or self.stale_sources)
+
+@dataclass
+class CollectionConfig:
+    """Location data collection configuration"""
+    parallel: bool = os.getenv("DATA_COLLECTION_PARALLEL", "true").lower() == "true"
+    source_timeout_s: float = float(os.getenv("DATA_SOURCE_TIMEOUT_S", "3.0"))
+    request_deadline_s: float = float(os.getenv("DATA_COLLECTION_DEADLINE_S", "5.0"))
+    stale_after_hours: float = float(os.getenv("DATA_STALE_AFTER_HOURS", "6"))
+    cache_enabled: bool = os.getenv("LOCATION_CACHE_ENABLED", "true").lower() == "true"
+    # Also write the legacy data_collection_<timestamp>.json dump per cycle
+    json_dumps: bool = os.getenv("DATA_COLLECTION_JSON_DUMPS", "false").lower() == "true"
+    # Per-source overrides of source_timeout_s, e.g. {"spatial": 4.0}
+    source_timeouts: Dict[str, float] = field(default_factory=dict)
+
+    def timeout_for(self, source: str) -> float:
+        """Get the timeout for a single source"""
+        return self.source_timeouts.get(source, self.source_timeout_s)
+
+class DataCollector:
+    """
+    Comprehensive data collection service for environmental monitoring
+    """
+
+    def __init__(self, config: CollectionConfig = None, cache: LocationDataCache = None,
+                 timeseries: TimeSeriesStore = None):
+        self.config = config or CollectionConfig()
+        # Columnar history of every collection cycle
+        self.timeseries = timeseries or TimeSeriesStore()
+        # Shared per-cell cache in front of the parallel collection path
+        if cache is None and self.config.cache_enabled:
+            cache = LocationDataCache()
+        self.cache = cache
+        self.weather_service = WeatherAPIService()
+        self.satellite_service = SatelliteAPIService()
+        self.sensor_service = SensorAPIService()
+        
+    async def __aenter__(self):
+        # Requests go through the shared pool, which the application owns
+        await http_client.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    async def collect_all_data(self) -> Dict:
+        """
+        Collect data from all sources for monitoring
+        """
+        try:
+            logger.info("Starting comprehensive data collection...")
+            
+            # Collect weather data
+            weather_data = await self.weather_service.collect_weather_data()
+            
+            # Collect satellite data
+            satellite_data = await self.satellite_service.collect_satellite_data()
+            
+            # Collect sensor data
+            sensor_data = await self.sensor_service.collect_sensor_data()
+            
+            # Process and combine data
+            processed_data = await self.process_combined_data(
+                weather_data, satellite_data, sensor_data
+            )
+            
+            # Store data
+            await self.store_collected_data(processed_data)
+            
+            logger.info("Data collection completed successfully")
+            return processed_data
+            
+        except Exception as e:
+            logger.error(f"Data collection failed: {e}")
+            raise
+    
+    async def collect_location_data(self, latitude: float, longitude: float,
+                                  radius_km: float = 50.0,
+                                  parallel: Optional[bool] = None) -> LocationData:
+        """
+        Collect comprehensive data for a specific location
+
+        In parallel mode (the default, see CollectionConfig) all sources are
+        fetched concurrently and a partial LocationData is returned when some
+        of them fail or miss their deadline.
+        """
+        if parallel is None:
+            parallel = self.config.parallel
+        if parallel:
+            return await self.collect_location_data_parallel(latitude, longitude, radius_km)
+
+        try:
+            logger.info(f"Collecting data for location: {latitude}, {longitude}")
+
+            # Collect weather data
+            weather_data = await self.weather_service.get_location_weather(
+                latitude, longitude, radius_km
+            )
+            
+            # Collect satellite data
+            satellite_data = await self.satellite_service.get_location_satellite_data(
+                latitude, longitude, radius_km
+            )
+            
+            # Collect soil and water data
+            soil_data = await self.collect_soil_data(latitude, longitude)
+            water_data = await self.collect_water_data(latitude, longitude)
+            
+            # Collect atmospheric data
+            atmospheric_data = await self.collect_atmospheric_data(latitude, longitude)
+            
+            # Collect ocean data (if applicable)
+            ocean_data = await self.collect_ocean_data(latitude, longitude)
+            
+            # Collect spatial data
+            spatial_data = await self.collect_spatial_data(latitude, longitude, radius_km)
+            
+            return LocationData(
+                latitude=latitude,
+                longitude=longitude,
+                timestamp=datetime.now(),
+                weather_data=weather_data,
+                satellite_data=satellite_data,
+                soil_data=soil_data,
+                water_data=water_data,
+                atmospheric_data=atmospheric_data,
+                ocean_data=ocean_data,
+                spatial_data=spatial_data
+            )
+            
+        except Exception as e:
+            logger.error(f"Location data collection failed: {e}")
+            raise
+
+    async def collect_location_data_parallel(self, latitude: float, longitude: float,
+                                             radius_km: float = 50.0) -> LocationData:
+        """
+        Collect all sources for a location concurrently
+
+        Each source gets its own timeout, bounded by an overall per-request
+        deadline, so latency is set by the slowest source rather than the sum
+        of all of them. Sources that fail, time out or come back empty are
+        listed in missing_sources; sources whose newest observation is older
+        than stale_after_hours are listed in stale_sources.
+
+        With the location cache enabled, sources are fetched for the center
+        of the location's grid cell and shared by every request in that cell.
+        """
+        logger.info(f"Collecting data in parallel for location: {latitude}, {longitude}")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.request_deadline_s
+
+        if self.cache is not None:
+            sources = self.cached_location_sources(latitude, longitude, radius_km)
+        else:
+            sources = self.location_sources(latitude, longitude, radius_km)
+        tasks = {
+            name: asyncio.create_task(self._fetch_source(name, fetch, deadline))
+            for name, fetch in sources.items()
+        }
+
+        # Source timeouts are already capped by the deadline; this only guards
+        # against a source that ignores cancellation
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.config.request_deadline_s)
+        for task in pending:
+            task.cancel()
+
+        results = {}
+        missing_sources = []
+        stale_sources = []
+        for name, task in tasks.items():
+            result = task.result() if task.done() and not task.cancelled() else None
+            if self._is_empty(result):
+                missing_sources.append(name)
+                results[name] = [] if name == "spatial" else pd.DataFrame()
+                continue
+            if self._is_stale(result):
+                stale_sources.append(name)
+            results[name] = result
+
+        if missing_sources or stale_sources:
+            logger.warning(
+                f"Partial data for {latitude}, {longitude}: "
+                f"missing={missing_sources} stale={stale_sources}"
+            )
+
+        return LocationData(
+            latitude=latitude,
+            longitude=longitude,
+            timestamp=datetime.now(),
+            weather_data=results["weather"],
+            satellite_data=results["satellite"],
+            soil_data=results["soil"],
+            water_data=results["water"],
+            atmospheric_data=results["atmospheric"],
+            ocean_data=results["ocean"],
+            spatial_data=results["spatial"],
+            missing_sources=missing_sources,
+            stale_sources=stale_sources
+        )
+
+    def location_sources(self, latitude: float, longitude: float,
+                         radius_km: float) -> Dict[str, Callable]:
+        """
+        Get the fetch coroutine factory for each location source
+        """
+        return {
+            "weather": lambda: self.weather_service.get_location_weather(latitude, longitude, radius_km),
+            "satellite": lambda: self.satellite_service.get_location_satellite_data(latitude, longitude, radius_km),
+            "soil": lambda: self.collect_soil_data(latitude, longitude),
+            "water": lambda: self.collect_water_data(latitude, longitude),
+            "atmospheric": lambda: self.collect_atmospheric_data(latitude, longitude),
+            "ocean": lambda: self.collect_ocean_data(latitude, longitude),
+            "spatial": lambda: self.collect_spatial_data(latitude, longitude, radius_km)
+        }
+
+    def cached_location_sources(self, latitude: float, longitude: float,
+                                radius_km: float) -> Dict[str, Callable]:
+        """
+        Get fetch factories that go through the location cache
+        """
+        center_lat, center_lon = self.cache.cell_center_for(latitude, longitude)
+        upstream = self.location_sources(center_lat, center_lon, radius_km)
+
+        def cached(name: str, fetch: Callable) -> Callable:
+            return lambda: self.cache.get_or_fetch(name, latitude, longitude, radius_km, fetch)
+
+        return {name: cached(name, fetch) for name, fetch in upstream.items()}
+
+    async def _fetch_source(self, name: str, fetch: Callable, deadline: float):
+        """
+        Fetch a single source within its own timeout and the request deadline
+        """
+        remaining = deadline - asyncio.get_running_loop().time()
+        timeout = min(self.config.timeout_for(name), remaining)
+        if timeout <= 0:
+            logger.warning(f"No time left for source {name}")
+            DATA_SOURCE_SECONDS.labels(name, "skipped").observe(0.0)
+            return None
+
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await asyncio.wait_for(fetch(), timeout=timeout)
+            outcome = "empty" if self._is_empty(result) else "ok"
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.warning(f"Source {name} timed out after {timeout:.2f}s")
+            return None
+        except Exception as e:
+            logger.error(f"Source {name} failed: {e}")
+            return None
+        finally:
+            DATA_SOURCE_SECONDS.labels(name, outcome).observe(time.perf_counter() - start_time)
+
+    def _is_empty(self, result) -> bool:
+        """Check if a source result carries no data"""
+        if result is None:
+            return True
+        if isinstance(result, pd.DataFrame):
+            return result.empty
+        return len(result) == 0
+
+    def _is_stale(self, result) -> bool:
+        """Check if the newest observation of a source result is too old"""
+        if not isinstance(result, pd.DataFrame) or 'timestamp' not in result.columns:
+            return False
+        try:
+            newest = pd.to_datetime(result['timestamp']).max()
+            cutoff = datetime.now() - timedelta(hours=self.config.stale_after_hours)
+            return bool(newest < cutoff)
+        except Exception:
+            return False
+
+    async def collect_soil_data(self, latitude: float, longitude: float) -> pd.DataFrame:
+        """
+        Collect soil moisture and temperature data
+        """
+        try:
+            # Get soil data from multiple sources
+            soil_data = []
+            
+            # NASA SMAP soil moisture data
+            smap_data = await self.get_smap_soil_moisture(latitude, longitude)
+            if smap_data is not None and not smap_data.empty:
+                soil_data.append(smap_data)
+            
+            # Local sensor data
+            sensor_soil = await self.sensor_service.get_soil_sensors(latitude, longitude)
+            if sensor_soil is not None and not sensor_soil.empty:
+                soil_data.append(sensor_soil)
+            
+            # Combine and process soil data
+            if soil_data:
+                combined_soil = pd.concat(soil_data, ignore_index=True)
+                return self.process_soil_data(combined_soil)
+            else:
+                # Return default soil data structure
+                return pd.DataFrame({
+                    'timestamp': [datetime.now()],
+                    'soil_moisture': [0.3],  # Default value
+                    'soil_temperature': [20.0],  # Default value
+                    'soil_type': ['loam'],
+                    'depth': [10]
+                })
+                
+        except Exception as e:
+            logger.error(f"Soil data collection failed: {e}")
+            return pd.DataFrame()
+    
+    async def collect_water_data(self, latitude: float, longitude: float) -> pd.DataFrame:
+        """
+        Collect water level and quality data
+        """
+        try:
+            water_data = []
+            
+            # USGS water level data
+            usgs_data = await self.get_usgs_water_data(latitude, longitude)
+            if usgs_data is not None and not usgs_data.empty:
+                water_data.append(usgs_data)
+            
+            # Local water sensors
+            sensor_water = await self.sensor_service.get_water_sensors(latitude, longitude)
+            if sensor_water is not None and not sensor_water.empty:
+                water_data.append(sensor_water)
+            
+            # Combine water data
+            if water_data:
+                combined_water = pd.concat(water_data, ignore_index=True)
+                return self.process_water_data(combined_water)
+            else:
+                # Return default water data structure
+                return pd.DataFrame({
+                    'timestamp': [datetime.now()],
+                    'water_level': [0.0],
+                    'water_temperature': [15.0],
+                    'flow_rate': [0.0],
+                    'turbidity': [0.0]
+                })
+                
+        except Exception as e:
+            logger.error(f"Water data collection failed: {e}")
+            return pd.DataFrame()
+    
+    async def collect_atmospheric_data(self, latitude: float, longitude: float) -> pd.DataFrame:
+        """
+        Collect atmospheric pressure, wind, and humidity data
+        """
+        try:
+            atmospheric_data = []
+            
+            # NOAA atmospheric data
+            noaa_data = await self.get_noaa_atmospheric_data(latitude, longitude)
+            if noaa_data is not None and not noaa_data.empty:
+                atmospheric_data.append(noaa_data)
+            
+            # Weather API atmospheric data
+            weather_atmospheric = await self.weather_service.get_atmospheric_data(
+                latitude, longitude
+            )
+            if weather_atmospheric is not None and not weather_atmospheric.empty:
+                atmospheric_data.append(weather_atmospheric)
+            
+            # Combine atmospheric data
+            if atmospheric_data:
+                combined_atmospheric = pd.concat(atmospheric_data, ignore_index=True)
+                return self.process_atmospheric_data(combined_atmospheric)
+            else:
+                # Return default atmospheric data structure
+                return pd.DataFrame({
+                    'timestamp': [datetime.now()],
+                    'pressure': [1013.25],  # Standard atmospheric pressure
+                    'wind_speed': [0.0],
+                    'wind_direction': [0.0],
+                    'humidity': [50.0],
+                    'temperature': [20.0],
+                    'vorticity': [0.0],
+                    'divergence': [0.0]
+                })
+                
+        except Exception as e:
+            logger.error(f"Atmospheric data collection failed: {e}")
+            return pd.DataFrame()
+    
+    async def collect_ocean_data(self, latitude: float, longitude: float) -> pd.DataFrame:
+        """
+        Collect ocean data (SST, sea level, etc.)
+        """
+        try:
+            ocean_data = []
+            
+            # NOAA ocean data
+            noaa_ocean = await self.get_noaa_ocean_data(latitude, longitude)
+            if noaa_ocean is not None and not noaa_ocean.empty:
+                ocean_data.append(noaa_ocean)
+            
+            # Satellite ocean data
+            satellite_ocean = await self.satellite_service.get_ocean_data(
+                latitude, longitude
+            )
+            if satellite_ocean is not None and not satellite_ocean.empty:
+                ocean_data.append(satellite_ocean)
+            
+            # Combine ocean data
+            if ocean_data:
+                combined_ocean = pd.concat(ocean_data, ignore_index=True)
+                return self.process_ocean_data(combined_ocean)
+            else:
+                # Return default ocean data structure
+                return pd.DataFrame({
+                    'timestamp': [datetime.now()],
+                    'sst': [20.0],  # Sea surface temperature
+                    'sea_surface_height': [0.0],
+                    'ocean_heat_content': [0.0],
+                    'mixed_layer_depth': [50.0],
+                    'salinity': [35.0]
+                })
+                
+        except Exception as e:
+            logger.error(f"Ocean data collection failed: {e}")
+            return pd.DataFrame()
+    
+    async def collect_spatial_data(self, latitude: float, longitude: float, 
+                                 radius_km: float) -> List[np.ndarray]:
+        """
+        Collect spatial data for the location
+        """
+        try:
+            spatial_data = []
+            
+            # Get satellite imagery
+            satellite_images = await self.satellite_service.get_spatial_images(
+                latitude, longitude, radius_km
+            )
+            if satellite_images:
+                spatial_data.extend(satellite_images)
+            
+            # Get radar data
+            radar_data = await self.get_radar_data(latitude, longitude, radius_km)
+            if radar_data:
+                spatial_data.extend(radar_data)
+            
+            return spatial_data
+            
+        except Exception as e:
+            logger.error(f"Spatial data collection failed: {e}")
+            return []
+    
+    async def get_smap_soil_moisture(self, latitude: float, longitude: float) -> Optional[pd.DataFrame]:
+        """
+        Get NASA SMAP soil moisture data
+        """
+        try:
+            # In production, implement actual SMAP API call
+            # For now, return simulated data
+            return pd.DataFrame({
+                'timestamp': [datetime.now()],
+                'soil_moisture': [np.random.uniform(0.1, 0.5)],
+                'depth': [5]
+            })
+        except Exception as e:
+            logger.error(f"SMAP data collection failed: {e}")
+            return None
+    
+    async def get_usgs_water_data(self, latitude: float, longitude: float) -> Optional[pd.DataFrame]:
+        """
+        Get USGS water level data
+        """
+        try:
+            # In production, implement actual USGS API call
+            # For now, return simulated data
+            return pd.DataFrame({
+                'timestamp': [datetime.now()],
+                'water_level': [np.random.uniform(0.5, 2.0)],
+                'flow_rate': [np.random.uniform(10, 100)],
+                'site_id': ['simulated_site']
+            })
+        except Exception as e:
+            logger.error(f"USGS data collection failed: {e}")
+            return None
+    
+    async def get_noaa_atmospheric_data(self, latitude: float, longitude: float) -> Optional[pd.DataFrame]:
+        """
+        Get NOAA atmospheric data
+        """
+        try:
+            # In production, implement actual NOAA API call
+            # For now, return simulated data
+            return pd.DataFrame({
+                'timestamp': [datetime.now()],
+                'pressure': [np.random.uniform(1000, 1020)],
+                'wind_speed': [np.random.uniform(0, 20)],
+                'wind_direction': [np.random.uniform(0, 360)],
+                'vorticity': [np.random.uniform(-1e-5, 1e-5)],
+                'divergence': [np.random.uniform(-1e-5, 1e-5)]
+            })
+        except Exception as e:
+            logger.error(f"NOAA atmospheric data collection failed: {e}")
+            return None
+    
+    async def get_noaa_ocean_data(self, latitude: float, longitude: float) -> Optional[pd.DataFrame]:
+        """
+        Get NOAA ocean data
+        """
+        try:
+            # In production, implement actual NOAA ocean API call
+            # For now, return simulated data
+            return pd.DataFrame({
+                'timestamp': [datetime.now()],
+                'sst': [np.random.uniform(15, 30)],
+                'sea_surface_height': [np.random.uniform(-0.5, 0.5)],
+                'ocean_heat_content': [np.random.uniform(1e7, 1e8)],
+                'mixed_layer_depth': [np.random.uniform(20, 100)]
+            })
+        except Exception as e:
+            logger.error(f"NOAA ocean data collection failed: {e}")
+            return None
+    
+    async def get_radar_data(self, latitude: float, longitude: float, 
+                           radius_km: float) -> List[np.ndarray]:
+        """
+        Get radar data for the location
+        """
+        try:
+            # In production, implement actual radar API call
+            # For now, return simulated radar data
+            radar_data = []
+            for i in range(5):  # Last 5 time steps
+                # Create simulated radar image
+                radar_image = np.random.rand(64, 64) * 100  # Rainfall intensity
+                radar_data.append(radar_image)
+            
+            return radar_data
+            
+        except Exception as e:
+            logger.error(f"Radar data collection failed: {e}")
+            return []
+    
+    def process_soil_data(self, soil_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process and clean soil data
+        """
+        # Remove duplicates
+        soil_data = soil_data.drop_duplicates(subset=['timestamp'])
+        
+        # Sort by timestamp
+        soil_data = soil_data.sort_values('timestamp')
+        
+        # Fill missing values
+        soil_data = soil_data.ffill().bfill()
+        
+        return soil_data
+    
+    def process_water_data(self, water_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process and clean water data
+        """
+        # Remove duplicates
+        water_data = water_data.drop_duplicates(subset=['timestamp'])
+        
+        # Sort by timestamp
+        water_data = water_data.sort_values('timestamp')
+        
+        # Fill missing values
+        water_data = water_data.ffill().bfill()
+        
+        return water_data
+    
+    def process_atmospheric_data(self, atmospheric_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process and clean atmospheric data
+        """
+        # Remove duplicates
+        atmospheric_data = atmospheric_data.drop_duplicates(subset=['timestamp'])
+        
+        # Sort by timestamp
+        atmospheric_data = atmospheric_data.sort_values('timestamp')
+        
+        # Fill missing values
+        atmospheric_data = atmospheric_data.ffill().bfill()
+        
+        return atmospheric_data
+    
+    def process_ocean_data(self, ocean_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Process and clean ocean data
+        """
+        # Remove duplicates
+        ocean_data = ocean_data.drop_duplicates(subset=['timestamp'])
+        
+        # Sort by timestamp
+        ocean_data = ocean_data.sort_values('timestamp')
+        
+        # Fill missing values
+        ocean_data = ocean_data.ffill().bfill()
+        
+        return ocean_data
+    
+    async def process_combined_data(self, weather_data: Dict, satellite_data: Dict, 
+                                  sensor_data: Dict) -> Dict:
+        """
+        Process and combine data from all sources
+        """
+        try:
+            combined_data = {
+                'timestamp': datetime.now(),
+                'weather': weather_data,
+                'satellite': satellite_data,
+                'sensors': sensor_data,
+                'processed': True
+            }
+            
+            # Add derived metrics
+            combined_data['derived_metrics'] = await self.calculate_derived_metrics(
+                weather_data, satellite_data, sensor_data
+            )
+            
+            return combined_data
+            
+        except Exception as e:
+            logger.error(f"Data processing failed: {e}")
+            raise
+    
+    async def calculate_derived_metrics(self, weather_data: Dict, satellite_data: Dict, 
+                                      sensor_data: Dict) -> Dict:
+        """
+        Calculate derived environmental metrics on the compute pool
+        """
+        return await compute_executor.run(self.derived_metrics, weather_data, satellite_data, sensor_data)
+    
+    def derived_metrics(self, weather_data: Dict, satellite_data: Dict, sensor_data: Dict) -> Dict:
+        """
+        Calculate derived environmental metrics (drought, vegetation and flood indices)
+        """
+        try:
+            derived_metrics = {}
+            
+            # Calculate drought indices
+            if 'precipitation' in weather_data and 'temperature' in weather_data:
+                derived_metrics['spi'] = self.calculate_spi(weather_data['precipitation'])
+                derived_metrics['spei'] = self.calculate_spei(
+                    weather_data['precipitation'], weather_data['temperature']
+                )
+            
+            # Calculate vegetation indices
+            if 'satellite_bands' in satellite_data:
+                derived_metrics['ndvi'] = self.calculate_ndvi(satellite_data['satellite_bands'])
+                derived_metrics['evi'] = self.calculate_evi(satellite_data['satellite_bands'])
+            
+            # Calculate flood risk indicators
+            if 'water_level' in sensor_data and 'rainfall' in weather_data:
+                derived_metrics['flood_risk'] = self.calculate_flood_risk(
+                    sensor_data['water_level'], weather_data['rainfall']
+                )
+            
+            return derived_metrics
+            
+        except Exception as e:
+            logger.error(f"Derived metrics calculation failed: {e}")
+            return {}
+    
+    def calculate_spi(self, precipitation: List[float]) -> float:
+        """
+        Calculate Standardized Precipitation Index
+        """
+        try:
+            precip_series = pd.Series(precipitation)
+            rolling_sum = precip_series.rolling(window=30).sum()
+            mean_val = rolling_sum.mean()
+            std_val = rolling_sum.std()
+            
+            if std_val > 0:
+                spi = (rolling_sum.iloc[-1] - mean_val) / std_val
+                return float(spi)
+            else:
+                return 0.0
+        except Exception as e:
+            logger.error(f"SPI calculation failed: {e}")
+            return 0.0
+    
+    def calculate_spei(self, precipitation: List[float], temperature: List[float]) -> float:
+        """
+        Calculate Standardized Precipitation Evapotranspiration Index
+        """
+        try:
+            precip_series = pd.Series(precipitation)
+            temp_series = pd.Series(temperature)
+            
+            # Simplified PET calculation
+            pet = 0.0023 * (temp_series + 17.8) * temp_series ** 0.5
+            
+            # Water balance
+            water_balance = precip_series - pet
+            mean_wb = water_balance.mean()
+            std_wb = water_balance.std()
+            
+            if std_wb > 0:
+                spei = (water_balance.iloc[-1] - mean_wb) / std_wb
+                return float(spei)
+            else:
+                return 0.0
+        except Exception as e:
+            logger.error(f"SPEI calculation failed: {e}")
+            return 0.0
+    
+    def calculate_ndvi(self, satellite_bands: Dict) -> float:
+        """
+        Calculate Normalized Difference Vegetation Index
+        """
+        try:
+            if 'nir' in satellite_bands and 'red' in satellite_bands:
+                nir = satellite_bands['nir']
+                red = satellite_bands['red']
+                
+                if nir + red > 0:
+                    ndvi = (nir - red) / (nir + red)
+                    return float(ndvi)
+                else:
+                    return 0.0
+            else:
+                return 0.0
+        except Exception as e:
+            logger.error(f"NDVI calculation failed: {e}")
+            return 0.0
+    
+    def calculate_evi(self, satellite_bands: Dict) -> float:
+        """
+        Calculate Enhanced Vegetation Index
+        """
+        try:
+            if all(band in satellite_bands for band in ['nir', 'red', 'blue']):
+                nir = satellite_bands['nir']
+                red = satellite_bands['red']
+                blue = satellite_bands['blue']
+                
+                denominator = nir + 6 * red - 7.5 * blue + 1
+                if denominator > 0:
+                    evi = 2.5 * (nir - red) / denominator
+                    return float(evi)
+                else:
+                    return 0.0
+            else:
+                return 0.0
+        except Exception as e:
+            logger.error(f"EVI calculation failed: {e}")
+            return 0.0
+    
+    def calculate_flood_risk(self, water_level: float, rainfall: float) -> float:
+        """
+        Calculate flood risk based on water level and rainfall
+        """
+        try:
+            # Simplified flood risk calculation
+            # In production, use more sophisticated models
+            
+            # Normalize water level (assuming 0-5m range)
+            normalized_water = min(water_level / 5.0, 1.0)
+            
+            # Normalize rainfall (assuming 0-100mm range)
+            normalized_rainfall = min(rainfall / 100.0, 1.0)
+            
+            # Calculate risk as weighted combination
+            flood_risk = 0.6 * normalized_water + 0.4 * normalized_rainfall
+            
+            return float(flood_risk)
+        except Exception as e:
+            logger.error(f"Flood risk calculation failed: {e}")
+            return 0.0
+    
+    async def store_collected_data(self, data: Dict):
+        """
+        Store collected data in the time-series store
+        """
+        try:
+            rows = await asyncio.to_thread(self.timeseries.append_collection, data)
+            logger.info(f"Stored collected data: {rows}")
+            
+            if self.config.json_dumps:
+                # Legacy per-cycle dump for debugging
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"data_collection_{timestamp}.json"
+                
+                with open(filename, 'w') as f:
+                    json.dump(data, f, default=str, indent=2)
+                
+        except Exception as e:
+            logger.error(f"Data storage failed: {e}")
+            raise 
\ No newline at end of file
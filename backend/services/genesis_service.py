@@ -0,0 +1,87 @@
+"""
+Cyclone Genesis Grid Service
+Keeps a current global genesis-risk grid for the cyclone routes:
+- Computed off the event loop with the gridded GPI engine
+- Refreshed once older than its TTL; concurrent requests share one computation
+- Climatology fields until a gridded reanalysis source is configured
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from ..models.genesis_grid import GenesisGrid, climatology_fields, compute_genesis_grid, grid_axes
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class GenesisConfig:
+    """Genesis grid configuration"""
+    resolution_deg: float = float(os.getenv("GENESIS_GRID_RESOLUTION_DEG", "0.5"))
+    ttl_s: float = float(os.getenv("GENESIS_GRID_TTL_S", "3600"))
+    # Latitude rows per processing band; bounds the temporaries per band
+    chunk_rows: int = int(os.getenv("GENESIS_GRID_CHUNK_ROWS", "32"))
+
+class GenesisGridService:
+    """
+    Owner of the latest genesis-risk grid
+
+    ``field_source`` returns the field source for the next computation (see
+    compute_genesis_grid); it defaults to the seasonal climatology.
+    """
+
+    def __init__(self, config: GenesisConfig = None, field_source: Callable = None,
+                 source_name: str = "climatology"):
+        self.config = config or GenesisConfig()
+        self.field_source = field_source or climatology_fields
+        self.source_name = source_name
+        self._grid: Optional[GenesisGrid] = None
+        self._computed_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self.stats = {"computations": 0, "last_compute_ms": 0.0}
+
+    @property
+    def fresh(self) -> bool:
+        return self._grid is not None and time.monotonic() - self._computed_at < self.config.ttl_s
+
+    def compute(self) -> GenesisGrid:
+        """Compute a new grid synchronously"""
+        start_time = time.perf_counter()
+        latitudes, longitudes = grid_axes(self.config.resolution_deg)
+        grid = compute_genesis_grid(
+            self.field_source(), latitudes, longitudes,
+            chunk_rows=self.config.chunk_rows, source=self.source_name
+        )
+        self.stats["computations"] += 1
+        self.stats["last_compute_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+        logger.info(f"Computed {grid.shape} genesis grid in {self.stats['last_compute_ms']}ms")
+        return grid
+
+    async def get_grid(self) -> GenesisGrid:
+        """Get the current grid, recomputing it in a worker thread once stale"""
+        if self.fresh:
+            return self._grid
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._recompute())
+        return await asyncio.shield(self._refresh)
+
+    async def _recompute(self) -> GenesisGrid:
+        grid = await asyncio.to_thread(self.compute)
+        self._grid = grid
+        self._computed_at = time.monotonic()
+        return grid
+
+    def get_stats(self) -> Dict:
+        return {
+            "resolution_deg": self.config.resolution_deg,
+            "ttl_s": self.config.ttl_s,
+            "fresh": self.fresh,
+            "grid": self._grid.summary() if self._grid is not None else None,
+            **self.stats
+        }
+
+# Global instance
+genesis_service = GenesisGridService()
@@ -0,0 +1,200 @@
+"""
+Shared HTTP Client Service
+Process-wide pooled HTTP client used by every upstream service:
+- Connection pooling with keep-alive per host
+- DNS caching
+- Per-host concurrency limits
+- Per-host pool statistics for sizing the pools
+- Prometheus request, error and latency metrics per host
+"""
+
+import asyncio
+import aiohttp
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .metrics import observe_upstream
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HTTPClientConfig:
+    """HTTP client pool configuration"""
+    total_limit: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+    limit_per_host: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+    dns_cache_ttl_s: int = int(os.getenv("HTTP_DNS_CACHE_TTL_S", "300"))
+    keepalive_timeout_s: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT_S", "30"))
+    request_timeout_s: float = float(os.getenv("HTTP_REQUEST_TIMEOUT_S", "10"))
+    user_agent: str = "AI-Climate-Resilience-System/1.0"
+    # Per-host overrides of limit_per_host, e.g. {"api.twilio.com": 5}
+    host_limits: Dict[str, int] = field(default_factory=dict)
+
+    def limit_for(self, host: str) -> int:
+        """Get the concurrency limit for a single host"""
+        return self.host_limits.get(host, self.limit_per_host)
+
+@dataclass
+class HostStats:
+    """Request statistics for a single upstream host"""
+    limit: int
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    waiting: int = 0
+    peak_waiting: int = 0
+    total_latency_s: float = 0.0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        """Convert statistics to a JSON-friendly dictionary"""
+        completed = max(self.requests - self.in_flight, 0)
+        return {
+            "limit": self.limit,
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "avg_latency_ms": (self.total_latency_s / completed * 1000) if completed else 0.0,
+            "status_counts": {str(k): v for k, v in self.status_counts.items()}
+        }
+
+class HTTPClientManager:
+    """
+    Owner of the single aiohttp session shared by all services
+
+    The FastAPI startup/shutdown hooks call start() and close(). Services
+    that run outside the app (scripts, background jobs) get a session
+    lazily on first request.
+    """
+
+    def __init__(self, config: HTTPClientConfig = None):
+        self.config = config or HTTPClientConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._host_stats: Dict[str, HostStats] = {}
+
+    async def start(self):
+        """Create the pooled session"""
+        await self.get_session()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get or create the pooled session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+
+        if self._session is not None and not self._session.closed:
+            logger.warning("HTTP client session belongs to another event loop, recreating")
+
+        connector = aiohttp.TCPConnector(
+            limit=self.config.total_limit,
+            limit_per_host=self.config.limit_per_host,
+            ttl_dns_cache=self.config.dns_cache_ttl_s,
+            use_dns_cache=True,
+            keepalive_timeout=self.config.keepalive_timeout_s
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.request_timeout_s),
+            headers={'User-Agent': self.config.user_agent}
+        )
+        self._loop = loop
+        # Semaphores are bound to the loop they are first used on
+        self._host_semaphores = {}
+
+        logger.info(
+            f"HTTP client pool started (limit={self.config.total_limit}, "
+            f"per_host={self.config.limit_per_host})"
+        )
+        return self._session
+
+    def _host_entry(self, host: str):
+        """Get the semaphore and statistics for a host"""
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.config.limit_for(host))
+        if host not in self._host_stats:
+            self._host_stats[host] = HostStats(limit=self.config.limit_for(host))
+        return self._host_semaphores[host], self._host_stats[host]
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        """
+        Perform a request through the shared pool
+
+        Usage mirrors aiohttp: ``async with http_client.get(url) as response``.
+        """
+        session = await self.get_session()
+        host = urlsplit(url).hostname or "unknown"
+        semaphore, stats = self._host_entry(host)
+
+        # Requests queued behind the per-host limit show up as "waiting"
+        queued = semaphore.locked()
+        if queued:
+            stats.waiting += 1
+            stats.peak_waiting = max(stats.peak_waiting, stats.waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            if queued:
+                stats.waiting -= 1
+
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        start_time = time.perf_counter()
+        status = None
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                status = response.status
+                stats.status_counts[status] = stats.status_counts.get(status, 0) + 1
+                yield response
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            stats.errors += 1
+            raise
+        finally:
+            elapsed_s = time.perf_counter() - start_time
+            stats.total_latency_s += elapsed_s
+            observe_upstream(host, status, elapsed_s)
+            stats.in_flight -= 1
+            semaphore.release()
+
+    def get(self, url: str, **kwargs):
+        """Perform a GET request through the shared pool"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """Perform a POST request through the shared pool"""
+        return self.request("POST", url, **kwargs)
+
+    def get_pool_stats(self) -> Dict:
+        """
+        Get pool configuration and per-host statistics
+        """
+        return {
+            "active": self._session is not None and not self._session.closed,
+            "total_limit": self.config.total_limit,
+            "limit_per_host": self.config.limit_per_host,
+            "dns_cache_ttl_s": self.config.dns_cache_ttl_s,
+            "keepalive_timeout_s": self.config.keepalive_timeout_s,
+            "hosts": {host: stats.to_dict() for host, stats in self._host_stats.items()}
+        }
+
+    async def close(self):
+        """Close the pooled session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("HTTP client pool closed")
+        self._session = None
+        self._loop = None
+
+# Global instance
+http_client = HTTPClientManager()
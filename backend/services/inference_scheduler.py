@@ -0,0 +1,264 @@
+"""
+Inference Scheduler
+Micro-batching for the deep (LSTM/CNN) model forward passes:
+- Concurrent predictions for the same network are queued and run as one batch
+- A batch is flushed at a maximum size or once its oldest request has waited
+  the maximum wait time
+- One forward pass per batch, with each request's rows scattered back to it
+- Callable from worker threads (blocking) and from the event loop (awaitable)
+- Batch size, queue wait and forward time histograms per network
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .metrics import INFERENCE_BATCH_ROWS, INFERENCE_BATCH_SECONDS, INFERENCE_QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class InferenceConfig:
+    """Micro-batching configuration"""
+    enabled: bool = os.getenv("INFERENCE_BATCHING_ENABLED", "true").lower() == "true"
+    max_batch_size: int = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "64"))
+    max_wait_ms: float = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+    # Requests queued per network before new ones are rejected
+    queue_size: int = int(os.getenv("INFERENCE_QUEUE_SIZE", "10000"))
+
+class InferenceOverloaded(RuntimeError):
+    """Raised when a network's inference queue is full"""
+
+class BatcherClosed(RuntimeError):
+    """Raised when submitting to a batcher that has been closed"""
+
+class _Request:
+    __slots__ = ("inputs", "future", "enqueued_at")
+
+    def __init__(self, inputs: np.ndarray):
+        self.inputs = inputs
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class MicroBatcher:
+    """
+    Batching queue in front of one network
+
+    ``forward`` takes a batch of inputs and returns one output row per
+    input row. Requests may carry several rows; each gets back exactly its
+    own rows. A single worker thread forms the batches, so forward passes
+    for one network never overlap. While a pass runs, new requests queue up
+    and form the next batch, so batches grow with the load on their own.
+    """
+
+    def __init__(self, name: str, forward: Callable[[np.ndarray], np.ndarray],
+                 config: InferenceConfig = None, model: object = None):
+        self.name = name
+        self.forward = forward
+        self.model = model
+        self.config = config or InferenceConfig()
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue(maxsize=self.config.queue_size)
+        self._closed = False
+        # Nothing is queued once _closed is set, so the worker can tell when it has drained
+        self._submit_lock = threading.Lock()
+        # Submitting threads and the worker both count; get_stats reads a consistent copy
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "rows": 0, "batches": 0, "rejected": 0, "errors": 0}
+        self._worker = threading.Thread(target=self._run, name=f"inference-{name}", daemon=True)
+        self._worker.start()
+
+    def submit(self, inputs) -> Future:
+        """Queue inputs (rows along the first axis) and get a future of their outputs"""
+        request = _Request(np.asarray(inputs))
+        with self._submit_lock:
+            if self._closed:
+                raise BatcherClosed(f"Inference batcher {self.name} is closed")
+            try:
+                self._queue.put_nowait(request)
+            except queue.Full:
+                self._count(rejected=1)
+                raise InferenceOverloaded(f"Inference queue for {self.name} is full")
+        self._count(requests=1)
+        return request.future
+
+    def _count(self, **increments: int):
+        with self._stats_lock:
+            for name, increment in increments.items():
+                self.stats[name] += increment
+
+    def predict(self, inputs, timeout: Optional[float] = None) -> np.ndarray:
+        """Run inputs through the next batch, blocking the calling thread"""
+        return self.submit(inputs).result(timeout)
+
+    async def apredict(self, inputs) -> np.ndarray:
+        """Run inputs through the next batch without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(inputs))
+
+    def close(self):
+        """Stop the worker after the requests already queued, without waiting for it"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                # The worker is busy with a full queue; it stops once that is drained
+                pass
+
+    def _run(self):
+        while True:
+            batch, closing = self._collect()
+            if batch:
+                self._run_batch(batch)
+            if closing or (self._closed and self._queue.empty()):
+                return
+
+    def _collect(self):
+        """Wait for a request, then gather more until the batch is full or the oldest has waited long enough"""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        rows = len(first.inputs)
+        deadline = first.enqueued_at + self.config.max_wait_ms / 1000
+        while rows < self.config.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still take whatever is already queued
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            rows += len(request.inputs)
+        return batch, False
+
+    def _run_batch(self, batch: List[_Request]):
+        started = time.perf_counter()
+        # Requests cancelled while queued are dropped from the batch
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        for request in batch:
+            INFERENCE_QUEUE_WAIT_SECONDS.labels(self.name).observe(started - request.enqueued_at)
+
+        # Inputs of different shapes (e.g. histories of another length) cannot share a pass
+        groups: Dict[tuple, List[_Request]] = {}
+        for request in batch:
+            groups.setdefault((request.inputs.shape[1:], request.inputs.dtype.str), []).append(request)
+
+        for requests in groups.values():
+            sizes = [len(request.inputs) for request in requests]
+            inputs = requests[0].inputs if len(requests) == 1 else np.concatenate([r.inputs for r in requests])
+            pass_started = time.perf_counter()
+            try:
+                outputs = np.asarray(self.forward(inputs))
+                if len(outputs) != len(inputs):
+                    raise ValueError(f"{self.name} returned {len(outputs)} rows for {len(inputs)} inputs")
+            except Exception as e:
+                self._count(errors=1)
+                logger.error(f"Inference batch of {len(inputs)} rows failed for {self.name}: {e}")
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+
+            for request, rows in zip(requests, np.split(outputs, np.cumsum(sizes)[:-1])):
+                request.future.set_result(rows)
+            self._count(batches=1, rows=len(inputs))
+            INFERENCE_BATCH_ROWS.labels(self.name).observe(len(inputs))
+            INFERENCE_BATCH_SECONDS.labels(self.name).observe(time.perf_counter() - pass_started)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "avg_batch_size": round(stats["rows"] / stats["batches"], 2) if stats["batches"] else 0.0,
+            **stats
+        }
+
+def keras_forward(model) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Forward pass for a Keras model
+
+    predict_on_batch runs the batch directly instead of through predict()'s
+    per-call dataset and callback setup, which dominates for small batches.
+    """
+    return getattr(model, "predict_on_batch", None) or model.predict
+
+class InferenceScheduler:
+    """
+    Micro-batchers for the deep models' networks, one per name
+
+    ``predict(name, network, inputs)`` is passed to the deep models as their
+    forward callable in place of ``network.predict(inputs)``. The model
+    ``predict`` methods block, so the API runs them in worker threads
+    (asyncio.to_thread); concurrent requests then meet here and share
+    forward passes. With batching disabled the call goes straight to the
+    network.
+    """
+
+    def __init__(self, config: InferenceConfig = None):
+        self.config = config or InferenceConfig()
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self._lock = threading.Lock()
+
+    def batcher(self, name: str, network) -> MicroBatcher:
+        """Get the batcher for a network, replacing it when the network was reloaded"""
+        batcher = self._batchers.get(name)
+        if batcher is not None and batcher.model is network:
+            return batcher
+        with self._lock:
+            batcher = self._batchers.get(name)
+            if batcher is None or batcher.model is not network:
+                if batcher is not None:
+                    batcher.close()
+                batcher = MicroBatcher(name, keras_forward(network), self.config, model=network)
+                self._batchers[name] = batcher
+            return batcher
+
+    def predict(self, name: str, network, inputs) -> np.ndarray:
+        """Run inputs through a network, batched with concurrent callers"""
+        if not self.config.enabled:
+            return network.predict(inputs)
+        return self._submit(name, network, inputs).result()
+
+    async def apredict(self, name: str, network, inputs) -> np.ndarray:
+        if not self.config.enabled:
+            return await asyncio.to_thread(network.predict, inputs)
+        return await asyncio.wrap_future(self._submit(name, network, inputs))
+
+    def _submit(self, name: str, network, inputs) -> Future:
+        """Queue inputs on the network's batcher, following it when a concurrent swap closes it"""
+        for _ in range(3):
+            try:
+                return self.batcher(name, network).submit(inputs)
+            except BatcherClosed:
+                continue
+        return self.batcher(name, network).submit(inputs)
+
+    def close(self):
+        with self._lock:
+            for batcher in self._batchers.values():
+                batcher.close()
+            self._batchers.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.config.enabled,
+            "max_batch_size": self.config.max_batch_size,
+            "max_wait_ms": self.config.max_wait_ms,
+            "models": {name: batcher.get_stats() for name, batcher in list(self._batchers.items())}
+        }
+
+# Global instance
+inference_scheduler = InferenceScheduler()
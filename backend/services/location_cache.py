@@ -0,0 +1,248 @@
+"""
+Location Data Cache
+Caches collected location data per source and quantized location cell:
+- Fixed lat/lon grid cells so nearby requests share one entry
+- Per-source TTLs with stale-while-revalidate refresh
+- Bounded LRU memory budget
+- Single-flight coalescing of concurrent fetches for the same cell
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Seconds a freshly fetched source stays fresh
+DEFAULT_SOURCE_TTLS = {
+    "weather": 600,
+    "atmospheric": 600,
+    "water": 900,
+    "soil": 3600,
+    "ocean": 3600,
+    "satellite": 6 * 3600,
+    "spatial": 6 * 3600
+}
+
+def quantize_location(latitude: float, longitude: float, cell_size_deg: float) -> Tuple[int, int]:
+    """
+    Map a coordinate to the index of its fixed-size grid cell
+    """
+    return (int(math.floor(latitude / cell_size_deg)), int(math.floor(longitude / cell_size_deg)))
+
+def cell_center(cell: Tuple[int, int], cell_size_deg: float) -> Tuple[float, float]:
+    """
+    Get the coordinate at the center of a grid cell
+    """
+    return ((cell[0] + 0.5) * cell_size_deg, (cell[1] + 0.5) * cell_size_deg)
+
+@dataclass
+class CacheConfig:
+    """Location data cache configuration"""
+    cell_size_deg: float = float(os.getenv("LOCATION_CACHE_CELL_DEG", "0.05"))  # ~5.5 km at the equator
+    max_bytes: int = int(os.getenv("LOCATION_CACHE_MAX_MB", "256")) * 1024 * 1024
+    # How long past its TTL an entry may still be served while it refreshes
+    stale_while_revalidate_s: float = float(os.getenv("LOCATION_CACHE_SWR_S", "1800"))
+    default_ttl_s: float = 600
+    source_ttls: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_SOURCE_TTLS))
+
+    def ttl_for(self, source: str) -> float:
+        """Get the TTL for a single source"""
+        return self.source_ttls.get(source, self.default_ttl_s)
+
+@dataclass
+class CacheEntry:
+    """A cached source result"""
+    value: Any
+    size_bytes: int
+    fetched_at: float
+    expires_at: float
+    stale_until: float
+
+class LocationDataCache:
+    """
+    LRU cache of location source data keyed by (source, cell, radius)
+
+    Values are fetched for the cell center, so every request that falls in
+    the same cell is served by the same upstream fetch.
+    """
+
+    def __init__(self, config: CacheConfig = None):
+        self.config = config or CacheConfig()
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        self.total_bytes = 0
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "evictions": 0,
+            "fetch_errors": 0
+        }
+
+    def cell_for(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Get the grid cell for a coordinate"""
+        return quantize_location(latitude, longitude, self.config.cell_size_deg)
+
+    def cell_center_for(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """Get the center of the grid cell containing a coordinate"""
+        return cell_center(self.cell_for(latitude, longitude), self.config.cell_size_deg)
+
+    def make_key(self, source: str, latitude: float, longitude: float,
+                 radius_km: float = 50.0) -> Tuple:
+        """Build the cache key for a source at a location"""
+        return (source, self.cell_for(latitude, longitude), round(radius_km, 1))
+
+    async def get_or_fetch(self, source: str, latitude: float, longitude: float,
+                           radius_km: float, fetch: Callable[[], Awaitable]) -> Any:
+        """
+        Get a source result from the cache, fetching it if needed
+
+        Fresh entries are returned directly. Entries past their TTL but within
+        the stale-while-revalidate window are returned immediately while one
+        background refresh runs. Concurrent misses for the same key share a
+        single fetch. Empty results are returned but never cached.
+        """
+        key = self.make_key(source, latitude, longitude, radius_km)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._share(entry.value)
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                if key not in self._in_flight:
+                    self.stats["refreshes"] += 1
+                    self._start_fetch(key, fetch)
+                return self._share(entry.value)
+            self._remove(key)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = self._start_fetch(key, fetch)
+
+        # Shield the shared fetch so a caller timing out does not cancel it
+        # for everyone else; it still completes and fills the cache
+        value = await asyncio.shield(task)
+        return self._share(value)
+
+    def _start_fetch(self, key: Tuple, fetch: Callable[[], Awaitable]) -> asyncio.Task:
+        """Start the single shared fetch for a key"""
+        task = asyncio.create_task(self._fetch_and_store(key, fetch))
+        self._in_flight[key] = task
+        return task
+
+    async def _fetch_and_store(self, key: Tuple, fetch: Callable[[], Awaitable]) -> Any:
+        """Fetch a source result and store it if it carries data"""
+        try:
+            value = await fetch()
+        except Exception as e:
+            self.stats["fetch_errors"] += 1
+            logger.error(f"Cached fetch failed for {key}: {e}")
+            return None
+        finally:
+            self._in_flight.pop(key, None)
+
+        if not self._is_empty(value):
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Tuple, value: Any):
+        """Insert an entry and evict least recently used entries over budget"""
+        ttl = self.config.ttl_for(key[0])
+        now = time.monotonic()
+        size = self._estimate_size(value)
+
+        self._remove(key)
+        self._entries[key] = CacheEntry(
+            value=value,
+            size_bytes=size,
+            fetched_at=now,
+            expires_at=now + ttl,
+            stale_until=now + ttl + self.config.stale_while_revalidate_s
+        )
+        self.total_bytes += size
+
+        while self.total_bytes > self.config.max_bytes and len(self._entries) > 1:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Tuple):
+        """Remove an entry if present"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size_bytes
+
+    def _share(self, value: Any) -> Any:
+        """
+        Hand out a cached value without exposing it to caller mutation
+
+        DataFrames get a shallow copy, so added columns stay private to the
+        caller while the underlying data is shared.
+        """
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        if isinstance(value, list):
+            return list(value)
+        return value
+
+    def _is_empty(self, value: Any) -> bool:
+        """Check if a source result carries no data"""
+        if value is None:
+            return True
+        if isinstance(value, pd.DataFrame):
+            return value.empty
+        try:
+            return len(value) == 0
+        except TypeError:
+            return False
+
+    def _estimate_size(self, value: Any) -> int:
+        """Estimate the memory footprint of a source result in bytes"""
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=True).sum())
+        if isinstance(value, np.ndarray):
+            return int(value.nbytes)
+        if isinstance(value, (list, tuple)):
+            return sum(self._estimate_size(item) for item in value) + sys.getsizeof(value)
+        return sys.getsizeof(value)
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache size and hit statistics
+        """
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"] + self.stats["coalesced"]
+        served_without_fetch = self.stats["hits"] + self.stats["stale_hits"] + self.stats["coalesced"]
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.config.max_bytes,
+            "cell_size_deg": self.config.cell_size_deg,
+            "hit_ratio": served_without_fetch / lookups if lookups else 0.0,
+            **self.stats
+        }
@@ -0,0 +1,361 @@
+"""
+Prometheus Metrics
+Process-wide metrics served on /metrics:
+- Latency histograms per request stage (data sources, feature extraction,
+  inference, recommendations, database write)
+- Upstream HTTP requests, errors and latency per host
+- Duration and schedule lag of the background tasks
+- Micro-batch sizes, queue wait and forward time of the deep models
+- Event loop lag, to show the loop stays responsive under load
+- HTTP request latency per route
+- Scrape-time gauges for the location cache, alert queues, write-behind
+  buffers, the inference queues and the asyncpg pool
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# Request stages run from about a millisecond (recommendations) to the
+# per-request collection deadline
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Background tasks sweep every city or subscription and take much longer
+TASK_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+STAGE_SECONDS = Histogram(
+    "climatrix_stage_duration_seconds",
+    "Time spent in one stage of a prediction request",
+    ["stage", "disaster_type"],
+    buckets=STAGE_BUCKETS
+)
+DATA_SOURCE_SECONDS = Histogram(
+    "climatrix_data_source_duration_seconds",
+    "Time to collect one data source for a location",
+    ["source", "outcome"],
+    buckets=STAGE_BUCKETS
+)
+UPSTREAM_REQUESTS = Counter(
+    "climatrix_upstream_requests_total",
+    "Upstream HTTP requests by host and status code",
+    ["host", "status"]
+)
+UPSTREAM_ERRORS = Counter(
+    "climatrix_upstream_errors_total",
+    "Upstream HTTP requests that failed, by host and kind (transport or 4xx/5xx status)",
+    ["host", "kind"]
+)
+UPSTREAM_SECONDS = Histogram(
+    "climatrix_upstream_request_duration_seconds",
+    "Upstream HTTP request latency by host, excluding time queued behind the host limit",
+    ["host"],
+    buckets=STAGE_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "climatrix_http_request_duration_seconds",
+    "API request latency by route",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+TASK_SECONDS = Histogram(
+    "climatrix_background_task_duration_seconds",
+    "Duration of one background task run",
+    ["task", "outcome"],
+    buckets=TASK_BUCKETS
+)
+TASK_LAG_SECONDS = Gauge(
+    "climatrix_background_task_lag_seconds",
+    "How late the last background task run started compared with its schedule",
+    ["task"],
+    multiprocess_mode="max"
+)
+TASK_LAST_SUCCESS = Gauge(
+    "climatrix_background_task_last_success_timestamp_seconds",
+    "Unix time the background task last completed without an error",
+    ["task"],
+    multiprocess_mode="max"
+)
+INFERENCE_BATCH_ROWS = Histogram(
+    "climatrix_inference_batch_size",
+    "Rows per forward pass of a micro-batched deep model",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+INFERENCE_QUEUE_WAIT_SECONDS = Histogram(
+    "climatrix_inference_queue_wait_seconds",
+    "Time a prediction waited in the inference queue before its batch ran",
+    ["model"],
+    buckets=STAGE_BUCKETS
+)
+INFERENCE_BATCH_SECONDS = Histogram(
+    "climatrix_inference_batch_duration_seconds",
+    "Forward pass time of one micro-batch",
+    ["model"],
+    buckets=STAGE_BUCKETS
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "climatrix_event_loop_lag_seconds",
+    "How late the event loop woke a periodic timer, i.e. how long callbacks were blocked",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    "climatrix_event_loop_lag_last_seconds",
+    "Event loop lag at the latest check",
+    multiprocess_mode="max"
+)
+DB_FLUSH_SECONDS = Histogram(
+    "climatrix_db_flush_duration_seconds",
+    "Time to write one write-behind batch to the database",
+    ["buffer"],
+    buckets=STAGE_BUCKETS
+)
+DB_FLUSH_ROWS = Counter(
+    "climatrix_db_flushed_rows_total",
+    "Rows written to the database by the write-behind buffers",
+    ["buffer"]
+)
+
+@contextmanager
+def observe_stage(stage: str, disaster_type: str = "none"):
+    """Time a block into the stage histogram"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage, disaster_type).observe(time.perf_counter() - start_time)
+
+def observe_upstream(host: str, status: Optional[int], elapsed_s: float):
+    """Record one upstream request; status is None for transport errors and timeouts"""
+    UPSTREAM_SECONDS.labels(host).observe(elapsed_s)
+    if status is None:
+        UPSTREAM_REQUESTS.labels(host, "error").inc()
+        UPSTREAM_ERRORS.labels(host, "transport").inc()
+        return
+    UPSTREAM_REQUESTS.labels(host, str(status)).inc()
+    if status >= 400:
+        UPSTREAM_ERRORS.labels(host, f"{status // 100}xx").inc()
+
+async def monitor_loop_lag(interval_s: float = 0.5):
+    """
+    Sample event loop lag until cancelled
+
+    Sleeps for ``interval_s`` and records how much later than that the loop
+    woke up; anything running on the loop without yielding shows up here.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval_s)
+        lag = max(loop.time() - started - interval_s, 0.0)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+class TaskTimer:
+    """
+    Timing for a periodic background task
+
+    ``run()`` wraps one iteration; the lag is how much later the iteration
+    started than the previous one finished plus its intended sleep.
+    """
+
+    def __init__(self, task: str):
+        self.task = task
+        self._due_at: Optional[float] = None
+
+    def schedule(self, delay_s: float):
+        """Note when the next run is due"""
+        self._due_at = time.monotonic() + delay_s
+
+    @contextmanager
+    def run(self):
+        start_time = time.monotonic()
+        if self._due_at is not None:
+            TASK_LAG_SECONDS.labels(self.task).set(max(start_time - self._due_at, 0.0))
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+            TASK_LAST_SUCCESS.labels(self.task).set_to_current_time()
+        finally:
+            TASK_SECONDS.labels(self.task, outcome).observe(time.monotonic() - start_time)
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses are
+    timed to their last chunk and not buffered. Paths that match no route
+    share one label to keep the series count bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Dict[object, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], self._route_template(scope), str(status)
+            ).observe(time.perf_counter() - start_time)
+
+    def _route_template(self, scope) -> str:
+        """Get the path template of the route that handled the request"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._templates:
+            app = scope.get("app")
+            self._templates[endpoint] = next(
+                (route.path for route in getattr(app, "routes", []) if getattr(route, "endpoint", None) is endpoint),
+                getattr(endpoint, "__name__", "unknown")
+            )
+        return self._templates[endpoint]
+
+class RuntimeCollector:
+    """
+    Reads component statistics when Prometheus scrapes
+
+    Components are bound by the app at import time; any that are missing
+    or not started yet are skipped.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, object] = {}
+
+    def bind(self, **components):
+        self.components.update(components)
+
+    def collect(self):
+        for name, read in (
+            ("http_client", self._http_pools),
+            ("location_cache", self._location_cache),
+            ("alert_delivery", self._alert_queues),
+            ("inference_scheduler", self._inference_queues),
+            ("update_stream", self._update_stream),
+            ("db_manager", self._database)
+        ):
+            component = self.components.get(name)
+            if component is None:
+                continue
+            try:
+                yield from read(component)
+            except Exception as e:
+                logger.warning(f"Could not collect {name} metrics: {e}")
+
+    def _http_pools(self, http_client):
+        in_flight = GaugeMetricFamily("climatrix_upstream_in_flight", "Upstream requests in flight", labels=["host"])
+        waiting = GaugeMetricFamily("climatrix_upstream_waiting",
+                                    "Upstream requests queued behind the per-host limit", labels=["host"])
+        limit = GaugeMetricFamily("climatrix_upstream_limit", "Per-host concurrency limit", labels=["host"])
+        for host, stats in http_client.get_pool_stats()["hosts"].items():
+            in_flight.add_metric([host], stats["in_flight"])
+            waiting.add_metric([host], stats["waiting"])
+            limit.add_metric([host], stats["limit"])
+        yield from (in_flight, waiting, limit)
+
+    def _location_cache(self, cache):
+        stats = cache.get_stats()
+        lookups = CounterMetricFamily("climatrix_location_cache_lookups",
+                                      "Location cache lookups by result", labels=["result"])
+        for result in ("hits", "stale_hits", "misses", "coalesced"):
+            lookups.add_metric([result], stats[result])
+        yield lookups
+        yield GaugeMetricFamily("climatrix_location_cache_hit_ratio",
+                                "Share of lookups served without an upstream fetch", value=stats["hit_ratio"])
+        yield GaugeMetricFamily("climatrix_location_cache_entries", "Cached source entries", value=stats["entries"])
+        yield GaugeMetricFamily("climatrix_location_cache_bytes", "Estimated cache size", value=stats["total_bytes"])
+
+    def _alert_queues(self, delivery):
+        stats = delivery.get_stats()
+        depth = GaugeMetricFamily("climatrix_alert_queue_depth", "Alerts waiting per channel", labels=["channel"])
+        capacity = GaugeMetricFamily("climatrix_alert_queue_capacity", "Alert queue size per channel",
+                                     labels=["channel"])
+        in_flight = GaugeMetricFamily("climatrix_alert_in_flight", "Alerts being sent per channel",
+                                      labels=["channel"])
+        for channel, channel_stats in stats["channels"].items():
+            depth.add_metric([channel], channel_stats["queue_depth"])
+            capacity.add_metric([channel], channel_stats["queue_capacity"])
+            in_flight.add_metric([channel], channel_stats["in_flight"])
+        yield from (depth, capacity, in_flight)
+        yield GaugeMetricFamily("climatrix_alert_pending_retries", "Alerts waiting for a retry",
+                                value=stats["pending_retries"])
+
+    def _inference_queues(self, scheduler):
+        depth = GaugeMetricFamily("climatrix_inference_queue_depth", "Predictions waiting for a batch per model",
+                                  labels=["model"])
+        for name, stats in scheduler.get_stats()["models"].items():
+            depth.add_metric([name], stats["queue_depth"])
+        yield depth
+
+    def _update_stream(self, hub):
+        stats = hub.get_stats()
+        yield GaugeMetricFamily("climatrix_stream_connections", "Open update stream connections",
+                                value=stats["connections"])
+        yield GaugeMetricFamily("climatrix_stream_buffered_events", "Events waiting in connection buffers",
+                                value=stats["buffered_events"])
+        yield CounterMetricFamily("climatrix_stream_resyncs",
+                                  "Connections that fell behind and were sent a new snapshot", value=stats["resyncs"])
+
+    def _database(self, db_manager):
+        pending = GaugeMetricFamily("climatrix_write_behind_pending", "Rows waiting to be written",
+                                    labels=["buffer"])
+        dropped = CounterMetricFamily("climatrix_write_behind_dropped_rows",
+                                      "Rows dropped by backpressure or failed writes", labels=["buffer"])
+        for writer in (db_manager.prediction_writer, db_manager.environmental_writer):
+            stats = writer.get_stats()
+            pending.add_metric([writer.name], stats["pending"])
+            dropped.add_metric([writer.name], stats["dropped_backpressure"] + stats["failed_rows"])
+        yield from (pending, dropped)
+
+        pool = db_manager.pool
+        if pool is None:
+            return
+        size, idle, max_size = pool.get_size(), pool.get_idle_size(), pool.get_max_size()
+        yield GaugeMetricFamily("climatrix_db_pool_size", "Open asyncpg connections", value=size)
+        yield GaugeMetricFamily("climatrix_db_pool_in_use", "asyncpg connections checked out", value=size - idle)
+        yield GaugeMetricFamily("climatrix_db_pool_max_size", "asyncpg pool limit", value=max_size)
+        yield GaugeMetricFamily("climatrix_db_pool_utilization", "Checked-out share of the pool limit",
+                                value=(size - idle) / max_size if max_size else 0.0)
+
+runtime_collector = RuntimeCollector()
+REGISTRY.register(runtime_collector)
+
+def render() -> bytes:
+    """
+    Render the metrics in the Prometheus text format
+
+    With several workers per replica set PROMETHEUS_MULTIPROC_DIR so the
+    histograms and counters are merged across them; the scrape-time gauges
+    then describe the worker that served the scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(runtime_collector)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
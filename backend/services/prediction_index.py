@@ -0,0 +1,219 @@
+"""
+Prediction Index
+In-memory spatial index of recent predictions:
+- Fixed lat/lon bucket grid; a radius query scans only the buckets
+  overlapping the radius and checks candidates by haversine distance
+- One entry per disaster type and location (newer predictions replace older)
+- Entries expire with their prediction horizon; bounded entry count
+- Top-k highest-risk predictions within a radius without a database round trip
+"""
+
+import heapq
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .geo import KM_PER_DEG_LAT, haversine_km
+from .location_cache import quantize_location
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVEL_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+@dataclass
+class PredictionIndexConfig:
+    """Prediction index configuration"""
+    # Bucket size; radius queries scan about (2r / bucket + 1)^2 buckets
+    bucket_deg: float = float(os.getenv("PREDICTION_INDEX_BUCKET_DEG", "0.5"))
+    # Predictions for the same type closer than this replace each other
+    location_deg: float = float(os.getenv("PREDICTION_INDEX_LOCATION_DEG", "0.01"))
+    max_entries: int = int(os.getenv("PREDICTION_INDEX_MAX_ENTRIES", "500000"))
+    max_radius_km: float = float(os.getenv("PREDICTION_INDEX_MAX_RADIUS_KM", "1000"))
+
+class IndexedPrediction:
+    """A prediction held by the index"""
+    __slots__ = ("key", "disaster_type", "latitude", "longitude", "probability", "risk_level",
+                 "confidence", "model_version", "predicted_at", "expires_at")
+
+    def __init__(self, key: Tuple, disaster_type: str, latitude: float, longitude: float, prediction: Dict,
+                 predicted_at: float, expires_at: float):
+        self.key = key
+        self.disaster_type = disaster_type
+        self.latitude = latitude
+        self.longitude = longitude
+        self.probability = float(prediction["probability"])
+        self.risk_level = prediction.get("risk_level", "LOW")
+        self.confidence = prediction.get("confidence")
+        self.model_version = prediction.get("model_version")
+        self.predicted_at = predicted_at
+        self.expires_at = expires_at
+
+    @property
+    def rank(self) -> Tuple[float, int]:
+        return self.probability, RISK_LEVEL_RANK.get(self.risk_level, 0)
+
+    def to_dict(self, distance_km: Optional[float] = None) -> Dict:
+        result = {
+            "disaster_type": self.disaster_type,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "probability": self.probability,
+            "risk_level": self.risk_level,
+            "confidence": self.confidence,
+            "model_version": self.model_version,
+            "timestamp": datetime.fromtimestamp(self.predicted_at).isoformat(),
+            "expires_at": datetime.fromtimestamp(self.expires_at).isoformat()
+        }
+        if distance_km is not None:
+            result["distance_km"] = round(distance_km, 3)
+        return result
+
+class PredictionIndex:
+    """
+    Bucket-grid index of unexpired predictions
+
+    Buckets are keyed by quantized (row, col); longitudes wrap, so queries
+    near the antimeridian see both sides. Expired entries are skipped by
+    queries and removed in expiry order as new predictions arrive.
+    """
+
+    def __init__(self, config: PredictionIndexConfig = None):
+        self.config = config or PredictionIndexConfig()
+        self._buckets: Dict[Tuple[int, int], Dict[Tuple, IndexedPrediction]] = {}
+        self._entries: Dict[Tuple, IndexedPrediction] = {}
+        # (expires_at, key) for every entry version; stale versions are skipped
+        self._expiry: List[Tuple[float, Tuple]] = []
+        self._columns = round(360 / self.config.bucket_deg)
+        self.stats = {"added": 0, "replaced": 0, "expired": 0, "evicted": 0, "queries": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bucket(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row, col = quantize_location(latitude, longitude, self.config.bucket_deg)
+        return row, col % self._columns
+
+    def add(self, disaster_type: str, latitude: float, longitude: float, prediction: Dict,
+            horizon_hours: float = 24, now: float = None):
+        """Index a prediction until its horizon passes"""
+        now = time.time() if now is None else now
+        key = (disaster_type, *quantize_location(latitude, longitude, self.config.location_deg))
+        entry = IndexedPrediction(key, disaster_type, latitude, longitude, prediction,
+                                  now, now + horizon_hours * 3600)
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._remove(previous)
+            self.stats["replaced"] += 1
+        self._entries[key] = entry
+        self._buckets.setdefault(self._bucket(latitude, longitude), {})[key] = entry
+        heapq.heappush(self._expiry, (entry.expires_at, key))
+        self.stats["added"] += 1
+        self.evict(now)
+
+    def add_many(self, predictions: Iterable[Tuple[str, Dict, Dict]], horizon_hours: float = 24):
+        """Index (disaster_type, location, prediction) entries"""
+        now = time.time()
+        for disaster_type, location, prediction in predictions:
+            self.add(disaster_type, location["latitude"], location["longitude"], prediction, horizon_hours, now)
+
+    def _remove(self, entry: IndexedPrediction):
+        del self._entries[entry.key]
+        bucket_key = self._bucket(entry.latitude, entry.longitude)
+        bucket = self._buckets[bucket_key]
+        del bucket[entry.key]
+        if not bucket:
+            del self._buckets[bucket_key]
+
+    def evict(self, now: float = None):
+        """Drop expired entries, then the soonest-expiring ones beyond the size limit"""
+        now = time.time() if now is None else now
+        while self._expiry:
+            expires_at, key = self._expiry[0]
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at != expires_at:
+                # Replaced since; its current version has its own heap item
+                heapq.heappop(self._expiry)
+                continue
+            if expires_at > now and len(self._entries) <= self.config.max_entries:
+                break
+            heapq.heappop(self._expiry)
+            self._remove(entry)
+            self.stats["expired" if expires_at <= now else "evicted"] += 1
+        if len(self._expiry) > 2 * len(self._entries) + 1024:
+            # Mostly superseded versions: rebuild instead of letting them pile up
+            self._expiry = [(e.expires_at, k) for k, e in self._entries.items()]
+            heapq.heapify(self._expiry)
+
+    def _candidate_buckets(self, latitude: float, longitude: float, radius_km: float) -> Iterable[Tuple[int, int]]:
+        size = self.config.bucket_deg
+        dlat = radius_km / KM_PER_DEG_LAT
+        lat_min, lat_max = max(-90.0, latitude - dlat), min(90.0, latitude + dlat)
+        # Widest longitude span at the box's most poleward latitude
+        cos_lat = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+        if cos_lat * 180 <= dlat:
+            columns = range(self._columns)
+        else:
+            dlon = min(180.0, dlat / cos_lat)
+            first = int(math.floor((longitude - dlon) / size))
+            last = int(math.floor((longitude + dlon) / size))
+            columns = {col % self._columns for col in range(first, last + 1)}
+        for row in range(int(math.floor(lat_min / size)), int(math.floor(lat_max / size)) + 1):
+            for col in columns:
+                if (row, col) in self._buckets:
+                    yield row, col
+
+    def _matches(self, latitude: float, longitude: float, radius_km: float,
+                 disaster_types: Optional[Iterable[str]], min_probability: float, now: Optional[float]):
+        now = time.time() if now is None else now
+        radius_km = min(radius_km, self.config.max_radius_km)
+        types = set(disaster_types) if disaster_types is not None else None
+        self.stats["queries"] += 1
+        for bucket_key in self._candidate_buckets(latitude, longitude, radius_km):
+            for entry in self._buckets[bucket_key].values():
+                if entry.expires_at <= now or entry.probability < min_probability:
+                    continue
+                if types is not None and entry.disaster_type not in types:
+                    continue
+                distance = haversine_km(latitude, longitude, entry.latitude, entry.longitude)
+                if distance <= radius_km:
+                    yield entry, distance
+
+    def nearby(self, latitude: float, longitude: float, radius_km: float = 50.0, k: int = 10,
+               disaster_types: Optional[Iterable[str]] = None, min_probability: float = 0.0,
+               now: float = None) -> List[Tuple[IndexedPrediction, float]]:
+        """
+        The k highest-risk unexpired predictions within a radius
+
+        Returns (prediction, distance_km) pairs, highest probability first
+        (ties broken by risk level, then distance). The radius is capped
+        at max_radius_km.
+        """
+        matches = self._matches(latitude, longitude, radius_km, disaster_types, min_probability, now)
+        return heapq.nlargest(k, matches, key=lambda match: (*match[0].rank, -match[1]))
+
+    def highest_by_type(self, latitude: float, longitude: float, radius_km: float,
+                        disaster_types: Optional[Iterable[str]] = None,
+                        now: float = None) -> Dict[str, IndexedPrediction]:
+        """The highest-risk prediction of each disaster type within a radius"""
+        highest: Dict[str, Tuple[IndexedPrediction, float]] = {}
+        for entry, distance in self._matches(latitude, longitude, radius_km, disaster_types, 0.0, now):
+            best = highest.get(entry.disaster_type)
+            if best is None or (*entry.rank, -distance) > (*best[0].rank, -best[1]):
+                highest[entry.disaster_type] = (entry, distance)
+        return {disaster_type: entry for disaster_type, (entry, _) in highest.items()}
+
+    def get_stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "buckets": len(self._buckets),
+            "bucket_deg": self.config.bucket_deg,
+            "max_entries": self.config.max_entries,
+            **self.stats
+        }
+
+# Global instance
+prediction_index = PredictionIndex()
@@ -0,0 +1,290 @@
+"""
+Risk Grid Service
+Keeps precomputed risk grids per disaster type and time step for map tiles:
+- Scores every cell of a regional or global grid with the simple models
+- Incremental: only cells whose inputs (or model version) changed are rescored
+- Observed weather at predicted locations overrides the climatology inputs
+  of its cell
+- float16 grids on disk per (disaster type, time step), uint8 overview
+  pyramids in memory
+- XYZ tiles as palette PNG or raw uint8, cached by grid version
+"""
+
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.risk_grid import (NO_DATA, RISK_SCALE, InputSource, build_pyramid, climatology_inputs,
+                                encode_png, grid_axes, render_tile, to_tile_values)
+from .compute_executor import compute_executor
+from .metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+TILE_FORMATS = {"png": "image/png", "bin": "application/octet-stream"}
+MAX_ZOOM = 18
+
+def _parse_bounds(value: str) -> Tuple[float, float, float, float]:
+    lat_min, lat_max, lon_min, lon_max = (float(part) for part in value.split(","))
+    return lat_min, lat_max, lon_min, lon_max
+
+@dataclass
+class RiskGridConfig:
+    """Risk grid configuration"""
+    resolution_deg: float = float(os.getenv("RISK_GRID_RESOLUTION_DEG", "0.5"))
+    # lat_min,lat_max,lon_min,lon_max of the scored region
+    bounds: Tuple[float, float, float, float] = _parse_bounds(os.getenv("RISK_GRID_BOUNDS", "-90,90,-180,180"))
+    step_hours: int = int(os.getenv("RISK_GRID_STEP_HOURS", "6"))
+    interval_s: float = float(os.getenv("RISK_GRID_INTERVAL_S", "900"))
+    keep_steps: int = int(os.getenv("RISK_GRID_KEEP_STEPS", "4"))
+    directory: str = os.getenv("RISK_GRID_DIR", "risk_grid")
+    # Encoded tiles kept in memory
+    tile_cache_size: int = int(os.getenv("RISK_TILE_CACHE_SIZE", "4096"))
+
+@dataclass
+class RiskLayer:
+    """Risk of one disaster type at one time step"""
+    disaster_type: str
+    step: str
+    probabilities: np.ndarray  # (rows, cols) float16, NaN where not scored
+    pyramid: List[np.ndarray]  # uint8 tile values, level 0 first
+    version: int
+    model_version: Optional[str]
+    updated_at: str
+
+class RiskGridService:
+    """
+    Owner of the risk grids
+
+    ``compute(models)`` scores the current time step; it runs in a worker
+    thread and swaps in new RiskLayer objects, so tile requests always
+    see a complete grid. ``input_source`` gets the step time and returns
+    an input source (see risk_grid.climatology_inputs).
+    """
+
+    def __init__(self, config: RiskGridConfig = None,
+                 input_source: Callable[[datetime], InputSource] = climatology_inputs):
+        self.config = config or RiskGridConfig()
+        self.input_source = input_source
+        self.latitudes, self.longitudes = grid_axes(self.config.bounds, self.config.resolution_deg)
+        self.shape = (len(self.latitudes), len(self.longitudes))
+        self._layers: Dict[Tuple[str, str], RiskLayer] = {}
+        # Inputs each type was last scored on, and the model version used
+        self._inputs: Dict[str, np.ndarray] = {}
+        self._scored_with: Dict[str, Optional[str]] = {}
+        # (row, col) -> (observed_at, features) overriding the source inputs
+        self._observations: Dict[Tuple[int, int], Tuple[float, Dict[str, float]]] = {}
+        self._tiles: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self.stats = {"computations": 0, "cells_scored": 0, "last_compute_ms": 0.0,
+                      "observations": 0, "tile_hits": 0, "tile_misses": 0}
+        self._load()
+
+    def step_for(self, when: datetime) -> Tuple[str, datetime]:
+        """The time step containing a moment, as (key, start)"""
+        start = when.replace(minute=0, second=0, microsecond=0)
+        start -= timedelta(hours=start.hour % self.config.step_hours)
+        return start.strftime("%Y%m%dT%H"), start
+
+    def _path(self, disaster_type: str, step: str) -> str:
+        return os.path.join(self.config.directory, disaster_type, f"{step}.npy")
+
+    def _load(self):
+        """Serve the grids already on disk until the first computation"""
+        if not os.path.isdir(self.config.directory):
+            return
+        for disaster_type in os.listdir(self.config.directory):
+            type_dir = os.path.join(self.config.directory, disaster_type)
+            steps = sorted(f[:-4] for f in os.listdir(type_dir) if f.endswith(".npy") and ".tmp" not in f)
+            for step in steps[-self.config.keep_steps:]:
+                probabilities = np.load(self._path(disaster_type, step))
+                if probabilities.shape != self.shape:
+                    continue  # Written for another grid configuration
+                self._layers[(disaster_type, step)] = RiskLayer(
+                    disaster_type, step, probabilities, build_pyramid(to_tile_values(probabilities)),
+                    0, None, datetime.fromtimestamp(os.path.getmtime(self._path(disaster_type, step))).isoformat()
+                )
+
+    def cell_for(self, latitude: float, longitude: float) -> Optional[Tuple[int, int]]:
+        lat_min, _, lon_min, _ = self.config.bounds
+        row = int(math.floor((latitude - lat_min) / self.config.resolution_deg))
+        col = int(math.floor((longitude - lon_min) / self.config.resolution_deg))
+        if 0 <= row < self.shape[0] and 0 <= col < self.shape[1]:
+            return row, col
+        return None
+
+    def observe(self, latitude: float, longitude: float, features: Dict) -> bool:
+        """Use observed feature values for a location's cell in the next computation"""
+        cell = self.cell_for(latitude, longitude)
+        if cell is None:
+            return False
+        numeric = {}
+        for name, value in features.items():
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            if not math.isnan(value):
+                numeric[name] = value
+        if numeric:
+            self._observations[cell] = (time.time(), numeric)
+            self.stats["observations"] += 1
+        return bool(numeric)
+
+    def _current_inputs(self, step_start: datetime) -> Dict[str, np.ndarray]:
+        fields = self.input_source(step_start)(self.latitudes, self.longitudes)
+        fields = {name: np.array(values, dtype=np.float32) for name, values in fields.items()}
+        # Observations older than a step no longer describe the cell
+        cutoff = time.time() - self.config.step_hours * 3600
+        for cell, (observed_at, _) in list(self._observations.items()):
+            if observed_at < cutoff:
+                self._observations.pop(cell, None)
+        for (row, col), (_, features) in list(self._observations.items()):
+            for name, value in features.items():
+                if name in fields:
+                    fields[name][row, col] = value
+        return fields
+
+    def latest(self, disaster_type: str) -> Optional[RiskLayer]:
+        steps = [layer for (kind, _), layer in list(self._layers.items()) if kind == disaster_type]
+        return max(steps, key=lambda layer: layer.step) if steps else None
+
+    def compute(self, models: Dict, when: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Score the current step of every model's grid; returns cells scored per type
+
+        A type whose inputs and model are unchanged since its last scoring
+        keeps its grid and version.
+        """
+        start_time = time.perf_counter()
+        step, step_start = self.step_for(when or datetime.now())
+        fields = self._current_inputs(step_start)
+        scored = {}
+        for disaster_type, model in models.items():
+            schema = model.schema
+            with observe_stage("feature_extraction", disaster_type):
+                X = schema.extract({name: fields[name].ravel() for name in schema.columns if name in fields})
+                X = X.astype(np.float32)
+            previous = self.latest(disaster_type)
+            previous_inputs = self._inputs.get(disaster_type)
+            if (previous is None or previous_inputs is None or previous_inputs.shape != X.shape
+                    or self._scored_with.get(disaster_type) != model.version):
+                changed = np.ones(len(X), dtype=bool)
+                probabilities = np.full(len(X), np.nan, dtype=np.float32)
+            else:
+                changed = np.any(X != previous_inputs, axis=1)
+                probabilities = previous.probabilities.ravel().astype(np.float32)
+
+            count = int(changed.sum())
+            scored[disaster_type] = count
+            if count == 0 and previous is not None and previous.step == step:
+                continue
+            if count:
+                with observe_stage("inference", disaster_type):
+                    probabilities[changed] = model.predict_probabilities(X[changed])
+            self._inputs[disaster_type] = X
+            self._scored_with[disaster_type] = model.version
+
+            grid = probabilities.reshape(self.shape).astype(np.float16)
+            current = self._layers.get((disaster_type, step))
+            layer = RiskLayer(
+                disaster_type, step, grid, build_pyramid(to_tile_values(grid)),
+                current.version + 1 if current is not None else 1,
+                model.version, datetime.now().isoformat()
+            )
+            self._save(layer)
+            self._layers[(disaster_type, step)] = layer
+            self._prune(disaster_type)
+            self.stats["cells_scored"] += count
+
+        self.stats["computations"] += 1
+        self.stats["last_compute_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+        logger.info(f"Risk grid step {step} scored {scored} cells in {self.stats['last_compute_ms']}ms")
+        return scored
+
+    async def refresh(self, models: Dict) -> Dict[str, int]:
+        """Compute the current step off the event loop"""
+        return await compute_executor.run(self.compute, dict(models))
+
+    def _save(self, layer: RiskLayer):
+        path = self._path(layer.disaster_type, layer.step)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path[:-4]}.{os.getpid()}.tmp.npy"
+        np.save(temporary, layer.probabilities)
+        os.replace(temporary, path)
+
+    def _prune(self, disaster_type: str):
+        steps = sorted(step for kind, step in list(self._layers) if kind == disaster_type)
+        for step in steps[:-self.config.keep_steps]:
+            del self._layers[(disaster_type, step)]
+            try:
+                os.remove(self._path(disaster_type, step))
+            except FileNotFoundError:
+                pass
+
+    def layer(self, disaster_type: str, step: Optional[str] = None) -> Optional[RiskLayer]:
+        if step is None:
+            return self.latest(disaster_type)
+        return self._layers.get((disaster_type, step))
+
+    def tile(self, layer: RiskLayer, z: int, x: int, y: int, fmt: str) -> bytes:
+        """
+        An encoded XYZ tile of a layer
+
+        ``bin`` is the raw (256, 256) uint8 array, row-major from the
+        north-west corner: value / 254 is the probability, 255 no data.
+        """
+        key = (layer.disaster_type, layer.step, layer.version, z, x, y, fmt)
+        body = self._tiles.get(key)
+        if body is not None:
+            self._tiles.move_to_end(key)
+            self.stats["tile_hits"] += 1
+            return body
+        self.stats["tile_misses"] += 1
+        values = render_tile(layer.pyramid, self.config.bounds, self.config.resolution_deg, z, x, y)
+        body = encode_png(values) if fmt == "png" else values.tobytes()
+        self._tiles[key] = body
+        while len(self._tiles) > self.config.tile_cache_size:
+            self._tiles.popitem(last=False)
+        return body
+
+    def describe(self) -> Dict:
+        """Grid layout and the available layers"""
+        return {
+            "bounds": dict(zip(("lat_min", "lat_max", "lon_min", "lon_max"), self.config.bounds)),
+            "resolution_deg": self.config.resolution_deg,
+            "shape": list(self.shape),
+            "step_hours": self.config.step_hours,
+            "tile_formats": list(TILE_FORMATS),
+            "raw_encoding": {"dtype": "uint8", "scale": RISK_SCALE, "no_data": NO_DATA},
+            "layers": [
+                {
+                    "disaster_type": layer.disaster_type,
+                    "step": layer.step,
+                    "version": layer.version,
+                    "model_version": layer.model_version,
+                    "updated_at": layer.updated_at,
+                    "pyramid_levels": len(layer.pyramid),
+                    "max_probability": float(np.nanmax(layer.probabilities)) if np.isfinite(layer.probabilities).any() else None
+                }
+                for layer in sorted(list(self._layers.values()), key=lambda l: (l.disaster_type, l.step))
+            ]
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            "layers": len(self._layers),
+            "cells": self.shape[0] * self.shape[1],
+            "tiles_cached": len(self._tiles),
+            "observed_cells": len(self._observations),
+            **self.stats
+        }
+
+# Global instance
+risk_grid_service = RiskGridService()
@@ -0,0 +1,341 @@
+"""
+Sensor API Service
+Integrates with IoT environmental sensors:
+- Soil moisture sensors
+- Water level sensors
+- Weather stations
+- Air quality sensors
+
+Readings come from the IoT gateway at SENSOR_API_URL (GET /<kind> for
+soil, water, weather_station and air_quality); while no gateway answers
+there they are simulated, as they always were.
+"""
+
+import asyncio
+import aiohttp
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+import os
+import json
+
+from .http_client import http_client
+from .geo import haversine_km
+
+logger = logging.getLogger(__name__)
+
+SOIL_FIELDS = ['soil_moisture', 'soil_temperature', 'soil_ph', 'soil_conductivity']
+WATER_FIELDS = ['water_level', 'water_temperature', 'water_ph', 'water_turbidity', 'flow_rate']
+
+class SensorAPIService:
+    """
+    IoT sensor data collection service
+    """
+    
+    def __init__(self):
+        # IoT gateway; readings are simulated while it is unset or unreachable
+        self.sensor_base_url = os.getenv("SENSOR_API_URL", "http://localhost:8080").rstrip("/")
+        self.gateway_available = True
+        # Sensors further than this from a location do not describe it
+        self.max_distance_km = float(os.getenv("SENSOR_MAX_DISTANCE_KM", "25"))
+    
+    async def __aenter__(self):
+        # Requests go through the shared pool, which the application owns
+        await http_client.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    async def collect_sensor_data(self) -> Dict:
+        """
+        Collect data from all IoT sensors
+        """
+        try:
+            sensor_data = {}
+            
+            # Collect soil sensors data
+            soil_data = await self.get_soil_sensors_data()
+            sensor_data["soil"] = soil_data
+            
+            # Collect water sensors data
+            water_data = await self.get_water_sensors_data()
+            sensor_data["water"] = water_data
+            
+            # Collect weather station data
+            weather_data = await self.get_weather_station_data()
+            sensor_data["weather_station"] = weather_data
+            
+            # Collect air quality data
+            air_quality_data = await self.get_air_quality_data()
+            sensor_data["air_quality"] = air_quality_data
+            
+            return sensor_data
+            
+        except Exception as e:
+            logger.error(f"Sensor data collection failed: {e}")
+            return {}
+    
+    async def fetch_readings(self, kind: str) -> Optional[Dict]:
+        """
+        Get the latest readings of one sensor kind from the gateway
+
+        Returns None when no gateway is configured or it cannot be reached;
+        the callers then fall back to simulated readings.
+        """
+        if not self.sensor_base_url:
+            return None
+        try:
+            async with http_client.get(f"{self.sensor_base_url}/{kind}") as response:
+                response.raise_for_status()
+                readings = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if self.gateway_available:
+                # Logged once per outage, not on every collection
+                logger.warning(f"Sensor gateway {self.sensor_base_url} unavailable, simulating readings: {e}")
+                self.gateway_available = False
+            return None
+        if not self.gateway_available:
+            logger.info(f"Sensor gateway {self.sensor_base_url} available again")
+            self.gateway_available = True
+        return readings
+    
+    def nearby_readings(self, readings: Dict, latitude: float, longitude: float,
+                        fields: List[str]) -> pd.DataFrame:
+        """Readings of the sensors within max_distance_km of a location, nearest first"""
+        rows = []
+        for record in readings.get("sensors") or readings.get("stations") or []:
+            location = record.get("location") or {}
+            if "lat" not in location or "lon" not in location:
+                continue
+            distance = haversine_km(latitude, longitude, location["lat"], location["lon"])
+            if distance > self.max_distance_km:
+                continue
+            rows.append((distance, {
+                'timestamp': pd.to_datetime(record.get("timestamp") or datetime.now()),
+                **{field: record.get(field, np.nan) for field in fields},
+                'sensor_id': record.get("sensor_id") or record.get("station_id"),
+                'latitude': location["lat"],
+                'longitude': location["lon"]
+            }))
+        rows.sort(key=lambda row: row[0])
+        return pd.DataFrame([row for _, row in rows])
+    
+    async def get_soil_sensors(self, latitude: float, longitude: float) -> Optional[pd.DataFrame]:
+        """
+        Get soil sensor data for a location
+        """
+        try:
+            readings = await self.fetch_readings("soil")
+            if readings is not None:
+                return self.nearby_readings(readings, latitude, longitude, SOIL_FIELDS)
+            
+            # For demo purposes, return simulated data
+            return pd.DataFrame({
+                'timestamp': [datetime.now()],
+                'soil_moisture': [np.random.uniform(0.1, 0.5)],
+                'soil_temperature': [np.random.uniform(15, 30)],
+                'soil_ph': [np.random.uniform(6.0, 7.5)],
+                'soil_conductivity': [np.random.uniform(100, 500)],
+                'sensor_id': ['soil_sensor_001'],
+                'latitude': [latitude],
+                'longitude': [longitude]
+            })
+        except Exception as e:
+            logger.error(f"Soil sensors data failed: {e}")
+            return None
+    
+    async def get_water_sensors(self, latitude: float, longitude: float) -> Optional[pd.DataFrame]:
+        """
+        Get water sensor data for a location
+        """
+        try:
+            readings = await self.fetch_readings("water")
+            if readings is not None:
+                return self.nearby_readings(readings, latitude, longitude, WATER_FIELDS)
+            
+            # For demo purposes, return simulated data
+            return pd.DataFrame({
+                'timestamp': [datetime.now()],
+                'water_level': [np.random.uniform(0.5, 3.0)],
+                'water_temperature': [np.random.uniform(10, 25)],
+                'water_ph': [np.random.uniform(6.5, 8.5)],
+                'water_turbidity': [np.random.uniform(0, 10)],
+                'flow_rate': [np.random.uniform(0, 100)],
+                'sensor_id': ['water_sensor_001'],
+                'latitude': [latitude],
+                'longitude': [longitude]
+            })
+        except Exception as e:
+            logger.error(f"Water sensors data failed: {e}")
+            return None
+    
+    async def get_soil_sensors_data(self) -> Dict:
+        """
+        Get data from all soil sensors
+        """
+        try:
+            readings = await self.fetch_readings("soil")
+            if readings is not None:
+                return readings
+            
+            # For demo purposes, return simulated data
+            return {
+                "sensors": [
+                    {
+                        "sensor_id": "soil_001",
+                        "location": {"lat": 40.7128, "lon": -74.0060},
+                        "soil_moisture": 0.35,
+                        "soil_temperature": 22.5,
+                        "soil_ph": 6.8,
+                        "timestamp": datetime.now().isoformat()
+                    },
+                    {
+                        "sensor_id": "soil_002",
+                        "location": {"lat": 40.7150, "lon": -74.0080},
+                        "soil_moisture": 0.28,
+                        "soil_temperature": 21.8,
+                        "soil_ph": 7.1,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                ]
+            }
+        except Exception as e:
+            logger.error(f"Soil sensors data collection failed: {e}")
+            return {}
+    
+    async def get_water_sensors_data(self) -> Dict:
+        """
+        Get data from all water sensors
+        """
+        try:
+            readings = await self.fetch_readings("water")
+            if readings is not None:
+                return readings
+            
+            # For demo purposes, return simulated data
+            return {
+                "sensors": [
+                    {
+                        "sensor_id": "water_001",
+                        "location": {"lat": 40.7128, "lon": -74.0060},
+                        "water_level": 1.8,
+                        "water_temperature": 18.5,
+                        "water_ph": 7.2,
+                        "flow_rate": 45.2,
+                        "timestamp": datetime.now().isoformat()
+                    },
+                    {
+                        "sensor_id": "water_002",
+                        "location": {"lat": 40.7150, "lon": -74.0080},
+                        "water_level": 2.1,
+                        "water_temperature": 19.2,
+                        "water_ph": 7.0,
+                        "flow_rate": 38.7,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                ]
+            }
+        except Exception as e:
+            logger.error(f"Water sensors data collection failed: {e}")
+            return {}
+    
+    async def get_weather_station_data(self) -> Dict:
+        """
+        Get data from weather stations
+        """
+        try:
+            readings = await self.fetch_readings("weather_station")
+            if readings is not None:
+                return readings
+            
+            # For demo purposes, return simulated data
+            return {
+                "stations": [
+                    {
+                        "station_id": "weather_001",
+                        "location": {"lat": 40.7128, "lon": -74.0060},
+                        "temperature": 23.5,
+                        "humidity": 65.0,
+                        "pressure": 1013.25,
+                        "wind_speed": 5.2,
+                        "wind_direction": 180.0,
+                        "precipitation": 0.0,
+                        "timestamp": datetime.now().isoformat()
+                    },
+                    {
+                        "station_id": "weather_002",
+                        "location": {"lat": 40.7150, "lon": -74.0080},
+                        "temperature": 24.1,
+                        "humidity": 62.0,
+                        "pressure": 1012.8,
+                        "wind_speed": 4.8,
+                        "wind_direction": 175.0,
+                        "precipitation": 0.0,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                ]
+            }
+        except Exception as e:
+            logger.error(f"Weather station data collection failed: {e}")
+            return {}
+    
+    async def get_air_quality_data(self) -> Dict:
+        """
+        Get data from air quality sensors
+        """
+        try:
+            readings = await self.fetch_readings("air_quality")
+            if readings is not None:
+                return readings
+            
+            # For demo purposes, return simulated data
+            return {
+                "sensors": [
+                    {
+                        "sensor_id": "aq_001",
+                        "location": {"lat": 40.7128, "lon": -74.0060},
+                        "pm25": 12.5,
+                        "pm10": 25.3,
+                        "co": 0.8,
+                        "no2": 15.2,
+                        "o3": 45.8,
+                        "timestamp": datetime.now().isoformat()
+                    },
+                    {
+                        "sensor_id": "aq_002",
+                        "location": {"lat": 40.7150, "lon": -74.0080},
+                        "pm25": 14.2,
+                        "pm10": 28.7,
+                        "co": 1.1,
+                        "no2": 18.5,
+                        "o3": 42.3,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                ]
+            }
+        except Exception as e:
+            logger.error(f"Air quality data collection failed: {e}")
+            return {}
+    
+    async def check_connection(self) -> bool:
+        """
+        Check if sensor APIs are accessible
+        """
+        if not self.sensor_base_url:
+            return False
+        
+        try:
+            # Test sensor API connection
+            url = f"{self.sensor_base_url}/health"
+            async with http_client.get(url) as response:
+                if response.status == 200:
+                    return True
+            
+            return False
+            
+        except Exception as e:
+            logger.error(f"Sensor API connection check failed: {e}")
+            return False 
\ No newline at end of file
@@ -0,0 +1,340 @@
+"""
+Satellite Tile Cache
+On-disk cache of satellite imagery per sensor and tile:
+- Keyed by (sensor, tile, acquisition time); tiles are fixed lat/lon grid cells
+- One band stack per (sensor, tile) in time order, stored compactly as
+  float16 reflectance or uint16 scaled counts
+- Stack and acquisition times published together as one immutable version
+  behind a CURRENT pointer
+- Read back as memory-mapped, C-contiguous (time, y, x, band) arrays, so
+  workers share the page cache instead of holding float64 copies
+- LRU eviction of whole stacks by disk budget
+- Vectorized normalisation over a whole stack
+- Concurrent fetches for the same tile coalesced into one
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .location_cache import quantize_location
+
+logger = logging.getLogger(__name__)
+
+CURRENT_POINTER = "CURRENT"
+STORAGE_DTYPES = {"float16": np.float16, "uint16": np.uint16}
+
+@dataclass
+class TileCacheConfig:
+    """Satellite tile cache configuration"""
+    directory: str = os.getenv("TILE_CACHE_DIR", "tile_cache")
+    max_bytes: int = int(os.getenv("TILE_CACHE_MAX_MB", "2048")) * 1024 * 1024
+    # float16 keeps reflectance directly (~3 significant digits); uint16
+    # stores counts of uint16_scale reflectance, the Level-2 product convention
+    storage_dtype: str = os.getenv("TILE_CACHE_DTYPE", "float16")
+    uint16_scale: float = 1e-4
+    tile_size_deg: float = float(os.getenv("TILE_SIZE_DEG", "0.1"))
+    # Acquisitions kept per stack, newest last
+    max_time_steps: int = int(os.getenv("TILE_CACHE_MAX_TIME_STEPS", "32"))
+
+def tile_id(latitude: float, longitude: float, tile_size_deg: float) -> str:
+    """Name of the grid tile containing a coordinate"""
+    row, col = quantize_location(latitude, longitude, tile_size_deg)
+    return f"{row}_{col}"
+
+def encode_bands(images: np.ndarray, storage_dtype: str, scale: float) -> np.ndarray:
+    """Convert reflectance images to the storage dtype in one pass over the stack"""
+    if storage_dtype == "uint16":
+        counts = np.rint(np.asarray(images, dtype=np.float32) / scale)
+        return np.clip(counts, 0, np.iinfo(np.uint16).max).astype(np.uint16)
+    return np.asarray(images, dtype=np.float16)
+
+def normalize_stack(stack: np.ndarray, scale: Optional[float] = None,
+                    clip: Optional[Tuple[float, float]] = (0.0, 1.0)) -> np.ndarray:
+    """
+    Reflectance as float32 for a whole (time, y, x, band) stack
+
+    ``scale`` converts uint16 counts; float16 stacks are already
+    reflectance. One vectorized pass, with a single float32 output.
+    """
+    out = np.multiply(stack, scale, dtype=np.float32) if scale else stack.astype(np.float32)
+    if clip is not None:
+        np.clip(out, clip[0], clip[1], out=out)
+    return out
+
+@dataclass
+class TileStack:
+    """Cached acquisitions of one sensor over one tile"""
+    sensor: str
+    tile: str
+    times: List[str]
+    data: np.ndarray  # (time, y, x, band), memory-mapped
+    scale: Optional[float] = None  # reflectance per count for uint16 stacks
+
+    def reflectance(self) -> np.ndarray:
+        """The stack as float32 reflectance: the memory map itself would be float16/uint16"""
+        return normalize_stack(self.data, self.scale)
+
+    def images(self) -> np.ndarray:
+        """
+        The stack in reflectance units with as little copying as possible
+
+        float16 stacks are returned as the memory map itself; uint16 stacks
+        have to be scaled.
+        """
+        return self.data if self.scale is None else self.reflectance()
+
+class SatelliteTileCache:
+    """
+    LRU on-disk cache of per-tile band stacks
+
+    Layout::
+
+        <directory>/<sensor>/<tile>/CURRENT     active version id
+        <directory>/<sensor>/<tile>/<version>/  immutable version directory
+            stack.npy
+            index.json
+
+    Adding acquisitions writes a new version in a staging directory,
+    renames it into place and swaps the CURRENT pointer, so a reader sees
+    either the old stack and times or the new ones, never a mix. Readers
+    holding a memory map of an older version keep a consistent view after
+    it is deleted.
+    """
+
+    def __init__(self, config: TileCacheConfig = None):
+        self.config = config or TileCacheConfig()
+        if self.config.storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown tile storage dtype {self.config.storage_dtype!r}")
+        # (sensor, tile) -> bytes on disk, least recently used first
+        self._entries: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.total_bytes = 0
+        # get/put run in worker threads; guards _entries and total_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "partial_hits": 0, "misses": 0, "fetched_images": 0, "evictions": 0}
+        self._scan()
+
+    def _directory(self, sensor: str, tile: str) -> str:
+        return os.path.join(self.config.directory, sensor, tile)
+
+    def _current_version(self, directory: str) -> Optional[str]:
+        try:
+            with open(os.path.join(directory, CURRENT_POINTER)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _scan(self):
+        """Register the stacks already on disk, oldest access first"""
+        if not os.path.isdir(self.config.directory):
+            return
+        found = []
+        for sensor in os.listdir(self.config.directory):
+            sensor_dir = os.path.join(self.config.directory, sensor)
+            if not os.path.isdir(sensor_dir):
+                continue
+            for tile in os.listdir(sensor_dir):
+                version = self._current_version(os.path.join(sensor_dir, tile))
+                stack_path = os.path.join(sensor_dir, tile, version or "", "stack.npy")
+                if version and os.path.exists(stack_path):
+                    stat = os.stat(stack_path)
+                    found.append((stat.st_mtime, (sensor, tile), stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        if found:
+            logger.info(f"Tile cache holds {len(found)} stacks, {self.total_bytes / 1e6:.1f} MB")
+
+    def get(self, sensor: str, tile: str, times: Optional[Sequence[str]] = None,
+            partial: bool = False) -> Optional[TileStack]:
+        """
+        Open a cached stack, optionally restricted to some acquisition times
+
+        Returns None unless every requested time is cached, or with
+        ``partial`` unless at least one is (the others are left out). The requested
+        times are usually the latest consecutive acquisitions, which are a
+        contiguous slice of the memory map; other selections are copied.
+        """
+        directory = self._directory(sensor, tile)
+        for _ in range(2):
+            version = self._current_version(directory)
+            if version is None:
+                return None
+            try:
+                with open(os.path.join(directory, version, "index.json")) as f:
+                    index = json.load(f)
+                data = np.load(os.path.join(directory, version, "stack.npy"), mmap_mode="r")
+                break
+            except FileNotFoundError:
+                # A concurrent put replaced and removed this version; follow the pointer again
+                continue
+            except ValueError:
+                return None
+        else:
+            return None
+
+        key = (sensor, tile)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+        cached_times = index["times"]
+        if times is not None:
+            positions = {t: i for i, t in enumerate(cached_times)}
+            available = [t for t in times if t in positions]
+            if not available or (len(available) < len(times) and not partial):
+                return None
+            times = available
+            rows = [positions[t] for t in times]
+            if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+                data = data[rows[0]:rows[0] + len(rows)]
+            else:
+                data = data[rows]
+            cached_times = list(times)
+        return TileStack(sensor, tile, cached_times, data, index.get("scale"))
+
+    def put(self, sensor: str, tile: str, acquisitions: Dict[str, np.ndarray]) -> TileStack:
+        """Add acquisitions (time -> (y, x, band) reflectance) to a tile's stack"""
+        existing = self.get(sensor, tile)
+        merged: Dict[str, np.ndarray] = {}
+        scale = self.config.uint16_scale if self.config.storage_dtype == "uint16" else None
+        if existing is not None and existing.scale == scale and existing.data.dtype == STORAGE_DTYPES[self.config.storage_dtype]:
+            merged.update(zip(existing.times, existing.data))
+        new_times = sorted(acquisitions)
+        if new_times:
+            encoded = encode_bands(np.stack([acquisitions[t] for t in new_times]),
+                                   self.config.storage_dtype, self.config.uint16_scale)
+            merged.update(zip(new_times, encoded))
+
+        times = sorted(merged)[-self.config.max_time_steps:]
+        shapes = {merged[t].shape for t in times}
+        if len(shapes) > 1:
+            # A sensor product changed resolution; keep the newest layout only
+            newest = merged[times[-1]].shape
+            times = [t for t in times if merged[t].shape == newest]
+        stack = np.stack([merged[t] for t in times]) if times else np.empty((0,), STORAGE_DTYPES[self.config.storage_dtype])
+
+        directory = self._directory(sensor, tile)
+        version = f"v{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+        self._publish(directory, version, stack, {
+            "times": times, "scale": scale, "dtype": self.config.storage_dtype,
+            "shape": list(stack.shape), "updated_at": time.time()
+        })
+
+        key = (sensor, tile)
+        with self._lock:
+            self.total_bytes += stack.nbytes - self._entries.pop(key, 0)
+            self._entries[key] = stack.nbytes
+            evicted = self._evict(keep=key)
+        for evicted_key in evicted:
+            # Open memory maps stay valid after the files are unlinked
+            shutil.rmtree(self._directory(*evicted_key), ignore_errors=True)
+        return self.get(sensor, tile)
+
+    def _publish(self, directory: str, version: str, stack: np.ndarray, index: Dict):
+        """Write a stack version, make it the current one and remove the versions it replaces"""
+        staging = os.path.join(directory, f".staging-{version}")
+        os.makedirs(staging)
+        try:
+            np.save(os.path.join(staging, "stack.npy"), np.ascontiguousarray(stack))
+            with open(os.path.join(staging, "index.json"), "w") as f:
+                json.dump(index, f)
+            os.rename(staging, os.path.join(directory, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        pointer = os.path.join(directory, CURRENT_POINTER)
+        pointer_temporary = f"{pointer}.{version}.tmp"
+        with open(pointer_temporary, "w") as f:
+            f.write(version)
+        os.replace(pointer_temporary, pointer)
+
+        # Staging directories and pointers of concurrent puts are left alone
+        for entry in os.listdir(directory):
+            if entry.startswith("v") and entry != version:
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+    def _evict(self, keep: Tuple[str, str]) -> List[Tuple[str, str]]:
+        """
+        Drop least recently used stacks until the cache is within its disk budget
+
+        Called with the lock held; returns the keys whose directories the
+        caller removes once it has released the lock.
+        """
+        evicted = []
+        while self.total_bytes > self.config.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            size = self._entries.pop(key)
+            self.total_bytes -= size
+            self.stats["evictions"] += 1
+            evicted.append(key)
+        return evicted
+
+    async def get_or_fetch(self, sensor: str, tile: str, times: Sequence[str],
+                           fetch: Callable[[List[str]], Awaitable[Dict[str, np.ndarray]]]) -> Optional[TileStack]:
+        """
+        Get a tile's acquisitions, fetching only the ones not cached yet
+
+        ``fetch`` gets the missing times and returns time -> image. Disk
+        reads and writes run in a worker thread.
+        """
+        key = (sensor, tile)
+        while True:
+            cached = await asyncio.to_thread(self.get, sensor, tile)
+            cached_times = set(cached.times) if cached is not None else set()
+            missing = [t for t in times if t not in cached_times]
+            if not missing:
+                self.stats["hits"] += 1
+                return await asyncio.to_thread(self.get, sensor, tile, list(times))
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            # Another request is filling this tile; wait for it and look again
+            await asyncio.shield(inflight)
+
+        self.stats["partial_hits" if cached_times else "misses"] += 1
+        task = asyncio.create_task(self._fill(sensor, tile, missing, fetch))
+        self._inflight[key] = task
+        try:
+            await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        # Acquisitions the upstream could not provide are left out
+        return await asyncio.to_thread(self.get, sensor, tile, list(times), True)
+
+    async def _fill(self, sensor: str, tile: str, missing: List[str],
+                    fetch: Callable[[List[str]], Awaitable[Dict[str, np.ndarray]]]):
+        acquisitions = await fetch(missing)
+        if acquisitions:
+            self.stats["fetched_images"] += len(acquisitions)
+            await asyncio.to_thread(self.put, sensor, tile, acquisitions)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stacks, total_bytes = len(self._entries), self.total_bytes
+        return {
+            "stacks": stacks,
+            "total_bytes": total_bytes,
+            "max_bytes": self.config.max_bytes,
+            "storage_dtype": self.config.storage_dtype,
+            **self.stats
+        }
+
+# Global instance
+tile_cache = SatelliteTileCache()
@@ -0,0 +1,300 @@
+"""
+Update Stream
+Server-push of globe and risk updates to subscribed clients:
+- Clients subscribe to a bounding box and a set of layers
+- One full snapshot on connect, then only deltas: changed or moved
+  features, features leaving the box, and new alerts
+- Deltas computed once per data refresh and encoded once per distinct
+  (layers, box) subscription, then fanned out
+- Per-connection bounded buffers; a client that falls behind has its
+  backlog dropped and gets a fresh snapshot instead
+- Idle connections cost a small object and a buffer; a single heartbeat
+  loop keeps them open through proxies
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import count
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Layer -> key identifying one feature of the layer
+LAYER_KEYS = {"cyclones": "id", "drought": "id", "rainfall": "region"}
+LAYERS = (*LAYER_KEYS, "alerts")
+
+@dataclass
+class StreamConfig:
+    """Update stream configuration"""
+    # Events buffered per connection before it is resynchronised
+    buffer_size: int = int(os.getenv("STREAM_BUFFER_SIZE", "32"))
+    max_connections: int = int(os.getenv("STREAM_MAX_CONNECTIONS", "50000"))
+    heartbeat_s: float = float(os.getenv("STREAM_HEARTBEAT_S", "15"))
+    # How often the layer source is checked for new data
+    poll_interval_s: float = float(os.getenv("STREAM_POLL_INTERVAL_S", "10"))
+    # Recent alerts included in the snapshot sent on connect
+    recent_alerts: int = int(os.getenv("STREAM_RECENT_ALERTS", "100"))
+    # Milliseconds a disconnected browser waits before reconnecting
+    retry_ms: int = 5000
+
+class StreamFull(RuntimeError):
+    """Raised when the connection limit is reached"""
+
+@dataclass(frozen=True)
+class BoundingBox:
+    """Latitude/longitude box; lon_min > lon_max crosses the antimeridian"""
+    lat_min: float = -90.0
+    lat_max: float = 90.0
+    lon_min: float = -180.0
+    lon_max: float = 180.0
+
+    def _lon_in(self, lon: float) -> bool:
+        if self.lon_min <= self.lon_max:
+            return self.lon_min <= lon <= self.lon_max
+        return lon >= self.lon_min or lon <= self.lon_max
+
+    def contains(self, feature: Dict) -> bool:
+        """Whether a point feature (lat/lon) or area feature (lat_range/lon_range) touches the box"""
+        if "lat" in feature and "lon" in feature:
+            return self.lat_min <= feature["lat"] <= self.lat_max and self._lon_in(feature["lon"])
+        lat_range, lon_range = feature.get("lat_range"), feature.get("lon_range")
+        if lat_range is None or lon_range is None:
+            return True
+        if lat_range[1] < self.lat_min or lat_range[0] > self.lat_max:
+            return False
+        if self.lon_min <= self.lon_max:
+            return not (lon_range[1] < self.lon_min or lon_range[0] > self.lon_max)
+        return lon_range[1] >= self.lon_min or lon_range[0] <= self.lon_max
+
+def _comparable(feature: Dict) -> Dict:
+    # Timestamps are restamped on every refresh; they are not a change on their own
+    return {k: v for k, v in feature.items() if k != "timestamp"}
+
+def diff_layers(previous: Dict[str, List[Dict]], current: Dict[str, List[Dict]]) -> List[Tuple[str, str, Optional[Dict], Optional[Dict]]]:
+    """
+    Changes between two refreshes as (layer, key, old, new)
+
+    ``old`` is None for new features and ``new`` None for removed ones.
+    """
+    changes = []
+    for layer, key in LAYER_KEYS.items():
+        old_features = {str(f[key]): f for f in previous.get(layer, [])}
+        new_features = {str(f[key]): f for f in current.get(layer, [])}
+        for feature_id, new in new_features.items():
+            old = old_features.get(feature_id)
+            if old is None or _comparable(old) != _comparable(new):
+                changes.append((layer, feature_id, old, new))
+        for feature_id, old in old_features.items():
+            if feature_id not in new_features:
+                changes.append((layer, feature_id, old, None))
+    return changes
+
+def sse_event(event: str, data: Dict, event_id: Optional[int] = None) -> bytes:
+    """One Server-Sent Events message"""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines += [f"event: {event}", f"data: {json.dumps(data, separators=(',', ':'), default=str)}", "", ""]
+    return "\n".join(lines).encode()
+
+HEARTBEAT = b": keep-alive\n\n"
+
+class StreamSubscription:
+    """
+    One connected client and its bounded event buffer
+
+    Only the hub pushes, only the connection's generator drains, both on
+    the event loop, so a deque and an Event are enough.
+    """
+    __slots__ = ("id", "layers", "bbox", "buffer", "ready", "resync", "connected_at", "sent", "dropped")
+
+    def __init__(self, subscription_id: int, layers: FrozenSet[str], bbox: BoundingBox, buffer_size: int):
+        self.id = subscription_id
+        self.layers = layers
+        self.bbox = bbox
+        self.buffer: Deque[bytes] = deque(maxlen=buffer_size)
+        self.ready = asyncio.Event()
+        # Start with a snapshot
+        self.resync = True
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def filter_key(self) -> Tuple:
+        return self.layers, self.bbox
+
+    def push(self, message: bytes):
+        if len(self.buffer) == self.buffer.maxlen:
+            # Too far behind for deltas to be useful: drop the backlog and
+            # resynchronise with a snapshot once the client reads again
+            self.dropped += len(self.buffer)
+            self.buffer.clear()
+            self.resync = True
+        self.buffer.append(message)
+        self.ready.set()
+
+class UpdateStreamHub:
+    """
+    Fan-out of layer deltas and alerts to stream subscriptions
+
+    ``run(source)`` polls ``source`` (an async callable returning
+    ``{layer: [feature, ...]}``) and publishes what changed. Alerts are
+    published with ``publish_alert``.
+    """
+
+    def __init__(self, config: StreamConfig = None):
+        self.config = config or StreamConfig()
+        self._subscriptions: Dict[int, StreamSubscription] = {}
+        # Subscriptions by filter, so a delta is filtered and encoded once per group
+        self._groups: Dict[Tuple, Dict[int, StreamSubscription]] = {}
+        self._ids = count(1)
+        self._state: Dict[str, List[Dict]] = {layer: [] for layer in LAYER_KEYS}
+        self._alerts: Deque[Dict] = deque(maxlen=self.config.recent_alerts)
+        self.sequence = 0
+        self.stats = {"connections_total": 0, "rejected": 0, "deltas": 0, "alerts": 0,
+                      "snapshots_sent": 0, "resyncs": 0, "events_dropped": 0}
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, layers: FrozenSet[str], bbox: BoundingBox) -> StreamSubscription:
+        if len(self._subscriptions) >= self.config.max_connections:
+            self.stats["rejected"] += 1
+            raise StreamFull(f"Update stream is at its limit of {self.config.max_connections} connections")
+        subscription = StreamSubscription(next(self._ids), frozenset(layers), bbox, self.config.buffer_size)
+        self._subscriptions[subscription.id] = subscription
+        self._groups.setdefault(subscription.filter_key, {})[subscription.id] = subscription
+        self.stats["connections_total"] += 1
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription):
+        if self._subscriptions.pop(subscription.id, None) is not None:
+            self.stats["events_dropped"] += subscription.dropped
+            group = self._groups[subscription.filter_key]
+            del group[subscription.id]
+            if not group:
+                del self._groups[subscription.filter_key]
+
+    def snapshot(self, layers: FrozenSet[str], bbox: BoundingBox) -> Dict:
+        """The current state of some layers within a box"""
+        data = {
+            layer: [f for f in self._state[layer] if bbox.contains(f)]
+            for layer in LAYER_KEYS if layer in layers
+        }
+        if "alerts" in layers:
+            data["alerts"] = [a for a in self._alerts if bbox.contains(a)]
+        return {"sequence": self.sequence, **data}
+
+    def publish_state(self, state: Dict[str, List[Dict]]) -> int:
+        """
+        Publish a new refresh of the layers; returns the number of changes
+
+        The delta for each distinct (layers, box) subscription is filtered
+        and encoded once and shared by every connection with that filter.
+        """
+        state = {layer: list(state.get(layer, [])) for layer in LAYER_KEYS}
+        changes = diff_layers(self._state, state)
+        self._state = state
+        if not changes:
+            return 0
+        self.sequence += 1
+        self.stats["deltas"] += 1
+
+        for key, group in list(self._groups.items()):
+            message = self._encode_delta(changes, *key)
+            if message is not None:
+                for subscription in list(group.values()):
+                    subscription.push(message)
+        return len(changes)
+
+    def _encode_delta(self, changes, layers: FrozenSet[str], bbox: BoundingBox) -> Optional[bytes]:
+        """A delta as one subscription filter sees it, or None if it sees nothing"""
+        delta: Dict[str, Dict[str, List]] = {}
+        for layer, feature_id, old, new in changes:
+            if layer not in layers:
+                continue
+            if new is not None and bbox.contains(new):
+                delta.setdefault(layer, {"upsert": [], "remove": []})["upsert"].append(new)
+            elif old is not None and bbox.contains(old):
+                # Moved out of the box or gone
+                delta.setdefault(layer, {"upsert": [], "remove": []})["remove"].append(feature_id)
+        if not delta:
+            return None
+        return sse_event("delta", {"sequence": self.sequence, **delta}, self.sequence)
+
+    def publish_alert(self, alert: Dict):
+        """Publish a new area alert (needs lat/lon) to the subscriptions covering it"""
+        self._alerts.append(alert)
+        self.stats["alerts"] += 1
+        message = sse_event("alert", alert)
+        for (layers, bbox), group in list(self._groups.items()):
+            if "alerts" in layers and bbox.contains(alert):
+                for subscription in list(group.values()):
+                    subscription.push(message)
+
+    async def events(self, subscription: StreamSubscription) -> AsyncIterator[bytes]:
+        """
+        The Server-Sent Events body of one connection
+
+        Always starts with a snapshot, so reconnecting clients (including
+        ones sending Last-Event-ID) simply resynchronise.
+        """
+        try:
+            yield f"retry: {self.config.retry_ms}\n\n".encode()
+            while True:
+                if subscription.resync:
+                    subscription.resync = False
+                    subscription.buffer.clear()
+                    self.stats["snapshots_sent"] += 1
+                    if subscription.sent:
+                        self.stats["resyncs"] += 1
+                    subscription.sent += 1
+                    yield sse_event("snapshot", self.snapshot(subscription.layers, subscription.bbox), self.sequence)
+                    continue
+                if not subscription.buffer:
+                    subscription.ready.clear()
+                    await subscription.ready.wait()
+                    continue
+                message = subscription.buffer.popleft()
+                subscription.sent += 1
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    def heartbeat(self):
+        """Keep idle connections open through proxies and detect dead ones"""
+        for subscription in list(self._subscriptions.values()):
+            if not subscription.buffer:
+                subscription.push(HEARTBEAT)
+
+    async def run(self, source: Callable[[], Awaitable[Dict[str, List[Dict]]]]):
+        """Background task: publish source changes and send heartbeats"""
+        last_heartbeat = time.monotonic()
+        while True:
+            try:
+                self.publish_state(await source())
+            except Exception as e:
+                logger.error(f"Update stream refresh failed: {e}")
+            if time.monotonic() - last_heartbeat >= self.config.heartbeat_s:
+                self.heartbeat()
+                last_heartbeat = time.monotonic()
+            await asyncio.sleep(min(self.config.poll_interval_s, self.config.heartbeat_s))
+
+    def get_stats(self) -> Dict:
+        subscriptions = list(self._subscriptions.values())
+        return {
+            "connections": len(subscriptions),
+            "max_connections": self.config.max_connections,
+            "distinct_filters": len(self._groups),
+            "buffered_events": sum(len(s.buffer) for s in subscriptions),
+            "sequence": self.sequence,
+            **self.stats
+        }
+
+# Global instance
+update_stream = UpdateStreamHub()
@@ -0,0 +1,317 @@
+"""
+Benchmark Cases
+Hot paths of the prediction pipeline, measured on synthetic data (no network):
+- Simple model predict, single row and batched
+- Drought and cyclone feature engineering at several history lengths
+- Rolling-window features, batch and incremental
+- Gridded cyclone genesis potential
+- Sequence building for the LSTM models and one streamed training epoch
+- DataCollector drought and vegetation indices
+- Recommendation generation
+- Nearby-risk queries on the in-memory prediction index
+- Risk grid tile rendering
+- In-process ASGI round trip of /api/v1/predict
+"""
+
+import asyncio
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from harness import benchmark
+
+DISASTER_TYPES = ["flood", "drought", "cyclone"]
+BATCH_SIZES = [100, 1000, 10000]
+DROUGHT_HISTORY_DAYS = [90, 365, 1825]
+CYCLONE_HISTORY_HOURS = [168, 720, 2160]
+SEQUENCE_ROWS = [1000, 10000]
+INDEX_LENGTHS = [90, 365, 3650]
+ROLLING_LENGTHS = [365, 3650, 36500]
+
+@lru_cache(maxsize=None)
+def trained_simple_models():
+    """Simple models trained once on synthetic data, so predict takes the sklearn path"""
+    from backend.models.simple_models import SimpleModelFactory, generate_synthetic_training_data
+
+    data, labels = generate_synthetic_training_data(n_samples=2000, seed=7)
+    trained = SimpleModelFactory.get_all_models()
+    for disaster_type, model in trained.items():
+        model.train(data, labels[disaster_type])
+    return trained
+
+def weather_rows(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    from backend.models.simple_models import generate_synthetic_training_data
+
+    data, _ = generate_synthetic_training_data(n_samples=n_rows, seed=seed)
+    return data
+
+def drought_inputs(days: int, seed: int = 0):
+    """Daily climate, satellite and soil frames as DroughtPredictionModel expects them"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2020-01-01", periods=days, freq="D")
+    temperature = 25 + 8 * np.sin(np.arange(days) * 2 * np.pi / 365) + rng.normal(0, 2, days)
+    climate = pd.DataFrame({
+        "timestamp": timestamps,
+        "precipitation": rng.gamma(1.5, 3.0, days),
+        "temperature": temperature,
+        "humidity": rng.uniform(20, 90, days),
+        "wind_speed": rng.gamma(2.0, 3.0, days),
+        # calculate_drought_indices reads the condition indices off the climate frame
+        "vci": rng.uniform(0, 1, days),
+        "tci": rng.uniform(0, 1, days)
+    })
+    satellite = pd.DataFrame({
+        "timestamp": timestamps,
+        "red": rng.uniform(0.05, 0.15, days),
+        "green": rng.uniform(0.08, 0.2, days),
+        "blue": rng.uniform(0.03, 0.08, days),
+        "nir": rng.uniform(0.2, 0.5, days),
+        "lst": temperature + rng.normal(3, 1, days)
+    })
+    soil = pd.DataFrame({
+        "timestamp": timestamps,
+        "soil_moisture": rng.uniform(0.05, 0.45, days),
+        "soil_temperature": temperature - rng.uniform(0, 3, days)
+    })
+    return climate, satellite, soil
+
+def atmospheric_frame(hours: int, seed: int = 0) -> pd.DataFrame:
+    """Hourly atmospheric frame as CyclonePredictionModel expects it"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "pressure": rng.normal(1008, 6, hours),
+        "temperature": rng.normal(28, 2, hours),
+        "humidity": rng.uniform(50, 95, hours),
+        "wind_speed": rng.gamma(2.0, 8.0, hours),
+        "wind_direction": rng.uniform(0, 360, hours),
+        "sst": rng.normal(301, 1, hours),  # Kelvin
+        "olr": rng.normal(240, 15, hours),
+        "vorticity": rng.normal(0, 1e-5, hours),
+        "divergence": rng.normal(0, 5e-6, hours),
+        "pressure_tahiti": rng.normal(1012, 2, hours),
+        "pressure_darwin": rng.normal(1009, 2, hours),
+        "pressure_iceland": rng.normal(1000, 5, hours),
+        "pressure_azores": rng.normal(1020, 4, hours),
+        "wind_200hpa": rng.normal(20, 6, hours),
+        "wind_850hpa": rng.normal(8, 3, hours)
+    })
+
+# Simple model predict
+
+for _disaster_type in DISASTER_TYPES:
+    @benchmark(f"simple_models.predict[{_disaster_type}]", "simple_models", disaster_type=_disaster_type)
+    def _predict_single(disaster_type):
+        model = trained_simple_models()[disaster_type]
+        row = weather_rows(1)
+        return lambda: model.predict(row)
+
+    for _batch_size in BATCH_SIZES:
+        @benchmark(f"simple_models.predict_batch[{_disaster_type},{_batch_size}]", "simple_models",
+                   disaster_type=_disaster_type, rows=_batch_size)
+        def _predict_batch(disaster_type, rows):
+            model = trained_simple_models()[disaster_type]
+            data = weather_rows(rows)
+            return lambda: model.predict_batch(data)
+
+# Feature engineering
+
+for _days in DROUGHT_HISTORY_DAYS:
+    @benchmark(f"drought.preprocess_data[{_days}d]", "feature_engineering", days=_days)
+    def _drought_preprocess(days):
+        from backend.models.drought_model import DroughtPredictionModel
+
+        model = DroughtPredictionModel()
+        climate, satellite, soil = drought_inputs(days)
+        # preprocess_data adds columns in place, so each call gets fresh copies
+        return lambda: model.preprocess_data(climate.copy(), satellite.copy(), soil.copy())
+
+for _hours in CYCLONE_HISTORY_HOURS:
+    @benchmark(f"cyclone.preprocess_atmospheric_data[{_hours}h]", "feature_engineering", hours=_hours)
+    def _cyclone_preprocess(hours):
+        from backend.models.cyclone_model import CyclonePredictionModel
+
+        model = CyclonePredictionModel()
+        frame = atmospheric_frame(hours)
+        return lambda: model.preprocess_atmospheric_data(frame.copy())
+
+# Rolling-window features
+
+for _length in ROLLING_LENGTHS:
+    @benchmark(f"rolling_features.all_stats[{_length},w30]", "feature_engineering", length=_length)
+    def _rolling_all(length):
+        from backend.models.rolling_features import rolling_features
+
+        values = 300 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, length))
+        return lambda: rolling_features(values, 30)
+
+@benchmark("rolling_features.incremental_update[1000 locations,w30]", "feature_engineering")
+def _rolling_incremental():
+    from backend.models.rolling_features import IncrementalRollingFeatures, RollingSpec
+
+    engine = IncrementalRollingFeatures([RollingSpec("ndvi", 30), RollingSpec("precipitation", 30)])
+    rng = np.random.default_rng(0)
+    observations = [{"ndvi": float(v), "precipitation": float(p)}
+                    for v, p in zip(rng.uniform(0, 1, 1000), rng.gamma(1.5, 3.0, 1000))]
+    def run():
+        for location, observation in enumerate(observations):
+            engine.update(location, observation)
+    return run
+
+# Gridded genesis potential
+
+for _resolution in (1.0, 0.25):
+    @benchmark(f"genesis_grid.compute[{_resolution}deg]", "feature_engineering", resolution=_resolution)
+    def _genesis_grid(resolution):
+        from backend.models.genesis_grid import climatology_fields, compute_genesis_grid, grid_axes
+
+        latitudes, longitudes = grid_axes(resolution)
+        # Precomputed fields, so only the GPI pass is timed
+        fields = climatology_fields()(latitudes, longitudes)
+        return lambda: compute_genesis_grid(fields, latitudes, longitudes)
+
+# Sequence building
+
+for _model_name, _sequence_length in (("flood", 24), ("drought", 30), ("cyclone", 48)):
+    for _rows in SEQUENCE_ROWS:
+        @benchmark(f"{_model_name}.create_sequences[{_rows}x32,len{_sequence_length}]", "sequences",
+                   model_name=_model_name, rows=_rows, sequence_length=_sequence_length)
+        def _create_sequences(model_name, rows, sequence_length):
+            from backend.models.flood_model import FloodPredictionModel
+            from backend.models.drought_model import DroughtPredictionModel
+            from backend.models.cyclone_model import CyclonePredictionModel
+
+            model_class = {
+                "flood": FloodPredictionModel,
+                "drought": DroughtPredictionModel,
+                "cyclone": CyclonePredictionModel
+            }[model_name]
+            model = model_class()
+            rng = np.random.default_rng(0)
+            data = rng.normal(size=(rows, 32)).astype(np.float32)
+            target = rng.normal(size=rows).astype(np.float32)
+            return lambda: model.create_sequences(data, target, sequence_length)
+
+@benchmark("sequence_pipeline.stream_epoch[4x20000x32,len30]", "sequences")
+def _stream_epoch():
+    import shutil
+    import tempfile
+    import weakref
+    from sklearn.preprocessing import StandardScaler
+    from backend.models.sequence_pipeline import save_history, streaming_splits
+
+    history_dir = tempfile.mkdtemp(prefix="climatrix-bench-")
+    rng = np.random.default_rng(0)
+    for station in range(4):
+        save_history(history_dir, f"station{station}", rng.normal(size=(20000, 32)), rng.normal(size=20000))
+    train_batches, _ = streaming_splits(history_dir, 30, StandardScaler(), batch_size=256)
+
+    def epoch():
+        for _ in train_batches:
+            pass
+    weakref.finalize(epoch, shutil.rmtree, history_dir, True)
+    return epoch
+
+# DataCollector indices
+
+for _length in INDEX_LENGTHS:
+    @benchmark(f"data_collector.calculate_spi[{_length}]", "indices", length=_length)
+    def _spi(length):
+        from backend.services.data_collector import DataCollector
+
+        collector = DataCollector()
+        precipitation = list(np.random.default_rng(0).gamma(1.5, 3.0, length))
+        return lambda: collector.calculate_spi(precipitation)
+
+    @benchmark(f"data_collector.calculate_spei[{_length}]", "indices", length=_length)
+    def _spei(length):
+        from backend.services.data_collector import DataCollector
+
+        collector = DataCollector()
+        rng = np.random.default_rng(0)
+        precipitation = list(rng.gamma(1.5, 3.0, length))
+        temperature = list(rng.normal(25, 5, length))
+        return lambda: collector.calculate_spei(precipitation, temperature)
+
+@benchmark("data_collector.calculate_ndvi", "indices")
+def _ndvi():
+    from backend.services.data_collector import DataCollector
+
+    collector = DataCollector()
+    bands = {"red": 0.1, "green": 0.15, "blue": 0.05, "nir": 0.3}
+    return lambda: collector.calculate_ndvi(bands)
+
+# Prediction index
+
+for _radius_km in (50, 200):
+    @benchmark(f"prediction_index.nearby[200000,r{_radius_km}km,k10]", "api", radius_km=_radius_km)
+    def _prediction_index_nearby(radius_km):
+        from backend.services.prediction_index import PredictionIndex
+
+        index = PredictionIndex()
+        rng = np.random.default_rng(0)
+        latitudes, longitudes = rng.uniform(-60, 70, 200000), rng.uniform(-180, 180, 200000)
+        for i, (lat, lon, p) in enumerate(zip(latitudes, longitudes, rng.uniform(0, 1, 200000))):
+            index.add(DISASTER_TYPES[i % 3], float(lat), float(lon), {"probability": float(p), "risk_level": "LOW"})
+        queries = list(zip(rng.uniform(-60, 70, 100), rng.uniform(-180, 180, 100)))
+        def run():
+            for lat, lon in queries:
+                index.nearby(lat, lon, radius_km, k=10)
+        return run
+
+# Risk grid tiles
+
+for _zoom in (2, 8):
+    @benchmark(f"risk_grid.render_tile[0.5deg,z{_zoom},png]", "api", zoom=_zoom)
+    def _risk_tile(zoom):
+        from backend.models.risk_grid import build_pyramid, encode_png, grid_axes, render_tile, to_tile_values
+
+        bounds = (-90, 90, -180, 180)
+        latitudes, longitudes = grid_axes(bounds, 0.5)
+        probabilities = np.random.default_rng(0).uniform(0, 1, (len(latitudes), len(longitudes)))
+        pyramid = build_pyramid(to_tile_values(probabilities.astype(np.float16)))
+        x, y = 3 * 2 ** zoom // 4, 2 ** zoom // 3
+        return lambda: encode_png(render_tile(pyramid, bounds, 0.5, zoom, x, y))
+
+# API
+
+@benchmark("api.generate_recommendations", "api")
+def _recommendations():
+    from backend.api.main import generate_recommendations
+
+    cases = [(t, level, p) for t in DISASTER_TYPES
+             for level, p in (("LOW", 0.1), ("MEDIUM", 0.4), ("HIGH", 0.7), ("CRITICAL", 0.9))]
+    def run():
+        for disaster_type, risk_level, probability in cases:
+            generate_recommendations(disaster_type, risk_level, probability)
+    return run
+
+for _cached in (True, False):
+    @benchmark(f"api.predict_roundtrip[{'cached' if _cached else 'uncached'}]", "api", cached=_cached)
+    def _predict_roundtrip(cached):
+        import httpx
+        from backend.api import main
+        from backend.services.http_client import http_client
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(http_client.start())
+        main.models.update(trained_simple_models())
+        saved_cache = main.data_collector.cache
+        if not cached:
+            main.data_collector.cache = None
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+        body = {"location": {"latitude": 40.7128, "longitude": -74.0060}, "disaster_type": "flood"}
+
+        def run():
+            response = loop.run_until_complete(client.post("/api/v1/predict", json=body))
+            if response.status_code != 200:
+                raise RuntimeError(f"predict returned {response.status_code}: {response.text[:200]}")
+
+        def cleanup():
+            main.data_collector.cache = saved_cache
+            loop.run_until_complete(client.aclose())
+            loop.run_until_complete(http_client.close())
+            loop.close()
+
+        return run, cleanup
@@ -0,0 +1,216 @@
+"""
+Benchmark Harness
+Timing, result files and baseline comparison for the micro-benchmarks:
+- Case registry with per-case setup and optional cleanup
+- Auto-ranged loop counts so every sample runs long enough to time
+- Median/min/mean/stdev per call over several samples
+- JSON results with the environment they were measured in
+- Noise-aware regression check against a stored baseline
+"""
+
+import gc
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULT_SCHEMA_VERSION = 1
+
+# Recorded name -> distribution
+PACKAGES = {"numpy": "numpy", "pandas": "pandas", "sklearn": "scikit-learn", "fastapi": "fastapi"}
+
+@dataclass
+class Benchmark:
+    """A registered benchmark case"""
+    name: str
+    group: str
+    # Returns the callable to time, or (callable, cleanup)
+    setup: Callable[[], Any]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+REGISTRY: List[Benchmark] = []
+
+def benchmark(name: str, group: str, **params):
+    """Register a setup function as a benchmark case"""
+    def register(setup: Callable[..., Any]):
+        REGISTRY.append(Benchmark(name=name, group=group, setup=lambda: setup(**params), params=params))
+        return setup
+    return register
+
+def autorange(fn: Callable[[], Any], min_time_s: float) -> int:
+    """Find a loop count whose run takes at least min_time_s"""
+    loops = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= min_time_s or loops >= 1_000_000:
+            return loops
+        # Aim straight for the target instead of growing tenfold every time
+        loops = max(loops * 2, int(loops * min_time_s / max(elapsed, 1e-9) * 1.2))
+
+def measure(fn: Callable[[], Any], min_time_s: float = 0.2, repeats: int = 5) -> Dict:
+    """Time fn, returning per-call statistics in seconds"""
+    fn()  # warm caches and lazy initialization
+    loops = autorange(fn, min_time_s)
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - start_time) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "loops": loops,
+        "repeats": repeats,
+        "ops_per_s": 1.0 / statistics.median(samples) if statistics.median(samples) > 0 else None
+    }
+
+def run_case(case: Benchmark, min_time_s: float, repeats: int) -> Dict:
+    """Set up, time and clean up one case"""
+    prepared = case.setup()
+    fn, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+    try:
+        result = measure(fn, min_time_s, repeats)
+    finally:
+        if cleanup is not None:
+            cleanup()
+    return {"group": case.group, "params": case.params, **result}
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def environment() -> Dict:
+    """Describe where the results were measured"""
+    # Installed versions, whatever the selected cases happened to import
+    versions = {}
+    for name, distribution in PACKAGES.items():
+        try:
+            versions[name] = importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": git_commit(),
+        "packages": versions
+    }
+
+def build_results(results: Dict[str, Dict], settings: Dict) -> Dict:
+    return {
+        "schema": RESULT_SCHEMA_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "settings": settings,
+        "results": results
+    }
+
+def load_results(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_results(path: str, data: Dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def compare(current: Dict, baseline: Dict, threshold: float,
+            metric: str = "min_s") -> Tuple[List[Dict], bool]:
+    """
+    Compare current timings with the baseline
+
+    A case regresses when its ``metric`` (the fastest sample by default,
+    which scheduler noise only ever inflates) is more than ``threshold``
+    (e.g. 0.15 for 15%) slower than the baseline's, and the difference is
+    larger than the two runs' combined sample stdev. Returns one row per
+    case and whether any case regressed.
+    """
+    rows = []
+    regressed = False
+    baseline_results = baseline.get("results", {})
+    for name, result in current["results"].items():
+        previous = baseline_results.get(name)
+        if previous is None:
+            rows.append({"name": name, "status": "new", "value_s": result[metric]})
+            continue
+
+        ratio = result[metric] / previous[metric] if previous[metric] else float("inf")
+        noise = result.get("stdev_s", 0.0) + previous.get("stdev_s", 0.0)
+        beyond_noise = abs(result[metric] - previous[metric]) > noise
+        if ratio > 1 + threshold and beyond_noise:
+            status = "regression"
+            regressed = True
+        elif ratio < 1 - threshold and beyond_noise:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "status": status,
+            "value_s": result[metric],
+            "baseline_s": previous[metric],
+            "ratio": round(ratio, 3)
+        })
+
+    for name in baseline_results:
+        if name not in current["results"]:
+            rows.append({"name": name, "status": "missing", "baseline_s": baseline_results[name][metric]})
+    return rows, regressed
+
+def environment_differences(current: Dict, baseline: Dict) -> List[str]:
+    """
+    Environment fields that differ between two result files
+
+    A package only differs when both sides recorded a version for it.
+    """
+    keys = ("python", "implementation", "machine", "processor", "cpu_count")
+    current_env = current.get("environment", {})
+    baseline_env = baseline.get("environment", {})
+    differences = [key for key in keys if current_env.get(key) != baseline_env.get(key)]
+    current_packages = current_env.get("packages") or {}
+    baseline_packages = baseline_env.get("packages") or {}
+    for name in sorted(set(current_packages) & set(baseline_packages)):
+        if current_packages[name] and baseline_packages[name] and current_packages[name] != baseline_packages[name]:
+            differences.append(name)
+    return differences
+
+def format_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
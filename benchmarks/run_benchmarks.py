@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark Runner
+Runs the hot-path benchmarks offline and tracks them against a baseline:
+
+    python benchmarks/run_benchmarks.py                     # run, compare with baseline.json
+    python benchmarks/run_benchmarks.py --filter sequences  # only matching cases
+    python benchmarks/run_benchmarks.py --save-baseline     # make this run the baseline
+
+Results go to benchmarks/results/latest.json. The exit status is 1 when a
+case's --metric (min_s by default) is slower than the baseline by more
+than --threshold and by more than the runs' combined stdev, and still is
+when the case is measured again (--confirm). Baselines are
+machine specific: against one recorded in a different environment the
+comparison is only reported, unless --strict is given.
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import warnings
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent))
+
+from harness import (REGISTRY, build_results, compare, environment_differences,  # noqa: E402
+                     format_time, load_results, run_case, save_results)
+import cases  # noqa: E402,F401  (registers the benchmark cases)
+
+DEFAULT_BASELINE = str(BENCHMARK_DIR / "baseline.json")
+DEFAULT_OUTPUT = str(BENCHMARK_DIR / "results" / "latest.json")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the micro-benchmarks and compare with a baseline")
+    parser.add_argument("--filter", help="regular expression selecting case names")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per sample")
+    parser.add_argument("--repeats", type=int, default=5, help="samples per case")
+    parser.add_argument("--quick", action="store_true", help="shorter, noisier run (0.05s x 3)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float,
+                        default=float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.15")),
+                        help="allowed slowdown before failing, e.g. 0.15 = 15%%")
+    parser.add_argument("--metric", choices=("min_s", "median_s", "mean_s"), default="min_s",
+                        help="timing compared with the baseline")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="re-measure regressed cases this many times, keeping their best run")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on regressions even against a baseline from another environment")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--no-fail", action="store_true", help="exit 0 even when cases regress")
+    args = parser.parse_args()
+
+    selected = [case for case in REGISTRY if not args.filter or re.search(args.filter, case.name)]
+    if args.list:
+        for case in selected:
+            print(f"{case.group:20} {case.name}")
+        return 0
+    if not selected:
+        print(f"No cases match {args.filter!r}")
+        return 1
+
+    min_time_s, repeats = (0.05, 3) if args.quick else (args.min_time, args.repeats)
+
+    # Keep the library noise (missing DB, deprecations) out of the report
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+
+    results = {}
+    failures = {}
+    for case in selected:
+        try:
+            results[case.name] = run_case(case, min_time_s, repeats)
+        except Exception as e:
+            failures[case.name] = f"{type(e).__name__}: {e}"
+            print(f"{case.name:60} FAILED {failures[case.name]}")
+            continue
+        result = results[case.name]
+        print(f"{case.name:60} {format_time(result['median_s']):>12} "
+              f"(min {format_time(result['min_s'])}, {result['loops']} loops x {repeats})")
+
+    current = build_results(results, {
+        "min_time_s": min_time_s,
+        "repeats": repeats,
+        "filter": args.filter,
+        "failures": failures
+    })
+    save_results(args.output, current)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        save_results(args.baseline, current)
+        print(f"Baseline written to {args.baseline}")
+        return 1 if failures else 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 1 if failures else 0
+
+    rows, regressed = compare(current, baseline, args.threshold, args.metric)
+    for _ in range(args.confirm):
+        suspects = {row["name"] for row in rows if row["status"] == "regression"}
+        if not suspects:
+            break
+        # A one-off stall on a busy machine does not reproduce; a real slowdown does
+        for case in selected:
+            if case.name in suspects:
+                retry = run_case(case, min_time_s, repeats)
+                if retry[args.metric] < current["results"][case.name][args.metric]:
+                    current["results"][case.name] = retry
+        rows, regressed = compare(current, baseline, args.threshold, args.metric)
+    if args.confirm:
+        save_results(args.output, current)
+    if args.filter:
+        # Cases left out by the filter are not missing
+        rows = [row for row in rows if row["status"] != "missing"]
+    print(f"\nCompared {args.metric} with {args.baseline} (threshold {args.threshold:.0%}, "
+          f"baseline commit {baseline.get('environment', {}).get('git_commit')})")
+    for row in rows:
+        if row["status"] == "ok" and "ratio" in row:
+            continue
+        ratio = f"x{row['ratio']:.2f}" if "ratio" in row else ""
+        print(f"  {row['status']:12} {row['name']:60} {format_time(row.get('baseline_s')):>10} -> "
+              f"{format_time(row.get('value_s')):>10} {ratio}")
+    unchanged = sum(1 for row in rows if row["status"] == "ok")
+    print(f"  {unchanged} cases within threshold or noise")
+
+    differences = environment_differences(current, baseline)
+    if differences and regressed and not args.strict:
+        # Another machine's timings say little about this change
+        print(f"  Baseline was measured in a different environment ({', '.join(differences)}); "
+              f"regressions are reported only (pass --strict to fail on them)")
+        regressed = False
+
+    if failures or (regressed and not args.no_fail):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
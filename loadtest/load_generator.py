@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Load Generator
+Drives the prediction and weather routes at a target request rate:
+- Open-loop scheduling, so a slow server does not lower the offered load
+- Weighted mix of /api/v1/predict, /api/v1/predict/city and /api/v1/weather/*
+- Throughput, error and latency percentile report per endpoint
+- Optional JSON report for comparing runs
+
+    python loadtest/load_generator.py --base-url http://127.0.0.1:8000 --rps 200 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+DISASTER_TYPES = ["flood", "drought", "cyclone"]
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "Miami", "London",
+          "Mumbai", "Delhi", "Tokyo", "Manila", "Sydney", "Lagos"]
+WEATHER_ROUTES = ["current", "cyclones", "drought", "rainfall", "forecast/24", "stats"]
+
+DEFAULT_MIX = "predict=6,city=2,weather=2"
+
+@dataclass
+class LoadConfig:
+    """Load generator configuration"""
+    base_url: str = "http://127.0.0.1:8000"
+    rps: float = 50.0
+    duration_s: float = 30.0
+    # Requests allowed in flight before new ones are counted as skipped
+    max_in_flight: int = 1000
+    timeout_s: float = 30.0
+    # Relative weights of the scenarios
+    mix: Dict[str, float] = field(default_factory=lambda: parse_mix(DEFAULT_MIX))
+    # Distinct locations to spread predict requests over
+    locations: int = 500
+    seed: Optional[int] = None
+
+@dataclass
+class Result:
+    """Outcome of one request"""
+    endpoint: str
+    status: int
+    latency_s: float
+    error: Optional[str] = None
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse a scenario mix such as "predict=6,city=2,weather=2" """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+class Scenarios:
+    """Builds the next request for each scenario"""
+
+    def __init__(self, config: LoadConfig):
+        self.random = random.Random(config.seed)
+        # A fixed pool of locations, so location caching behaves like production traffic
+        self.locations = [
+            (round(self.random.uniform(-60, 60), 4), round(self.random.uniform(-180, 180), 4))
+            for _ in range(config.locations)
+        ]
+        self.builders: Dict[str, Callable[[], Tuple[str, str, str, Optional[Dict]]]] = {
+            "predict": self.predict,
+            "city": self.city,
+            "weather": self.weather
+        }
+        unknown = set(config.mix) - set(self.builders)
+        if unknown:
+            raise SystemExit(f"Unknown scenarios in mix: {sorted(unknown)}")
+        self.names = list(config.mix)
+        self.weights = [config.mix[name] for name in self.names]
+
+    def next(self) -> Tuple[str, str, str, Optional[Dict]]:
+        """Get (endpoint label, method, path, JSON body) for the next request"""
+        name = self.random.choices(self.names, weights=self.weights)[0]
+        return self.builders[name]()
+
+    def predict(self):
+        latitude, longitude = self.random.choice(self.locations)
+        return "POST /api/v1/predict", "POST", "/api/v1/predict", {
+            "location": {"latitude": latitude, "longitude": longitude},
+            "disaster_type": self.random.choice(DISASTER_TYPES)
+        }
+
+    def city(self):
+        return "POST /api/v1/predict/city", "POST", "/api/v1/predict/city", {
+            "city_name": self.random.choice(CITIES),
+            "disaster_type": self.random.choice(DISASTER_TYPES)
+        }
+
+    def weather(self):
+        route = self.random.choice(WEATHER_ROUTES)
+        label = "GET /api/v1/weather/forecast/{hours}" if route.startswith("forecast") else f"GET /api/v1/weather/{route}"
+        return label, "GET", f"/api/v1/weather/{route}", None
+
+async def send(session: aiohttp.ClientSession, base_url: str, endpoint: str, method: str,
+               path: str, body: Optional[Dict], scheduled_at: float) -> Result:
+    """Send one request, timing it from its scheduled start"""
+    try:
+        async with session.request(method, base_url + path, json=body) as response:
+            await response.read()
+            return Result(endpoint, response.status, time.perf_counter() - scheduled_at)
+    except Exception as e:
+        return Result(endpoint, 0, time.perf_counter() - scheduled_at, error=type(e).__name__)
+
+async def run_load(config: LoadConfig) -> Dict:
+    """
+    Offer config.rps requests per second for config.duration_s seconds
+
+    Latency is measured from when a request was due, not when it was sent,
+    so queueing inside the generator counts against the server instead of
+    hiding it (no coordinated omission).
+    """
+    scenarios = Scenarios(config)
+    results: List[Result] = []
+    skipped = 0
+    in_flight = set()
+    interval = 1.0 / config.rps
+    total = int(config.rps * config.duration_s)
+
+    connector = aiohttp.TCPConnector(limit=config.max_in_flight)
+    timeout = aiohttp.ClientTimeout(total=config.timeout_s)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started_at = time.perf_counter()
+        for i in range(total):
+            scheduled_at = started_at + i * interval
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if len(in_flight) >= config.max_in_flight:
+                skipped += 1
+                continue
+
+            task = asyncio.create_task(send(session, config.base_url, *scenarios.next(), scheduled_at))
+            in_flight.add(task)
+            task.add_done_callback(lambda t: (in_flight.discard(t), results.append(t.result())))
+
+        offered_s = time.perf_counter() - started_at
+        if in_flight:
+            await asyncio.wait(list(in_flight))
+        elapsed_s = time.perf_counter() - started_at
+
+    return build_report(config, results, skipped, offered_s, elapsed_s)
+
+def latency_summary(latencies: List[float]) -> Dict:
+    """Latency percentiles in milliseconds"""
+    if not latencies:
+        return {"p50_ms": 0.0, "p90_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "mean_ms": 0.0}
+    values = np.asarray(latencies) * 1000
+    p50, p90, p95, p99 = np.percentile(values, [50, 90, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p90_ms": round(float(p90), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(values.max()), 2),
+        "mean_ms": round(float(values.mean()), 2)
+    }
+
+def build_report(config: LoadConfig, results: List[Result], skipped: int,
+                 offered_s: float, elapsed_s: float) -> Dict:
+    """Summarize results overall and per endpoint"""
+    by_endpoint: Dict[str, List[Result]] = defaultdict(list)
+    for result in results:
+        by_endpoint[result.endpoint].append(result)
+
+    def summarize(group: List[Result]) -> Dict:
+        ok = [r for r in group if 200 <= r.status < 400]
+        statuses = Counter(str(r.status) if r.status else r.error for r in group if not 200 <= r.status < 400)
+        return {
+            "requests": len(group),
+            "ok": len(ok),
+            "errors": len(group) - len(ok),
+            "error_rate": round((len(group) - len(ok)) / len(group), 4) if group else 0.0,
+            "throughput_rps": round(len(ok) / elapsed_s, 2) if elapsed_s else 0.0,
+            "errors_by_status": dict(statuses),
+            # Successful requests only, so fast failures do not flatter the numbers
+            "latency": latency_summary([r.latency_s for r in ok])
+        }
+
+    return {
+        "config": {
+            "base_url": config.base_url,
+            "target_rps": config.rps,
+            "duration_s": config.duration_s,
+            "mix": config.mix,
+            "max_in_flight": config.max_in_flight
+        },
+        "offered_rps": round((len(results) + skipped) / offered_s, 2) if offered_s else 0.0,
+        "elapsed_s": round(elapsed_s, 2),
+        "skipped_max_in_flight": skipped,
+        "overall": summarize(results),
+        "endpoints": {endpoint: summarize(group) for endpoint, group in sorted(by_endpoint.items())}
+    }
+
+def print_report(report: Dict):
+    """Print the report as a table"""
+    overall = report["overall"]
+    print(f"\nTarget {report['config']['target_rps']} rps, offered {report['offered_rps']} rps, "
+          f"{report['elapsed_s']}s, skipped {report['skipped_max_in_flight']}")
+    header = f"{'endpoint':42} {'reqs':>7} {'err%':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("overall", overall)]
+    for endpoint, stats in rows:
+        latency = stats["latency"]
+        print(f"{endpoint:42} {stats['requests']:>7} {stats['error_rate'] * 100:>6.2f} {stats['throughput_rps']:>8.1f} "
+              f"{latency['p50_ms']:>8.1f} {latency['p95_ms']:>8.1f} {latency['p99_ms']:>8.1f} {latency['max_ms']:>8.1f}")
+    if overall["errors_by_status"]:
+        print(f"errors: {overall['errors_by_status']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the API at a target request rate")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. predict=6,city=2,weather=2")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--locations", type=int, default=500, help="distinct predict locations")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        base_url=args.base_url.rstrip("/"),
+        rps=args.rps,
+        duration_s=args.duration,
+        max_in_flight=args.max_in_flight,
+        timeout_s=args.timeout,
+        mix=parse_mix(args.mix),
+        locations=args.locations,
+        seed=args.seed
+    )
+    report = asyncio.run(run_load(config))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Replay Upstream Server
+Local stand-in for the external APIs the backend calls, serving the
+recorded data_collection_*.json payloads:
+- OpenWeatherMap current weather and forecast
+- NOAA / NWS points
+- NASA and USGS satellite endpoints
+- Nominatim geocoding (search and reverse)
+- IoT sensor gateway
+- Configurable latency, jitter, error and timeout injection
+
+Run it, then start the API with the printed environment variables:
+
+    python loadtest/replay_server.py --port 8090 --latency-ms 40 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Known cities for geocoding; other names get a stable pseudo-location
+CITIES = {
+    "new york": (40.7128, -74.0060, "United States", "us"),
+    "los angeles": (34.0522, -118.2437, "United States", "us"),
+    "chicago": (41.8781, -87.6298, "United States", "us"),
+    "houston": (29.7604, -95.3698, "United States", "us"),
+    "miami": (25.7617, -80.1918, "United States", "us"),
+    "london": (51.5074, -0.1278, "United Kingdom", "gb"),
+    "mumbai": (19.0760, 72.8777, "India", "in"),
+    "delhi": (28.6139, 77.2090, "India", "in"),
+    "tokyo": (35.6762, 139.6503, "Japan", "jp"),
+    "manila": (14.5995, 120.9842, "Philippines", "ph"),
+    "sydney": (-33.8688, 151.2093, "Australia", "au"),
+    "lagos": (6.5244, 3.3792, "Nigeria", "ng")
+}
+
+@dataclass
+class ReplayConfig:
+    """Replay server configuration"""
+    host: str = "127.0.0.1"
+    port: int = 8090
+    recordings: str = "data_collection_*.json"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Share of requests answered with a 503
+    error_rate: float = 0.0
+    # Share of requests that hang for timeout_ms before answering
+    timeout_rate: float = 0.0
+    timeout_ms: float = 15000.0
+    # Per-upstream latency overrides, e.g. {"nominatim": 250}
+    upstream_latency_ms: Dict[str, float] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+class Recordings:
+    """Recorded collection payloads served round-robin"""
+
+    def __init__(self, pattern: str):
+        self.payloads: List[Dict] = []
+        for path in sorted(glob.glob(pattern)):
+            try:
+                with open(path) as f:
+                    self.payloads.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping recording {path}: {e}")
+        if not self.payloads:
+            raise SystemExit(f"No recordings match {pattern}")
+        self._next = count()
+
+    def next(self) -> Dict:
+        """Get the next recorded payload"""
+        return self.payloads[next(self._next) % len(self.payloads)]
+
+def weather_current(payload: Dict) -> Dict:
+    """Recorded current weather, preferring OpenWeatherMap over NOAA"""
+    weather = payload.get("weather") or {}
+    for provider in ("openweather", "noaa", "nws"):
+        current = (weather.get(provider) or {}).get("current")
+        if current:
+            return current
+    return {}
+
+def weather_forecast(payload: Dict) -> List[Dict]:
+    """Recorded hourly forecast, preferring OpenWeatherMap over NOAA"""
+    weather = payload.get("weather") or {}
+    for provider in ("openweather", "noaa", "nws"):
+        forecast = (weather.get(provider) or {}).get("forecast")
+        if forecast:
+            return forecast
+    return []
+
+def openweather_item(values: Dict, dt: int) -> Dict:
+    """Shape recorded values like an OpenWeatherMap response item"""
+    return {
+        "dt": dt,
+        "main": {
+            "temp": values.get("temperature", 20.0),
+            "humidity": values.get("humidity", 50.0),
+            "pressure": values.get("pressure", 1013.25)
+        },
+        "wind": {
+            "speed": values.get("wind_speed", 0.0),
+            "deg": values.get("wind_direction", 0)
+        },
+        "rain": {"1h": values.get("precipitation", 0.0), "3h": values.get("precipitation", 0.0)},
+        "visibility": values.get("visibility", 10.0) * 1000,
+        "weather": [{"description": values.get("description") or values.get("conditions") or "clear sky"}]
+    }
+
+def city_location(name: str):
+    """Look up or derive a stable location for a city name"""
+    key = name.strip().lower()
+    if key in CITIES:
+        return CITIES[key]
+    digest = hashlib.sha1(key.encode()).digest()
+    latitude = (int.from_bytes(digest[:4], "big") / 2 ** 32) * 120 - 60
+    longitude = (int.from_bytes(digest[4:8], "big") / 2 ** 32) * 360 - 180
+    return (round(latitude, 4), round(longitude, 4), "Replayland", "rl")
+
+def nominatim_place(name: str) -> Dict:
+    latitude, longitude, country, country_code = city_location(name)
+    return {
+        "lat": str(latitude),
+        "lon": str(longitude),
+        "display_name": f"{name.title()}, {country}",
+        "type": "city",
+        "address": {"city": name.title(), "country": country, "country_code": country_code}
+    }
+
+class ReplayServer:
+    """
+    aiohttp application serving recorded upstream responses
+
+    Every upstream lives under its own path prefix, so one process stands
+    in for all of them; ``env()`` lists the backend variables to set.
+    """
+
+    def __init__(self, config: ReplayConfig):
+        self.config = config
+        self.recordings = Recordings(config.recordings)
+        self.random = random.Random(config.seed)
+        self.requests: Counter = Counter()
+        self.injected: Counter = Counter()
+        self.started_at = time.time()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.config.host}:{self.config.port}"
+
+    def env(self) -> Dict[str, str]:
+        """Backend environment variables pointing every upstream at this server"""
+        return {
+            "OPENWEATHER_API_URL": f"{self.base_url}/openweather/data/2.5",
+            "OPENWEATHER_API_KEY": "replay",
+            "NOAA_API_URL": f"{self.base_url}/noaa",
+            "NWS_API_URL": f"{self.base_url}/noaa",
+            "NASA_API_URL": f"{self.base_url}/nasa",
+            "NASA_API_KEY": "replay",
+            "USGS_API_URL": f"{self.base_url}/usgs",
+            "GEOCODING_API_URL": f"{self.base_url}/nominatim",
+            "SENSOR_API_URL": f"{self.base_url}/sensors",
+            "TWILIO_API_URL": f"{self.base_url}/twilio",
+            "EMAIL_API_URL": f"{self.base_url}/email",
+            "PUSH_API_URL": f"{self.base_url}/push"
+        }
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.inject_faults])
+        app.add_routes([
+            web.get("/openweather/data/2.5/weather", self.openweather_current),
+            web.get("/openweather/data/2.5/forecast", self.openweather_forecast),
+            web.get("/noaa/points/{point}", self.noaa_points),
+            web.get("/nasa/planetary/apod", self.nasa_apod),
+            web.get("/usgs/api/v1/collections", self.usgs_collections),
+            web.get("/nominatim/search", self.nominatim_search),
+            web.get("/nominatim/reverse", self.nominatim_reverse),
+            web.get("/sensors/health", self.sensor_health),
+            web.get("/sensors/{kind}", self.sensor_readings),
+            web.post("/twilio/{path:.*}", self.accept_notification),
+            web.post("/email/send", self.accept_notification),
+            web.post("/push/send", self.accept_notification),
+            web.get("/replay/stats", self.stats)
+        ])
+        return app
+
+    @web.middleware
+    async def inject_faults(self, request: web.Request, handler):
+        """Apply configured latency, errors and timeouts to upstream routes"""
+        upstream = request.path.strip("/").split("/", 1)[0]
+        if upstream == "replay":
+            return await handler(request)
+        self.requests[upstream] += 1
+
+        latency_ms = self.config.upstream_latency_ms.get(upstream, self.config.latency_ms)
+        if self.config.jitter_ms:
+            latency_ms = max(0.0, latency_ms + self.random.uniform(-self.config.jitter_ms, self.config.jitter_ms))
+
+        roll = self.random.random()
+        if roll < self.config.timeout_rate:
+            self.injected["timeout"] += 1
+            latency_ms += self.config.timeout_ms
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        if roll >= self.config.timeout_rate and roll < self.config.timeout_rate + self.config.error_rate:
+            self.injected["error"] += 1
+            return web.json_response({"error": "injected failure"}, status=503)
+        return await handler(request)
+
+    async def openweather_current(self, request: web.Request) -> web.Response:
+        payload = self.recordings.next()
+        body = openweather_item(weather_current(payload), int(time.time()))
+        body["coord"] = {"lat": float(request.query.get("lat", 0)), "lon": float(request.query.get("lon", 0))}
+        return web.json_response(body)
+
+    async def openweather_forecast(self, request: web.Request) -> web.Response:
+        # Recorded hourly steps, re-based onto the current time
+        now = int(time.time())
+        forecast = weather_forecast(self.recordings.next())
+        return web.json_response({
+            "cnt": len(forecast),
+            "list": [openweather_item(step, now + (i + 1) * 3600) for i, step in enumerate(forecast)]
+        })
+
+    async def noaa_points(self, request: web.Request) -> web.Response:
+        point = request.match_info["point"]
+        return web.json_response({
+            "id": f"{self.base_url}/noaa/points/{point}",
+            "properties": {
+                "forecast": f"{self.base_url}/noaa/gridpoints/OKX/33,35/forecast",
+                "observation": weather_current(self.recordings.next())
+            }
+        })
+
+    async def nasa_apod(self, request: web.Request) -> web.Response:
+        return web.json_response({"date": time.strftime("%Y-%m-%d"), "title": "Replay", "media_type": "image"})
+
+    async def usgs_collections(self, request: web.Request) -> web.Response:
+        satellite = self.recordings.next().get("satellite") or {}
+        return web.json_response({
+            "collections": [
+                {"id": payload.get("collection", name), "bands": payload.get("bands", {})}
+                for name, payload in satellite.items() if isinstance(payload, dict)
+            ]
+        })
+
+    async def nominatim_search(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "").strip()
+        if not query:
+            return web.json_response([])
+        limit = int(request.query.get("limit", 1))
+        return web.json_response([nominatim_place(query)][:limit])
+
+    async def nominatim_reverse(self, request: web.Request) -> web.Response:
+        latitude = float(request.query.get("lat", 0))
+        longitude = float(request.query.get("lon", 0))
+        name, (_, _, country, _) = min(
+            CITIES.items(),
+            key=lambda item: (item[1][0] - latitude) ** 2 + (item[1][1] - longitude) ** 2
+        )
+        return web.json_response({
+            "display_name": f"{name.title()}, {country}",
+            "address": {"city": name.title(), "country": country}
+        })
+
+    async def sensor_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def sensor_readings(self, request: web.Request) -> web.Response:
+        sensors = self.recordings.next().get("sensors") or {}
+        kind = request.match_info["kind"]
+        if kind not in sensors:
+            return web.json_response({"error": f"unknown sensor kind {kind}"}, status=404)
+        return web.json_response(sensors[kind])
+
+    async def accept_notification(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "accepted"}, status=201 if request.path.startswith("/twilio") else 200)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "recordings": len(self.recordings.payloads),
+            "requests": dict(self.requests),
+            "injected": dict(self.injected)
+        })
+
+def parse_upstream_latency(values: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values or []:
+        upstream, _, latency_ms = value.partition("=")
+        overrides[upstream] = float(latency_ms)
+    return overrides
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded upstream payloads for load testing")
+    parser.add_argument("--host", default=os.getenv("REPLAY_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("REPLAY_PORT", "8090")))
+    parser.add_argument("--recordings", default="data_collection_*.json", help="glob of recorded payloads")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests delayed by --timeout-ms")
+    parser.add_argument("--timeout-ms", type=float, default=15000.0)
+    parser.add_argument("--upstream-latency", action="append", metavar="UPSTREAM=MS",
+                        help="per-upstream latency, e.g. nominatim=250 (repeatable)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = ReplayServer(ReplayConfig(
+        host=args.host,
+        port=args.port,
+        recordings=args.recordings,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_ms=args.timeout_ms,
+        upstream_latency_ms=parse_upstream_latency(args.upstream_latency),
+        seed=args.seed
+    ))
+
+    print(f"Replaying {len(server.recordings.payloads)} recordings on {server.base_url}")
+    print("Start the API with:")
+    for name, value in server.env().items():
+        print(f"  export {name}={value}")
+    web.run_app(server.build_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
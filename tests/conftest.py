@@ -0,0 +1,19 @@
+"""
+Shared test fixtures
+"""
+
+import asyncio
+import time
+
+import pytest
+
+async def _wait_until(condition, timeout_s: float = 5.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the condition"
+        await asyncio.sleep(0.005)
+
+@pytest.fixture
+def wait_until():
+    """Await wait_until(condition) in async test code to poll until the condition holds"""
+    return _wait_until
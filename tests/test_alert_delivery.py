@@ -0,0 +1,229 @@
+"""
+Alert delivery against a mock HTTP push provider
+"""
+
+import asyncio
+import time
+from dataclasses import replace
+
+import pytest
+from aiohttp import web
+
+from backend.services import alert_delivery
+from backend.services.alert_delivery import AlertDeliveryService, ChannelConfig, DeliveryConfig, new_job
+from backend.services.http_client import http_client
+
+class MockProvider:
+    """Batch push endpoint answering with scripted (status, results) responses"""
+
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.responses = []
+        self.requests = []
+        self.url = None
+        self._runner = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        messages = (await request.json())["messages"]
+        self.requests.append((time.monotonic(), [m["token"] for m in messages]))
+        if self.delay_s:
+            await asyncio.sleep(self.delay_s)
+        status, results = self.responses.pop(0) if self.responses else (200, None)
+        if results is None:
+            results = [{"ok": True} for _ in messages]
+        return web.json_response({"results": results}, status=status)
+
+    @property
+    def delivered(self):
+        return [token for _, tokens in self.requests for token in tokens]
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/send", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await http_client.close()
+        await self._runner.cleanup()
+
+@pytest.fixture
+def config() -> DeliveryConfig:
+    """Fast retries and one worker per channel; tests point push_api_url at their provider"""
+    return DeliveryConfig(max_attempts=3, backoff_base_s=0.01, backoff_max_s=0.05, dedup_window_s=3600, channels={
+        "sms": ChannelConfig(workers=1, rate_per_s=1000, burst=1000, batch_size=1),
+        "email": ChannelConfig(workers=1, rate_per_s=1000, burst=1000, batch_size=10),
+        "push": ChannelConfig(workers=1, rate_per_s=1000, burst=1000, batch_size=10)
+    })
+
+def push_job(i: int, risk_level: str = "HIGH"):
+    return new_job("push", {"subscription_id": f"sub-{i}", "user_id": f"user-{i}"},
+                   "flood", risk_level, "River levels rising", f"token-{i}")
+
+def counters(service: AlertDeliveryService):
+    return service.metrics["push"].counters
+
+def test_rate_limit_spaces_out_batches(config, wait_until):
+    async def scenario():
+        async with MockProvider() as provider:
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url, channels={
+                **config.channels, "push": ChannelConfig(workers=1, rate_per_s=50, burst=10, batch_size=10)
+            }))
+            start = time.monotonic()
+            for i in range(40):
+                assert service.enqueue(push_job(i)) == "queued"
+            await wait_until(lambda: counters(service)["sent"] == 40)
+            elapsed = time.monotonic() - start
+            await service.stop()
+
+        # 10 tokens up front, the other 30 at 50 per second
+        assert elapsed >= 0.5
+        assert all(len(tokens) <= 10 for _, tokens in provider.requests)
+        assert sorted(provider.delivered) == sorted(f"token-{i}" for i in range(40))
+
+    asyncio.run(scenario())
+
+def test_duplicate_alert_is_sent_once(config, wait_until):
+    async def scenario():
+        async with MockProvider() as provider:
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url))
+            assert service.enqueue(push_job(1)) == "queued"
+            assert service.enqueue(push_job(1)) == "deduplicated"
+            # Another risk level is a different alert
+            assert service.enqueue(push_job(1, "CRITICAL")) == "queued"
+            await wait_until(lambda: counters(service)["sent"] == 2)
+            await service.stop()
+
+        assert provider.delivered == ["token-1", "token-1"]
+        assert counters(service)["deduplicated"] == 1
+
+    asyncio.run(scenario())
+
+def test_retryable_failure_is_retried_after_backoff(monkeypatch, config, wait_until):
+    # Take the top of the jitter range, so the delay is the full backoff
+    monkeypatch.setattr(alert_delivery.random, "uniform", lambda low, high: high)
+
+    async def scenario():
+        async with MockProvider() as provider:
+            provider.responses = [(503, []), (503, [])]
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url, backoff_base_s=0.05, backoff_max_s=1.0))
+            service.enqueue(push_job(1))
+            await wait_until(lambda: counters(service)["sent"] == 1)
+            await service.stop()
+
+        times = [at for at, _ in provider.requests]
+        assert len(times) == 3
+        # base * 2^attempt: 0.1s after the first attempt, 0.2s after the second
+        assert times[1] - times[0] >= 0.1
+        assert times[2] - times[1] >= 0.2
+        assert counters(service)["retried"] == 2
+        assert not service.dead_letters
+
+    asyncio.run(scenario())
+
+def test_jobs_missing_from_a_short_result_list_are_retried(config, wait_until):
+    async def scenario():
+        async with MockProvider() as provider:
+            provider.responses = [(200, [{"ok": True}, {"ok": True}])]
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url))
+            for i in range(5):
+                service.enqueue(push_job(i))
+            await wait_until(lambda: counters(service)["sent"] == 5)
+            await service.stop()
+
+        assert provider.requests[0][1] == [f"token-{i}" for i in range(5)]
+        # Each unconfirmed job is retried on its own backoff
+        assert sorted(provider.delivered[5:]) == ["token-2", "token-3", "token-4"]
+        assert counters(service)["retried"] == 3
+
+    asyncio.run(scenario())
+
+def test_rejected_and_exhausted_jobs_are_dead_lettered(config, wait_until):
+    async def scenario():
+        async with MockProvider() as provider:
+            provider.responses = [(200, [{"ok": False, "error": "unregistered token"}])]
+            provider.responses += [(503, [])] * 3
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url, channels={
+                **config.channels, "push": ChannelConfig(workers=1, rate_per_s=1000, burst=1000, batch_size=1)
+            }))
+            service.enqueue(push_job(1))
+            await wait_until(lambda: counters(service)["dead_lettered"] == 1)
+            service.enqueue(push_job(2))
+            await wait_until(lambda: counters(service)["dead_lettered"] == 2)
+            # A dead-lettered alert may be raised again by the next evaluation
+            assert service.enqueue(push_job(1)) == "queued"
+            await wait_until(lambda: counters(service)["sent"] == 1)
+            await service.stop()
+
+        rejected, exhausted = service.get_dead_letters()
+        # Not retryable: dead-lettered on the first attempt
+        assert (rejected["recipient"], rejected["attempts"], rejected["last_error"]) == ("token-1", 1, "unregistered token")
+        assert (exhausted["recipient"], exhausted["attempts"], exhausted["last_error"]) == ("token-2", 3, "HTTP 503")
+
+    asyncio.run(scenario())
+
+def test_stop_drains_queued_jobs(config):
+    async def scenario():
+        async with MockProvider(delay_s=0.02) as provider:
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url, channels={
+                **config.channels, "push": ChannelConfig(workers=1, rate_per_s=1000, burst=1000, batch_size=5)
+            }))
+            for i in range(20):
+                service.enqueue(push_job(i))
+            await service.stop(drain_timeout_s=5)
+
+        assert not service.running
+        assert counters(service)["sent"] == 20
+        assert len(provider.delivered) == 20
+        assert not service.dead_letters
+
+    asyncio.run(scenario())
+
+def test_stop_dead_letters_jobs_it_cannot_deliver(config, wait_until):
+    async def scenario():
+        async with MockProvider() as provider:
+            provider.responses = [(503, [])]
+            # The retry would come long after shutdown
+            service = AlertDeliveryService(replace(config, push_api_url=provider.url, backoff_base_s=30, backoff_max_s=60))
+            service.enqueue(push_job(1))
+            await wait_until(lambda: service.get_stats()["pending_retries"] == 1)
+            await service.stop(drain_timeout_s=1)
+
+        assert service.get_stats()["pending_retries"] == 0
+        [dead] = service.get_dead_letters()
+        assert dead["recipient"] == "token-1"
+        assert dead["last_error"].startswith("undelivered at shutdown")
+        assert counters(service)["dead_lettered"] == 1
+
+    asyncio.run(scenario())
+
+def test_jobs_for_an_unconfigured_provider_are_skipped_not_sent(config, wait_until):
+    async def scenario():
+        service = AlertDeliveryService(replace(config, push_api_url=""))
+        outcomes = []
+        service.outcome_listeners.append(lambda job, status: outcomes.append((job.recipient, status)))
+        for i in range(3):
+            service.enqueue(push_job(i))
+        await wait_until(lambda: len(outcomes) == 3)
+        await service.stop()
+        return service, outcomes
+
+    service, outcomes = asyncio.run(scenario())
+    assert sorted(outcomes) == [(f"token-{i}", "skipped") for i in range(3)]
+    assert counters(service)["skipped"] == 3 and counters(service)["sent"] == 0
+    assert not service.dead_letters
+
+def test_token_bucket_charges_batches_larger_than_its_capacity():
+    async def scenario():
+        bucket = alert_delivery.TokenBucket(rate_per_s=100, capacity=10)
+        start = time.monotonic()
+        await bucket.acquire(30)
+        return time.monotonic() - start
+
+    # 10 tokens up front, the other 20 at 100 per second
+    assert asyncio.run(scenario()) >= 0.18
@@ -0,0 +1,62 @@
+"""
+Alert history records following their deliveries
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.services.alert_history import AlertHistoryConfig, AlertHistoryStore
+from backend.services.alert_system import AlertSystem
+from backend.services.http_client import http_client
+
+def make_record(alert_id: str, sent_at: datetime, delivery: dict) -> dict:
+    return {
+        "alert_id": alert_id,
+        "user_id": "user-1",
+        "disaster_type": "flood",
+        "message": "River levels rising",
+        "prediction": {"risk_level": "HIGH"},
+        "sent_at": sent_at,
+        "alert_types": list(delivery),
+        "delivery": dict(delivery)
+    }
+
+def test_status_counts_follow_updates_and_expiry():
+    store = AlertHistoryStore(AlertHistoryConfig(retention_hours=1))
+    start = datetime(2026, 1, 1, 12)
+    store.add(make_record("a-1", start, {"sms": "queued", "push": "queued"}))
+    assert store.update_delivery("a-1", "sms", "sent")
+    assert store.update_delivery("a-1", "push", "retrying")
+    assert store.update_delivery("a-1", "push", "dead_lettered")
+    # Unknown alerts and channels the alert was not sent on are ignored
+    assert not store.update_delivery("a-2", "sms", "sent")
+    assert not store.update_delivery("a-1", "email", "sent")
+    assert store.get_stats()["delivery_status_counts"] == {"sent": 1, "dead_lettered": 1}
+
+    # Expiring the record removes its final statuses, not the queued ones
+    store.add(make_record("a-2", start + timedelta(hours=2), {"email": "queued"}))
+    assert store.get_stats()["delivery_status_counts"] == {"queued": 1}
+
+def test_alert_record_reflects_final_delivery_outcome(wait_until):
+    async def scenario():
+        system = AlertSystem()
+        system.delivery.config.max_attempts = 1
+        # Nothing listens there: the push send fails and is dead-lettered
+        system.delivery.config.push_api_url = "http://127.0.0.1:9"
+        subscription = {"subscription_id": "sub-1", "user_id": "user-1", "alert_types": ["email", "push"]}
+        prediction = {"probability": 0.9, "risk_level": "HIGH", "confidence": 0.8}
+
+        await system.send_alert(subscription, "flood", prediction)
+        [record] = await system.get_user_alerts("user-1")
+        assert record["delivery"] == {"email": "queued", "push": "queued"}
+
+        await wait_until(lambda: "queued" not in record["delivery"].values())
+        await system.delivery.stop()
+        await http_client.close()
+
+        # No email provider configured: the email is logged and skipped, not sent
+        assert record["delivery"] == {"email": "skipped", "push": "dead_lettered"}
+        stats = await system.get_alert_statistics()
+        assert stats["delivery_status_counts"] == {"skipped": 1, "dead_lettered": 1}
+
+    asyncio.run(scenario())
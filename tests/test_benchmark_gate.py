@@ -0,0 +1,90 @@
+"""
+Benchmark baseline comparison and the run_benchmarks exit status
+"""
+
+import sys
+
+import pytest
+
+import harness
+import run_benchmarks
+from harness import Benchmark, build_results, compare, environment_differences, save_results
+
+def timing(seconds: float, stdev: float = 0.0, median: float = None) -> dict:
+    return {"group": "test", "params": {}, "min_s": seconds, "median_s": median or seconds,
+            "mean_s": median or seconds, "stdev_s": stdev, "loops": 1, "repeats": 3}
+
+def results(**cases) -> dict:
+    return {"environment": harness.environment(), "results": cases}
+
+def statuses(current: dict, baseline: dict) -> dict:
+    rows, _ = compare(current, baseline, threshold=0.15)
+    return {row["name"]: row["status"] for row in rows}
+
+def test_compare_needs_threshold_and_noise_to_be_exceeded():
+    baseline = results(slow=timing(1.0, 0.01), noisy=timing(1.0, 0.2), fast=timing(1.0, 0.01), gone=timing(1.0))
+    current = results(slow=timing(1.3, 0.01), noisy=timing(1.3, 0.2), fast=timing(0.7, 0.01), added=timing(1.0))
+
+    assert statuses(current, baseline) == {
+        "slow": "regression", "noisy": "ok", "fast": "improvement", "added": "new", "gone": "missing"
+    }
+
+def test_compare_uses_the_fastest_sample_by_default():
+    baseline = results(case=timing(1.0))
+    # A stalled sample inflates the median but not the minimum
+    current = results(case=timing(1.02, median=1.5))
+    assert statuses(current, baseline) == {"case": "ok"}
+    rows, regressed = compare(current, baseline, threshold=0.15, metric="median_s")
+    assert regressed and rows[0]["status"] == "regression"
+
+def test_environment_differences_ignore_packages_missing_on_one_side():
+    current = {"environment": {"machine": "x86_64", "packages": {"numpy": "2.0", "fastapi": None}}}
+    baseline = {"environment": {"machine": "x86_64", "packages": {"numpy": "2.0", "fastapi": "0.104.1"}}}
+    assert environment_differences(current, baseline) == []
+
+    baseline["environment"]["packages"]["numpy"] = "1.26"
+    baseline["environment"]["machine"] = "arm64"
+    assert environment_differences(current, baseline) == ["machine", "numpy"]
+
+def test_installed_versions_do_not_depend_on_imports():
+    assert harness.environment()["packages"]["numpy"] is not None
+    assert harness.environment()["packages"]["fastapi"] is not None
+
+@pytest.fixture
+def gate(tmp_path, monkeypatch):
+    """Runs run_benchmarks.main() over one fake case whose timings come from a list"""
+    timings = []
+    case = Benchmark(name="case", group="test", setup=lambda: None)
+    monkeypatch.setattr(run_benchmarks, "REGISTRY", [case])
+    monkeypatch.setattr(run_benchmarks, "run_case", lambda case, min_time_s, repeats: timings.pop(0))
+    baseline_path = str(tmp_path / "baseline.json")
+
+    def run(baseline: dict, measured: list, *flags) -> int:
+        save_results(baseline_path, baseline)
+        timings[:] = measured
+        monkeypatch.setattr(sys, "argv", ["run_benchmarks.py", "--baseline", baseline_path,
+                                          "--output", str(tmp_path / "latest.json"), *flags])
+        return run_benchmarks.main()
+    return run
+
+def baseline_results(**environment) -> dict:
+    baseline = build_results({"case": timing(1.0, 0.01)}, {})
+    baseline["environment"].update(environment)
+    return baseline
+
+def test_gate_fails_on_a_reproduced_regression(gate):
+    assert gate(baseline_results(), [timing(1.3, 0.01)] * 3) == 1
+    assert gate(baseline_results(), [timing(1.3, 0.01)] * 3, "--no-fail") == 0
+
+def test_gate_passes_when_re_measuring_clears_a_stall(gate):
+    assert gate(baseline_results(), [timing(1.3, 0.01), timing(1.01, 0.01)]) == 0
+
+def test_gate_only_reports_against_another_environment(gate):
+    other = baseline_results(machine="arm64")
+    assert gate(other, [timing(1.3, 0.01)] * 3) == 0
+    assert gate(other, [timing(1.3, 0.01)] * 3, "--strict") == 1
+
+def test_gate_still_fails_when_a_package_is_unrecorded(gate):
+    baseline = baseline_results()
+    baseline["environment"]["packages"]["fastapi"] = None
+    assert gate(baseline, [timing(1.3, 0.01)] * 3) == 1
@@ -0,0 +1,101 @@
+"""
+Micro-batcher shutdown, hot swap and stats with in-process networks
+"""
+
+import threading
+import time
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from backend.services.inference_scheduler import (BatcherClosed, InferenceConfig, InferenceScheduler,
+                                                  MicroBatcher)
+
+class FakeNetwork:
+    """Doubles its inputs; can hold forward passes until released"""
+
+    def __init__(self):
+        self.open = threading.Event()
+        self.open.set()
+
+    def predict_on_batch(self, inputs):
+        self.open.wait()
+        return inputs * 2
+
+@pytest.fixture
+def config() -> InferenceConfig:
+    return InferenceConfig(enabled=True, max_batch_size=4, max_wait_ms=1.0, queue_size=4)
+
+def test_close_with_full_queue_does_not_block_and_drains(config):
+    network = FakeNetwork()
+    network.open.clear()
+    batcher = MicroBatcher("test", network.predict_on_batch, config, model=network)
+    futures = [batcher.submit(np.array([[1.0]]))]
+    # Fill the queue behind the pass that is held open
+    while batcher._queue.qsize():
+        time.sleep(0.005)
+    time.sleep(0.01)
+    futures += [batcher.submit(np.array([[1.0]])) for _ in range(batcher.config.queue_size)]
+
+    closer = threading.Thread(target=batcher.close, daemon=True)
+    closer.start()
+    closer.join(timeout=1.0)
+    assert not closer.is_alive()
+
+    try:
+        batcher.submit(np.array([[1.0]]))
+        assert False, "a closed batcher accepted a request"
+    except BatcherClosed:
+        pass
+
+    network.open.set()
+    for future in futures:
+        assert future.result(timeout=2.0).shape == (1, 1)
+    batcher._worker.join(timeout=2.0)
+    assert not batcher._worker.is_alive()
+
+class SwappingScheduler(InferenceScheduler):
+    """Hands out a batcher that a concurrent reload closes before the caller submits"""
+
+    def __init__(self, config: InferenceConfig):
+        super().__init__(config)
+        self.swaps = 1
+
+    def batcher(self, name, network):
+        batcher = super().batcher(name, network)
+        if self.swaps:
+            self.swaps -= 1
+            batcher.close()
+            self._batchers.pop(name)
+        return batcher
+
+def test_submit_follows_a_hot_swapped_batcher(config):
+    scheduler = SwappingScheduler(config)
+    network = FakeNetwork()
+    result = scheduler.predict("test", network, np.array([[3.0]]))
+    assert result.tolist() == [[6.0]]
+    assert scheduler.swaps == 0
+    assert scheduler._batchers["test"].model is network
+    scheduler.close()
+
+def test_stats_stay_consistent_under_concurrent_submitters(config):
+    batcher = MicroBatcher("test", FakeNetwork().predict_on_batch, replace(config, queue_size=10_000), model=None)
+    seen = []
+
+    def submit(rows):
+        for _ in range(200):
+            batcher.predict(np.ones((rows, 1)), timeout=5.0)
+            seen.append(batcher.get_stats())
+
+    threads = [threading.Thread(target=submit, args=(rows,)) for rows in (1, 2, 3, 1, 2, 3, 1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    stats = batcher.get_stats()
+    assert stats["requests"] == 8 * 200
+    assert stats["rows"] == 200 * (1 + 2 + 3 + 1 + 2 + 3 + 1 + 2)
+    assert all(s["rows"] >= s["batches"] for s in seen)
@@ -0,0 +1,82 @@
+"""
+Prediction index radius queries checked against a brute-force scan
+"""
+
+import random
+
+import pytest
+
+from backend.services.geo import haversine_km
+from backend.services.location_cache import quantize_location
+from backend.services.prediction_index import PredictionIndex, PredictionIndexConfig
+
+NOW = 1_700_000_000.0
+
+def prediction(probability: float, risk_level: str = "LOW"):
+    return {"probability": probability, "risk_level": risk_level, "confidence": 0.8, "model_version": "1"}
+
+@pytest.fixture
+def index() -> PredictionIndex:
+    return PredictionIndex(PredictionIndexConfig(bucket_deg=0.5, location_deg=0.01, max_entries=10_000,
+                                                 max_radius_km=1000))
+
+def populate(index, points):
+    for i, (latitude, longitude) in enumerate(points):
+        index.add("flood", latitude, longitude, prediction(i / len(points)), now=NOW)
+
+@pytest.mark.parametrize("latitude, longitude", [(0.0, 179.9), (-10.0, -179.95), (89.5, 10.0), (-89.9, -170.0)])
+def test_radius_query_matches_brute_force_across_the_antimeridian_and_poles(index, latitude, longitude):
+    rng = random.Random(7)
+    points = [(rng.uniform(max(-90.0, latitude - 5), min(90.0, latitude + 5)),
+               (longitude + rng.uniform(-8, 8) + 180) % 360 - 180)
+              for _ in range(2000)]
+    # One point per location cell, so none replaces another
+    points = list({quantize_location(*p, 0.01): p for p in points}.values())
+    populate(index, points)
+
+    for radius_km in (10, 100, 400):
+        found = {(e.latitude, e.longitude) for e, _ in index.nearby(latitude, longitude, radius_km, k=len(points), now=NOW)}
+        expected = {p for p in points if haversine_km(latitude, longitude, *p) <= radius_km}
+        assert found == expected
+    # The query really reached the far side of the dateline
+    if abs(latitude) < 80:
+        assert any(lon * longitude < 0 for _, lon in found)
+
+def test_nearby_orders_by_risk_then_distance(index):
+    index.add("flood", 0.0, 179.99, prediction(0.5, "MEDIUM"), now=NOW)
+    index.add("flood", 0.0, -179.9, prediction(0.9, "HIGH"), now=NOW)
+    index.add("flood", 0.0, 179.95, prediction(0.5, "MEDIUM"), now=NOW)
+    index.add("flood", 0.0, -179.8, prediction(0.5, "LOW"), now=NOW)
+
+    results = index.nearby(0.0, 179.99, radius_km=50, k=3, now=NOW)
+    assert [(e.longitude, e.probability) for e, _ in results] == [(-179.9, 0.9), (179.99, 0.5), (179.95, 0.5)]
+    assert results[1][1] == 0.0
+
+def test_newer_prediction_replaces_older_at_the_same_location(index):
+    index.add("flood", 10.0, 20.0, prediction(0.2), now=NOW)
+    index.add("flood", 10.001, 20.001, prediction(0.7), now=NOW + 1)
+    index.add("drought", 10.0, 20.0, prediction(0.4), now=NOW + 1)
+
+    assert len(index) == 2
+    assert index.stats["replaced"] == 1
+    highest = index.highest_by_type(10.0, 20.0, 10, now=NOW + 1)
+    assert {t: e.probability for t, e in highest.items()} == {"flood": 0.7, "drought": 0.4}
+
+def test_expired_predictions_are_skipped_then_evicted(index):
+    index.add("flood", 10.0, 20.0, prediction(0.9), horizon_hours=1, now=NOW)
+    index.add("flood", 10.1, 20.1, prediction(0.3), horizon_hours=24, now=NOW)
+
+    later = NOW + 2 * 3600
+    assert [e.probability for e, _ in index.nearby(10.0, 20.0, 50, now=later)] == [0.3]
+    index.add("flood", -10.0, -20.0, prediction(0.1), now=later)
+    assert len(index) == 2
+    assert index.stats["expired"] == 1
+
+def test_size_limit_evicts_soonest_expiring(index):
+    index.config.max_entries = 2
+    index.add("flood", 0.0, 0.0, prediction(0.1), horizon_hours=1, now=NOW)
+    index.add("flood", 1.0, 1.0, prediction(0.1), horizon_hours=24, now=NOW)
+    index.add("flood", 2.0, 2.0, prediction(0.1), horizon_hours=12, now=NOW)
+
+    assert sorted(key[1:] for key in index._entries) == sorted([(100, 100), (200, 200)])
+    assert index.stats["evicted"] == 1
@@ -0,0 +1,113 @@
+"""
+Incremental risk grid scoring with a recording model and a controlled input source
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from backend.models.feature_schema import FeatureSchema, FeatureSpec
+from backend.services.risk_grid_service import RiskGridConfig, RiskGridService
+
+SCHEMA = FeatureSchema(name="test", features=(FeatureSpec("precipitation", 0), FeatureSpec("humidity", 50)))
+WHEN = datetime(2026, 10, 18, 7, 30)
+
+class RecordingModel:
+    """Probability is precipitation / 100; records every batch it scores"""
+
+    def __init__(self, version: str = "1"):
+        self.schema = SCHEMA
+        self.version = version
+        self.batches = []
+
+    def predict_probabilities(self, X):
+        self.batches.append(X.copy())
+        return np.clip(X[:, 0] / 100, 0, 1)
+
+class Inputs:
+    """Input source returning the current precipitation field"""
+
+    def __init__(self, shape):
+        self.precipitation = np.full(shape, 10.0)
+
+    def __call__(self, when):
+        return lambda latitudes, longitudes: {"precipitation": self.precipitation.copy(),
+                                              "humidity": np.full(self.precipitation.shape, 60.0)}
+
+@pytest.fixture
+def config(tmp_path) -> RiskGridConfig:
+    """A 4x4 grid of 0.5 degree cells"""
+    return RiskGridConfig(resolution_deg=0.5, bounds=(0.0, 2.0, 10.0, 12.0), step_hours=6, keep_steps=2,
+                          directory=str(tmp_path / "risk_grid"), tile_cache_size=8)
+
+@pytest.fixture
+def inputs() -> Inputs:
+    return Inputs((4, 4))
+
+def test_unchanged_inputs_are_not_rescored(config, inputs):
+    service = RiskGridService(config, inputs)
+    model = RecordingModel()
+
+    assert service.compute({"flood": model}, WHEN) == {"flood": 16}
+    first = service.latest("flood")
+    assert service.compute({"flood": model}, WHEN) == {"flood": 0}
+
+    assert service.latest("flood") is first
+    assert first.version == 1
+    assert len(model.batches) == 1
+    np.testing.assert_allclose(first.probabilities, 0.1, rtol=1e-3)
+
+def test_only_changed_cells_are_rescored(config, inputs):
+    service = RiskGridService(config, inputs)
+    model = RecordingModel()
+    service.compute({"flood": model}, WHEN)
+
+    inputs.precipitation[2, 3] = 80.0
+    assert service.compute({"flood": model}, WHEN) == {"flood": 1}
+
+    layer = service.latest("flood")
+    assert layer.version == 2
+    assert model.batches[-1].tolist() == [[80.0, 60.0]]
+    expected = np.full((4, 4), 0.1)
+    expected[2, 3] = 0.8
+    np.testing.assert_allclose(layer.probabilities, expected, rtol=1e-3)
+
+def test_new_model_version_rescores_everything(config, inputs):
+    service = RiskGridService(config, inputs)
+    service.compute({"flood": RecordingModel("1")}, WHEN)
+
+    assert service.compute({"flood": RecordingModel("2")}, WHEN) == {"flood": 16}
+    assert service.latest("flood").model_version == "2"
+
+def test_observation_overrides_its_cell(config, inputs):
+    service = RiskGridService(config, inputs)
+    model = RecordingModel()
+    service.compute({"flood": model}, WHEN)
+
+    assert service.observe(0.7, 10.2, {"precipitation": "50", "condition": "rain"})
+    assert not service.observe(45.0, 10.2, {"precipitation": 50})
+    assert service.compute({"flood": model}, WHEN) == {"flood": 1}
+    assert service.latest("flood").probabilities[1, 0] == pytest.approx(0.5, rel=1e-3)
+
+def test_new_step_reuses_scores_and_old_steps_are_pruned(config, inputs):
+    service = RiskGridService(config, inputs)
+    model = RecordingModel()
+    for hours in (0, 6, 12):
+        when = WHEN.replace(hour=WHEN.hour + hours)
+        service.compute({"flood": model}, when)
+
+    assert len(model.batches) == 1
+    assert sorted(step for _, step in service._layers) == ["20261018T12", "20261018T18"]
+    assert sorted(p.name for p in (Path(config.directory) / "flood").iterdir()) == ["20261018T12.npy", "20261018T18.npy"]
+
+def test_saved_grids_are_served_after_restart(config, inputs):
+    service = RiskGridService(config, inputs)
+    service.compute({"flood": RecordingModel()}, WHEN)
+
+    restarted = RiskGridService(config, inputs)
+    layer = restarted.latest("flood")
+    assert layer.step == "20261018T06"
+    np.testing.assert_array_equal(layer.probabilities, service.latest("flood").probabilities)
+    assert len(restarted.tile(layer, 0, 0, 0, "bin")) == 256 * 256
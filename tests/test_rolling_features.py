@@ -0,0 +1,82 @@
+"""
+Closed-form rolling statistics checked against pandas, and the incremental windows against the batch ones
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.models.rolling_features import (IncrementalRollingFeatures, RollingSpec, RollingWindow,
+                                             rolling_features, rolling_slope)
+
+def series(n: int = 500, offset: float = 0.0, gaps: bool = True, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = offset + np.cumsum(rng.normal(0, 1, n)) + np.sin(np.arange(n) / 7)
+    if gaps:
+        values[[20, 21, 150, 333]] = np.nan
+        values[90] = np.inf
+    return values
+
+def pandas_slope(window: np.ndarray) -> float:
+    return np.polyfit(np.arange(len(window)), window, 1)[0]
+
+@pytest.mark.parametrize("offset", [0.0, 300.0, 1e6])
+@pytest.mark.parametrize("window", [2, 7, 30])
+def test_matches_pandas_rolling(offset, window):
+    values = series(offset=offset)
+    rolling = pd.Series(values).replace([np.inf, -np.inf], np.nan).rolling(window)
+    expected = {
+        "sum": rolling.sum(), "mean": rolling.mean(), "std": rolling.std(),
+        "min": rolling.min(), "max": rolling.max(), "trend": rolling.apply(pandas_slope, raw=True)
+    }
+
+    result = rolling_features(values, window, expected)
+    for stat, values_expected in expected.items():
+        # Absolute error scales with the offset, as it does for pandas' own sums
+        np.testing.assert_allclose(result[stat], values_expected.to_numpy(), rtol=1e-9,
+                                   atol=1e-9 * max(1.0, offset) * window, equal_nan=True, err_msg=stat)
+
+def test_short_and_empty_series_are_all_nan():
+    assert np.isnan(rolling_features([1.0, 2.0], 3)["mean"]).all()
+    assert rolling_features([], 3)["std"].shape == (0,)
+    assert np.isnan(rolling_slope([np.nan] * 5, 2)).all()
+    with pytest.raises(ValueError):
+        rolling_features([1.0], 0)
+
+@pytest.mark.parametrize("window", [2, 12])
+def test_incremental_window_matches_batch(window):
+    values = series(offset=1e4)
+    batch = rolling_features(values, window)
+    rolling = RollingWindow(window)
+    for i, value in enumerate(values):
+        rolling.update(value)
+        for stat, column in batch.items():
+            assert math.isnan(getattr(rolling, stat)) == math.isnan(column[i]), (stat, i)
+            if not math.isnan(column[i]):
+                assert getattr(rolling, stat) == pytest.approx(column[i], rel=1e-7, abs=1e-6), (stat, i)
+
+def test_incremental_window_resync_bounds_drift(monkeypatch):
+    monkeypatch.setattr(RollingWindow, "RESYNC_EVERY", 64)
+    values = series(n=2000, offset=1e8, gaps=False)
+    rolling = RollingWindow(16)
+    for value in values:
+        rolling.update(value)
+    assert rolling.mean == pytest.approx(values[-16:].mean(), abs=1e-6)
+    assert rolling.trend == pytest.approx(pandas_slope(values[-16:]), abs=1e-6)
+
+def test_per_location_features_warm_update_and_evict():
+    engine = IncrementalRollingFeatures([RollingSpec("precipitation", 3, ("mean", "max"))], max_locations=2)
+    engine.warm("a", {"precipitation": [0.0, 9.0, 1.0, 2.0]})
+    assert engine.features("a") == {"precipitation_mean_3": 4.0, "precipitation_max_3": 9.0}
+
+    assert engine.update("a", {"precipitation": 3.0}) == {"precipitation_mean_3": 2.0, "precipitation_max_3": 3.0}
+    # A missing column blanks the window until it refills
+    assert math.isnan(engine.update("a", {})["precipitation_mean_3"])
+
+    engine.update("b", {"precipitation": 1.0})
+    engine.update("a", {"precipitation": 1.0})
+    engine.update("c", {"precipitation": 1.0})
+    assert engine.features("b") is None
+    assert len(engine) == 2
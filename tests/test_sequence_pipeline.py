@@ -0,0 +1,105 @@
+"""
+Sequence windows and streamed training batches over memory-mapped station histories
+"""
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from backend.models.sequence_pipeline import (ReservoirSample, SequenceBatches, open_history, save_history,
+                                              sequence_windows)
+
+LENGTH = 5
+
+def create_sequences(data, target, sequence_length):
+    """The list-building windowing sequence_windows replaced"""
+    X, y = [], []
+    for i in range(len(data) - sequence_length):
+        X.append(data[i:i + sequence_length])
+        y.append(target[i + sequence_length])
+    return np.array(X), np.array(y)
+
+def station(source_id: int, rows: int):
+    """Features (row, source, noise) identify each row; the target is row * 10"""
+    row = np.arange(rows, dtype=np.float32)
+    features = np.column_stack([row, np.full(rows, source_id, dtype=np.float32), np.sin(row)])
+    return features, row * 10
+
+@pytest.fixture
+def sources(tmp_path):
+    for source_id, rows in enumerate((137, 64, 300)):
+        save_history(str(tmp_path), f"station-{source_id}", *station(source_id, rows))
+    return open_history(str(tmp_path))
+
+def samples_of(batches: SequenceBatches):
+    """(source, first row) of every sample streamed in one pass, checking each sample's contents"""
+    seen = []
+    for X, y, current in batches:
+        assert X.shape[1:] == (LENGTH, 3) and X.dtype == np.float32
+        first, source = X[:, 0, 0].astype(int), X[:, 0, 1].astype(int)
+        np.testing.assert_array_equal(X[:, :, 0], first[:, None] + np.arange(LENGTH))
+        np.testing.assert_array_equal(y, (first + LENGTH) * 10)
+        np.testing.assert_array_equal(current[:, 0], first + LENGTH)
+        np.testing.assert_array_equal(current[:, 1], source)
+        seen += zip(source.tolist(), first.tolist())
+    return seen
+
+def test_windows_match_list_building_without_copying():
+    data = np.random.default_rng(0).normal(size=(50, 4))
+    target = np.arange(50)
+    X, y = sequence_windows(data, target, 7)
+    expected_X, expected_y = create_sequences(data, target, 7)
+
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+    assert np.shares_memory(X, data)
+    assert not X.flags.writeable
+
+def test_windows_of_a_short_series_are_empty():
+    X, y = sequence_windows(np.ones((3, 2)), np.ones(3), 3)
+    assert X.shape == (0, 3, 2) and y.shape == (0,)
+
+def test_every_sample_streamed_once_with_train_before_validation(sources):
+    train = SequenceBatches(sources, LENGTH, batch_size=16, subset="train", validation_split=0.25,
+                            block_size=20, shuffle_blocks=2)
+    val = SequenceBatches(sources, LENGTH, batch_size=16, subset="val", validation_split=0.25, block_size=20)
+
+    train_samples, val_samples = samples_of(train), samples_of(val)
+    assert len(train_samples) == len(set(train_samples)) == len(train)
+    assert sorted(train_samples + val_samples) == [(s, k) for s, src in enumerate(sources)
+                                                   for k in range(src.rows - LENGTH)]
+    for source_id, source in enumerate(sources):
+        split, _ = val.sample_range(source)
+        assert max(k for s, k in train_samples if s == source_id) < split
+        assert min(k for s, k in val_samples if s == source_id) == split
+    # Validation keeps time order
+    assert val_samples == sorted(val_samples)
+
+def test_full_batches_across_buffers_and_reshuffled_each_epoch(sources):
+    train = SequenceBatches(sources, LENGTH, batch_size=32, block_size=16, shuffle_blocks=3)
+    first_pass = [len(y) for _, y, _ in train]
+    assert first_pass[:-1] == [32] * (len(first_pass) - 1)
+    assert len(first_pass) == train.steps()
+    assert samples_of(train) != samples_of(train)
+
+def test_scaler_fitted_on_training_rows_only(sources):
+    train = SequenceBatches(sources, LENGTH, subset="train", validation_split=0.25)
+    scaler = train.fit_scaler(StandardScaler(), chunk_rows=17)
+
+    rows = np.concatenate([source.features[:train.sample_range(source)[1] + LENGTH] for source in sources])
+    expected = StandardScaler().fit(rows)
+    np.testing.assert_allclose(scaler.mean_, expected.mean_, rtol=1e-6)
+    np.testing.assert_allclose(scaler.var_, expected.var_, rtol=1e-6)
+
+def test_reservoir_keeps_a_bounded_sample_of_streamed_rows():
+    reservoir = ReservoirSample(max_rows=50, seed=1)
+    for start in range(0, 1000, 64):
+        rows = np.arange(start, min(start + 64, 1000), dtype=np.float64)
+        reservoir.add(rows[:, None], rows)
+
+    X, y = reservoir.arrays()
+    assert reservoir.seen == 1000 and len(y) == 50
+    assert len(set(y.tolist())) == 50
+    np.testing.assert_array_equal(X[:, 0], y)
+    # Not just the first rows streamed
+    assert y.max() > 500
@@ -0,0 +1,36 @@
+"""
+Simple model scoring across the accepted input kinds
+"""
+
+import numpy as np
+import pytest
+
+from backend.models.feature_schema import FLOOD_FEATURES
+from backend.models.simple_models import SimpleModelFactory, generate_synthetic_training_data
+
+@pytest.fixture(scope="module")
+def flood_data():
+    data, labels = generate_synthetic_training_data(n_samples=400)
+    model = SimpleModelFactory.create_model("flood")
+    model.train(data, labels["flood"])
+    return model, data.iloc[:50]
+
+def test_single_prediction_extracts_only_the_first_row(flood_data, monkeypatch):
+    model, rows = flood_data
+    expected = model.predict_batch(rows)[0]
+    inputs = (rows, {name: rows[name].to_numpy() for name in rows}, FLOOD_FEATURES.extract(rows))
+    extracted = []
+    extract = FLOOD_FEATURES.extract
+    monkeypatch.setattr(type(FLOOD_FEATURES), "extract", lambda schema, data: extracted.append(data) or extract(data))
+
+    for data in inputs:
+        prediction = model.predict(data)
+        assert prediction["probability"] == pytest.approx(expected["probability"])
+        assert prediction["water_level"] == pytest.approx(expected["water_level"])
+    assert [FLOOD_FEATURES.n_rows(data) for data in extracted] == [1, 1, 1]
+
+def test_head_of_scalar_and_one_dimensional_inputs():
+    row = {"precipitation": 12.0, "humidity": [80, 70], "station": "a"}
+    assert FLOOD_FEATURES.head(row) == {"precipitation": 12.0, "humidity": [80], "station": "a"}
+    vector = np.zeros(len(FLOOD_FEATURES.columns))
+    assert FLOOD_FEATURES.head(vector) is vector
@@ -0,0 +1,102 @@
+"""
+Response snapshots: ETags, 304s, format negotiation and precomputed encodings
+"""
+
+import gzip
+import json
+import struct
+import threading
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.api import snapshots
+from backend.api.snapshots import (PACKED_MAGIC, SnapshotConfig, SnapshotStore, available_encodings,
+                                   available_formats)
+
+class Source:
+    """Weather-like data whose content the test changes between refreshes"""
+
+    def __init__(self):
+        self.points = [{"id": f"p{i}", "lat": 10.0 + i, "lon": -20.0 - i, "value": i} for i in range(40)]
+        self.loads = 0
+
+    def __call__(self):
+        self.loads += 1
+        return list(self.points)
+
+def points(data):
+    return {"points": data}
+
+@pytest.fixture
+def served():
+    source = Source()
+    store = SnapshotStore("test", source, SnapshotConfig(ttl_s=0))
+    loop_threads = set()
+    app = FastAPI()
+
+    @app.get("/points")
+    async def get_points(request: Request):
+        loop_threads.add(threading.get_ident())
+        return await store.respond(request, points)
+
+    return source, store, TestClient(app), loop_threads
+
+def test_conditional_get_answers_304_until_the_content_changes(served):
+    source, store, client, _ = served
+    first = client.get("/points", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert first.json()["points"][0] == {"id": "p0", "lat": 10.0, "lon": -20.0, "value": 0}
+    etag = first.headers["etag"]
+
+    # Refreshed, but with the same content: same version and ETag
+    again = client.get("/points", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert source.loads == 2 and again.headers["x-snapshot-version"] == "1"
+
+    source.points[0] = {**source.points[0], "value": 99}
+    changed = client.get("/points", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.headers["x-snapshot-version"] == "2"
+
+def test_gzip_body_is_the_compressed_json(served):
+    _, _, client, _ = served
+    response = client.get("/points", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-json-gzip"')
+    # The test client decompresses transparently
+    assert len(response.json()["points"]) == 40
+
+def test_packed_format_carries_coordinates_as_float32(served):
+    _, _, client, _ = served
+    body = client.get("/points?format=packed", headers={"Accept-Encoding": "identity"}).content
+    assert body[:4] == PACKED_MAGIC
+    header_length = struct.unpack("<I", body[8:12])[0]
+    header = json.loads(body[12:12 + header_length])
+    coords = np.frombuffer(body, dtype="<f4", offset=12 + header_length).reshape(-1, 2)
+    assert header["points"]["count"] == 40 and "lat" not in header["points"]["records"][0]
+    np.testing.assert_allclose(coords[3], [13.0, -23.0])
+
+def test_unknown_format_is_rejected(served):
+    _, _, client, _ = served
+    assert client.get("/points?format=xml").status_code == 400
+
+def test_every_representation_is_built_off_the_event_loop(served, monkeypatch):
+    _, store, client, loop_threads = served
+    encoded_on = set()
+    real_encode = snapshots.encode_payload
+
+    def tracking_encode(payload, fmt):
+        encoded_on.add(threading.get_ident())
+        return real_encode(payload, fmt)
+
+    monkeypatch.setattr(snapshots, "encode_payload", tracking_encode)
+    client.get("/points?format=packed", headers={"Accept-Encoding": "gzip"})
+
+    assert encoded_on and not encoded_on & loop_threads
+    snapshot = next(iter(store._snapshots.values()))
+    expected = {(fmt, enc) for fmt in available_formats() for enc in ["identity", *available_encodings()]}
+    assert set(snapshot.bodies) == expected
+    assert gzip.decompress(snapshot.body("packed", "gzip")) == snapshot.body("packed", "identity")
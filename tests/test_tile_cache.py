@@ -0,0 +1,97 @@
+"""
+Satellite tile cache: versioned publish, selection, eviction and coalesced fetches
+"""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from backend.services import tile_cache as tile_cache_module
+from backend.services.tile_cache import SatelliteTileCache, TileCacheConfig
+
+def image(value: float, shape=(4, 4, 3)) -> np.ndarray:
+    return np.full(shape, value, dtype=np.float32)
+
+def acquisitions(first: int, count: int):
+    # Each image holds its own time's number, so data and times can be matched up
+    return {f"t{n:03d}": image(n / 64) for n in range(first, first + count)}
+
+def assert_consistent(stack):
+    for time_label, frame in zip(stack.times, np.asarray(stack.data, dtype=np.float32)):
+        assert frame[0, 0, 0] == int(time_label[1:]) / 64
+
+@pytest.fixture
+def cache(tmp_path):
+    return SatelliteTileCache(TileCacheConfig(directory=str(tmp_path), max_time_steps=4, max_bytes=10 ** 9))
+
+def test_readers_never_see_new_data_with_old_times(cache, monkeypatch):
+    cache.put("s2", "1_1", acquisitions(0, 4))
+    seen = []
+    real_replace = os.replace
+
+    def replace_and_read(src, dst):
+        # Read around every rename the put makes
+        seen.append(cache.get("s2", "1_1"))
+        real_replace(src, dst)
+        seen.append(cache.get("s2", "1_1"))
+
+    monkeypatch.setattr(tile_cache_module.os, "replace", replace_and_read)
+    # The stack is full, so the new acquisition keeps its length the same
+    stack = cache.put("s2", "1_1", acquisitions(4, 1))
+
+    assert stack.times == ["t001", "t002", "t003", "t004"]
+    assert seen and all(s is not None for s in seen)
+    for s in seen:
+        assert_consistent(s)
+
+def test_get_selects_times_and_partial(cache):
+    cache.put("s2", "1_1", acquisitions(0, 4))
+
+    latest = cache.get("s2", "1_1", ["t002", "t003"])
+    assert latest.times == ["t002", "t003"]
+    assert_consistent(latest)
+
+    assert cache.get("s2", "1_1", ["t003", "t009"]) is None
+    assert cache.get("s2", "1_1", ["t003", "t009"], partial=True).times == ["t003"]
+
+def test_uint16_storage_round_trips_reflectance(tmp_path):
+    cache = SatelliteTileCache(TileCacheConfig(directory=str(tmp_path), storage_dtype="uint16"))
+    stack = cache.put("l8", "2_2", {"t000": image(0.1234)})
+    assert stack.data.dtype == np.uint16
+    np.testing.assert_allclose(stack.images(), 0.1234, atol=1e-4)
+
+def test_evicts_least_recently_used_stacks(tmp_path):
+    stack_bytes = image(0).astype(np.float16).nbytes
+    cache = SatelliteTileCache(TileCacheConfig(directory=str(tmp_path), max_bytes=2 * stack_bytes))
+    cache.put("s2", "a", acquisitions(0, 1))
+    cache.put("s2", "b", acquisitions(0, 1))
+    cache.get("s2", "a")
+    cache.put("s2", "c", acquisitions(0, 1))
+
+    assert cache.get("s2", "b") is None
+    assert cache.get("s2", "a") is not None and cache.get("s2", "c") is not None
+    assert cache.get_stats()["total_bytes"] == 2 * stack_bytes
+
+    # A new instance finds the surviving stacks on disk
+    reopened = SatelliteTileCache(cache.config)
+    assert reopened.get_stats()["stacks"] == 2
+
+def test_concurrent_fetches_for_a_tile_are_coalesced(cache):
+    calls = []
+
+    async def fetch(times):
+        calls.append(list(times))
+        await asyncio.sleep(0.01)
+        return {t: image(int(t[1:]) / 64) for t in times}
+
+    async def scenario():
+        times = ["t000", "t001"]
+        return await asyncio.gather(*(cache.get_or_fetch("s2", "1_1", times, fetch) for _ in range(5)))
+
+    stacks = asyncio.run(scenario())
+    assert calls == [["t000", "t001"]]
+    for stack in stacks:
+        assert stack.times == ["t000", "t001"]
+        assert_consistent(stack)
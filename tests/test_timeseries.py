@@ -0,0 +1,59 @@
+"""
+Time-series store history reads
+"""
+
+import numpy as np
+import pytest
+
+from backend.database.timeseries import TimeSeriesConfig, TimeSeriesStore
+
+def soil_readings(sensor_id: str, moisture: float, hours: range):
+    return [
+        {"timestamp": f"2026-03-01T{hour:02d}:00:00", "latitude": 28.61, "longitude": 77.21,
+         "series": sensor_id, "moisture": moisture + hour / 100}
+        for hour in hours
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    return TimeSeriesStore(TimeSeriesConfig(root_dir=str(tmp_path), cell_size_deg=0.05))
+
+def test_history_of_one_series_in_a_shared_cell(store):
+    store.append("sensor_soil", soil_readings("soil_a", 0.35, range(0, 6)) + soil_readings("soil_b", 0.28, range(0, 6)))
+
+    history = store.history("sensor_soil", "moisture", 28.61, 77.21, steps=4, series="soil_b")
+    np.testing.assert_allclose(history, [0.30, 0.31, 0.32, 0.33], rtol=1e-6)
+    assert history.dtype == np.float32 and history.flags.c_contiguous
+
+def test_history_needs_a_series_when_the_cell_holds_several(store):
+    store.append("sensor_soil", soil_readings("soil_a", 0.35, range(0, 3)) + soil_readings("soil_b", 0.28, range(0, 3)))
+
+    with pytest.raises(ValueError, match="soil_a.*soil_b"):
+        store.history("sensor_soil", "moisture", 28.61, 77.21, steps=4)
+
+def test_history_without_series_for_a_single_series_cell(store):
+    store.append("weather_openweather", [
+        {"timestamp": f"2026-03-0{day}T12:00:00", "latitude": 40.71, "longitude": -74.01,
+         "series": "openweather", "temperature": float(day)}
+        for day in (3, 1, 2)
+    ])
+
+    history = store.history("weather_openweather", "temperature", 40.71, -74.01, steps=5)
+    np.testing.assert_array_equal(history, [1.0, 2.0, 3.0])
+
+def test_collections_without_coordinates_are_stored_unlocated(store):
+    store.append_collection({
+        "timestamp": "2026-03-01T12:00:00",
+        "weather": {"noaa": {"current": {"temperature": 21.5}}},
+        "sensors": {"soil": {"sensors": [
+            {"sensor_id": "soil_a", "location": {"lat": 28.61, "lon": 77.21}, "soil_moisture": 0.3}
+        ]}}
+    })
+
+    weather = store.query("weather_noaa")
+    assert np.isnan(weather["latitude"]).all() and np.isnan(weather["longitude"]).all()
+    assert weather["temperature"].tolist() == [21.5]
+    # No location cell claims the unlocated row
+    assert len(store.query("weather_noaa", latitude=40.71, longitude=-74.01)["timestamp"]) == 0
+    soil = store.query("sensor_soil", latitude=28.61, longitude=77.21)
+    assert soil["series"].tolist() == ["soil_a"]
@@ -0,0 +1,109 @@
+"""
+Update stream hub: deltas, per-filter fan-out and resynchronisation of slow clients
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.services.update_stream import BoundingBox, StreamConfig, UpdateStreamHub
+
+PACIFIC = BoundingBox(lat_min=-40.0, lat_max=40.0, lon_min=150.0, lon_max=-150.0)
+
+def cyclone(cyclone_id: str, lat: float, lon: float, **fields):
+    return {"id": cyclone_id, "lat": lat, "lon": lon, "timestamp": "t0", **fields}
+
+def parse(message: bytes):
+    """(event, data) of one SSE message"""
+    fields = dict(line.split(": ", 1) for line in message.decode().splitlines() if line and not line.startswith(":"))
+    return fields.get("event"), json.loads(fields["data"]) if "data" in fields else None
+
+async def receive(stream, n: int):
+    return [parse(await asyncio.wait_for(stream.__anext__(), 1.0)) for _ in range(n)]
+
+@pytest.fixture
+def hub() -> UpdateStreamHub:
+    return UpdateStreamHub(StreamConfig(buffer_size=3, max_connections=10, recent_alerts=10))
+
+def test_box_across_the_antimeridian():
+    assert PACIFIC.contains({"lat": 0.0, "lon": 179.0})
+    assert PACIFIC.contains({"lat": 0.0, "lon": -170.0})
+    assert not PACIFIC.contains({"lat": 0.0, "lon": 0.0})
+    assert PACIFIC.contains({"lat_range": [-10, 10], "lon_range": [140, 155]})
+    assert not PACIFIC.contains({"lat_range": [-10, 10], "lon_range": [-140, -100]})
+
+def test_snapshot_on_connect_then_only_deltas_inside_the_box(hub):
+    async def scenario():
+        hub.publish_state({"cyclones": [cyclone("a", 10, 170), cyclone("b", 10, 0)]})
+        stream = hub.events(hub.subscribe(frozenset({"cyclones"}), PACIFIC))
+        start = await receive(stream, 2)
+
+        # Restamped but unchanged: no delta
+        assert hub.publish_state({"cyclones": [cyclone("a", 10, 170, timestamp="t1"), cyclone("b", 10, 0)]}) == 0
+        # "b" moves outside the box it was never in, "a" strengthens
+        hub.publish_state({"cyclones": [cyclone("a", 10, 170, category=3), cyclone("b", 11, 0)]})
+        # "a" leaves the box
+        hub.publish_state({"cyclones": [cyclone("a", 10, 100, category=3), cyclone("b", 11, 0)]})
+        deltas = await receive(stream, 2)
+        await stream.aclose()
+        return start, deltas
+
+    start, deltas = asyncio.run(scenario())
+    assert start[0] == (None, None)
+    assert start[1][0] == "snapshot"
+    assert [c["id"] for c in start[1][1]["cyclones"]] == ["a"]
+    assert [event for event, _ in deltas] == ["delta", "delta"]
+    assert deltas[0][1]["cyclones"] == {"upsert": [cyclone("a", 10, 170, category=3)], "remove": []}
+    assert deltas[1][1]["cyclones"] == {"upsert": [], "remove": ["a"]}
+    assert deltas[1][1]["sequence"] == deltas[0][1]["sequence"] + 1
+    assert hub.connections == 0
+
+def test_delta_is_encoded_once_per_filter(hub):
+    first = hub.subscribe(frozenset({"cyclones"}), PACIFIC)
+    second = hub.subscribe(frozenset({"cyclones"}), PACIFIC)
+    other = hub.subscribe(frozenset({"cyclones"}), BoundingBox())
+    hub.publish_state({"cyclones": [cyclone("a", 10, 170)]})
+
+    assert first.buffer[0] is second.buffer[0]
+    assert other.buffer[0] is not first.buffer[0]
+    assert hub.get_stats()["distinct_filters"] == 2
+
+def test_slow_client_drops_its_backlog_and_resyncs_with_current_state(hub):
+    async def scenario():
+        subscription = hub.subscribe(frozenset({"cyclones"}), BoundingBox())
+        stream = hub.events(subscription)
+        await receive(stream, 2)
+
+        # More deltas than the buffer holds while the client is not reading
+        for category in range(1, 6):
+            hub.publish_state({"cyclones": [cyclone("a", 10, 170, category=category)]})
+        assert subscription.resync
+        received = await receive(stream, 1)
+        assert not subscription.buffer
+        hub.publish_state({"cyclones": [cyclone("a", 10, 170, category=4)]})
+        received += await receive(stream, 1)
+        await stream.aclose()
+        return received
+
+    received = asyncio.run(scenario())
+    assert received[0][0] == "snapshot"
+    assert received[0][1]["cyclones"] == [cyclone("a", 10, 170, category=5)]
+    assert received[0][1]["sequence"] == 5
+    # Deltas resume after the snapshot
+    assert received[1][0] == "delta"
+    assert received[1][1]["sequence"] == 6
+    stats = hub.get_stats()
+    assert stats["resyncs"] == 1
+    assert stats["events_dropped"] == 3
+
+def test_alerts_reach_only_subscriptions_covering_them(hub):
+    pacific = hub.subscribe(frozenset({"alerts"}), PACIFIC)
+    europe = hub.subscribe(frozenset({"alerts"}), BoundingBox(35, 70, -10, 40))
+    cyclones_only = hub.subscribe(frozenset({"cyclones"}), PACIFIC)
+    hub.publish_alert({"lat": -5.0, "lon": -175.0, "message": "storm"})
+
+    assert [parse(m)[0] for m in pacific.buffer] == ["alert"]
+    assert not europe.buffer
+    assert not cyclones_only.buffer
+    assert hub.snapshot(frozenset({"alerts"}), PACIFIC)["alerts"][0]["message"] == "storm"
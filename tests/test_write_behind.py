@@ -0,0 +1,140 @@
+"""
+Write-behind buffer driven with an in-process writer
+"""
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from backend.database.write_behind import WriteBehindBuffer, WriteBehindConfig
+
+class FakeTable:
+    """Records written batches; can fail the next writes or hold writes until released"""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+        self.open = asyncio.Event()
+        self.open.set()
+
+    async def write_rows(self, rows):
+        await self.open.wait()
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+@pytest.fixture
+def config() -> WriteBehindConfig:
+    """A buffer that only flushes on its own when full or after 10s"""
+    return WriteBehindConfig(batch_size=100, flush_interval_s=10.0, max_pending=1000, put_timeout_s=1.0,
+                             max_attempts=3, backoff_base_s=0.01)
+
+def test_full_batch_is_flushed_without_waiting_for_the_interval(config, wait_until):
+    async def scenario():
+        table = FakeTable()
+        buffer = WriteBehindBuffer("test", table.write_rows, replace(config, batch_size=4))
+        await buffer.start()
+        assert await buffer.put_many((i,) for i in range(10)) == 10
+        await wait_until(lambda: len(table.rows) == 10)
+        await buffer.stop()
+        return table, buffer
+
+    table, buffer = asyncio.run(scenario())
+    assert [len(batch) for batch in table.batches] == [4, 4, 2]
+    assert table.rows == [(i,) for i in range(10)]
+    assert buffer.counters["flushes"] == 3
+
+def test_partial_batch_is_flushed_after_the_interval(config, wait_until):
+    async def scenario():
+        table = FakeTable()
+        buffer = WriteBehindBuffer("test", table.write_rows, replace(config, flush_interval_s=0.05))
+        await buffer.start()
+        await buffer.put_many([(1,), (2,), (3,)])
+        assert table.batches == []
+        await wait_until(lambda: table.batches, timeout_s=1.0)
+        await buffer.stop()
+        return table
+
+    assert asyncio.run(scenario()).batches == [[(1,), (2,), (3,)]]
+
+def test_full_buffer_makes_producers_wait_for_a_flush(config):
+    async def scenario():
+        table = FakeTable()
+        buffer = WriteBehindBuffer("test", table.write_rows, replace(config, batch_size=5, max_pending=5))
+        await buffer.start()
+        assert await buffer.put_many((i,) for i in range(6)) == 6
+        await buffer.stop()
+        return table, buffer
+
+    table, buffer = asyncio.run(scenario())
+    assert len(table.rows) == 6
+    assert buffer.counters["backpressure_waits"] == 1
+    assert buffer.counters["dropped_backpressure"] == 0
+
+def test_row_is_dropped_when_no_room_is_made_in_time(config):
+    async def scenario():
+        table = FakeTable()
+        table.open.clear()  # The database is stuck
+        buffer = WriteBehindBuffer("test", table.write_rows, replace(config, batch_size=2, max_pending=2, put_timeout_s=0.05))
+        await buffer.start()
+        accepted = await buffer.put_many((i,) for i in range(5))
+        table.open.set()
+        await buffer.stop()
+        return table, buffer, accepted
+
+    table, buffer, accepted = asyncio.run(scenario())
+    # Two rows fill the buffer; the flush holding them frees room for two
+    # more, then the writer is stuck and the last row times out
+    assert accepted == 4
+    assert buffer.counters["dropped_backpressure"] == 1
+    assert len(table.rows) == 4
+
+def test_failed_batch_is_retried(config):
+    async def scenario():
+        table = FakeTable(failures=2)
+        buffer = WriteBehindBuffer("test", table.write_rows, config)
+        await buffer.put_many([(1,), (2,)])
+        assert await buffer.flush() == 2
+        return table, buffer
+
+    table, buffer = asyncio.run(scenario())
+    assert table.batches == [[(1,), (2,)]]
+    assert buffer.counters["failed_flushes"] == 2
+    assert buffer.counters["failed_rows"] == 0
+
+def test_batch_is_dropped_after_the_last_attempt(config):
+    async def scenario():
+        table = FakeTable(failures=3)
+        buffer = WriteBehindBuffer("test", table.write_rows, config)
+        await buffer.put_many([(1,), (2,)])
+        assert await buffer.flush() == 0
+        # The next batch is unaffected
+        await buffer.put((3,))
+        assert await buffer.flush() == 1
+        return table, buffer
+
+    table, buffer = asyncio.run(scenario())
+    assert table.batches == [[(3,)]]
+    assert buffer.counters["failed_rows"] == 2
+    assert buffer.counters["written"] == 1
+
+def test_stop_writes_pending_rows(config):
+    async def scenario():
+        table = FakeTable()
+        buffer = WriteBehindBuffer("test", table.write_rows, config)
+        await buffer.start()
+        await buffer.put_many([(1,), (2,), (3,)])
+        assert table.batches == []
+        await buffer.stop()
+        return table, buffer
+
+    table, buffer = asyncio.run(scenario())
+    assert table.batches == [[(1,), (2,), (3,)]]
+    assert not buffer.running
+    assert buffer.pending == 0